@@ -53,6 +53,11 @@ sys.path.append(os.path.join(os.path.abspath(__file__ + "../../")))
 
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+try:
+    controller_session = importlib.import_module("controller_session_9800_3504")
+except ImportError:
+    # without pexpect every action runs wifi_ctl_9800_3504.py
+    controller_session = None
 
 
 class create_controller_series_object:
@@ -72,7 +77,8 @@ class create_controller_series_object:
                  ap_dual_band_slot_6g=None,
                  port=None,
                  timeout=None,
-                 pwd=None
+                 pwd=None,
+                 persistent_session=True
                  ):
         if scheme is None:
             raise ValueError('Controller scheme must be set: serial, ssh or telnet')
@@ -181,6 +187,8 @@ class create_controller_series_object:
         # self.series = 'NA'
         self.testbed_location = 'NA'
         self.ap_config_radio_role = 'NA'
+        # 9800 over ssh or telnet: keep one logged in session instead of running wifi_ctl_9800_3504.py per action
+        self.persistent_session = persistent_session
 
 
     # TODO update the wifi_ctl_9800_3504 to use 24g, 5g, 6g
@@ -220,12 +228,225 @@ class create_controller_series_object:
 #
     # TODO consolidate the command formats
 
+    # 9800 band name used in the ap name ... dot11 <band> commands
+    def dot11_band(self):
+        return {'24g': '24ghz', '5g': '5ghz', '6g': '6ghz', 'dual_band_5g': 'dual-band', 'dual_band_6g': 'dual-band'}.get(self.band)
+
+    # the 9800 cli for an action, the same commands wifi_ctl_9800_3504.py sends
+    # returns (exec commands, configuration lines) or None when the action is left to wifi_ctl_9800_3504.py
+    def session_commands(self):
+        action = self.action
+        ap = self.ap
+        slot = self.ap_band_slot
+        band = self.dot11_band()
+        wlan = self.wlan
+        value = self.value
+        if band is None:
+            return None
+
+        show_commands = {
+            "summary": "show ap summary",
+            "show_ap_status": "show ap status",
+            "show_ap_wlan_summary": "show ap wlan summary",
+            "show_wlan_summary": "show wlan summary",
+            "show_wireless_client_sumry": "show  wireless client summary",
+            "get_ra_trace_files": "dir bootflash: | i ra_trace",
+            "11r_logs": "sh wi stats client detail | inc 11r",
+            "advanced": "show ap dot11 {band} summary".format(band=band),
+            "show_ap_name_config_role": "show ap name {ap} config slot {slot} | inc Role".format(ap=ap, slot=slot),
+            "show_ap_tx_power_config": "show ap name {ap} config dot11 {band} | sec Tx".format(ap=ap, band=band),
+            "show_ap_bssid_24g": "show ap name {ap} wlan dot11 24ghz".format(ap=ap),
+            "show_ap_bssid_5g": "show ap name {ap} wlan dot11 5ghz".format(ap=ap),
+            "show_ap_bssid_6g": "show ap name {ap} wlan dot11 6ghz".format(ap=ap),
+            "show_ap_bssid_dual_band_5g": "show ap name {ap} wlan dot11 dual-band".format(ap=ap),
+            "show_ap_bssid_dual_band_6g": "show ap name {ap} wlan dot11 dual-band".format(ap=ap),
+        }
+        if action in show_commands:
+            return [show_commands[action]], []
+
+        if action in ['cmd', 'show_client_macadd_detail', 'debug_wieless_mac', 'no_debug_wieless_mac', 'get_data_ra_trace_files', 'del_ra_trace_file']:
+            if value is None:
+                return None
+            value_commands = {
+                'cmd': "{value}",
+                'show_client_macadd_detail': "show wireless client mac-address {value}  detail",
+                'debug_wieless_mac': "debug wireless mac {value}",
+                'no_debug_wieless_mac': "no debug wireless mac  {value}",
+                'get_data_ra_trace_files': "more bootflash:{value}",
+                'del_ra_trace_file': "delete /force bootflash:{value}",
+            }
+            return [value_commands[action].format(value=value)], []
+
+        # ap name <ap> dot11 <band> slot <slot> ...
+        ap_slot = "ap name {ap} dot11 {band} slot {slot}".format(ap=ap, band=band, slot=slot)
+        ap_no_slot = "ap name {ap} no dot11 {band} slot {slot}".format(ap=ap, band=band, slot=slot)
+        if action == 'manual':
+            if band == 'dual-band':
+                return [ap_slot + " role manual client-serving"], []
+            return [ap_slot + " radio role manual client-serving"], []
+        if action == 'auto':
+            return [ap_slot + " radio role auto"], []
+        if action in ['txPower', 'channel', 'bandwidth']:
+            if value is None:
+                return None
+            setting = {'txPower': 'txpower', 'channel': 'channel', 'bandwidth': 'channel width'}[action]
+            return ["{ap_slot} {setting} {value}".format(ap_slot=ap_slot, setting=setting, value=value)], []
+        if action == 'enable_operation_status':
+            return [ap_no_slot + " shutdown"], []
+        if action == 'disable_operation_status':
+            return [ap_slot + " shutdown"], []
+        if action in ['enable_network_dual_band_5ghz', 'enable_network_dual_band_6ghz']:
+            return ["ap name {ap} no dot11 dual-band slot {slot} shutdown".format(ap=ap, slot=slot)], []
+        if action in ['disable_network_dual_band_5ghz', 'disable_network_dual_band_6ghz']:
+            # the session answers the (y/n) question of exec commands
+            return ["ap name {ap} dot11 dual-band slot {slot} shutdown".format(ap=ap, slot=slot)], []
+        if action in ['dual_band_mode_shutdown', 'dual_band_no_mode_shutdown', 'config_dual_band_mode']:
+            if self.band == 'dual_band_6g':
+                dual_band = '6ghz'
+            elif self.band == 'dual_band_5g':
+                dual_band = '5ghz'
+            else:
+                return None
+            if action == 'dual_band_mode_shutdown':
+                return ["ap name {ap} dot11 dual-band shutdown".format(ap=ap)], []
+            if action == 'dual_band_no_mode_shutdown':
+                return ["ap name {ap} no dot11 dual-band shutdown".format(ap=ap)], []
+            return ["ap name {ap} dot11 dual-band slot {slot} band {band}".format(ap=ap, slot=slot, band=dual_band)], []
+
+        # configuration mode, the lines go to the controller in one batch
+        if action in ['enable_network_24ghz', 'enable_network_5ghz', 'enable_network_6ghz']:
+            return [], ["no ap dot11 {band} shutdown".format(band=action.split('_')[-1])]
+        if action in ['disable_network_24ghz', 'disable_network_5ghz', 'disable_network_6ghz']:
+            # a batch answers its own (y/n) question
+            return [], ["ap dot11 {band} shutdown".format(band=action.split('_')[-1]), "y"]
+        if action == 'no_logging_console':
+            return [], ["no logging console"]
+        if action == 'line_console_0':
+            return [], ["line console 0"]
+        if action in ["ap_dot11_dot11ax_mcs_tx_index_spatial_stream", "no_ap_dot11_dot11ax_mcs_tx_index_spatial_stream"]:
+            if self.spatial_stream is None or self.mcs_tx_index is None:
+                return None
+            mcs_band = {'24g': '24ghz', '5g': '5ghz', 'dual_band_5g': '5ghz', '6g': '6ghz', 'dual_band_6g': '6ghz'}[self.band]
+            line = "ap dot11 {band} dot11ax mcs tx index {index} spatial-stream {stream}".format(band=mcs_band, index=self.mcs_tx_index, stream=self.spatial_stream)
+            if action.startswith("no_"):
+                line = "no " + line
+            return [], [line]
+
+        # wlan configuration
+        if wlan is None:
+            return None
+        if action == 'wireless_tag_policy':
+            return [], ["wireless tag policy {policy_tag}".format(policy_tag=self.tag_policy),
+                        "wlan {wlan} policy {policy_profile}".format(wlan=wlan, policy_profile=self.policy_profile)]
+        if action == 'delete_wlan':
+            return [], ["no wlan {wlan}".format(wlan=wlan)]
+        if action == 'enable_wlan':
+            return [], ["wlan {wlan}".format(wlan=wlan), "no shutdown"]
+        if action == 'disable_wlan':
+            return [], ["wlan {wlan}".format(wlan=wlan), "shutdown"]
+        if action == 'dtim':
+            if value is None or self.band not in ['5g', '6g']:
+                return None
+            return [], ["wlan {wlan}".format(wlan=wlan), "dtim dot11 {band} {value}".format(band=band, value=value)]
+        if action in ['create_wlan', 'create_wlan_wpa2', 'create_wlan_wpa3']:
+            if self.wlanID is None or self.wlanSSID is None:
+                return None
+            if action != 'create_wlan' and self.security_key is None:
+                return None
+            set_key = "security wpa psk set-key ascii 0 {security_key}".format(security_key=self.security_key)
+            if action == 'create_wlan':
+                wlan_lines = ["no security ft",
+                              "no security ft adaptive",
+                              "no security wpa",
+                              "no security wpa wpa2",
+                              "no security wpa wpa1",
+                              "no security wpa wpa2 ciphers aes",
+                              "no security dot1x authentication-list",
+                              "no security wpa akm dot1x",
+                              "no shutdown"]
+            elif action == 'create_wlan_wpa2':
+                wlan_lines = ["assisted-roaming dual-list",
+                              "bss-transition dual-list",
+                              "radio policy dot11 24ghz",
+                              "radio policy dot11 5ghz",
+                              set_key,
+                              "no security wpa akm dot1x",
+                              "security wpa akm psk",
+                              "no shutdown"]
+            else:
+                wlan_lines = ["assisted-roaming dual-list",
+                              "radio policy dot11 6ghz",
+                              "no security ft adaptive",
+                              "no security wpa wpa2",
+                              set_key,
+                              "no security wpa akm dot1x",
+                              "security wpa akm sae",
+                              "security wpa akm sae pwe h2e",
+                              "security wpa wpa3",
+                              "security pmf mandatory",
+                              "no shutdown"]
+            return [], ["wlan {wlan} {wlanID} {wlanSSID}".format(wlan=wlan, wlanID=self.wlanID, wlanSSID=self.wlanSSID)] + wlan_lines
+        if action in ['enable_ft_akm_ftpsk', 'enable_ft_akm_ftsae', 'enable_ftotd_akm_ftpsk', 'enable_ft_wpa3_dot1x', 'enable_ft_wpa3_dot1x_sha256']:
+            set_key = "security wpa psk set-key ascii 0 {security_key}".format(security_key=self.security_key)
+            ft_lines = {
+                'enable_ft_akm_ftpsk': ["security ft", set_key, "no security wpa akm psk", "security wpa akm ft psk"],
+                'enable_ft_akm_ftsae': ["security ft", set_key, "no security wpa akm sae", "security wpa akm ft sae"],
+                'enable_ftotd_akm_ftpsk': ["security ft", "security ft over-the-ds", set_key, "no security wpa akm psk", "security wpa akm ft psk"],
+                'enable_ft_wpa3_dot1x': ["security ft", "no security wpa akm sae", "security wpa akm ft dot1x", "security dot1x authentication-list default"],
+                'enable_ft_wpa3_dot1x_sha256': ["security ft", "no security wpa akm sae", "security wpa akm dot1x-sha256", "security wpa akm ft dot1x",
+                                                "security dot1x authentication-list  {value}".format(value=value)],
+            }[action]
+            return [], ["wlan {wlan}".format(wlan=wlan), "shutdown"] + ft_lines + ["no shutdown"]
+        return None
+
+    # the ControllerSession of this controller, or None when actions go through wifi_ctl_9800_3504.py
+    def controller_session(self):
+        if not self.persistent_session or controller_session is None:
+            return None
+        if self.series != "9800" or self.scheme not in ["ssh", "telnet"]:
+            return None
+        return controller_session.ControllerSession.get_shared(scheme=self.scheme, dest=self.dest, port=self.port,
+                                                               user=self.user, passwd=self.passwd, prompt=self.prompt,
+                                                               timeout=self.timeout)
+
+    # run the action on the persistent session, returns None when it has to go through wifi_ctl_9800_3504.py
+    def send_session_command(self):
+        session = self.controller_session()
+        if session is None:
+            return None
+        commands = self.session_commands()
+        if commands is None:
+            return None
+        exec_commands, config_lines = commands
+        try:
+            summary_output = ''
+            for command in exec_commands:
+                summary_output += session.run(command)
+            if config_lines:
+                summary_output += session.configure(config_lines)
+        except controller_session.ControllerSessionError as e:
+            logger.error("controller session failed, running wifi_ctl_9800_3504.py: {error}".format(error=e))
+            return None
+        logger.info(summary_output)
+        return summary_output
+
+    # send several configuration lines in one round trip, returns the controller output
+    def send_config_lines(self, lines):
+        session = self.controller_session()
+        if session is None:
+            raise ValueError("configuration batches need a 9800 controller over ssh or telnet")
+        return session.configure(lines)
+
     def send_command(self):
         # self.convert_band()
         self.set_ap_band_slot()
 
         logger.info("action {action}".format(action=self.action))
 
+        summary_output = self.send_session_command()
+        if summary_output is not None:
+            return summary_output
+
         # set the ap_band_slot 24g = ap_band_slot 0 , 5g ap_band_slot = 1 / 2, 6g - ap_band_slot 2 / 3 so needs to be passed in
 
         # Command base
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# flake8: noqa
+
+"""
+NAME: controller_session_9800_3504.py
+
+CLASSIFICATION: module
+
+PURPOSE:
+Persistent CLI session to a cisco 9800 controller.
+
+cc_module_9800_3504 used to run ./wifi_ctl_9800_3504.py for every action, so every
+command paid for a new process, a new ssh or telnet connection and the whole login
+dance before the controller did any work. ControllerSession logs in once and keeps
+the session open: commands are serialized on it with a lock, the end of each
+command is found by waiting for the controller prompt (answering --More-- and
+(y/n) questions on the way), and a dropped session is logged in again and the
+command resent once.
+
+configure() sends 'configure terminal', a batch of configuration lines and 'end'
+in one write and waits for the exec prompt once, so a wlan configuration of ten
+lines is one round trip instead of ten prompt waits.
+
+Sessions are shared, every caller asking for the same controller, port, user and
+prompt gets the same session. Open sessions log out when the process exits.
+
+SETUP:
+pexpect, ssh or telnet client
+
+EXAMPLE:
+    session = ControllerSession.get_shared(scheme="ssh", dest="localhost", port=8887,
+                                           user="admin", passwd="Cisco123", prompt="WLC1")
+    summary = session.run("show ap summary")
+    session.configure(["wlan open-wlan", "shutdown", "dtim dot11 5ghz 3", "no shutdown"])
+
+COPYRIGHT:
+    Copyright (C) 2020-2026 Candela Technologies Inc
+    License: Free to distribute and modify. LANforge systems must be licensed.
+
+INCLUDE_IN_README
+"""
+
+import sys
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import atexit
+import logging
+import re
+import threading
+import time
+
+import pexpect
+
+logger = logging.getLogger(__name__)
+
+CR = "\r\n"
+SEND_MORE = ' '
+MORE = "--More--"
+FINGERPRINT = r"continue connecting \(yes/no(/\[fingerprint\])?\)\?"
+CONFIRM = r"\(y/n\)(\[[yn]\])?:?"
+BAD_SECRETS = "Bad secrets"
+PRESS_RETURN = "Press RETURN to get started"
+
+
+class ControllerSessionError(Exception):
+    pass
+
+
+class ControllerSession:
+    Default_Timeout = 10
+    Login_Attempts = 8
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls, scheme=None, dest=None, port=None, user=None, passwd=None, prompt=None, timeout=Default_Timeout):
+        """
+        :return: the session to the controller, shared by every caller in the process; it logs in on first use
+        """
+        key = (scheme, dest, str(port), user, prompt)
+        with cls._sessions_lock:
+            session = cls._sessions.get(key)
+            if session is None:
+                session = cls._sessions[key] = cls(scheme=scheme, dest=dest, port=port, user=user,
+                                                   passwd=passwd, prompt=prompt, timeout=timeout)
+            return session
+
+    @classmethod
+    def close_all(cls):
+        with cls._sessions_lock:
+            sessions = list(cls._sessions.values())
+        for session in sessions:
+            session.close()
+
+    def __init__(self,
+                 scheme=None,
+                 dest=None,
+                 port=None,
+                 user=None,
+                 passwd=None,
+                 prompt=None,
+                 timeout=Default_Timeout):
+        """
+        :param scheme: ssh or telnet
+        :param dest: controller address
+        :param port: ssh or telnet port, default 22 or 23
+        :param user: login
+        :param passwd: password, also used for enable
+        :param prompt: controller hostname, WLC1 for the prompts WLC1> WLC1# WLC1(config)#
+        :param timeout: seconds to wait for a prompt
+        """
+        if scheme not in ("ssh", "telnet"):
+            raise ValueError("ControllerSession scheme must be ssh or telnet")
+        if dest is None or user is None or passwd is None or prompt is None:
+            raise ValueError("ControllerSession needs dest, user, passwd and prompt")
+        self.scheme = scheme
+        self.dest = dest
+        self.port = int(port) if port else (22 if scheme == "ssh" else 23)
+        self.user = user
+        self.passwd = passwd
+        self.prompt = prompt
+        self.timeout = float(timeout) if timeout else self.Default_Timeout
+        self.lock = threading.RLock()
+        self.egg = None
+        self.logins = 0
+        self.commands = 0
+
+        name = re.escape(prompt)
+        self.user_prompt = re.compile(name + ">")
+        self.enable_prompt = re.compile(name + "#")
+        self.config_prompt = re.compile(name + r"\([\w\-]+\)#")
+        self.any_prompt = re.compile(name + r"(\([\w\-]+\))?[#>]")
+
+    def spawn_command(self):
+        """
+        :return: command line that opens the connection
+        """
+        if self.scheme == "ssh":
+            return "ssh -p%d -o PubkeyAuthentication=no %s@%s" % (self.port, self.user, self.dest)
+        return "telnet %s %d" % (self.dest, self.port)
+
+    def connected(self):
+        return self.egg is not None and self.egg.isalive()
+
+    def connect(self):
+        """
+        Open the connection and log in to the enable (#) prompt, unless already logged in.
+        Raises ControllerSessionError when the connection or login fails.
+        """
+        with self.lock:
+            if self.connected():
+                return
+            self._close_egg()
+            cmd = self.spawn_command()
+            logger.info("controller session spawn: {cmd}".format(cmd=cmd))
+            try:
+                self.egg = pexpect.spawn(cmd, encoding="utf-8", codec_errors="ignore", timeout=self.timeout)
+                self._login()
+                # no --More-- paging, the session reads whole outputs
+                self._send_and_wait("terminal length 0")
+            except ControllerSessionError:
+                self._close_egg()
+                raise
+            except (pexpect.ExceptionPexpect, OSError) as e:
+                self._close_egg()
+                raise ControllerSessionError("controller {dest}: login failed: {error}".format(
+                    dest=self.dest, error=type(e).__name__ if isinstance(e, (pexpect.EOF, pexpect.TIMEOUT)) else e)) from e
+            self.logins += 1
+            logger.info("controller session logged in to {dest} ({logins} logins)".format(dest=self.dest, logins=self.logins))
+
+    def _login(self):
+        patterns = [FINGERPRINT, "Username:", "User:", "Password:",
+                    self.config_prompt, self.enable_prompt, self.user_prompt,
+                    BAD_SECRETS, PRESS_RETURN, pexpect.EOF, pexpect.TIMEOUT]
+        timeouts = 0
+        for _attempt in range(self.Login_Attempts * 2):
+            i = self.egg.expect(patterns, timeout=self.timeout)
+            if i == 0:
+                self.egg.sendline("yes")
+            elif i in (1, 2):
+                self.egg.sendline(self.user)
+            elif i == 3:
+                self.egg.sendline(self.passwd)
+            elif i == 4:
+                # left in config mode by an earlier session
+                self.egg.sendline("end")
+            elif i == 5:
+                return
+            elif i == 6:
+                self.egg.sendline("enable")
+            elif i == 7:
+                raise ControllerSessionError("controller {dest}: login refused, bad secrets".format(dest=self.dest))
+            elif i == 8:
+                self.egg.send(CR)
+            elif i == 9:
+                raise ControllerSessionError("controller {dest}: connection closed during login: {before}".format(
+                    dest=self.dest, before=self.egg.before))
+            else:
+                timeouts += 1
+                if timeouts >= self.Login_Attempts:
+                    break
+                # telnet consoles wait for a return before showing a prompt
+                self.egg.send(CR)
+        raise ControllerSessionError("controller {dest}: did not reach the {prompt}# prompt".format(dest=self.dest, prompt=self.prompt))
+
+    def _send_and_wait(self, text, until=None, answer=True):
+        """
+        Send text and read up to the prompt until, answering --More-- on the way.
+        :param answer: answer (y/n) questions with y; a batch carries its own answers
+        :return: output read before the prompt
+        """
+        until = until or self.any_prompt
+        self.egg.send(text + "\n" if not text.endswith("\n") else text)
+        output = []
+        while True:
+            i = self.egg.expect([until, MORE, CONFIRM], timeout=self.timeout)
+            output.append(self.egg.before)
+            if i == 0:
+                return "".join(output)
+            if i == 1:
+                self.egg.send(SEND_MORE)
+            else:
+                output.append(self.egg.after)
+                if answer:
+                    self.egg.sendline("y")
+
+    def _call(self, text, until=None, answer=True):
+        """ run text on the session, logging in again and resending once when the session dropped """
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    self.connect()
+                    output = self._send_and_wait(text, until=until, answer=answer)
+                    self.commands += 1
+                    return output
+                except (pexpect.EOF, pexpect.TIMEOUT) as e:
+                    dropped = isinstance(e, pexpect.EOF) or not self.egg.isalive()
+                    logger.warning("controller session {dest}: {what} on {text!r}, before: {before}".format(
+                        dest=self.dest, what="connection dropped" if dropped else "timed out",
+                        text=text.strip(), before=self.egg.before))
+                    self._close_egg()
+                    if attempt:
+                        raise ControllerSessionError("controller {dest}: no prompt after {text!r}".format(dest=self.dest, text=text.strip())) from e
+                except (pexpect.ExceptionPexpect, OSError) as e:
+                    self._close_egg()
+                    raise ControllerSessionError("controller {dest}: {error} on {text!r}".format(dest=self.dest, error=e, text=text.strip())) from e
+
+    def run(self, command=None):
+        """
+        Run one exec mode command.
+        :return: the output of the command, starting with its echo
+        """
+        logger.info("controller session command: {command}".format(command=command))
+        output = self._call(command)
+        logger.debug(output)
+        return output
+
+    def configure(self, lines=None):
+        """
+        Send 'configure terminal', lines and 'end' with one write and wait for the exec prompt.
+        A line the controller answers with a (y/n) question must be followed by its answer,
+        since the lines after it are already on the way.
+        :param lines: configuration lines, sub modes like 'wlan <name>' are entered by their line
+        :return: the output of all lines
+        """
+        lines = list(lines or [])
+        logger.info("controller session configure: {lines}".format(lines=lines))
+        # the exec prompt only comes back after 'end'
+        output = self._call("\n".join(["configure terminal"] + lines + ["end"]), until=self.enable_prompt, answer=False)
+        logger.debug(output)
+        return output
+
+    def _close_egg(self):
+        if self.egg is None:
+            return
+        try:
+            if self.egg.isalive():
+                self.egg.sendline("end")
+                self.egg.sendline("logout")
+                time.sleep(0.1)
+        except (OSError, pexpect.ExceptionPexpect):
+            pass
+        self.egg.close(force=True)
+        self.egg = None
+
+    def close(self):
+        with self.lock:
+            self._close_egg()
+        with self._sessions_lock:
+            for key, session in list(self._sessions.items()):
+                if session is self:
+                    del self._sessions[key]
+# ~ControllerSession
+
+
+atexit.register(ControllerSession.close_all)
@@ -0,0 +1,204 @@
+# flake8: noqa
+"""----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+
+    asyncio variant of LFSession, LFJsonQuery and LFJsonCommand
+
+    Every generated LFJsonQuery.get_* and LFJsonCommand.post_* method has an awaitable
+    counterpart with the same name, signature and docstring. The counterparts are built
+    from the generated classes when this module is imported, so they never drift from
+    lanforge_api.py when that file is regenerated.
+
+    The awaitable methods run the blocking implementation on a bounded thread pool
+    that shares the LFSession keep-alive connection pool. The concurrency limit caps
+    how many requests are outstanding against the GUI at once.
+
+    EXAMPLE PYTHON USAGE:
+    ----- ----- ----- 8< ----- ----- ----- 8< ----- ----- -----
+    async def probe_all(eids):
+        async with AsyncLFSession(lfclient_url="http://localhost:8080",
+                                  max_concurrency=32) as session:
+            query = session.get_query()
+            return await asyncio.gather(*[query.get_probe(eid_list=[eid]) for eid in eids])
+
+    results = asyncio.run(probe_all(['1.1.sta0000', '1.1.sta0001']))
+    ----- ----- ----- 8< ----- ----- ----- 8< ----- ----- -----
+
+----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+import sys
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .lanforge_api import LFSession, LFJsonCommand, LFJsonQuery
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _async_counterpart(name: str = None, sync_method=None):
+    """
+    Wrap a generated method in a coroutine function that runs it through the owning
+    AsyncLFSession. functools.wraps keeps the generated signature and docstring.
+    """
+    @functools.wraps(sync_method)
+    async def method(self, *args, **kwargs):
+        return await self.async_session.run_sync(self._sync_method, name, *args, **kwargs)
+    return method
+
+
+class _AsyncRequest:
+    """
+    Base of AsyncLFJsonQuery and AsyncLFJsonCommand. Each worker thread gets its own
+    synchronous request instance so error and warning lists are not shared between
+    requests that are in flight at the same time.
+    """
+    sync_class: type = None
+
+    def __init__(self, async_session: 'AsyncLFSession' = None):
+        self.async_session = async_session
+        self._local = threading.local()
+
+    def get_sync_instance(self):
+        instance = getattr(self._local, "instance", None)
+        if instance is None:
+            session = self.async_session.session
+            instance = self.sync_class(session_obj=session,
+                                       debug=session.is_debug(),
+                                       exit_on_error=session.is_exit_on_error())
+            self._local.instance = instance
+        return instance
+
+    def _sync_method(self, name: str = None):
+        return getattr(self.get_sync_instance(), name)
+
+    @classmethod
+    def generate_methods(cls, prefix: str = None):
+        """
+        Add an awaitable counterpart to this class for every method of sync_class
+        whose name starts with prefix. Only the generated methods defined by sync_class
+        itself are wrapped; inherited helpers like get_errors() read the state of
+        whichever worker instance ran a request.
+        """
+        for name, sync_method in sorted(vars(cls.sync_class).items()):
+            if not inspect.isfunction(sync_method) or not name.startswith(prefix) or name.endswith("_map"):
+                continue
+            setattr(cls, name, _async_counterpart(name=name, sync_method=sync_method))
+
+
+class AsyncLFJsonQuery(_AsyncRequest):
+    """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+        Awaitable get_* methods generated from LFJsonQuery
+    ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+    sync_class = LFJsonQuery
+
+
+class AsyncLFJsonCommand(_AsyncRequest):
+    """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+        Awaitable post_* methods generated from LFJsonCommand
+    ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+    sync_class = LFJsonCommand
+
+
+AsyncLFJsonQuery.generate_methods(prefix="get_")
+AsyncLFJsonCommand.generate_methods(prefix="post_")
+
+
+class AsyncLFSession:
+    """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+        Wraps an LFSession for use from asyncio code. All queries and commands issued
+        through one AsyncLFSession share its LFSession, its keep-alive connection pool
+        and a limit of max_concurrency requests in flight.
+    ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+    Default_Max_Concurrency: int = 16
+
+    def __init__(self,
+                 lfclient_url: str = 'http://localhost:8080',
+                 max_concurrency: int = Default_Max_Concurrency,
+                 session: LFSession = None,
+                 **session_kwargs):
+        """
+        :param lfclient_url: URL of the LANforge GUI
+        :param max_concurrency: most requests outstanding at once; also sizes the connection pool
+        :param session: existing LFSession to share instead of creating a new one; it is left open by close()
+        :param session_kwargs: passed to LFSession when a new session is created
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.owns_session = session is None
+        if session is None:
+            session_kwargs.setdefault("pool_max_per_host", max_concurrency)
+            session = LFSession(lfclient_url=lfclient_url, **session_kwargs)
+        self.session: LFSession = session
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                           thread_name_prefix="lf_async")
+        self._semaphore: asyncio.Semaphore = None
+        self._semaphore_loop = None
+        self.query_instance = AsyncLFJsonQuery(async_session=self)
+        self.command_instance = AsyncLFJsonCommand(async_session=self)
+
+    def get_query(self) -> AsyncLFJsonQuery:
+        return self.query_instance
+
+    def get_command(self) -> AsyncLFJsonCommand:
+        return self.command_instance
+
+    def get_session(self) -> LFSession:
+        return self.session
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # a semaphore is bound to the loop it is first used on
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run_sync(self, resolve_method, name: str = None, *args, **kwargs):
+        """
+        Run a blocking request method on the worker pool.
+        :param resolve_method: called on the worker thread with name to look up the bound method
+        :param name: name of the generated method
+        :return: whatever the synchronous method returns
+        """
+        loop = asyncio.get_running_loop()
+
+        def call():
+            return resolve_method(name)(*args, **kwargs)
+
+        async with self._get_semaphore():
+            return await loop.run_in_executor(self.executor, call)
+
+    async def gather(self, *coroutines, return_exceptions: bool = False) -> list:
+        """
+        Convenience wrapper around asyncio.gather for queries and commands from this session.
+        """
+        return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
+
+    def close(self):
+        """
+        Wait for the requests in flight and stop the worker pool. A session this
+        AsyncLFSession created has its connection pool closed as well.
+        """
+        self.executor.shutdown(wait=True)
+        if self.owns_session and self.session.connection_pool:
+            self.session.connection_pool.close()
+
+    async def aclose(self):
+        """
+        close() without blocking the event loop.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self) -> 'AsyncLFSession':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_tb):
+        await self.aclose()
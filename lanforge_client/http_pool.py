@@ -0,0 +1,273 @@
+# flake8: noqa
+"""----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+
+    HTTP/1.1 keep-alive connection pool used by BaseSession.
+
+    Each BaseLFJsonRequest used to build a urllib.request.Request and call urlopen(),
+    which opens a new TCP connection to the GUI for every GET and POST. This module
+    keeps a bounded set of idle http.client connections per (scheme, host, port)
+    and hands them back out to later requests.
+
+    Responses are fully read before the connection is returned to the pool, so the
+    object handed back to callers is a PooledResponse that buffers the body but
+    otherwise looks like the http.client.HTTPResponse that urlopen() returns.
+    Error statuses are raised as urllib.error.HTTPError and connection failures as
+    urllib.error.URLError so existing error handling keeps working.
+
+----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+import sys
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import collections
+import http.client
+import io
+import logging
+import threading
+import time
+import urllib.error
+from urllib.parse import urlsplit
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PooledResponse:
+    """
+    Buffered response returned by HTTPConnectionPool.request(). It provides the
+    subset of http.client.HTTPResponse used by lanforge_api: status, reason, headers,
+    msg, getheaders(), getheader(), getcode(), geturl() and read().
+    """
+
+    def __init__(self,
+                 url: str = None,
+                 status: int = 0,
+                 reason: str = None,
+                 headers: http.client.HTTPMessage = None,
+                 body: bytes = b''):
+        self.url = url
+        self.status = status
+        self.code = status
+        self.reason = reason
+        self.headers = headers
+        self.msg = headers
+        self._body = io.BytesIO(body)
+
+    def read(self, amt: int = None) -> bytes:
+        return self._body.read(amt)
+
+    def getheaders(self) -> list:
+        if self.headers is None:
+            return []
+        return list(self.headers.items())
+
+    def getheader(self, name: str, default=None):
+        if self.headers is None:
+            return default
+        return self.headers.get(name, default)
+
+    def getcode(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+    def close(self):
+        self._body.close()
+
+
+class HTTPConnectionPool:
+    """
+    Thread-safe pool of keep-alive http.client connections keyed by host.
+
+    :param max_per_host: maximum number of connections (idle plus in use) per host
+    :param idle_timeout_sec: idle connections older than this are closed instead of reused
+    :param acquire_timeout_sec: how long a caller waits for a free connection when the host is at max_per_host
+    """
+    Default_Max_Per_Host: int = 8
+    Default_Idle_Timeout_Sec: float = 30.0
+    Default_Acquire_Timeout_Sec: float = 120.0
+
+    # errors that indicate the server closed a kept-alive socket underneath us
+    RECONNECT_ERRORS = (http.client.RemoteDisconnected,
+                        http.client.CannotSendRequest,
+                        http.client.BadStatusLine,
+                        ConnectionResetError,
+                        ConnectionAbortedError,
+                        BrokenPipeError)
+
+    def __init__(self,
+                 max_per_host: int = Default_Max_Per_Host,
+                 idle_timeout_sec: float = Default_Idle_Timeout_Sec,
+                 acquire_timeout_sec: float = Default_Acquire_Timeout_Sec):
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1")
+        self.max_per_host = max_per_host
+        self.idle_timeout_sec = idle_timeout_sec
+        self.acquire_timeout_sec = acquire_timeout_sec
+        self._cond = threading.Condition()
+        self._idle: dict = {}       # host key -> deque of (connection, last_used)
+        self._in_use: dict = {}     # host key -> count
+        self.counters: dict = {
+            "new": 0,
+            "reused": 0,
+            "reconnects": 0,
+            "evicted": 0,
+            "requests": 0,
+        }
+
+    @staticmethod
+    def host_key(url: str = None) -> tuple:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower() if parts.scheme else "http"
+        port = parts.port
+        if not port:
+            port = 443 if scheme == "https" else 80
+        return scheme, parts.hostname, port
+
+    def _evict_idle(self, key: tuple, now: float):
+        """ close idle connections that sat longer than idle_timeout_sec; call with self._cond held """
+        idle = self._idle.get(key)
+        if not idle:
+            return
+        while idle and (now - idle[0][1]) > self.idle_timeout_sec:
+            conn, _ = idle.popleft()
+            conn.close()
+            self.counters["evicted"] += 1
+
+    def _acquire(self, key: tuple, timeout: float) -> tuple:
+        """
+        :return: (connection, reused) where reused is True if the connection came from the idle list
+        """
+        deadline = time.monotonic() + self.acquire_timeout_sec
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._evict_idle(key, now)
+                idle = self._idle.get(key)
+                if idle:
+                    # most recently used socket is least likely to have been closed by the server
+                    conn, _ = idle.pop()
+                    self._in_use[key] = self._in_use.get(key, 0) + 1
+                    self.counters["reused"] += 1
+                    return conn, True
+                if self._in_use.get(key, 0) < self.max_per_host:
+                    self._in_use[key] = self._in_use.get(key, 0) + 1
+                    self.counters["new"] += 1
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise urllib.error.URLError("connection pool for %s://%s:%s exhausted" % key)
+                self._cond.wait(remaining)
+
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection, reusable: bool):
+        with self._cond:
+            self._in_use[key] = max(0, self._in_use.get(key, 0) - 1)
+            if reusable:
+                self._idle.setdefault(key, collections.deque()).append((conn, time.monotonic()))
+            else:
+                conn.close()
+            self._cond.notify()
+
+    def request(self,
+                method: str = 'GET',
+                url: str = None,
+                body: bytes = None,
+                headers: dict = None,
+                timeout: float = None,
+                timer=None) -> PooledResponse:
+        """
+        Perform one HTTP request over a pooled connection. A request that fails because
+        the server closed a reused connection is retried once on a fresh connection.
+
+        :param method: HTTP method
+        :param url: fully qualified URL
+        :param body: encoded request body or None
+        :param headers: request headers
+        :param timeout: socket timeout in seconds
+        :param timer: request_metrics.RequestTimer charged with the connect, server and read phases
+        :return: PooledResponse for statuses below 400
+        :raises urllib.error.HTTPError: for statuses 400 and above
+        :raises urllib.error.URLError: when the connection cannot be made or is lost
+        """
+        key = self.host_key(url)
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        if headers is None:
+            headers = {}
+
+        with self._cond:
+            self.counters["requests"] += 1
+
+        for attempt in (1, 2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                if timeout:
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                if timer is not None and not reused:
+                    conn.connect()
+                    timer.mark("connect")
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                if timer is not None:
+                    timer.mark("server")
+                data = response.read()
+                if timer is not None:
+                    timer.mark("read")
+            except self.RECONNECT_ERRORS as err:
+                self._release(key, conn, False)
+                if reused and attempt == 1:
+                    if timer is not None:
+                        timer.retry()
+                    # the other idle sockets to this host are likely just as stale
+                    with self._cond:
+                        self.counters["reconnects"] += 1
+                        idle = self._idle.pop(key, None)
+                        while idle:
+                            idle.popleft()[0].close()
+                            self.counters["evicted"] += 1
+                    LOGGER.debug("stale pooled connection to %s://%s:%s, reconnecting: %s" % (*key, err))
+                    continue
+                raise urllib.error.URLError(err)
+            except (OSError, http.client.HTTPException) as err:
+                self._release(key, conn, False)
+                raise urllib.error.URLError(err)
+
+            self._release(key, conn, not response.will_close)
+            if response.status >= 400:
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.msg, io.BytesIO(data))
+            return PooledResponse(url=url,
+                                  status=response.status,
+                                  reason=response.reason,
+                                  headers=response.msg,
+                                  body=data)
+        raise urllib.error.URLError("unable to reconnect to %s://%s:%s" % key)
+
+    def get_stats(self) -> dict:
+        """
+        :return: copy of the counters plus current idle and in-use connection counts
+        """
+        with self._cond:
+            stats = dict(self.counters)
+            stats["idle"] = sum(len(idle) for idle in self._idle.values())
+            stats["in_use"] = sum(self._in_use.values())
+        return stats
+
+    def close(self):
+        """ close every idle connection; connections still in use return to the idle list when released """
+        with self._cond:
+            for idle in self._idle.values():
+                while idle:
+                    conn, _ = idle.popleft()
+                    conn.close()
+            self._idle.clear()
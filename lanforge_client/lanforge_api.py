@@ -95,12 +95,17 @@ from typing import Optional
 import urllib
 from urllib import request
 import base64
+import copy
 import string
 import re
 import random
 
 # - - - - deployed import references - - - - -
 from .strutil import nott, iss
+from .http_pool import HTTPConnectionPool
+from .request_scheduler import RequestScheduler
+from . import request_metrics
+from . import url_chunking
 
 SESSION_HEADER = 'X-LFJson-Session'
 # LOGGER = Logger('json_api')
@@ -304,6 +309,38 @@ class BaseLFJsonRequest:
             self.logger.debug(f"{__class__!s}: url [{url}] now [{corrected_url}]")
         return corrected_url
 
+    def urlopen(self, myrequest: urllib.request.Request = None):
+        """
+        Send the request over the session's keep-alive connection pool when it has one,
+        otherwise through urllib.request.urlopen(). Both paths raise urllib.error.HTTPError
+        and urllib.error.URLError the same way. The request waits for its turn in the
+        shared RequestScheduler, which rate limits each manager and sends control
+        commands ahead of queued queries.
+        :param myrequest: prepared urllib.request.Request
+        :return: http.client.HTTPResponse or a PooledResponse with the same interface
+        """
+        pool = None
+        if self.session_instance:
+            pool = self.session_instance.get_connection_pool()
+        timer = request_metrics.current()
+        if timer:
+            timer.mark("client")
+            timer.add_bytes(bytes_out=len(myrequest.data) if isinstance(myrequest.data, bytes) else 0)
+        with RequestScheduler.get_shared().slot(url=myrequest.full_url, method=myrequest.get_method()):
+            if timer:
+                timer.mark("queue")
+            if not pool:
+                response = urllib.request.urlopen(myrequest)
+                if timer:
+                    timer.mark("server")
+                return response
+            return pool.request(method=myrequest.get_method(),
+                                url=myrequest.full_url,
+                                body=myrequest.data,
+                                headers=dict(myrequest.header_items()),
+                                timeout=getattr(myrequest, "timeout", None),
+                                timer=timer)
+
     def add_error(self, message: str = None):
         if not message:
             return
@@ -367,6 +404,7 @@ class BaseLFJsonRequest:
             self.add_warning(f"response[{singular_key}] is empty")
         return response[singular_key]
 
+    @request_metrics.measured('POST')
     def form_post(self,
                   url: str = None,
                   post_data: dict = None,
@@ -398,7 +436,7 @@ class BaseLFJsonRequest:
         myrequest.headers['Content-type'] = 'application/x-www-form-urlencoded'
 
         try:
-            resp = urllib.request.urlopen(myrequest)
+            resp = self.urlopen(myrequest)
             responses.append(resp)
             return responses[0]
 
@@ -426,6 +464,7 @@ class BaseLFJsonRequest:
             exit(1)
         return None
 
+    @request_metrics.measured('POST')
     def json_post(self,
                   url: str = "",
                   post_data: dict = None,
@@ -572,10 +611,19 @@ class BaseLFJsonRequest:
             max_timeout_sec = self.session_instance.max_timeout_sec
         finish_time_ms = (max_timeout_sec * 1000) + begin_time_ms
         attempt = 1
+        timer = request_metrics.current()
+        sent = False
         while (time.time() * 1000) < finish_time_ms:
+            if timer and sent:
+                timer.retry()
+            sent = True
             try:
-                response = urllib.request.urlopen(myrequest)
-                resp_data = response.read().decode('utf-8')
+                response = self.urlopen(myrequest)
+                resp_data = response.read()
+                if timer:
+                    timer.mark("read")
+                    timer.add_bytes(bytes_in=len(resp_data))
+                resp_data = resp_data.decode('utf-8')
                 if self.receives_async_feedback and (response_json_list is None and resp_data):
                     self.logger.warning("json_post: POST to URL has data: " + url)
                     raise ValueError("json_post: not returning post data, no response_json_list provided")
@@ -613,6 +661,8 @@ class BaseLFJsonRequest:
                     if type(response_json_list) is not list:
                         raise ValueError("reponse_json_list needs to be type list")
                     jzon_data = json.loads(resp_data)
+                    if timer:
+                        timer.mark("decode")
                     if debug:
                         self.logger.debug(
                             __name__ + ":----- json_post debug: ------------------------------------------")
@@ -758,6 +808,7 @@ class BaseLFJsonRequest:
                                 method_='DELETE',
                                 errors_warnings=errors_warnings)
 
+    @request_metrics.measured('GET')
     def get(self,
             url: str = None,
             debug: bool = False,
@@ -799,7 +850,7 @@ class BaseLFJsonRequest:
 
         myresponses: list = []  # list[HTTPResponse]
         try:
-            myresponses.append(request.urlopen(myrequest))
+            myresponses.append(self.urlopen(myrequest))
             return myresponses[0]
 
         except urllib.error.HTTPError as herror:
@@ -826,6 +877,7 @@ class BaseLFJsonRequest:
             sys.exit(1)
         return None
 
+    @request_metrics.measured('GET')
     def get_as_json(self,
                     url: str = None,
                     die_on_error: bool = False,
@@ -849,7 +901,10 @@ class BaseLFJsonRequest:
         """
         begin_sec = time.time() * 1000
         responses = []
+        timer = request_metrics.current()
         while (time.time() * 1000) < (begin_sec + max_timeout_sec):
+            if timer and responses:
+                timer.retry()
             if wait_sec and (wait_sec > 0):
                 time.sleep(wait_sec)
             responses = [self.get(url=url,
@@ -865,7 +920,13 @@ class BaseLFJsonRequest:
                 self.logger.debug(msg="No response from " + url)
             return None
 
-        json_data = json.loads(responses[0].read().decode('utf-8'))
+        resp_data = responses[0].read()
+        if timer:
+            timer.mark("read")
+            timer.add_bytes(bytes_in=len(resp_data))
+        json_data = json.loads(resp_data.decode('utf-8'))
+        if timer:
+            timer.mark("decode")
         if errors_warnings is not None:
             if "errors" in json_data:
                 errors_warnings.extend(json_data["errors"])
@@ -874,6 +935,7 @@ class BaseLFJsonRequest:
 
         return json_data
 
+    @request_metrics.measured('GET')
     def json_get(self,
                  url: str = None,
                  debug: bool = False,
@@ -889,7 +951,8 @@ class BaseLFJsonRequest:
         :param request_timeout_sec: maximum time each request can take
         :param max_timeout_sec: maximum time to spend making requests
         :param errors_warnings: if present, fill this with error and warning messages from the response JSON
-        :return: dictionary of json response from server
+        :return: dictionary of json response from server; a URL too long for the GUI is requested
+        in EID-list chunks and the responses merged
         """
         debug |= self.debug_on
         json_response = None
@@ -900,6 +963,14 @@ class BaseLFJsonRequest:
             raise ValueError("json_get called without url")
 
         url = self.get_corrected_url(url=url)
+        chunk_urls = url_chunking.split_url(url)
+        if chunk_urls:
+            return self._json_get_chunks(chunk_urls=chunk_urls,
+                                         debug=debug,
+                                         wait_sec=wait_sec,
+                                         request_timeout_sec=request_timeout_sec,
+                                         max_timeout_sec=max_timeout_sec,
+                                         errors_warnings=errors_warnings)
 
         deadline_sec: float = _now_sec() + max_timeout_sec
         self.error_list.clear()
@@ -948,6 +1019,39 @@ class BaseLFJsonRequest:
                     sys.exit(1)
         return json_response
 
+    def _json_get_chunks(self,
+                         chunk_urls: list = None,
+                         errors_warnings: list = None,
+                         **kwargs):
+        """
+        Request the chunks of a long URL concurrently and merge the responses. Every chunk
+        runs on a copy of this request with its own error and warning lists, which are
+        added to this request's lists, and to errors_warnings, in chunk order afterwards.
+        :param chunk_urls: urls from url_chunking.split_url()
+        :param errors_warnings: if present, fill this with error and warning messages of every chunk
+        :param kwargs: json_get() arguments for every chunk
+        :return: merged response, or None when a chunk had no response
+        """
+        chunk_requests = {}
+        for chunk_url in chunk_urls:
+            chunk_request = copy.copy(self)
+            chunk_request.error_list = []
+            chunk_request.warnings = []
+            chunk_requests[chunk_url] = (chunk_request, [] if errors_warnings is not None else None)
+
+        def fetch(chunk_url):
+            chunk_request, chunk_errors_warnings = chunk_requests[chunk_url]
+            return chunk_request.json_get(url=chunk_url, errors_warnings=chunk_errors_warnings, **kwargs)
+
+        response = url_chunking.fetch_merged(chunk_urls, fetch=fetch)
+        self.error_list.clear()
+        for chunk_request, chunk_errors_warnings in chunk_requests.values():
+            self.error_list.extend(chunk_request.error_list)
+            self.warnings.extend(chunk_request.warnings)
+            if chunk_errors_warnings:
+                errors_warnings.extend(chunk_errors_warnings)
+        return response
+
     # def set_post_data(self, data):
     #     """
     #     :param data: dictionary of parameters for post
@@ -1179,7 +1283,11 @@ class BaseSession:
                  retry_sec: float = Default_Retry_Sec,
                  stream_errors: bool = True,
                  stream_warnings: bool = False,
-                 exit_on_error: bool = False):
+                 exit_on_error: bool = False,
+                 keep_alive: bool = True,
+                 pool_max_per_host: int = HTTPConnectionPool.Default_Max_Per_Host,
+                 pool_idle_timeout_sec: float = HTTPConnectionPool.Default_Idle_Timeout_Sec,
+                 max_requests_per_sec: float = None):
         self.debug_on = debug
         # self.logger = Logg(name='json_api_session')
         self.logger = logging.getLogger(__name__)
@@ -1212,6 +1320,8 @@ class BaseSession:
         self.session_connection_check: bool
         self.session_connection_check = False
         self.session_started_at: int = 0
+        self.connection_pool: HTTPConnectionPool
+        self.connection_pool = None
 
         # please see this discussion on ProxyHandlers:
         # https://docs.python.org/3/library/urllib.request.html#urllib.request.ProxyHandler
@@ -1233,6 +1343,11 @@ class BaseSession:
             urllib.request.install_opener(opener)
             self.proxies_installed = True
 
+        # requests routed through a proxy keep using the installed urllib opener
+        if keep_alive and not self.proxies_installed:
+            self.connection_pool = HTTPConnectionPool(max_per_host=pool_max_per_host,
+                                                      idle_timeout_sec=pool_idle_timeout_sec)
+
         if connection_timeout_sec:
             self.connection_timeout_sec = connection_timeout_sec
             self.logger.debug("%s connection timeout sec now [%f]" % (__name__, connection_timeout_sec))
@@ -1291,6 +1406,8 @@ class BaseSession:
                                            lfclient_url,
                                            ("8080", port)[has_port])
         # print("RESULTING URL: "+self.lfclient_url)
+        if max_requests_per_sec is not None:
+            RequestScheduler.get_shared().configure(max_rps=max_requests_per_sec, manager=self.lfclient_url)
 
         # test connection with GUI to get a session id, then set our session ids in those instances
         # self.session_connection_check = self.command_instance.start_session(debug=debug)
@@ -1306,6 +1423,8 @@ class BaseSession:
         BaseSession.end_session(command_obj=self.command_instance,
                                 session_id_=BaseSession.session_id,
                                 debug=False)
+        if self.connection_pool:
+            self.connection_pool.close()
 
     def get_command(self) -> 'JsonCommand':
         """
@@ -1372,6 +1491,28 @@ class BaseSession:
     def get_timeout_sec(self) -> float:
         return self.connection_timeout_sec
 
+    def get_connection_pool(self) -> Optional[HTTPConnectionPool]:
+        """
+        :return: keep-alive connection pool shared by this session's queries and commands,
+        or None when keep_alive is off or a proxy is configured
+        """
+        return self.connection_pool
+
+    def get_connection_stats(self) -> dict:
+        """
+        :return: counters of new vs. reused connections, reconnects and idle evictions
+        """
+        if not self.connection_pool:
+            return {}
+        return self.connection_pool.get_stats()
+
+    def get_scheduler_stats(self) -> dict:
+        """
+        :return: queue depth and per-priority wait and latency histograms of this session's manager
+        """
+        return RequestScheduler.get_shared().get_stats().get(
+            "%s://%s:%s" % HTTPConnectionPool.host_key(self.lfclient_url), {})
+
     @classmethod
     def end_session(cls,
                     command_obj: JsonCommand = None,
@@ -25529,7 +25670,10 @@ class LFSession(BaseSession):
                  stream_errors: bool = True,
                  stream_warnings: bool = False,
                  require_session: bool = False,
-                 exit_on_error: bool = False):
+                 exit_on_error: bool = False,
+                 keep_alive: bool = True,
+                 pool_max_per_host: int = HTTPConnectionPool.Default_Max_Per_Host,
+                 max_requests_per_sec: float = None):
         """
         :param debug: turn on diagnostic information
         :param proxy_map: a dict with addresses of proxies to route requests through.
@@ -25542,6 +25686,10 @@ class LFSession(BaseSession):
         :param require_session: exit(1) if unable to establish a session_id
         :param exit_on_error: on requests failing HTTP requests on besides error 404,
         exit(1). This does not include failing to establish a session_id
+        :param keep_alive: reuse HTTP/1.1 connections to the GUI instead of opening one per request
+        :param pool_max_per_host: most connections kept open to the GUI at once
+        :param max_requests_per_sec: requests per second sent to this GUI by every session and
+        LFCliBase script of the process, 0 for no limit, None keeps the current budget (LF_MAX_RPS)
         """
         super().__init__(lfclient_url=lfclient_url,
                          debug=debug,
@@ -25549,7 +25697,10 @@ class LFSession(BaseSession):
                          connection_timeout_sec=connection_timeout_sec,
                          stream_errors=stream_errors,
                          stream_warnings=stream_warnings,
-                         exit_on_error=exit_on_error)
+                         exit_on_error=exit_on_error,
+                         keep_alive=keep_alive,
+                         pool_max_per_host=pool_max_per_host,
+                         max_requests_per_sec=max_requests_per_sec)
         self.command_instance = LFJsonCommand(session_obj=self, debug=debug, exit_on_error=exit_on_error)
         self.session_connection_check = \
             self.command_instance.start_session(debug=debug,
@@ -0,0 +1,359 @@
+# flake8: noqa
+"""----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+
+    Request/response latency instrumentation for LANforge JSON calls.
+
+    When a large test slows down, the time can be spent waiting for a turn in the
+    RequestScheduler, connecting, waiting for the GUI to answer, reading the body,
+    decoding the JSON or in the script's own loops. With instrumentation on, every
+    request made by LFRequest (and so LFCliBase and Realm) and by BaseLFJsonRequest
+    is timed in phases:
+        client  - the caller's own work before the request is sent, retry pauses
+        queue   - waiting for the RequestScheduler
+        connect - opening a new connection (pooled requests only)
+        server  - sending the request until the response headers arrive; for
+                  requests that do not use the connection pool this includes connect
+        read    - reading the response body
+        decode  - json.loads() of the body
+        total   - the whole call, including retries
+    Calls are grouped by method and url template, /port/1/1/sta0000?fields=alias
+    becomes /port/{n}/{n}/{name}, and each phase keeps a millisecond histogram.
+    Bytes sent and received, errors and retries are counted too.
+
+    Instrumentation is off unless the environment variable LF_REQUEST_METRICS is
+    set, and then costs one global lookup per request. The value names the
+    files written at exit: 1, true or yes write lf_request_metrics.json and
+    lf_request_metrics.csv to the current directory, anything else is used as the
+    path prefix of the two files. lf_report adds a "LANforge Request Latency"
+    section to reports built while it is on.
+
+        $ LF_REQUEST_METRICS=/tmp/l3_metrics ./test_l3.py ...
+
+    Inside the library:
+
+        with request_metrics.measure(url, "GET") as timer:
+            response = urlopen(...)
+            if timer:
+                timer.mark("server")
+
+----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+import sys
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import atexit
+import bisect
+import csv
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .request_scheduler import RequestScheduler, histogram_labels
+
+LOGGER = logging.getLogger(__name__)
+
+_metrics = None
+_local = threading.local()
+
+
+def active() -> 'RequestMetrics':
+    """
+    :return: the process-wide RequestMetrics when instrumentation is on, otherwise None
+    """
+    return _metrics
+
+
+def current() -> 'RequestTimer':
+    """
+    :return: the timer of the request this thread is making, or None
+    """
+    if _metrics is None:
+        return None
+    return getattr(_local, "timer", None)
+
+
+def measure(url: str = None, method: str = 'GET'):
+    """
+    :return: context manager that times one request and yields its RequestTimer,
+    or yields None when instrumentation is off. Nested measure() calls on the same
+    thread share the outermost timer.
+    """
+    if _metrics is None:
+        return NO_MEASURE
+    return Measure(url, method)
+
+
+def measured(method: str = 'GET'):
+    """
+    Decorate a request method so each call is timed by measure(). The url is the url
+    keyword or first positional str argument, else self.requested_url; the HTTP method
+    is the method_ keyword, else method. A call that returns None counts as an error.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if _metrics is None:
+                return func(self, *args, **kwargs)
+            url = kwargs.get("url")
+            if url is None:
+                if args and isinstance(args[0], str):
+                    url = args[0]
+                else:
+                    url = getattr(self, "requested_url", None)
+            with Measure(url, kwargs.get("method_") or method) as timer:
+                result = func(self, *args, **kwargs)
+                if result is None:
+                    timer.fail()
+                return result
+        return wrapper
+    return decorate
+
+
+@functools.lru_cache(maxsize=4096)
+def url_template(url: str = None) -> str:
+    """
+    :return: url path with EIDs and names replaced, like /port/{n}/{n}/{name} for
+    http://localhost:8080/port/1/1/sta0000?fields=alias; /cli-json/ commands keep their name
+    """
+    segments = [segment for segment in urlsplit(url or "").path.split('/') if segment]
+    if not segments:
+        return "/"
+    template = [segments[0]]
+    keep = 2 if segments[0] in ("cli-json", "cli-form") else 1
+    for segment in segments[1:]:
+        if len(template) < keep or segment in ("all", "list"):
+            template.append(segment)
+        elif ',' in segment:
+            template.append("{list}")
+        elif segment.isdigit():
+            template.append("{n}")
+        else:
+            template.append("{name}")
+    return "/" + "/".join(template)
+
+
+class NoMeasure:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        return False
+
+
+NO_MEASURE = NoMeasure()
+
+
+class Measure:
+    __slots__ = ("url", "method", "timer")
+
+    def __init__(self, url, method):
+        self.url = url
+        self.method = method
+        self.timer = None
+
+    def __enter__(self):
+        timer = getattr(_local, "timer", None)
+        if timer is None:
+            timer = _local.timer = RequestTimer(self.url, self.method)
+        timer.depth += 1
+        self.timer = timer
+        return timer
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        timer = self.timer
+        if exc_type is not None:
+            timer.error = True
+        timer.depth -= 1
+        if timer.depth == 0:
+            _local.timer = None
+            metrics = _metrics
+            if metrics is not None:
+                metrics.record(timer)
+        return False
+
+
+class RequestTimer:
+    """
+    Phase timings of one request. mark(phase) charges the time since the previous mark to phase.
+    """
+    __slots__ = ("url", "method", "started", "last", "phases", "bytes_in", "bytes_out",
+                 "retries", "error", "depth")
+
+    def __init__(self, url, method):
+        self.url = url
+        self.method = (method or 'GET').upper()
+        self.started = self.last = time.perf_counter()
+        self.phases = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.error = False
+        self.depth = 0
+
+    def mark(self, phase: str = None):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self.last)
+        self.last = now
+
+    def add_bytes(self, bytes_in: int = 0, bytes_out: int = 0):
+        self.bytes_in += bytes_in or 0
+        self.bytes_out += bytes_out or 0
+
+    def retry(self):
+        self.retries += 1
+
+    def fail(self):
+        self.error = True
+
+
+class TemplateStats:
+    """ counters and per-phase histograms of one (method, url template) """
+    __slots__ = ("count", "errors", "retries", "bytes_in", "bytes_out", "phases")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.phases = {}            # phase -> [histogram counts, sum ms, max ms]
+
+
+class RequestMetrics:
+    Phases: tuple = ("client", "queue", "connect", "server", "read", "decode", "total")
+    Latency_Buckets_Ms: tuple = RequestScheduler.Latency_Buckets_Ms
+    Default_Export_Prefix: str = "lf_request_metrics"
+
+    def __init__(self, export_prefix: str = None):
+        """
+        :param export_prefix: path prefix of the .json and .csv files written at exit, None to not write them
+        """
+        self.export_prefix = export_prefix
+        self.lock = threading.Lock()
+        self.stats: dict = {}       # (method, template) -> TemplateStats
+        self.started = time.time()
+
+    @classmethod
+    def enable(cls, export_prefix: str = None) -> 'RequestMetrics':
+        """
+        Turn instrumentation on for this process.
+        :param export_prefix: path prefix of the files written at exit, None to not write them
+        :return: the process-wide RequestMetrics
+        """
+        global _metrics
+        if _metrics is None:
+            _metrics = cls(export_prefix=export_prefix)
+            atexit.register(_metrics.export_at_exit)
+        elif export_prefix:
+            _metrics.export_prefix = export_prefix
+        return _metrics
+
+    @staticmethod
+    def disable():
+        global _metrics
+        _metrics = None
+
+    def record(self, timer: RequestTimer = None):
+        total_ms = (time.perf_counter() - timer.started) * 1000.0
+        key = (timer.method, url_template(timer.url))
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = TemplateStats()
+            stats.count += 1
+            stats.errors += timer.error
+            stats.retries += timer.retries
+            stats.bytes_in += timer.bytes_in
+            stats.bytes_out += timer.bytes_out
+            for phase, seconds in list(timer.phases.items()) + [("total", total_ms / 1000.0)]:
+                value_ms = seconds * 1000.0
+                phase_stats = stats.phases.get(phase)
+                if phase_stats is None:
+                    phase_stats = stats.phases[phase] = [[0] * (len(self.Latency_Buckets_Ms) + 1), 0.0, 0.0]
+                phase_stats[0][bisect.bisect_left(self.Latency_Buckets_Ms, value_ms)] += 1
+                phase_stats[1] += value_ms
+                if value_ms > phase_stats[2]:
+                    phase_stats[2] = value_ms
+
+    def summary(self) -> list:
+        """
+        :return: list of dicts, one per method and url template, slowest total time first:
+        method, url, requests, errors, retries, bytes_in, bytes_out and for each phase
+        <phase>_ms_mean, <phase>_ms_max and <phase>_ms histogram
+        """
+        labels = histogram_labels(self.Latency_Buckets_Ms)
+        rows = []
+        with self.lock:
+            for (method, template), stats in self.stats.items():
+                row = {"method": method,
+                       "url": template,
+                       "requests": stats.count,
+                       "errors": stats.errors,
+                       "retries": stats.retries,
+                       "bytes_in": stats.bytes_in,
+                       "bytes_out": stats.bytes_out}
+                for phase in self.Phases:
+                    counts, sum_ms, max_ms = stats.phases.get(phase, ([0] * len(labels), 0.0, 0.0))
+                    measured = sum(counts)
+                    row[phase + "_ms_mean"] = round(sum_ms / measured, 3) if measured else 0.0
+                    row[phase + "_ms_max"] = round(max_ms, 3)
+                    row[phase + "_ms"] = dict(zip(labels, counts))
+                rows.append(row)
+        rows.sort(key=lambda row: row["total_ms_mean"] * row["requests"], reverse=True)
+        return rows
+
+    def export(self, prefix: str = None) -> list:
+        """
+        Write the summary as prefix.json, with histograms, and prefix.csv, with means and maximums.
+        :return: list of files written
+        """
+        prefix = prefix or self.export_prefix or self.Default_Export_Prefix
+        if prefix.endswith(".json") or prefix.endswith(".csv"):
+            prefix = os.path.splitext(prefix)[0]
+        rows = self.summary()
+        json_file = prefix + ".json"
+        with open(json_file, "w") as json_out:
+            json.dump({"started": self.started,
+                       "ended": time.time(),
+                       "pid": os.getpid(),
+                       "buckets_ms": list(self.Latency_Buckets_Ms),
+                       "requests": rows}, json_out, indent=2)
+        csv_file = prefix + ".csv"
+        columns = ["method", "url", "requests", "errors", "retries", "bytes_in", "bytes_out"]
+        for phase in self.Phases:
+            columns += [phase + "_ms_mean", phase + "_ms_max"]
+        with open(csv_file, "w", newline="") as csv_out:
+            writer = csv.DictWriter(csv_out, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        return [json_file, csv_file]
+
+    def export_at_exit(self):
+        if not self.export_prefix or not self.stats:
+            return
+        try:
+            files = self.export()
+            LOGGER.info("request metrics written to %s" % ", ".join(files))
+        except OSError as e:
+            LOGGER.warning("unable to write request metrics: %s" % e)
+
+
+def enable_from_env():
+    """
+    Turn instrumentation on when LF_REQUEST_METRICS is set, see the module description.
+    """
+    value = os.environ.get("LF_REQUEST_METRICS", "").strip()
+    if not value or value.lower() in ("0", "false", "no", "off"):
+        return None
+    if value.lower() in ("1", "true", "yes", "on"):
+        value = RequestMetrics.Default_Export_Prefix
+    return RequestMetrics.enable(export_prefix=value)
+
+
+enable_from_env()
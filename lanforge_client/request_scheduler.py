@@ -0,0 +1,323 @@
+# flake8: noqa
+"""----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+
+    Client-side request scheduler for the LANforge GUI JSON server.
+
+    The GUI answers HTTP requests one at a time. Scripts that poll /endp, /port and
+    /cx from several threads (test_l3.py, lf_interop_qos.py, lf_multi_traffic.py
+    running tests in parallel) can keep it busy enough that a set_cx_state sent to
+    stop traffic waits behind a queue of monitoring GETs.
+
+    RequestScheduler gives every manager (scheme, host, port) a token bucket of
+    max_rps requests per second with a small burst. Requests that find the bucket
+    empty wait in a priority queue:
+        control  - set_cx_state and add_* commands
+        command  - every other POST, PUT or DELETE
+        monitor  - GET queries
+    so a control command goes out with the next token, ahead of any queued GET.
+    A max_rps of 0 (the default) sends requests at once, queue depth and latency
+    are still recorded.
+
+    BaseLFJsonRequest.urlopen(), LFCliBase.json_get()/json_post() and CommandBatch
+    share one scheduler per process:
+
+        scheduler = RequestScheduler.get_shared()
+        scheduler.configure(max_rps=20)                             # every manager
+        scheduler.configure(max_rps=5, manager="http://ct521a:8080") # one manager
+        with scheduler.slot(url="/cli-json/set_cx_state", method="POST",
+                            manager_url="http://ct521a:8080"):
+            ...send the request...
+        print(scheduler.format_stats())
+
+    The budget can also be set without code changes with the environment
+    variable LF_MAX_RPS, read when the shared scheduler is created.
+
+----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+import sys
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import bisect
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from .http_pool import HTTPConnectionPool
+
+LOGGER = logging.getLogger(__name__)
+
+
+def histogram_labels(bounds: tuple = None) -> list:
+    """
+    :return: bucket names for counts kept by bisect over bounds, like ['<=1', '<=2', '>2']
+    """
+    return ["<=%s" % bound for bound in bounds] + [">%s" % bounds[-1]]
+
+
+class ManagerBudget:
+    """
+    Token bucket, wait queue and histograms of one manager. All fields are guarded by cond.
+    """
+
+    def __init__(self,
+                 max_rps: float = 0.0,
+                 burst: int = 1):
+        self.cond = threading.Condition()
+        self.max_rps = max_rps
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled_at = time.monotonic()
+        self.waiting = []           # heap of (priority, sequence)
+        self.in_flight = 0
+        self.max_depth = 0
+        self.depth_counts = [0] * (len(RequestScheduler.Depth_Buckets) + 1)
+        self.requests = [0] * len(RequestScheduler.Priority_Names)
+        self.wait_counts = [[0] * (len(RequestScheduler.Latency_Buckets_Ms) + 1)
+                            for _ in RequestScheduler.Priority_Names]
+        self.latency_counts = [[0] * (len(RequestScheduler.Latency_Buckets_Ms) + 1)
+                               for _ in RequestScheduler.Priority_Names]
+        self.wait_ms_max = [0.0] * len(RequestScheduler.Priority_Names)
+        self.latency_ms_sum = [0.0] * len(RequestScheduler.Priority_Names)
+
+    def refill(self, now: float):
+        """ add the tokens earned since the last refill; call with cond held """
+        self.tokens = min(float(self.burst), self.tokens + (now - self.refilled_at) * self.max_rps)
+        self.refilled_at = now
+
+
+class RequestScheduler:
+    """
+    Process-wide, per-manager rate limit and priority queue for GUI requests.
+
+    :param max_rps: requests per second for managers without their own budget, 0 for no limit
+    :param burst: requests that may go out back to back after an idle period
+    """
+    Priority_Control: int = 0
+    Priority_Command: int = 1
+    Priority_Monitor: int = 2
+    Priority_Names: tuple = ("control", "command", "monitor")
+    Control_Commands: tuple = ("set_cx_state",)
+    Control_Prefixes: tuple = ("add_",)
+    Default_Burst: int = 4
+    Latency_Buckets_Ms: tuple = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    Depth_Buckets: tuple = (0, 1, 2, 4, 8, 16, 32, 64)
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls) -> 'RequestScheduler':
+        """
+        :return: the process-wide scheduler, limited to LF_MAX_RPS requests per second when that is set
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                max_rps = 0.0
+                try:
+                    max_rps = float(os.environ.get("LF_MAX_RPS", "0") or 0)
+                except ValueError:
+                    LOGGER.warning("RequestScheduler: ignoring LF_MAX_RPS=%s" % os.environ.get("LF_MAX_RPS"))
+                cls._shared = cls(max_rps=max_rps)
+            return cls._shared
+
+    def __init__(self,
+                 max_rps: float = 0.0,
+                 burst: int = Default_Burst):
+        self.max_rps = max_rps
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.budgets: dict = {}     # host key -> ManagerBudget
+        self.overrides: dict = {}   # host key -> (max_rps, burst)
+        self.sequence = itertools.count()
+
+    def configure(self,
+                  max_rps: float = None,
+                  burst: int = None,
+                  manager: str = None):
+        """
+        Change the request budget.
+        :param max_rps: requests per second, 0 for no limit
+        :param burst: requests that may go out back to back after an idle period
+        :param manager: GUI url like http://localhost:8080, None changes the default of all managers
+        """
+        with self.lock:
+            if manager is None:
+                if max_rps is not None:
+                    self.max_rps = max_rps
+                if burst is not None:
+                    self.burst = burst
+                keys = [key for key in self.budgets if key not in self.overrides]
+            else:
+                key = HTTPConnectionPool.host_key(manager)
+                old_rps, old_burst = self.overrides.get(key, (self.max_rps, self.burst))
+                self.overrides[key] = (old_rps if max_rps is None else max_rps,
+                                       old_burst if burst is None else burst)
+                keys = [key] if key in self.budgets else []
+            for key in keys:
+                budget = self.budgets[key]
+                rate, burst_ = self.overrides.get(key, (self.max_rps, self.burst))
+                with budget.cond:
+                    budget.refill(time.monotonic())
+                    budget.max_rps = rate
+                    budget.burst = max(1, burst_)
+                    budget.cond.notify_all()
+        if max_rps:
+            LOGGER.info("RequestScheduler: %s limited to %.1f requests/sec" % (manager or "every manager", max_rps))
+
+    def budget(self, manager_url: str = None) -> ManagerBudget:
+        key = HTTPConnectionPool.host_key(manager_url)
+        with self.lock:
+            budget = self.budgets.get(key)
+            if budget is None:
+                rate, burst = self.overrides.get(key, (self.max_rps, self.burst))
+                budget = self.budgets[key] = ManagerBudget(max_rps=rate, burst=max(1, burst))
+            return budget
+
+    @classmethod
+    def classify(cls,
+                 url: str = None,
+                 method: str = 'GET') -> int:
+        """
+        :param url: url or uri of the request, like /cli-json/set_cx_state
+        :param method: HTTP method
+        :return: Priority_Control, Priority_Command or Priority_Monitor
+        """
+        if (method or 'GET').upper() in ('GET', 'HEAD'):
+            return cls.Priority_Monitor
+        command = urlsplit(url or "").path.rstrip('/').rsplit('/', 1)[-1]
+        if command in cls.Control_Commands or command.startswith(cls.Control_Prefixes):
+            return cls.Priority_Control
+        return cls.Priority_Command
+
+    def acquire(self,
+                budget: ManagerBudget = None,
+                priority: int = Priority_Monitor) -> float:
+        """
+        Wait until the manager's budget allows one more request and no request of a higher
+        priority is waiting.
+        :return: seconds spent waiting
+        """
+        started = time.monotonic()
+        with budget.cond:
+            depth = len(budget.waiting)
+            budget.depth_counts[bisect.bisect_left(self.Depth_Buckets, depth)] += 1
+            if budget.max_rps <= 0 and not budget.waiting:
+                budget.in_flight += 1
+                return 0.0
+            ticket = (priority, next(self.sequence))
+            heapq.heappush(budget.waiting, ticket)
+            if len(budget.waiting) > budget.max_depth:
+                budget.max_depth = len(budget.waiting)
+            while True:
+                now = time.monotonic()
+                if budget.max_rps <= 0:
+                    budget.tokens = float(budget.burst)
+                else:
+                    budget.refill(now)
+                if budget.waiting[0] == ticket and budget.tokens >= 1.0:
+                    heapq.heappop(budget.waiting)
+                    if budget.max_rps > 0:
+                        budget.tokens -= 1.0
+                    budget.in_flight += 1
+                    budget.cond.notify_all()
+                    return now - started
+                if budget.waiting[0] == ticket:
+                    budget.cond.wait((1.0 - budget.tokens) / budget.max_rps)
+                else:
+                    budget.cond.wait()
+
+    def release(self,
+                budget: ManagerBudget = None,
+                priority: int = Priority_Monitor,
+                wait_sec: float = 0.0,
+                latency_sec: float = 0.0):
+        """ record a finished request """
+        wait_ms = wait_sec * 1000.0
+        latency_ms = latency_sec * 1000.0
+        with budget.cond:
+            budget.in_flight -= 1
+            budget.requests[priority] += 1
+            budget.wait_counts[priority][bisect.bisect_left(self.Latency_Buckets_Ms, wait_ms)] += 1
+            budget.latency_counts[priority][bisect.bisect_left(self.Latency_Buckets_Ms, latency_ms)] += 1
+            budget.latency_ms_sum[priority] += latency_ms
+            if wait_ms > budget.wait_ms_max[priority]:
+                budget.wait_ms_max[priority] = wait_ms
+
+    @contextmanager
+    def slot(self,
+             url: str = None,
+             method: str = 'GET',
+             manager_url: str = None):
+        """
+        Hold one request's place in its manager's budget while the request is sent.
+        :param url: url or uri of the request, used to pick the priority
+        :param method: HTTP method
+        :param manager_url: GUI url, defaults to url when that is a full url
+        """
+        budget = self.budget(manager_url or url)
+        priority = self.classify(url=url, method=method)
+        wait_sec = self.acquire(budget, priority)
+        started = time.monotonic()
+        try:
+            yield priority
+        finally:
+            self.release(budget, priority, wait_sec, time.monotonic() - started)
+
+    def get_stats(self) -> dict:
+        """
+        :return: dict of manager -> max_rps, current and max queue depth, the queue depth seen by
+        arriving requests, and per priority the request count, wait and latency histograms in ms
+        """
+        latency_labels = histogram_labels(self.Latency_Buckets_Ms)
+        depth_labels = histogram_labels(self.Depth_Buckets)
+        with self.lock:
+            budgets = list(self.budgets.items())
+        stats = {}
+        for (scheme, host, port), budget in budgets:
+            with budget.cond:
+                priorities = {}
+                for priority, name in enumerate(self.Priority_Names):
+                    count = budget.requests[priority]
+                    priorities[name] = {
+                        "requests": count,
+                        "wait_ms_max": round(budget.wait_ms_max[priority], 3),
+                        "latency_ms_mean": round(budget.latency_ms_sum[priority] / count, 3) if count else 0.0,
+                        "wait_ms": dict(zip(latency_labels, budget.wait_counts[priority])),
+                        "latency_ms": dict(zip(latency_labels, budget.latency_counts[priority])),
+                    }
+                stats["%s://%s:%s" % (scheme, host, port)] = {
+                    "max_rps": budget.max_rps,
+                    "queue_depth": len(budget.waiting),
+                    "max_queue_depth": budget.max_depth,
+                    "in_flight": budget.in_flight,
+                    "queue_depth_on_arrival": dict(zip(depth_labels, budget.depth_counts)),
+                    "priorities": priorities,
+                }
+        return stats
+
+    def format_stats(self) -> str:
+        """
+        :return: get_stats() as text, one line per histogram, empty buckets left out
+        """
+        lines = []
+        for manager, stats in self.get_stats().items():
+            lines.append("%s: max_rps %s, queue depth %d (max %d), in flight %d"
+                         % (manager, stats["max_rps"] or "unlimited", stats["queue_depth"],
+                            stats["max_queue_depth"], stats["in_flight"]))
+            lines.append("  queue depth on arrival: %s" % " ".join(
+                "%s:%d" % item for item in stats["queue_depth_on_arrival"].items() if item[1]))
+            for name, priority in stats["priorities"].items():
+                if not priority["requests"]:
+                    continue
+                lines.append("  %-7s %6d requests, mean latency %.1f ms, max wait %.1f ms"
+                             % (name, priority["requests"], priority["latency_ms_mean"], priority["wait_ms_max"]))
+                for histogram in ("wait_ms", "latency_ms"):
+                    lines.append("    %-10s %s" % (histogram, " ".join(
+                        "%s:%d" % item for item in priority[histogram].items() if item[1])))
+        return "\n".join(lines)
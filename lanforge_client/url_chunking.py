@@ -0,0 +1,123 @@
+# flake8: noqa
+"""----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+
+    Splitting of long EID-list query URLs.
+
+    The GUI JSON server refuses URLs longer than 2048 bytes. A query for many
+    entities, like /endp/cx-0000-A,cx-0000-B,...?fields=rx+bytes or
+    /port/1/1/sta0000,sta0001,...?fields=alias, passes that length with a few
+    hundred stations, and scripts worked around it by asking for every entity.
+
+    split_url() cuts the comma separated list of such a URL into chunks that each
+    fit, keeping the path before the list and the query after it. fetch_merged()
+    requests the chunks concurrently and merges the responses into one: lists
+    like 'interfaces' and 'endpoint' are concatenated in chunk order, anything
+    else is taken from the first response. Every chunk holds at least two
+    entities, so each answer uses the plural form of the response.
+
+    LFCliBase.json_get() and BaseLFJsonRequest.json_get(), and so every
+    LFJsonQuery.get_*() method, do this for long URLs. LFUtils.PortWaiter.poll()
+    requests through LFRequest and splits its /port queries itself:
+
+        urls = url_chunking.split_url(uri, base_len=len(lfclient_url))
+        if urls:
+            response = url_chunking.fetch_merged(urls, fetch=lambda url: get(url))
+
+----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+import sys
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+Max_Url_Bytes: int = 2048
+Max_Workers: int = 4
+
+
+def split_url(url: str = None, base_len: int = 0, max_bytes: int = None) -> list:
+    """
+    :param url: requested url or uri, like /port/1/1/sta0000,sta0001?fields=alias
+    :param base_len: length of the http://host:port prefix the url is appended to, 0 for a complete url
+    :param max_bytes: longest url to request, default Max_Url_Bytes
+    :return: list of urls that each fit, or None when the url fits or has no EID list to split
+    """
+    max_bytes = max_bytes or Max_Url_Bytes
+    if not url or base_len + len(url.encode("utf-8")) <= max_bytes:
+        return None
+    path, mark, query = url.partition("?")
+    segments = path.split("/")
+    list_index = None
+    for index, segment in enumerate(segments):
+        if "," in segment and (list_index is None or len(segment) > len(segments[list_index])):
+            list_index = index
+    if list_index is None:
+        LOGGER.warning("url of %d bytes has no EID list to split: %s..." % (base_len + len(url), url[:120]))
+        return None
+    prefix = "/".join(segments[:list_index + 1])[:-len(segments[list_index])]
+    suffix = "/".join([""] + segments[list_index + 1:]) + mark + query
+    room = max_bytes - base_len - len((prefix + suffix).encode("utf-8"))
+    items = [item for item in segments[list_index].split(",") if item]
+
+    chunks = [[]]
+    used = 0
+    for item in items:
+        size = len(item.encode("utf-8")) + (1 if chunks[-1] else 0)
+        if chunks[-1] and used + size > room:
+            chunks.append([])
+            size -= 1
+            used = 0
+        chunks[-1].append(item)
+        used += size
+    if len(chunks) < 2:
+        return None
+    # a single entity is answered with the singular key, keep two in the last chunk
+    if len(chunks[-1]) == 1 and len(chunks[-2]) > 2:
+        chunks[-1].insert(0, chunks[-2].pop())
+    if any(len(prefix + ",".join(chunk) + suffix) + base_len > max_bytes for chunk in chunks):
+        LOGGER.warning("EID list chunks of %s... exceed %d bytes" % (url[:120], max_bytes))
+    return [prefix + ",".join(chunk) + suffix for chunk in chunks]
+
+
+def merge_responses(responses: list = None) -> dict:
+    """
+    :return: the first response with the list values of the others appended to its own
+    """
+    merged = None
+    for response in responses:
+        if not isinstance(response, dict):
+            continue
+        if merged is None:
+            merged = {key: (list(value) if isinstance(value, list) else value)
+                      for key, value in response.items()}
+            continue
+        for key, value in response.items():
+            if isinstance(value, list):
+                if isinstance(merged.get(key), list):
+                    merged[key].extend(value)
+                else:
+                    merged[key] = list(value)
+            elif key not in merged:
+                merged[key] = value
+    return merged
+
+
+def fetch_merged(urls: list = None, fetch=None, max_workers: int = None):
+    """
+    Request urls concurrently and merge the responses.
+    :param urls: chunk urls from split_url()
+    :param fetch: called as fetch(url), returns the decoded json response or None
+    :param max_workers: most chunks requested at once, default Max_Workers
+    :return: merged response, or None when a chunk had no response
+    """
+    workers = max(1, min(max_workers or Max_Workers, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="url_chunk") as executor:
+        responses = list(executor.map(fetch, urls))
+    if any(response is None for response in responses):
+        LOGGER.debug("no response for %d of %d url chunks" % (responses.count(None), len(urls)))
+        return None
+    return merge_responses(responses)
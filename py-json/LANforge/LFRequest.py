@@ -7,6 +7,7 @@
 import logging
 import sys
 import os
+import importlib
 from pprint import pformat, PrettyPrinter
 import urllib
 from urllib import request
@@ -21,6 +22,8 @@ if sys.version_info[0] != 3:
 
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
 
+request_metrics = importlib.import_module("lanforge_client.request_metrics")
+
 debug_printer = PrettyPrinter(indent=2)
 
 
@@ -103,6 +106,7 @@ class LFRequest:
     def formPost(self, show_error=True, debug=False, die_on_error_=False):
         return self.form_post(show_error=show_error, debug=debug, die_on_error_=die_on_error_)
 
+    @request_metrics.measured('POST')
     def form_post(self, show_error=True, debug=False, die_on_error_=False):
         if self.die_on_error:
             die_on_error_ = True
@@ -131,8 +135,14 @@ class LFRequest:
         myrequest.headers['Content-type'] = 'application/x-www-form-urlencoded'
 
         resp = ''
+        timer = request_metrics.current()
         try:
+            if timer:
+                timer.mark("client")
+                timer.add_bytes(bytes_out=len(urlenc_data))
             resp = urllib.request.urlopen(myrequest)
+            if timer:
+                timer.mark("server")
             responses.append(resp)
             return responses[0]
 
@@ -160,6 +170,7 @@ class LFRequest:
         return self.json_post(show_error=show_error, debug=debug, die_on_error_=die_on_error_,
                               response_json_list_=response_json_list_)
 
+    @request_metrics.measured('POST')
     def json_post(self, show_error=True, debug=False, die_on_error_=False, response_json_list_=None, method_='POST'):
         if debug or self.debug:
             debug = True
@@ -183,9 +194,19 @@ class LFRequest:
 
         # https://stackoverflow.com/a/59635684/11014343
 
+        timer = request_metrics.current()
         try:
+            if timer:
+                timer.mark("client")
+                timer.add_bytes(bytes_out=len(myrequest.data) if isinstance(myrequest.data, bytes) else 0)
             resp = urllib.request.urlopen(myrequest)
-            resp_data = resp.read().decode('utf-8')
+            if timer:
+                timer.mark("server")
+            resp_data = resp.read()
+            if timer:
+                timer.mark("read")
+                timer.add_bytes(bytes_in=len(resp_data))
+            resp_data = resp_data.decode('utf-8')
             if debug or die_on_error_:
                 self.logger.debug("----- LFRequest::json_post:128 debug: --------------------------------------------")
                 self.logger.debug("URL: <%s>  status: %d " % (self.requested_url, resp.status))
@@ -199,6 +220,8 @@ class LFRequest:
                 if type(response_json_list_) is not list:
                     raise ValueError("reponse_json_list_ needs to be type list")
                 j = json.loads(resp_data)
+                if timer:
+                    timer.mark("decode")
                 if debug:
                     self.logger.debug(
                         "----- LFRequest::json_post:140 debug: --------------------------------------------")
@@ -235,6 +258,7 @@ class LFRequest:
     def json_delete(self, show_error=True, debug=False, die_on_error_=False, response_json_list_=None):
         return self.get_as_json(method_='DELETE')
 
+    @request_metrics.measured('GET')
     def get(self, method_='GET'):
         if self.debug:
             self.logger.debug("LFUtils.get: url: " + self.requested_url)
@@ -249,8 +273,13 @@ class LFRequest:
                                     headers=self.default_headers,
                                     method=method_)
         myresponses = []
+        timer = request_metrics.current()
         try:
+            if timer:
+                timer.mark("client")
             myresponses.append(request.urlopen(myrequest))
+            if timer:
+                timer.mark("server")
             return myresponses[0]
 
         except urllib.error.HTTPError as error:
@@ -276,6 +305,7 @@ class LFRequest:
     def getAsJson(self):
         return self.get_as_json()
 
+    @request_metrics.measured('GET')
     def get_as_json(self, method_='GET'):
         responses = list()
         responses.append(self.get(method_=method_))
@@ -286,7 +316,14 @@ class LFRequest:
         if responses[0] is None:
             self.logger.debug("No response from " + self.requested_url)
             return None
-        json_data = json.loads(responses[0].read().decode('utf-8'))
+        timer = request_metrics.current()
+        resp_data = responses[0].read()
+        if timer:
+            timer.mark("read")
+            timer.add_bytes(bytes_in=len(resp_data))
+        json_data = json.loads(resp_data.decode('utf-8'))
+        if timer:
+            timer.mark("decode")
         return json_data
 
     def addPostData(self, data):
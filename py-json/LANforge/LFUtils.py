@@ -24,6 +24,7 @@ if sys.version_info[0] != 3:
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
 
 LFRequest = importlib.import_module("py-json.LANforge.LFRequest")
+url_chunking = importlib.import_module("lanforge_client.url_chunking")
 logger = logging.getLogger(__name__)
 
 
@@ -687,31 +688,221 @@ def find_port_eids(resource_id=1, base_url="http://localhost:8080", port_names=(
     return port_eids
 
 
+def port_is_true(value):
+    """
+    Port flags such as down and phantom come back as booleans from newer GUIs and
+    as "true"/"false" strings from older ones.
+    """
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return bool(value)
+
+
+PORT_WAIT_IP_WAITING_STATES = ("0.0.0.0", "NA", "", 'DELETED', 'AUTO')
+
+
+def port_exists(record):
+    return record is not None
+
+
+def port_is_gone(record):
+    return record is None
+
+
+def port_is_present(record):
+    """ found and not phantom """
+    return (record is not None) and not port_is_true(record.get('phantom', False))
+
+
+def port_is_admin_up(record):
+    return (record is not None) and not port_is_true(record.get('down', True))
+
+
+def port_is_admin_down(record):
+    """ a port that disappeared is as good as admin down """
+    return (record is None) or port_is_true(record.get('down', False))
+
+
+def port_has_ipv4(record):
+    return (record is not None) and (record.get('ip', "") not in PORT_WAIT_IP_WAITING_STATES)
+
+
+def port_has_ipv6(record):
+    if record is None:
+        return False
+    ip6a = record.get('ipv6 address', record.get('ipv6_address', 'DELETED'))
+    return (ip6a not in PORT_WAIT_IP_WAITING_STATES) and not ip6a.startswith('fe80')
+
+
+class PortWaiter:
+    """
+    Polls a set of ports with one /port/shelf/resource/name,name,...?fields=
+    request per resource instead of one request per port, and waits until a
+    predicate holds for every port. Each poll rebuilds an index of port records
+    keyed by 'shelf.resource.name'; ports missing from the response map to None.
+
+    Polling starts every min_interval_sec and doubles up to max_interval_sec
+    while no port changes state, dropping back to min_interval_sec whenever
+    fewer ports are pending than after the previous poll.
+
+        waiter = PortWaiter(base_url="http://localhost:8080", port_list=["1.1.sta0000", "1.1.sta0001"])
+        if not waiter.wait_for(port_is_present, timeout_sec=120):
+            print(waiter.pending)
+    """
+    Default_Fields = ("alias", "phantom", "down", "ip")
+    Default_Min_Interval_Sec = 0.25
+    Default_Max_Interval_Sec = 2.0
+
+    def __init__(self,
+                 base_url="http://localhost:8080",
+                 port_list=(),
+                 resource_id=0,
+                 fields=Default_Fields,
+                 proxies_=None,
+                 min_interval_sec=Default_Min_Interval_Sec,
+                 max_interval_sec=Default_Max_Interval_Sec,
+                 debug_=False):
+        """
+        :param base_url: LANforge GUI url
+        :param port_list: port EIDs like 1.1.sta0000, or bare port names
+        :param resource_id: if not zero, overrides the resource of every port in port_list
+        :param fields: port fields to request; alias is always added
+        :param proxies_: proxy map passed to LFRequest
+        :param min_interval_sec: shortest pause between polls
+        :param max_interval_sec: longest pause between polls
+        :param debug_: log each query
+        """
+        if isinstance(port_list, str):
+            port_list = [port_list]
+        self.base_url = base_url.rstrip('/')
+        self.proxies = proxies_
+        self.debug = debug_
+        self.min_interval_sec = min_interval_sec
+        self.max_interval_sec = max(min_interval_sec, max_interval_sec)
+        fields = list(fields) if fields else []
+        if "alias" not in fields:
+            fields.insert(0, "alias")
+        self.fields = ",".join(field.replace(' ', '+') for field in fields)
+
+        self.eids = {}                  # 'shelf.resource.name' -> [shelf, resource, name]
+        self.names_by_resource = {}     # (shelf, resource) -> [names]
+        for port in port_list:
+            eid = name_to_eid(port)
+            shelf, resource, name = eid[0], eid[1], eid[2]
+            if resource_id:
+                resource = resource_id
+            key = "%s.%s.%s" % (shelf, resource, name)
+            if key in self.eids:
+                continue
+            self.eids[key] = [shelf, resource, name]
+            self.names_by_resource.setdefault((shelf, resource), []).append(name)
+
+        self.index = {}
+        self.pending = list(self.eids.keys())
+        self.polls = 0
+        self.requests = 0
+
+    def port_queries(self):
+        """
+        :return: list of ((shelf, resource), uri), one per resource; poll() splits uris
+            longer than the GUI accepts
+        """
+        return [((shelf, resource), "/port/%s/%s/%s?fields=%s" % (shelf, resource, ",".join(names), self.fields))
+                for (shelf, resource), names in self.names_by_resource.items()]
+
+    def poll(self):
+        """
+        Query every involved resource once and rebuild the index.
+        :return: dict of 'shelf.resource.name' -> port record, or None for ports not found
+        """
+        index = dict.fromkeys(self.eids.keys())
+        for (shelf, resource), uri in self.port_queries():
+            for chunk_uri in url_chunking.split_url(uri, base_len=len(self.base_url)) or [uri]:
+                lf_r = LFRequest.LFRequest(self.base_url, chunk_uri, proxies_=self.proxies, debug_=self.debug)
+                json_response = lf_r.get_as_json()
+                self.requests += 1
+                self.update_index(index, shelf, resource, json_response, chunk_uri)
+        self.index = index
+        self.polls += 1
+        return index
+
+    def update_index(self, index=None, shelf=1, resource=1, json_response=None, uri=None):
+        """
+        Store the port records of one port_queries() response in index.
+        :param index: dict of 'shelf.resource.name' -> record to update
+        :param shelf: shelf the query was for
+        :param resource: resource the query was for
+        :param json_response: decoded response, or None if the request failed
+        :param uri: query uri, for logging
+        """
+        if json_response is None:
+            if self.debug:
+                logger.debug("PortWaiter: no ports found for %s" % uri)
+            return
+        if "interface" in json_response:
+            records = [json_response["interface"]]
+        elif "interfaces" in json_response:
+            records = list_to_alias_map(json_response, from_element="interfaces").values()
+        else:
+            logger.debug("PortWaiter: unexpected response for %s: %s" % (uri, pprint.pformat(json_response)))
+            return
+        for record in records:
+            if not isinstance(record, dict) or ("alias" not in record):
+                continue
+            key = "%s.%s.%s" % (shelf, resource, record["alias"])
+            if key in index:
+                index[key] = record
+
+    def wait_for(self, predicate=port_is_present, timeout_sec=300, on_pending=None):
+        """
+        Poll until predicate(record) is true for every port or timeout_sec passes.
+        Afterwards self.pending lists the ports that did not satisfy the predicate.
+        :param predicate: called with each port record, or None if the port was not found
+        :param timeout_sec: seconds to wait
+        :param on_pending: optional callback(waiter, pending_eids, elapsed_sec) run after each
+            poll that leaves ports pending, e.g. to request a port probe or removal
+        :return: True if every port satisfied the predicate
+        """
+        started = time.monotonic()
+        interval = self.min_interval_sec
+        previous_pending = None
+        while True:
+            index = self.poll()
+            self.pending = [key for key, record in index.items() if not predicate(record)]
+            if len(self.pending) < 1:
+                return True
+
+            elapsed = time.monotonic() - started
+            if self.debug:
+                logger.debug("PortWaiter: %d of %d ports pending after %.1fs" % (len(self.pending), len(index), elapsed))
+            if elapsed >= timeout_sec:
+                return False
+            if on_pending is not None:
+                on_pending(self, self.pending, elapsed)
+
+            if (previous_pending is not None) and (len(self.pending) < previous_pending):
+                interval = self.min_interval_sec
+            elif previous_pending is not None:
+                interval = min(interval * 2, self.max_interval_sec)
+            previous_pending = len(self.pending)
+            sleep(min(interval, max(0, timeout_sec - elapsed)))
+
+
 def waitUntilPortsAdminDown(resource_id=1, base_url="http://localhost:8080", port_list=()):
     return wait_until_ports_admin_down(resource_id=resource_id, base_url=base_url, port_list=port_list)
 
 
 def wait_until_ports_admin_down(resource_id=1, base_url="http://localhost:8080", debug_=False, port_list=(), timeout_sec=360):
     print("Waiting until ports appear admin-down...")
-    port_url = "/port/1"
-    for _ in range(0, timeout_sec):
-        up_stations = []
-        for port_name in port_list:
-            uri = "%s/%s/%s?fields=device,down" % (port_url, resource_id, port_name)
-            lf_r = LFRequest.LFRequest(base_url, uri, debug_=debug_)
-            json_response = lf_r.get_as_json()
-            if json_response is None:
-                if debug_:
-                    print("port %s disappeared" % port_name)
-                continue
-            if "interface" in json_response:
-                json_response = json_response['interface']
-            if json_response['down'] == "false":
-                up_stations.append(port_name)
-        if len(up_stations) == 0:
-            return True
-        sleep(1)
-
+    waiter = PortWaiter(base_url=base_url,
+                        port_list=port_list,
+                        resource_id=resource_id,
+                        fields=("alias", "device", "down"),
+                        debug_=debug_)
+    if waiter.wait_for(port_is_admin_down, timeout_sec=timeout_sec):
+        return True
+    if debug_:
+        print("ports still admin up: %s" % ", ".join(waiter.pending))
     return False
 
 
@@ -722,55 +913,17 @@ def waitUntilPortsAdminUp(resource_id=0, base_url="http://localhost:8080", port_
 def wait_until_ports_admin_up(resource_id=0, base_url="http://localhost:8080", port_list=(), debug_=False, timeout=300):
     if debug_:
         print("Waiting until %s ports appear admin-up..." % (len(port_list)))
-    down_stations = port_list.copy()
-    port_url = "/port"
-    loops = 0
-
-    # url = /%s/%s?fields=device,down" % (resource_id, port_name)
-    for _ in range(0, timeout):
-        down_stations = []
-        for port_name in port_list:
-            eid = name_to_eid(port_name)
-            rid = resource_id
-            if rid == 0:  # TODO: this allows user to pass in resource_id, but probably should remove resource_id entirely.
-                rid = eid[1]  # use resource-id from the eid instead.
-            uri = "%s/%s/%s/%s?fields=device,down" % (port_url, eid[0], rid, eid[2])
-            lf_r = LFRequest.LFRequest(base_url, uri, debug_=debug_)
-            json_response = lf_r.get_as_json()
-
-            if debug_:
-                print("uri: %s response:\n%s" % (uri, json_response))
-
-            if json_response is None:
-                if debug_:
-                    print("port response is None for port name: %s" % port_name)
-                down_stations.append(port_name)
-                continue
-
-            if "interface" in json_response:
-                json_response = json_response['interface']
-            else:
-                if debug_:
-                    print("interface not found in json response:")
-                    pprint(json_response)
-                down_stations.append(port_name)
-                continue
-
-            if json_response['down']:  # This is a boolean object, not a string
-                if debug_:
-                    logger.info("waiting for port: %s to go admin up." % port_name)
-                down_stations.append(port_name)
-            else:
-                if debug_:
-                    logger.debug("port %s is admin up" % port_name)
-
-        if len(down_stations) > 0:
-            sleep(1)
-        else:
-            return True
-
-        loops += 1
+    # TODO: this allows user to pass in resource_id, but probably should remove resource_id entirely.
+    waiter = PortWaiter(base_url=base_url,
+                        port_list=port_list,
+                        resource_id=resource_id,
+                        fields=("alias", "device", "down"),
+                        debug_=debug_)
+    if waiter.wait_for(port_is_admin_up, timeout_sec=timeout):
+        return True
 
+    if debug_:
+        logger.info("waiting for ports: %s to go admin up." % ", ".join(waiter.pending))
     logger.warning("Not all ports went admin up within %s+ seconds" % timeout)
     return False
 
@@ -803,68 +956,40 @@ def wait_until_ports_disappear(base_url="http://localhost:8080", port_list=(), d
         return True  # no ports to remove, so we are done
 
     logger.info("LFUtils: Waiting until {len_port_list} ports disappear...".format(len_port_list=len(port_list)))
-    url = "/port/1"
-
-    temp_names_by_resource = {1: []}
-    temp_query_by_resource = {1: ""}
-    for port_eid in port_list:
-        eid = name_to_eid(port_eid)
-        # shelf = eid[0]
-        resource_id = eid[1]
-        if resource_id == 0:
-            continue
-        if resource_id not in temp_names_by_resource.keys():
-            temp_names_by_resource[resource_id] = []
-        port_name = eid[2]
-        temp_names_by_resource[resource_id].append(port_name)
-        temp_query_by_resource[resource_id] = "%s/%s/%s?fields=alias" % (
-            url, resource_id, ",".join(temp_names_by_resource[resource_id]))
+    if isinstance(port_list, str):
+        port_list = [port_list]
+    # resource 0 is the manager, it has no ports to wait for
+    port_list = [port for port in port_list if name_to_eid(port)[1] != 0]
+    waiter = PortWaiter(base_url=base_url,
+                        port_list=port_list,
+                        fields=("alias",),
+                        debug_=debug)
     if debug:
-        logger.debug(pprint.pformat(("temp_query_by_resource", temp_query_by_resource)))
-    sec_elapsed = 0
+        logger.debug(pprint.pformat(("port_queries", waiter.port_queries())))
+
     rm_ports_iteration = math.ceil(timeout_sec / 4)
     if rm_ports_iteration > 30:
         rm_ports_iteration = 30
     if rm_ports_iteration == 0:
         rm_ports_iteration = 1
+    last_removal = [0]
 
-    found_stations = []
-    for _ in range(0, timeout_sec):
-        found_stations = []
-        for (resource, check_url) in temp_query_by_resource.items():
-            if debug:
-                pprint.pprint([
-                    ("base_url", base_url),
-                    ("check_url", check_url),
-                ])
-            lf_r = LFRequest.LFRequest(base_url, check_url, debug_=debug)
-            json_response = lf_r.get_as_json()
-            if json_response is None:
-                logger.info("LFUtils::wait_until_ports_disappear:: Request returned None: [{}]".format(base_url + check_url))
-            else:
-                if debug:
-                    pprint.pprint(("wait_until_ports_disappear json_response:", json_response))
-                if "interface" in json_response:
-                    found_stations.append(json_response["interface"])
-                elif "interfaces" in json_response:
-                    mapped_list = list_to_alias_map(json_response, from_element="interfaces", debug_=debug)
-                    found_stations.extend(mapped_list.keys())
-            if debug:
-                logger.debug(pprint.pformat([("port_list", port_list), ("found_stations", found_stations)]))
-        if len(found_stations) > 0:
+    def remove_found_ports(port_waiter, pending, elapsed):
+        if debug:
+            logger.debug(pprint.pformat(("wait_until_ports_disappear found_stations:", pending)))
+        if (elapsed - last_removal[0]) < rm_ports_iteration:
+            return
+        last_removal[0] = elapsed
+        for key in pending:
+            eid = port_waiter.eids[key]
             if debug:
-                logger.debug(pprint.pformat(("wait_until_ports_disappear found_stations:", found_stations)))
-        else:
-            return True
+                logger.debug('removing port %s' % key)
+            remove_port(eid[1], eid[2], base_url)
 
-        if (sec_elapsed + 1) % rm_ports_iteration == 0:
-            for port in found_stations:
-                if debug:
-                    logger.debug('removing port %s' % '.'.join(port))
-                remove_port(port[1], port[2], base_url)
-        sleep(1)  # check for ports once per second
+    if waiter.wait_for(port_is_gone, timeout_sec=timeout_sec, on_pending=remove_found_ports):
+        return True
 
-    logger.critical('%s ports were still found' % found_stations)
+    logger.critical('%s ports were still found' % waiter.pending)
     return False
 
 
@@ -955,58 +1080,39 @@ def wait_until_ports_appear(base_url="http://localhost:8080", port_list=(), debu
     """
     if debug:
         logger.debug("Waiting until ports appear...")
-        existing_stations = LFRequest.LFRequest(base_url, '/ports', debug_=debug)
-        # logger.debug('existing ports')
-        # logger.debug(pprint.pformat(existing_stations)) # useless
-    port_url = "/port/1"
     show_url = "/cli-json/show_ports"
-    found_stations = set()
     if base_url.endswith('/'):
-        port_url = port_url[1:]
         show_url = show_url[1:]
     if type(port_list) is not list:
         port_list = [port_list]
+    waiter = PortWaiter(base_url=base_url,
+                        port_list=port_list,
+                        fields=("alias", "phantom"),
+                        debug_=debug)
+    # ask the GUI to probe ports it does not know about yet, but not on every poll
+    probe_interval_sec = 2
+    last_probe = [-probe_interval_sec]
+
+    def probe_missing_ports(port_waiter, pending, elapsed):
+        logger.info('Found %s out of %s ports after %.1f of %s seconds in wait_until_ports_appear'
+                    % (len(port_waiter.eids) - len(pending), len(port_waiter.eids), elapsed, timeout))
+        if (elapsed - last_probe[0]) < probe_interval_sec:
+            return
+        last_probe[0] = elapsed
+        for key in pending:
+            if port_waiter.index.get(key) is not None:
+                continue  # phantom, the GUI already knows about it
+            shelf, resource_id, port_name = port_waiter.eids[key]
+            lf_r = LFRequest.LFRequest(base_url, show_url, debug_=debug)
+            lf_r.addPostData({"shelf": shelf, "resource": resource_id, "port": port_name, "probe_flags": 5})
+            lf_r.jsonPost()
+
+    if waiter.wait_for(port_is_present, timeout_sec=timeout, on_pending=probe_missing_ports):
+        logger.info('All %s ports appeared' % len(waiter.eids))
+        return True
     if debug:
-        current_ports = LFRequest.LFRequest(base_url, '/ports', debug_=debug).get_as_json()
-        logger.debug("LFUtils:wait_until_ports_appear, full port listing: %s" % pprint.pformat(current_ports))
-        for port in current_ports['interfaces']:
-            if list(port.values())[0]['phantom']:
-                logger.debug("LFUtils:waittimeout_until_ports_appear: %s is phantom" % list(port.values())[0]['alias'])
-    for attempt in range(0, int(timeout / 2)):
-        found_stations = set()
-        for port_eid in port_list:
-            eid = name_to_eid(port_eid)
-            shelf = eid[0]
-            resource_id = eid[1]
-            port_name = eid[2]
-            # TODO:  If port_name happens to be a number, especialy '1', then the request below
-            # gets a list instead of a single item...and see a few lines down.
-            uri = "%s/%s/%s" % (port_url, resource_id, port_name)
-            #print("port-eid: %s uri: %s" % (port_eid, uri))
-            lf_r = LFRequest.LFRequest(base_url, uri, debug_=debug)
-            json_response = lf_r.get_as_json()
-            if json_response is not None:
-                #pprint.pprint(json_response)
-                # TODO:  If a list was (accidentally) requested, this code below will blow up.
-                # This can currently happen if someone manages to name a port 1.1.vap0, ie using
-                # an EID as a name.
-                # TODO:  Fix name_to_eid to somehow detect this and deal with it.
-                if not json_response['interface']['phantom']:
-                    found_stations.add("%s.%s.%s" % (shelf, resource_id, port_name))
-            else:
-                lf_r = LFRequest.LFRequest(base_url, show_url, debug_=debug)
-                lf_r.addPostData({"shelf": shelf, "resource": resource_id, "port": port_name, "probe_flags": 5})
-                lf_r.jsonPost()
-        if len(found_stations) < len(port_list):
-            sleep(2)
-            logger.info('Found %s out of %s ports in %s out of %s tries in wait_until_ports_appear' % (len(found_stations), len(port_list), attempt, timeout/2))
-        else:
-            logger.info('All %s ports appeared' % len(found_stations))
-            return True
-    if debug:
-        logger.debug("These ports appeared: " + ", ".join(found_stations))
-        logger.debug("These ports did not appear: " + ",".join(set(port_list) - set(found_stations)))
-        logger.debug(pprint.pformat(LFRequest.LFRequest("%s/ports" % base_url)))
+        logger.debug("These ports appeared: " + ", ".join(set(waiter.eids) - set(waiter.pending)))
+        logger.debug("These ports did not appear: " + ",".join(waiter.pending))
     return False
 
 
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# flake8: noqa
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# Queue many /cli-json/ commands and submit them together       -
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+"""
+A CommandBatch collects CLI commands (URL + post data) and sends them when flush()
+is called. Commands are pipelined over the keep-alive connections of a
+lanforge_client HTTPConnectionPool instead of opening one connection per command
+and sleeping between them.
+
+Ordering: commands are placed into groups, usually named after the station or
+connection they configure. Commands within a group are sent in the order they
+were added; different groups are sent concurrently, up to max_in_flight at once.
+Commands added without a group each form their own group.
+
+Each add() returns a BatchResult that is filled in by flush(), so callers can map
+responses back to the command that produced them.
+
+    batch = CommandBatch(lfclient_url="http://localhost:8080")
+    for sta in ("sta0000", "sta0001"):
+        batch.add("/cli-json/add_sta", {...}, group=sta)
+        batch.add("/cli-json/set_port", {...}, group=sta)
+    results = batch.flush()
+"""
+import sys
+import os
+import importlib
+import json
+import logging
+import urllib
+from concurrent.futures import ThreadPoolExecutor
+from pprint import pformat
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
+
+LFRequest = importlib.import_module("py-json.LANforge.LFRequest")
+http_pool = importlib.import_module("lanforge_client.http_pool")
+request_scheduler = importlib.import_module("lanforge_client.request_scheduler")
+
+logger = logging.getLogger(__name__)
+
+
+class BatchResult:
+    """
+    Outcome of one queued command. status is None until the batch is flushed,
+    and stays None with error set if the request never got a response.
+    """
+    __slots__ = ("index", "url", "data", "group", "status", "response_json", "error")
+
+    def __init__(self, index=0, url=None, data=None, group=None):
+        self.index = index
+        self.url = url
+        self.data = data
+        self.group = group
+        self.status = None
+        self.response_json = None
+        self.error = None
+
+    def ok(self):
+        return (self.error is None) and (self.status is not None) and (self.status < 400)
+
+    def __repr__(self):
+        return "BatchResult(%d %s group=%s status=%s error=%s)" % (self.index, self.url, self.group,
+                                                                   self.status, self.error)
+
+
+class CommandBatch:
+    Default_Max_In_Flight = 8
+
+    def __init__(self,
+                 lfclient_url=None,
+                 proxies_=None,
+                 max_in_flight=Default_Max_In_Flight,
+                 connection_pool=None,
+                 debug_=False,
+                 die_on_error_=False):
+        """
+        :param lfclient_url: base url of the LANforge GUI, e.g. http://localhost:8080
+        :param proxies_: proxy map as used by LFRequest; a proxied batch is sent one command at a time
+        :param max_in_flight: number of groups sent concurrently
+        :param connection_pool: HTTPConnectionPool to share; a private one is created if None
+        :param debug_: log each command and response
+        :param die_on_error_: exit(1) from flush() if any command failed
+        """
+        if not lfclient_url:
+            raise ValueError("CommandBatch needs lfclient_url")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.lfclient_url = lfclient_url.rstrip('/')
+        self.proxies = proxies_
+        self.max_in_flight = max_in_flight
+        self.debug = debug_
+        self.die_on_error = die_on_error_
+        self.current_group = None
+        self.pending = []
+        if connection_pool is None and not proxies_:
+            connection_pool = http_pool.HTTPConnectionPool(max_per_host=max_in_flight)
+        self.connection_pool = connection_pool
+
+    def __len__(self):
+        return len(self.pending)
+
+    def set_group(self, group=None):
+        """
+        Commands added after this call without an explicit group join this group.
+        :param group: group name, or None to put each following command in its own group
+        """
+        self.current_group = group
+
+    def add(self, url=None, data=None, group=None):
+        """
+        Queue a command. The post data is copied, so callers may reuse and modify their dict.
+        :param url: /cli-json/ url, with or without the leading slash
+        :param data: post data dict
+        :param group: ordering group; defaults to the group from set_group()
+        :return: BatchResult that flush() will fill in
+        """
+        if not url:
+            raise ValueError("CommandBatch.add needs url")
+        if group is None:
+            group = self.current_group
+        if not url.startswith('/'):
+            url = '/' + url
+        result = BatchResult(index=len(self.pending),
+                             url=url,
+                             data=dict(data) if data else {},
+                             group=group)
+        self.pending.append(result)
+        return result
+
+    def _send(self, result):
+        with request_scheduler.RequestScheduler.get_shared().slot(url=result.url,
+                                                                  method='POST',
+                                                                  manager_url=self.lfclient_url):
+            self._send_now(result)
+
+    def _send_now(self, result):
+        full_url = self.lfclient_url + result.url
+        if self.connection_pool is None:
+            lf_r = LFRequest.LFRequest(url=self.lfclient_url,
+                                       uri=result.url,
+                                       proxies_=self.proxies,
+                                       debug_=self.debug)
+            lf_r.add_post_data(result.data)
+            response_json_list = []
+            response = lf_r.json_post(debug=self.debug, response_json_list_=response_json_list)
+            if response is None:
+                result.error = "no response"
+                return
+            result.status = response.status
+            if response_json_list:
+                result.response_json = response_json_list[0]
+            return
+        try:
+            response = self.connection_pool.request(method='POST',
+                                                    url=full_url.replace('#', '%23'),
+                                                    body=json.dumps(result.data).encode("utf-8"),
+                                                    headers={'Accept': 'application/json',
+                                                             'Content-type': 'application/json'})
+            result.status = response.status
+            resp_data = response.read().decode('utf-8')
+            if resp_data:
+                result.response_json = json.loads(resp_data)
+        except urllib.error.HTTPError as herror:
+            result.status = herror.code
+            result.error = herror.reason
+            xerrors = []
+            if herror.headers:
+                xerrors = ["%s: %s" % (name, value) for (name, value) in herror.headers.items()
+                           if name.startswith("X-Error-")]
+            if xerrors:
+                result.error = "; ".join(xerrors)
+            logger.error("CommandBatch: POST %s HTTP %s: %s" % (full_url, herror.code, result.error))
+        except urllib.error.URLError as uerror:
+            result.error = str(uerror.reason)
+            logger.error("CommandBatch: %s failed: %s" % (full_url, uerror.reason))
+        except ValueError as verror:
+            result.error = "unable to decode response: %s" % verror
+        if self.debug:
+            logger.debug("CommandBatch: %s" % result)
+            logger.debug(pformat(result.data))
+
+    def _send_group(self, group_results):
+        for result in group_results:
+            self._send(result)
+
+    def flush(self):
+        """
+        Send every queued command and empty the queue.
+        :return: list of BatchResult in the order the commands were added
+        """
+        results = self.pending
+        self.pending = []
+        if not results:
+            return results
+
+        groups = {}
+        for result in results:
+            key = result.group if result.group is not None else ("#ungrouped", result.index)
+            groups.setdefault(key, []).append(result)
+
+        if (self.connection_pool is None) or (self.max_in_flight == 1) or (len(groups) == 1):
+            for group_results in groups.values():
+                self._send_group(group_results)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(groups)),
+                                    thread_name_prefix="cmd_batch") as executor:
+                list(executor.map(self._send_group, groups.values()))
+
+        failed = [result for result in results if not result.ok()]
+        if failed:
+            logger.warning("CommandBatch: %d of %d commands failed" % (len(failed), len(results)))
+            for result in failed:
+                logger.debug(result)
+            if self.die_on_error:
+                exit(1)
+        return results
+
+    def close(self):
+        if self.connection_pool is not None:
+            self.connection_pool.close()
+# ~CommandBatch
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# flake8: noqa
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# Process-wide read-through cache for LANforge JSON GETs        -
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+"""
+JsonGetCache sits in front of LFCliBase.json_get() when it is enabled. Scripts that
+run several tests in threads of one process, like lf_multi_traffic.py, give every
+test its own Realm, and each Realm polls /port, /endp, /generic, /layer4 and
+/resource on its own schedule. With the cache enabled:
+  - a GET of the same GUI and URL within freshness_sec of the last successful
+    response is answered from that response (hit)
+  - a GET that arrives while the same URL is already being fetched by another
+    thread waits for that request instead of sending its own (coalesced)
+  - anything else is sent to the GUI (miss) and the response kept, failed
+    requests (None) are never cached
+Every caller gets its own deep copy, callers that edit a response do not change
+what other tests see. Any json_post() or json_delete() through LFCliBase drops the
+cached responses of that GUI once the GUI has answered it, so a test reads back
+what it just configured. A response whose request was sent before that is not
+kept, and no GET waits for an in-flight request sent before it.
+
+    cache = JsonGetCache.get_shared()
+    cache.enable(freshness_sec=1.0)
+    ...  # run the tests
+    cache.metrics_table()
+"""
+import sys
+import copy
+import logging
+import threading
+import time
+import urllib.parse
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+logger = logging.getLogger(__name__)
+
+
+def active():
+    """
+    :return: the shared JsonGetCache when it is enabled, otherwise None
+    """
+    cache = JsonGetCache._shared
+    if cache is not None and cache.enabled:
+        return cache
+    return None
+
+
+def url_path(uri):
+    """
+    :return: first element of the uri path, like /port for /port/1/1/sta0000?fields=alias
+    """
+    path = urllib.parse.urlsplit(uri).path
+    parts = [part for part in path.split("/") if part]
+    return "/" + parts[0] if parts else "/"
+
+
+class InFlight:
+    __slots__ = ("event", "response", "generation")
+
+    def __init__(self, generation=0):
+        self.event = threading.Event()
+        self.response = None
+        self.generation = generation
+
+
+class JsonGetCache:
+    Default_Freshness_Sec = 1.0
+    Default_Max_Entries = 4096
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls):
+        """
+        :return: the process-wide cache, created disabled
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __init__(self,
+                 freshness_sec=Default_Freshness_Sec,
+                 max_entries=Default_Max_Entries,
+                 debug_=False):
+        """
+        :param freshness_sec: seconds a response is reused for
+        :param max_entries: responses kept, the oldest are dropped beyond this
+        :param debug_: log every hit, miss and coalesced request
+        """
+        self.freshness_sec = freshness_sec
+        self.max_entries = max_entries
+        self.debug = debug_
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.entries = {}           # (base_url, uri) -> (monotonic time, response)
+        self.in_flight = {}         # (base_url, uri) -> InFlight
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.invalidations = 0
+        self.generation = 0         # bumped by invalidate(), responses fetched across it are not kept
+        self.path_counts = {}       # /port -> [hits, coalesced, misses]
+
+    def enable(self, freshness_sec=None):
+        """
+        Start answering json_get() from the cache.
+        :param freshness_sec: change the freshness window, 0 or less disables the cache
+        """
+        with self.lock:
+            if freshness_sec is not None:
+                self.freshness_sec = freshness_sec
+            self.enabled = self.freshness_sec > 0
+        if self.enabled:
+            logger.info("JsonGetCache: enabled, responses reused for %.2fs" % self.freshness_sec)
+
+    def disable(self):
+        with self.lock:
+            self.enabled = False
+            self.entries.clear()
+
+    @staticmethod
+    def make_key(base_url, uri):
+        base_url = (base_url or "").rstrip("/")
+        if not uri.startswith("/"):
+            uri = "/" + uri
+        return base_url, uri
+
+    def _count(self, path, column):
+        counts = self.path_counts.get(path)
+        if counts is None:
+            counts = self.path_counts[path] = [0, 0, 0]
+        counts[column] += 1
+
+    def get(self, base_url=None, uri=None, fetch=None):
+        """
+        Return the response for a GET, from the cache, from another thread's request
+        for the same url, or by calling fetch().
+        :param base_url: GUI url, like http://localhost:8080
+        :param uri: requested url, like /port/1/1/list
+        :param fetch: function without arguments that sends the request and returns the decoded response or None
+        :return: decoded json response, or None
+        """
+        key = self.make_key(base_url, uri)
+        path = url_path(key[1])
+        hit = False
+        waiter = None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (time.monotonic() - entry[0]) <= self.freshness_sec:
+                self.hits += 1
+                self._count(path, 0)
+                hit = True
+            else:
+                waiter = self.in_flight.get(key)
+                if waiter is not None and waiter.generation != self.generation:
+                    # sent before the last invalidate(), it may answer with the old state
+                    waiter = None
+                if waiter is None:
+                    generation = self.generation
+                    owner = self.in_flight[key] = InFlight(generation)
+                    self.misses += 1
+                    self._count(path, 2)
+                else:
+                    self.coalesced += 1
+                    self._count(path, 1)
+        if hit:
+            if self.debug:
+                logger.debug("JsonGetCache: hit %s" % key[1])
+            return copy.deepcopy(entry[1])
+        if waiter is not None:
+            if self.debug:
+                logger.debug("JsonGetCache: waiting for in-flight %s" % key[1])
+            waiter.event.wait()
+            return copy.deepcopy(waiter.response)
+
+        response = None
+        try:
+            response = fetch()
+        finally:
+            with self.lock:
+                if self.in_flight.get(key) is owner:
+                    del self.in_flight[key]
+                if response is None:
+                    self.errors += 1
+                elif generation == self.generation:
+                    self.entries[key] = (time.monotonic(), response)
+                    if len(self.entries) > self.max_entries:
+                        self._prune()
+            owner.response = response
+            owner.event.set()
+        if self.debug:
+            logger.debug("JsonGetCache: miss %s" % key[1])
+        return copy.deepcopy(response)
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if (now - entry[0]) > self.freshness_sec]:
+            del self.entries[key]
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+
+    def invalidate(self, base_url=None):
+        """
+        Forget cached responses of one GUI, or of all of them. Call it after the
+        change has been sent, GETs sent before that are neither kept nor joined.
+        """
+        with self.lock:
+            self.generation += 1
+            if not self.entries:
+                return
+            self.invalidations += 1
+            if base_url is None:
+                self.entries.clear()
+                return
+            base_url = base_url.rstrip("/")
+            for key in [key for key in self.entries if key[0] == base_url]:
+                del self.entries[key]
+
+    def metrics(self):
+        """
+        :return: dict of request counts and the hit rate in percent
+        """
+        with self.lock:
+            requests = self.hits + self.coalesced + self.misses
+            saved = self.hits + self.coalesced
+            return {"requests": requests,
+                    "hits": self.hits,
+                    "coalesced": self.coalesced,
+                    "misses": self.misses,
+                    "errors": self.errors,
+                    "invalidations": self.invalidations,
+                    "hit_percent": round(100.0 * saved / requests, 2) if requests else 0.0}
+
+    def metrics_table(self):
+        """
+        :return: dict of columns, one row per url path plus a Total row, for lf_report tables
+        """
+        with self.lock:
+            path_counts = sorted(self.path_counts.items())
+        table = {"URL": [], "Requests": [], "Hits": [], "Coalesced": [], "Sent to GUI": [], "Hit %": []}
+        totals = [0, 0, 0]
+        for path, counts in path_counts + [("Total", None)]:
+            if counts is None:
+                counts = totals
+            else:
+                totals = [total + count for total, count in zip(totals, counts)]
+            requests = sum(counts)
+            table["URL"].append(path)
+            table["Requests"].append(requests)
+            table["Hits"].append(counts[0])
+            table["Coalesced"].append(counts[1])
+            table["Sent to GUI"].append(counts[2])
+            table["Hit %"].append(round(100.0 * (counts[0] + counts[1]) / requests, 2) if requests else 0.0)
+        return table
+# ~JsonGetCache
@@ -14,6 +14,8 @@ import argparse
 import re
 import logging
 import math
+import threading
+from contextlib import contextmanager
 
 if sys.version_info[0] != 3:
     print("This script requires Python 3")
@@ -24,6 +26,11 @@ sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
 debug_printer = pprint.PrettyPrinter(indent=2)
 LFRequest = importlib.import_module("py-json.LANforge.LFRequest")
 LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
+command_batch = importlib.import_module("py-json.LANforge.command_batch")
+json_get_cache = importlib.import_module("py-json.LANforge.json_get_cache")
+request_scheduler = importlib.import_module("lanforge_client.request_scheduler")
+request_metrics = importlib.import_module("lanforge_client.request_metrics")
+url_chunking = importlib.import_module("lanforge_client.url_chunking")
 Logg = importlib.import_module("lanforge_client.logg")
 logger = logging.getLogger(__name__)
 
@@ -79,6 +86,8 @@ class LFCliBase:
         # Otherwise, preexec methods use more processing time because they add an extra CLI call
         # into the queue, and inspect it -- typically nc_show_port
         self.suppress_related_commands = None
+        # json_post() queues into the calling thread's batch while command_batch() is active
+        self._batch_local = threading.local()
         self.finish = self.SHOULD_RUN
         self.thread_map = {}
 
@@ -216,6 +225,111 @@ class LFCliBase:
 
     # - END LOGGING -
 
+    def get_command_batch(self):
+        """
+        :return: CommandBatch that json_post() is queuing into on this thread, or None
+        """
+        batch_local = getattr(self, "_batch_local", None)
+        if batch_local is None:
+            return None
+        return getattr(batch_local, "batch", None)
+
+    @contextmanager
+    def command_batch(self, max_in_flight=command_batch.CommandBatch.Default_Max_In_Flight, debug_=False):
+        """
+        While this context is active, json_post() calls made on this thread are queued
+        instead of sent, and they are all flushed when the context exits:
+
+            with self.local_realm.command_batch() as batch:
+                for name in names:
+                    batch.set_group(name)
+                    self.local_realm.json_post("/cli-json/add_endp", {...})
+                    self.local_realm.json_post("/cli-json/set_endp_flag", {...})
+            failed = [r for r in batch.results if not r.ok()]
+
+        Queued json_post() calls return None and do not fill response_json_list_;
+        use batch.results after the context exits instead.
+        :param max_in_flight: number of command groups sent concurrently
+        :param debug_: log every command and response
+        """
+        if self.get_command_batch() is not None:
+            # nested batches join the outer one
+            yield self.get_command_batch()
+            return
+        batch = command_batch.CommandBatch(lfclient_url=self.lfclient_url,
+                                           proxies_=self.proxy,
+                                           max_in_flight=max_in_flight,
+                                           debug_=debug_ or self.debug,
+                                           die_on_error_=self.exit_on_error)
+        batch.results = []
+        if getattr(self, "_batch_local", None) is None:
+            self._batch_local = threading.local()
+        self._batch_local.batch = batch
+        try:
+            yield batch
+        finally:
+            self._batch_local.batch = None
+            try:
+                batch.results = batch.flush()
+            finally:
+                self.invalidate_json_cache()
+            batch.close()
+
+    def invalidate_json_cache(self):
+        """
+        Drop the cached GET responses of this GUI; call after a change has been sent.
+        """
+        cache = json_get_cache.active()
+        if cache is not None:
+            cache.invalidate(self.lfclient_url)
+
+    def apply_suppress_related_commands(self, _data, suppress_related_commands_=None):
+        """
+        Set or clear the suppress_preexec/postexec keys in post data.
+        :param _data: post data, modified in place
+        :param suppress_related_commands_: None removes the keys; False disables suppression; True suppresses
+        post-exec commands
+        """
+        if suppress_related_commands_ is None:
+            if 'suppress_preexec_cli' in _data:
+                del _data['suppress_preexec_cli']
+            if 'suppress_preexec_method' in _data:
+                del _data['suppress_preexec_method']
+            if 'suppress_postexec_cli' in _data:
+                del _data['suppress_postexec_cli']
+            if 'suppress_postexec_method' in _data:
+                del _data['suppress_postexec_method']
+        elif not suppress_related_commands_:
+            _data['suppress_preexec_cli'] = False
+            _data['suppress_preexec_method'] = False
+            _data['suppress_postexec_cli'] = False
+            _data['suppress_postexec_method'] = False
+        elif self.suppress_related_commands or suppress_related_commands_:
+            _data['suppress_preexec_cli'] = False
+            _data['suppress_preexec_method'] = False
+            _data['suppress_postexec_cli'] = True
+            _data['suppress_postexec_method'] = True
+
+    @contextmanager
+    def request_slot(self, _req_url, method_='GET'):
+        """
+        Wait for this request's turn in the process-wide lanforge_client RequestScheduler,
+        which limits the requests per second sent to each GUI and lets control commands
+        like set_cx_state go ahead of queued queries. Set the budget with LF_MAX_RPS or
+        request_scheduler.RequestScheduler.get_shared().configure(max_rps=...)
+        When LF_REQUEST_METRICS is set, the request is timed from here, wait included.
+        :param _req_url: requested url
+        :param method_: HTTP method
+        :return: context manager to hold while the request is sent
+        """
+        with request_metrics.measure(url=_req_url, method=method_) as timer:
+            with request_scheduler.RequestScheduler.get_shared().slot(url=_req_url,
+                                                                      method=method_,
+                                                                      manager_url=self.lfclient_url):
+                if timer:
+                    timer.mark("queue")
+                yield
+
     def json_post(self, _req_url, _data, debug_=False, suppress_related_commands_=None, response_json_list_=None):
         """
         send json to the LANforge client
@@ -224,43 +338,31 @@ class LFCliBase:
         :param debug_: turn on debugging output
         :param suppress_related_commands_: when False, override self.preexec; when True use
         :param response_json_list_: array for json results in the response object, (alternative return method)
-        :return: http response object
+        :return: http response object, or None when queued into an active command_batch()
         """
         json_response = None
         debug_ |= self.debug
+        batch = self.get_command_batch()
+        if batch is not None:
+            self.apply_suppress_related_commands(_data, suppress_related_commands_)
+            batch.add(url=_req_url, data=_data)
+            return None
         try:
             lf_r = LFRequest.LFRequest(url=self.lfclient_url,
                                        uri=_req_url,
                                        proxies_=self.proxy,
                                        debug_=debug_,
                                        die_on_error_=self.exit_on_error)
-            if suppress_related_commands_ is None:
-                if 'suppress_preexec_cli' in _data:
-                    del _data['suppress_preexec_cli']
-                if 'suppress_preexec_method' in _data:
-                    del _data['suppress_preexec_method']
-                if 'suppress_postexec_cli' in _data:
-                    del _data['suppress_postexec_cli']
-                if 'suppress_postexec_method' in _data:
-                    del _data['suppress_postexec_method']
-            elif not suppress_related_commands_:
-                _data['suppress_preexec_cli'] = False
-                _data['suppress_preexec_method'] = False
-                _data['suppress_postexec_cli'] = False
-                _data['suppress_postexec_method'] = False
-            elif self.suppress_related_commands or suppress_related_commands_:
-                _data['suppress_preexec_cli'] = False
-                _data['suppress_preexec_method'] = False
-                _data['suppress_postexec_cli'] = True
-                _data['suppress_postexec_method'] = True
+            self.apply_suppress_related_commands(_data, suppress_related_commands_)
 
             lf_r.addPostData(_data)
             if debug_:
                 logger.debug(debug_printer.pformat(_data))
-            json_response = lf_r.json_post(show_error=debug_,
-                                           debug=debug_,
-                                           response_json_list_=response_json_list_,
-                                           die_on_error_=self.exit_on_error)
+            with self.request_slot(_req_url, 'POST'):
+                json_response = lf_r.json_post(show_error=debug_,
+                                               debug=debug_,
+                                               response_json_list_=response_json_list_,
+                                               die_on_error_=self.exit_on_error)
             if debug_ and (response_json_list_ is not None):
                 logger.debug(pprint.pformat(response_json_list_))
         except Exception as x:
@@ -271,6 +373,8 @@ class LFCliBase:
                 logger.debug(traceback.format_exception(Exception, x, x.__traceback__, chain=True))
             if self.exit_on_error:
                 exit(1)
+        finally:
+            self.invalidate_json_cache()
         return json_response
 
     def json_put(self, _req_url, _data, debug_=False, response_json_list_=None):
@@ -295,10 +399,11 @@ class LFCliBase:
             lf_r.addPostData(_data)
             if debug_:
                 logger.debug(debug_printer.pformat(_data))
-            json_response = lf_r.json_put(show_error=self.debug,
-                                          debug=debug_,
-                                          response_json_list_=response_json_list_,
-                                          die_on_error_=self.exit_on_error)
+            with self.request_slot(_req_url, 'PUT'):
+                json_response = lf_r.json_put(show_error=self.debug,
+                                              debug=debug_,
+                                              response_json_list_=response_json_list_,
+                                              die_on_error_=self.exit_on_error)
             if debug_ and (response_json_list_ is not None):
                 pprint.pprint(response_json_list_)
         except Exception as x:
@@ -312,6 +417,26 @@ class LFCliBase:
         return json_response
 
     def json_get(self, _req_url, debug_=None):
+        """
+        GET a url from the LANforge client. While the process-wide JsonGetCache is
+        enabled, recent responses are reused and identical concurrent requests share one.
+        A url too long for the GUI, like /endp/<many endpoints>?fields=..., is requested
+        in EID-list chunks and the responses merged.
+        :param _req_url: requested url, like /port/1/1/list
+        :param debug_: turn on debugging output, defaults to self.debug
+        :return: decoded json response, or None
+        """
+        chunk_urls = url_chunking.split_url(_req_url, base_len=len(self.lfclient_url))
+        if chunk_urls:
+            return url_chunking.fetch_merged(chunk_urls, fetch=lambda chunk_url: self.json_get(chunk_url, debug_=debug_))
+        cache = json_get_cache.active()
+        if cache is None:
+            return self._json_get(_req_url, debug_=debug_)
+        return cache.get(base_url=self.lfclient_url,
+                         uri=_req_url,
+                         fetch=lambda: self._json_get(_req_url, debug_=debug_))
+
+    def _json_get(self, _req_url, debug_=None):
         # if debug_:
         #     print("json_get: "+_req_url)
         #     print("json_get: proxies:")
@@ -325,7 +450,8 @@ class LFCliBase:
                                        proxies_=self.proxy,
                                        debug_=debug_,
                                        die_on_error_=self.exit_on_error)
-            json_response = lf_r.get_as_json()
+            with self.request_slot(_req_url, 'GET'):
+                json_response = lf_r.get_as_json()
             if json_response is None:
                 if debug_:
                     # TODO Figure this out.
@@ -357,7 +483,8 @@ class LFCliBase:
                                        proxies_=self.proxy,
                                        debug_=debug_,
                                        die_on_error_=self.exit_on_error)
-            json_response = lf_r.json_delete(debug=debug_, die_on_error_=False)
+            with self.request_slot(_req_url, 'DELETE'):
+                json_response = lf_r.json_delete(debug=debug_, die_on_error_=False)
             logger.info(json_response)
             # logger.debug(debug_printer.pformat(json_response))
             if (json_response is None) and debug_:
@@ -370,6 +497,8 @@ class LFCliBase:
                 logger.debug(traceback.format_exception(ValueError, ve, ve.__traceback__, chain=True))
             if self.exit_on_error:
                 sys.exit(1)
+        finally:
+            self.invalidate_json_cache()
         # print("----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ")
         return json_response
 
@@ -1,6 +1,11 @@
 # flake8: noqa
-import paramiko
-from scp import SCPClient
+import sys
+import os
+import importlib
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+
+ssh_session_pool = importlib.import_module("py-json.ssh_session_pool")
 
 
 class lanforge_reports:
@@ -9,11 +14,7 @@ class lanforge_reports:
     def pull_reports(hostname="localhost", port=22, username="lanforge", password="lanforge",
                      report_location="/home/lanforge/html-reports/",
                      report_dir="../../../reports/"):
-        ssh = paramiko.SSHClient()
-        ssh.load_system_host_keys()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=hostname, username=username, password=password, port=port, allow_agent=False, look_for_keys=False)
-
-        with SCPClient(ssh.get_transport()) as scp:
-            scp.get(remote_path=report_location, local_path=report_dir, recursive=True)
-            scp.close()
+        # reuses the SSH connection lf_check and other callers already have open to this host
+        ssh_pool = ssh_session_pool.SSHSessionPool.get_shared()
+        ssh_pool.scp_get(hostname=hostname, port=port, username=username, password=password,
+                         remote_path=report_location, local_path=report_dir, recursive=True)
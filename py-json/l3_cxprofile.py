@@ -9,6 +9,7 @@ import time
 import datetime
 import logging
 import pprint
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 
@@ -17,11 +18,16 @@ LFCliBase = lfcli_base.LFCliBase
 pandas_extensions = importlib.import_module("py-json.LANforge.pandas_extensions")
 port_probe = importlib.import_module("py-json.port_probe")
 ProbePort = port_probe.ProbePort
+ProbeManager = port_probe.ProbeManager
+lfdata = importlib.import_module("py-json.lfdata")
 
 logger = logging.getLogger(__name__)
 
 
 class L3CXProfile(LFCliBase):
+    # most station probes monitor() runs at the same time
+    Default_Probe_Workers = 16
+
     def __init__(self,
                  lfclient_host,
                  lfclient_port,
@@ -126,6 +132,79 @@ class L3CXProfile(LFCliBase):
         else:
             return False
 
+    @staticmethod
+    def __match_endp_alias(endp_name, stations):
+        """
+        Find the station an endpoint belongs to. Endpoint names embed the station name,
+        e.g. CX-sta0000-A; whole-token matches are preferred so sta1 does not match sta10.
+        """
+        tokens = set(re.split(r'[-_.]', endp_name))
+        for station in stations:
+            if station in tokens:
+                return station
+        for station in stations:
+            if station in endp_name:
+                return station
+        return None
+
+    def __probe_station(self, station):
+        """
+        Probe one station.
+        :return: dict of probe results, or None if the probe failed
+        """
+        # the shared ProbeManager lets other monitors in this tick reuse the same probe
+        probe_manager = ProbeManager.get_shared(lfhost=self.lfclient_host,
+                                                lfport=self.lfclient_port,
+                                                debug=self.debug)
+        probe_port = probe_manager.probe(station)
+        if probe_port is None:
+            return None
+        probe_results = dict()
+        probe_results['Signal Avg Combined'] = probe_port.getSignalAvgCombined()
+        probe_results['Signal Avg per Chain'] = probe_port.getSignalAvgPerChain()
+        probe_results['Signal Combined'] = probe_port.getSignalCombined()
+        probe_results['Signal per Chain'] = probe_port.getSignalPerChain()
+        if 'Beacon Av Signal' in probe_results.keys():
+            probe_results['Beacon Avg Signal'] = probe_port.getBeaconSignalAvg()
+        else:
+            probe_results['Beacon Avg Signal'] = "0"
+        # probe_results['HE status'] = probe_port.he
+        probe_results['TX Bitrate'] = probe_port.tx_bitrate
+        probe_results['TX Mbps'] = probe_port.tx_mbit
+        probe_results['TX MCS ACTUAL'] = probe_port.tx_mcs
+        if probe_port.tx_mcs:
+            probe_results['TX MCS'] = int(probe_port.tx_mcs) % 8
+        else:
+            probe_results['TX MCS'] = probe_port.tx_mcs
+        probe_results['TX NSS'] = probe_port.tx_nss
+        probe_results['TX MHz'] = probe_port.tx_mhz
+        if probe_port.tx_gi:
+            probe_results['TX GI ns'] = (probe_port.tx_gi * 10**9)
+        else:
+            probe_results['TX GI ns'] = probe_port.tx_gi
+        probe_results['TX Mbps Calc'] = probe_port.tx_mbit_calc
+        probe_results['TX GI'] = probe_port.tx_gi
+        probe_results['TX Mbps short GI'] = probe_port.tx_data_rate_gi_short_Mbps
+        probe_results['TX Mbps long GI'] = probe_port.tx_data_rate_gi_long_Mbps
+        probe_results['RX Bitrate'] = probe_port.rx_bitrate
+        probe_results['RX Mbps'] = probe_port.rx_mbit
+        probe_results['RX MCS ACTUAL'] = probe_port.rx_mcs
+        if probe_port.rx_mcs:
+            probe_results['RX MCS'] = int(probe_port.rx_mcs) % 8
+        else:
+            probe_results['RX MCS'] = probe_port.rx_mcs
+        probe_results['RX NSS'] = probe_port.rx_nss
+        probe_results['RX MHz'] = probe_port.rx_mhz
+        if probe_port.rx_gi:
+            probe_results['RX GI ns'] = (probe_port.rx_gi * 10**9)
+        else:
+            probe_results['RX GI ns'] = probe_port.rx_gi
+        probe_results['RX Mbps Calc'] = probe_port.rx_mbit_calc
+        probe_results['RX GI'] = probe_port.rx_gi
+        probe_results['RX Mbps short GI'] = probe_port.rx_data_rate_gi_short_Mbps
+        probe_results['RX Mbps long GI'] = probe_port.rx_data_rate_gi_long_Mbps
+        return probe_results
+
     def instantiate_file(self, file_name, file_format):
         pass
 
@@ -143,7 +222,7 @@ class L3CXProfile(LFCliBase):
                 arguments=None,
                 compared_report=None,
                 resource=1,
-                adjust_cx_json=False,  # used for lf_test_max_association.py (removes created_cx from json get to alleviate url > 2048 bytes error)
+                adjust_cx_json=False,  # no longer used, json_get splits /endp/<created_cx> urls longer than 2048 bytes
                 debug=False):
         if duration_sec:
             duration_sec = self.parse_time(duration_sec).seconds
@@ -226,163 +305,127 @@ class L3CXProfile(LFCliBase):
 
         # for x in range(0,int(round(iterations,0))):
         initial_starttime = datetime.datetime.now()
-        timestamp_data = list()
-        while datetime.datetime.now() < end_time:
-            t = datetime.datetime.now()
-            timestamp = t.strftime("%m/%d/%Y %I:%M:%S")
-            t_to_millisec_epoch = int(self.get_milliseconds(t))
-            t_to_sec_epoch = int(self.get_seconds(t))
-            time_elapsed = int(self.get_seconds(t)) - int(self.get_seconds(initial_starttime))
-            stations = [station.split('.')[-1] for station in sta_list]
-            stations = ','.join(stations)
-
-            if port_mgr_cols:
-                port_mgr_response = self.json_get("/port/1/%s/%s?fields=%s" % (resource, stations, port_mgr_fields))
-
-            # if True, removes created_cx from json get to alleviate url > 2048 bytes error
-            if adjust_cx_json:
-                layer_3_response = self.json_get("/endp/?fields=%s" % (layer3_fields))
-            else:
-                layer_3_response = self.json_get("/endp/%s?fields=%s" % (created_cx, layer3_fields))
-            # logger.info(layer_3_response)
-
-            new_cx_rx_values = self.__get_rx_values()
-            if debug:
-                logger.debug(old_cx_rx_values, new_cx_rx_values)
-                logger.debug("\n-----------------------------------")
-                logger.debug(t)
-                logger.debug("-----------------------------------\n")
-            expected_passes += 1
-            if self.__compare_vals(old_cx_rx_values, new_cx_rx_values):
-                passes += 1
-            else:
-                # TODO track where this goes?
-                self.fail("FAIL: Not all stations increased traffic")
-
-            result = dict()  # create dataframe from layer 3 results
-            if type(layer_3_response) is dict:
-                for dictionary in layer_3_response['endpoint']:
-                    logger.debug('layer_3_data: {dictionary}'.format(dictionary=dictionary))
-                    result.update(dictionary)
-            else:
-                pass
-            layer3 = pd.DataFrame(result.values())
-            layer3.columns = ['l3-' + x for x in layer3.columns]
-
-            if port_mgr_cols:  # create dataframe from port mgr results
-                result = dict()
-                if type(port_mgr_response) is dict:
-                    logger.info("port_mgr_response {pmr}".format(pmr=port_mgr_response))
-                    if 'interfaces' in port_mgr_response:
-                        for dictionary in port_mgr_response['interfaces']:
-                            if debug:
-                                logger.debug('port mgr data: {dictionary}'.format(dictionary=dictionary))
-                            result.update(dictionary)
-
-                    elif 'interface' in port_mgr_response:
-                        dict_update = {port_mgr_response['interface']['alias']: port_mgr_response['interface']}
-                        if debug:
-                            logger.debug(dict_update)
-                        result.update(dict_update)
+        stations = [station.split('.')[-1] for station in sta_list]
+        station_names = ','.join(stations)
+        # json_get requests a url longer than the GUI accepts in chunks of endpoints
+        layer_3_url = "/endp/%s?fields=%s" % (created_cx, layer3_fields)
+        sampler = lfdata.MonitorSampler(csv_file=str(report_file))
+        alias_by_endp = {}
+        probe_workers = max(1, min(self.Default_Probe_Workers, len(sta_list)))
+        executor = ThreadPoolExecutor(max_workers=probe_workers + 3, thread_name_prefix="l3_monitor")
+        try:
+            while datetime.datetime.now() < end_time:
+                t = datetime.datetime.now()
+                tick_started = time.monotonic()
+                timestamp = t.strftime("%m/%d/%Y %I:%M:%S")
+                t_to_millisec_epoch = int(self.get_milliseconds(t))
+                t_to_sec_epoch = int(self.get_seconds(t))
+                time_elapsed = int(self.get_seconds(t)) - int(self.get_seconds(initial_starttime))
+
+                # endpoint, port and probe queries all go out at once
+                layer_3_future = executor.submit(self.json_get, layer_3_url)
+                port_mgr_future = None
+                if port_mgr_cols:
+                    port_mgr_future = executor.submit(self.json_get, "/port/1/%s/%s?fields=%s"
+                                                      % (resource, station_names, port_mgr_fields))
+                rx_values_future = executor.submit(self.__get_rx_values)
+                probe_futures = [(station.split('.')[-1], executor.submit(self.__probe_station, station))
+                                 for station in sta_list]
+
+                layer_3_response = layer_3_future.result()
+                new_cx_rx_values = rx_values_future.result()
+                if debug:
+                    logger.debug(old_cx_rx_values, new_cx_rx_values)
+                    logger.debug("\n-----------------------------------")
+                    logger.debug(t)
+                    logger.debug("-----------------------------------\n")
+                expected_passes += 1
+                if self.__compare_vals(old_cx_rx_values, new_cx_rx_values):
+                    passes += 1
+                else:
+                    # TODO track where this goes?
+                    self.fail("FAIL: Not all stations increased traffic")
+
+                layer3 = dict()  # endpoint name -> layer 3 record
+                if type(layer_3_response) is dict:
+                    for dictionary in layer_3_response['endpoint']:
+                        logger.debug('layer_3_data: {dictionary}'.format(dictionary=dictionary))
+                        layer3.update(dictionary)
+
+                port_data = dict()  # port alias -> port mgr record
+                if port_mgr_future is not None:
+                    port_mgr_response = port_mgr_future.result()
+                    if type(port_mgr_response) is dict:
                         if debug:
-                            logger.debug(result)
-                    else:
-                        logger.critical('interfaces and interface not in port_mgr_response')
-                        raise ValueError('interfaces and interface not in port_mgr_response')
-                    portdata_df = pd.DataFrame(result.values())
-                    logger.info("portdata_df {pd}".format(pd=portdata_df))
-                    portdata_df.columns = ['port-' + x for x in portdata_df.columns]
-                    portdata_df['alias'] = portdata_df['port-alias']
-
-                    layer3_alias = list()  # Add alias to layer 3 dataframe
-                    for cross_connect in layer3['l3-name']:
-                        for port in portdata_df['port-alias']:
-                            if port in cross_connect:
-                                layer3_alias.append(port)
-                    if len(layer3_alias) == layer3.shape[0]:
-                        layer3['alias'] = layer3_alias
-                    else:
+                            logger.debug("port_mgr_response {pmr}".format(pmr=port_mgr_response))
+                        if 'interfaces' in port_mgr_response:
+                            for dictionary in port_mgr_response['interfaces']:
+                                if debug:
+                                    logger.debug('port mgr data: {dictionary}'.format(dictionary=dictionary))
+                                for record in dictionary.values():
+                                    port_data[record['alias']] = record
+                        elif 'interface' in port_mgr_response:
+                            port_data[port_mgr_response['interface']['alias']] = port_mgr_response['interface']
+                        else:
+                            logger.critical('interfaces and interface not in port_mgr_response')
+                            raise ValueError('interfaces and interface not in port_mgr_response')
+
+                probe_data = dict()  # port alias -> probe results
+                for alias, probe_future in probe_futures:
+                    probe_results = probe_future.result()
+                    if probe_results is not None:
+                        probe_data[alias] = probe_results
+
+                if len(probe_data) < 1:
+                    logger.info("port probe results are empty.")
+                    time.sleep(max(0, monitor_interval_ms - (time.monotonic() - tick_started)))
+                    continue
+
+                # the csv columns come from the first tick with data, a tick without it writes nothing
+                if len(layer3) < 1 or (port_mgr_cols and len(port_data) < 1):
+                    logger.info("layer 3 endpoint or port mgr results are empty.")
+                    time.sleep(max(0, monitor_interval_ms - (time.monotonic() - tick_started)))
+                    continue
+
+                # join endpoints to their station by alias, matched once per endpoint name
+                for endp_name in layer3.keys():
+                    if endp_name not in alias_by_endp:
+                        alias_by_endp[endp_name] = self.__match_endp_alias(endp_name, stations)
+                    if port_mgr_cols and (alias_by_endp[endp_name] not in port_data):
                         logger.critical(("The Stations or Connection on LANforge did not match expected,",
                                          " Check if LANForge initial state correct or delete/cleanup corrects"))
                         raise ValueError(("The Stations or Connection on LANforge did not match expected,",
                                           " Check if LANForge initial state correct or delete/cleanup corrects"))
 
-                    timestamp_df = pd.merge(layer3, portdata_df, on='alias')
-            else:
-                timestamp_df = layer3
-            probe_port_df_list = list()
-            for station in sta_list:
-                probe_port = ProbePort(lfhost=self.lfclient_host,
-                                       lfport=self.lfclient_port,
-                                       eid_str=station,
-                                       debug=self.debug)
-                probe_results = dict()
-                if (probe_port.refreshProbe()):
-                    probe_results['Signal Avg Combined'] = probe_port.getSignalAvgCombined()
-                    probe_results['Signal Avg per Chain'] = probe_port.getSignalAvgPerChain()
-                    probe_results['Signal Combined'] = probe_port.getSignalCombined()
-                    probe_results['Signal per Chain'] = probe_port.getSignalPerChain()
-                    if 'Beacon Av Signal' in probe_results.keys():
-                        probe_results['Beacon Avg Signal'] = probe_port.getBeaconSignalAvg()
-                    else:
-                        probe_results['Beacon Avg Signal'] = "0"
-                    # probe_results['HE status'] = probe_port.he
-                    probe_results['TX Bitrate'] = probe_port.tx_bitrate
-                    probe_results['TX Mbps'] = probe_port.tx_mbit
-                    probe_results['TX MCS ACTUAL'] = probe_port.tx_mcs
-                    if probe_port.tx_mcs:
-                        probe_results['TX MCS'] = int(probe_port.tx_mcs) % 8
-                    else:
-                        probe_results['TX MCS'] = probe_port.tx_mcs
-                    probe_results['TX NSS'] = probe_port.tx_nss
-                    probe_results['TX MHz'] = probe_port.tx_mhz
-                    if probe_port.tx_gi:
-                        probe_results['TX GI ns'] = (probe_port.tx_gi * 10**9)
-                    else:
-                        probe_results['TX GI ns'] = probe_port.tx_gi
-                    probe_results['TX Mbps Calc'] = probe_port.tx_mbit_calc
-                    probe_results['TX GI'] = probe_port.tx_gi
-                    probe_results['TX Mbps short GI'] = probe_port.tx_data_rate_gi_short_Mbps
-                    probe_results['TX Mbps long GI'] = probe_port.tx_data_rate_gi_long_Mbps
-                    probe_results['RX Bitrate'] = probe_port.rx_bitrate
-                    probe_results['RX Mbps'] = probe_port.rx_mbit
-                    probe_results['RX MCS ACTUAL'] = probe_port.rx_mcs
-                    if probe_port.rx_mcs:
-                        probe_results['RX MCS'] = int(probe_port.rx_mcs) % 8
-                    else:
-                        probe_results['RX MCS'] = probe_port.rx_mcs
-                    probe_results['RX NSS'] = probe_port.rx_nss
-                    probe_results['RX MHz'] = probe_port.rx_mhz
-                    if probe_port.rx_gi:
-                        probe_results['RX GI ns'] = (probe_port.rx_gi * 10**9)
-                    else:
-                        probe_results['RX GI ns'] = probe_port.rx_gi
-                    probe_results['RX Mbps Calc'] = probe_port.rx_mbit_calc
-                    probe_results['RX GI'] = probe_port.rx_gi
-                    probe_results['RX Mbps short GI'] = probe_port.rx_data_rate_gi_short_Mbps
-                    probe_results['RX Mbps long GI'] = probe_port.rx_data_rate_gi_long_Mbps
-
-                    probe_df_initial = pd.DataFrame(probe_results.values()).transpose()
-                    probe_df_initial.columns = probe_results.keys()
-                    probe_df_initial.columns = ['probe ' + x for x in probe_df_initial.columns]
-                    probe_df_initial['alias'] = station.split('.')[-1]
-                    probe_port_df_list.append(probe_df_initial)
-            if len(probe_port_df_list) > 0:
-                probe_port_df = pd.concat(probe_port_df_list)
-                timestamp_df = pd.merge(timestamp_df, probe_port_df, on='alias')
-                timestamp_df['Timestamp'] = timestamp
-                timestamp_df['Timestamp milliseconds epoch'] = t_to_millisec_epoch
-                timestamp_df['Timestamp seconds epoch'] = t_to_sec_epoch
-                timestamp_df['Duration elapsed'] = time_elapsed
-                timestamp_data.append(timestamp_df)
-                time.sleep(monitor_interval_ms)
-                logger.info("Monitor: {}".format(datetime.datetime.now()))
-            else:
-                logger.info("port probe dataframe list is empty.")
-        if len(timestamp_data) > 0:
-            df = pd.concat(timestamp_data)
-            df = df.drop('alias', axis=1)
-            df.to_csv(str(report_file), index=False)
+                if sampler.columns is None:
+                    # same column order the merged DataFrames used to produce
+                    column_keys = [('l3', key) for key in next(iter(layer3.values())).keys()]
+                    if port_data:
+                        column_keys.extend(('port', key) for key in next(iter(port_data.values())).keys())
+                    column_keys.extend(('probe', key) for key in next(iter(probe_data.values())).keys())
+                    prefixes = {'l3': 'l3-', 'port': 'port-', 'probe': 'probe '}
+                    columns = [prefixes[kind] + key for kind, key in column_keys]
+                    columns.extend(['Timestamp', 'Timestamp milliseconds epoch', 'Timestamp seconds epoch', 'Duration elapsed'])
+                    sampler.set_columns(columns)
+
+                rows = []
+                tick_values = [timestamp, t_to_millisec_epoch, t_to_sec_epoch, time_elapsed]
+                for endp_name, endp_record in layer3.items():
+                    alias = alias_by_endp[endp_name]
+                    if alias not in probe_data:
+                        continue
+                    records = {'l3': endp_record, 'port': port_data.get(alias, {}), 'probe': probe_data[alias]}
+                    row = [records[kind].get(key, '') for kind, key in column_keys]
+                    row.extend(tick_values)
+                    rows.append(row)
+                sampler.append_rows(rows)
+
+                logger.info("Monitor: {} rows: {} collection: {:.3f}s".format(datetime.datetime.now(), len(rows),
+                                                                              time.monotonic() - tick_started))
+                time.sleep(max(0, monitor_interval_ms - (time.monotonic() - tick_started)))
+        finally:
+            executor.shutdown(wait=True)
+            sampler.close()
 
         # comparison to last report / report inputted
         if compared_report:
@@ -492,497 +535,502 @@ class L3CXProfile(LFCliBase):
             raise ValueError(
                 "side_a_min_bps, side_a_max_bps, side_b_min_bps, and side_b_max_bps must all be set to a value")
 
-        if type(side_a) == list and type(side_b) != list:
-            side_a_info = self.local_realm.name_to_eid(side_a[0])
-            side_a_shelf = side_a_info[0]
-            side_a_resource = side_a_info[1]
-            side_b_info = self.local_realm.name_to_eid(side_b)
-            side_b_shelf = side_b_info[0]
-            side_b_resource = side_b_info[1]
-
-            endp_a_list, endp_b_list = [], []
-            end_point_list = side_a
-            # setting the end points for batch-create functionality if type of side_a is list
-            if int(batch_quantity) > 1:
-                # separating the endpoints prefix
-                endp_a_prefix, endp_a_suffix = self.separate_endpoints_prefix(side_a[0])
-                endp_b_prefix, endp_b_suffix = self.separate_endpoints_prefix(side_b)
-
-                # separating the endpoints prefix if it's macvlan (eth1#0, eth1#1,..)
-                if '#' in (side_a[0] or side_b):
-                    if '#' in side_a[0]:
-                        prefix = side_a[0][::-1][side_a[0][::-1].index('#'):][::-1]
-                        suffix = side_a[0][::-1][0:side_a[0][::-1].index('#')][::-1]
-                        endp_a_prefix = prefix
-                        endp_a_suffix = suffix
-                    if '#' in side_b:
-                        prefix = side_b[::-1][side_b[::-1].index('#'):][::-1]
-                        suffix = side_b[::-1][0:side_b[::-1].index('#')][::-1]
-                        endp_b_prefix = prefix
-                        endp_b_suffix = suffix
-                if port_increment_a != '0' and port_increment_b != '0':
-                    for i in range(int(endp_a_suffix),
-                                   int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
-                                   int(port_increment_a)):
-                        endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
-                    for j in range(int(endp_b_suffix),
-                                   int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
-                                   int(port_increment_b)):
-                        endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
-                elif port_increment_a == '0' and port_increment_b != '0':
-                    for i in range(int(batch_quantity)):
-                        endp_a_list.append(side_a[0])
-                    for j in range(int(endp_b_suffix),
-                                   int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
-                                   int(port_increment_b)):
-                        endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
-                elif port_increment_a != '0' and port_increment_b == '0':
-                    for i in range(int(endp_a_suffix),
-                                   int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
-                                   int(port_increment_a)):
-                        endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
-                    for j in range(int(batch_quantity)):
-                        endp_b_list.append(side_b)
-                elif port_increment_a == '0' and port_increment_b == '0':
-                    for i in range(int(batch_quantity)):
-                        endp_a_list.append(side_a[0])
-                    for j in range(int(batch_quantity)):
-                        endp_b_list.append(side_b)
-                end_point_list = list(zip(endp_a_list, endp_b_list))
-                # logger.info("Endpoint-A List:%s" % endp_a_list)
-                # logger.info("Endpoint-B List:%s" % endp_b_list)
-                # logger.info("End Points Combinations : %s" % end_point_list)
-
-            # iterating the end points list
-            for port_tuple in end_point_list:
+        # endpoint commands for one connection are sent in order as one group; groups for
+        # different connections are pipelined over keep-alive connections when the batch exits
+        with self.local_realm.command_batch(debug_=debug_) as batch:
+            if type(side_a) == list and type(side_b) != list:
+                side_a_info = self.local_realm.name_to_eid(side_a[0])
+                side_a_shelf = side_a_info[0]
+                side_a_resource = side_a_info[1]
+                side_b_info = self.local_realm.name_to_eid(side_b)
+                side_b_shelf = side_b_info[0]
+                side_b_resource = side_b_info[1]
+
+                endp_a_list, endp_b_list = [], []
+                end_point_list = side_a
+                # setting the end points for batch-create functionality if type of side_a is list
                 if int(batch_quantity) > 1:
-                    side_a_info = self.local_realm.name_to_eid(port_tuple[0])
-                    side_b_info = self.local_realm.name_to_eid(port_tuple[1])
-                else:
-                    side_a_info = self.local_realm.name_to_eid(port_tuple, debug=debug_)
-                    side_a_shelf = side_a_info[0]
-                    side_a_resource = side_a_info[1]
-                if cx_name is None:
-                    safer_info_2 = re.sub("[^-_a-zA-Z0-9]", "_", side_a_info[2])
-                    cx_name = "%s%s-%i" % (self.name_prefix, safer_info_2, len(self.created_cx))
-                else:
-                    cx_name = cx_name
+                    # separating the endpoints prefix
+                    endp_a_prefix, endp_a_suffix = self.separate_endpoints_prefix(side_a[0])
+                    endp_b_prefix, endp_b_suffix = self.separate_endpoints_prefix(side_b)
+
+                    # separating the endpoints prefix if it's macvlan (eth1#0, eth1#1,..)
+                    if '#' in (side_a[0] or side_b):
+                        if '#' in side_a[0]:
+                            prefix = side_a[0][::-1][side_a[0][::-1].index('#'):][::-1]
+                            suffix = side_a[0][::-1][0:side_a[0][::-1].index('#')][::-1]
+                            endp_a_prefix = prefix
+                            endp_a_suffix = suffix
+                        if '#' in side_b:
+                            prefix = side_b[::-1][side_b[::-1].index('#'):][::-1]
+                            suffix = side_b[::-1][0:side_b[::-1].index('#')][::-1]
+                            endp_b_prefix = prefix
+                            endp_b_suffix = suffix
+                    if port_increment_a != '0' and port_increment_b != '0':
+                        for i in range(int(endp_a_suffix),
+                                       int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
+                                       int(port_increment_a)):
+                            endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
+                        for j in range(int(endp_b_suffix),
+                                       int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
+                                       int(port_increment_b)):
+                            endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
+                    elif port_increment_a == '0' and port_increment_b != '0':
+                        for i in range(int(batch_quantity)):
+                            endp_a_list.append(side_a[0])
+                        for j in range(int(endp_b_suffix),
+                                       int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
+                                       int(port_increment_b)):
+                            endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
+                    elif port_increment_a != '0' and port_increment_b == '0':
+                        for i in range(int(endp_a_suffix),
+                                       int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
+                                       int(port_increment_a)):
+                            endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
+                        for j in range(int(batch_quantity)):
+                            endp_b_list.append(side_b)
+                    elif port_increment_a == '0' and port_increment_b == '0':
+                        for i in range(int(batch_quantity)):
+                            endp_a_list.append(side_a[0])
+                        for j in range(int(batch_quantity)):
+                            endp_b_list.append(side_b)
+                    end_point_list = list(zip(endp_a_list, endp_b_list))
+                    # logger.info("Endpoint-A List:%s" % endp_a_list)
+                    # logger.info("Endpoint-B List:%s" % endp_b_list)
+                    # logger.info("End Points Combinations : %s" % end_point_list)
+
+                # iterating the end points list
+                for port_tuple in end_point_list:
+                    if int(batch_quantity) > 1:
+                        side_a_info = self.local_realm.name_to_eid(port_tuple[0])
+                        side_b_info = self.local_realm.name_to_eid(port_tuple[1])
+                    else:
+                        side_a_info = self.local_realm.name_to_eid(port_tuple, debug=debug_)
+                        side_a_shelf = side_a_info[0]
+                        side_a_resource = side_a_info[1]
+                    if cx_name is None:
+                        safer_info_2 = re.sub("[^-_a-zA-Z0-9]", "_", side_a_info[2])
+                        cx_name = "%s%s-%i" % (self.name_prefix, safer_info_2, len(self.created_cx))
+                    else:
+                        cx_name = cx_name
 
-                match =re.search("[^-._a-zA-Z0-9]", str(cx_name))
-                if match:
-                    pprint.pprint(["name_prefix", self.name_prefix,
-                                   "side_a_info.2", side_a_info[2]])
-                    raise ValueError(f"Endp-A has invalid characters in name: [{cx_name}]")
+                    match =re.search("[^-._a-zA-Z0-9]", str(cx_name))
+                    if match:
+                        pprint.pprint(["name_prefix", self.name_prefix,
+                                       "side_a_info.2", side_a_info[2]])
+                        raise ValueError(f"Endp-A has invalid characters in name: [{cx_name}]")
 
-                if tos and add_tos_to_name:
-                    endp_a_name = cx_name + "-%s-A" % (tos)
-                    endp_b_name = cx_name + "-%s-B" % (tos)
-                else:
+                    if tos and add_tos_to_name:
+                        endp_a_name = cx_name + "-%s-A" % (tos)
+                        endp_b_name = cx_name + "-%s-B" % (tos)
+                    else:
+                        endp_a_name = cx_name + "-A"
+                        endp_b_name = cx_name + "-B"
+                    self.created_cx[cx_name] = [endp_a_name, endp_b_name]
+                    self.created_endp[endp_a_name] = endp_a_name
+                    self.created_endp[endp_b_name] = endp_b_name
+                    these_cx.append(cx_name)
+                    batch.set_group(cx_name)
+                    these_endp.append(endp_a_name)
+                    these_endp.append(endp_b_name)
+                    endp_side_a = {
+                        "alias": endp_a_name,
+                        "shelf": side_a_shelf,
+                        "resource": side_a_resource,
+                        "port": side_a_info[2],
+                        "type": endp_type,
+                        "min_rate": self.side_a_min_bps,
+                        "max_rate": self.side_a_max_bps,
+                        "min_pkt": self.side_a_min_pdu,
+                        "max_pkt": self.side_a_max_pdu,
+                        "ip_port": ip_port_a,
+                        "multi_conn": self.mconn_A,
+                    }
+                    endp_side_b = {
+                        "alias": endp_b_name,
+                        "shelf": side_b_shelf,
+                        "resource": side_b_resource,
+                        "port": side_b_info[2],
+                        "type": endp_type,
+                        "min_rate": self.side_b_min_bps,
+                        "max_rate": self.side_b_max_bps,
+                        "min_pkt": self.side_b_min_pdu,
+                        "max_pkt": self.side_b_max_pdu,
+                        "ip_port": ip_port_b,
+                        "multi_conn": self.mconn_B,
+                    }
+
+                    url = "/cli-json/add_endp"
+                    self.local_realm.json_post(_req_url=url,
+                                               _data=endp_side_a,
+                                               debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
+                    self.local_realm.json_post(_req_url=url,
+                                               _data=endp_side_b,
+                                               debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
+                    self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
+                                               _data={"endp_name":endp_a_name, "milliseconds":250 },
+                                               suppress_related_commands_=suppress_related_commands)
+                    self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
+                                               _data={ "endp_name":endp_b_name, "milliseconds":250, },
+                                               suppress_related_commands_=suppress_related_commands)
+                    # time.sleep(sleep_time)
+
+                    url = "cli-json/set_endp_flag"
+                    data = {
+                        "name": endp_a_name,
+                        "flag": "AutoHelper",
+                        "val": 1
+                    }
+                    self.local_realm.json_post(url, data, debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
+                    data["name"] = endp_b_name
+                    self.local_realm.json_post(url, data, debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
+
+                    if (endp_type == "lf_udp") or (endp_type == "udp") or (endp_type == "lf_udp6") or (endp_type == "udp6"):
+                        data["name"] = endp_a_name
+                        data["flag"] = "UseAutoNAT"
+                        self.local_realm.json_post(url, data, debug_=debug_,
+                                                   suppress_related_commands_=suppress_related_commands)
+                        data["name"] = endp_b_name
+                        self.local_realm.json_post(url, data, debug_=debug_,
+                                                   suppress_related_commands_=suppress_related_commands)
+
+                    if tos:
+                        self.local_realm.set_endp_tos(endp_a_name, tos)
+                        self.local_realm.set_endp_tos(endp_b_name, tos)
+
+                    if pkts_to_send:
+                        self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
+                        self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
+
+                    data = {
+                        "alias": cx_name,
+                        "test_mgr": "default_tm",
+                        "tx_endp": endp_a_name,
+                        "rx_endp": endp_b_name,
+                    }
+                    cx_post_data.append(data)
+                    timer_post_data.append({
+                        "test_mgr": "default_tm",
+                        "cx_name": cx_name,
+                        "milliseconds": self.report_timer
+                    })
+                    if ip_port_a != -1:
+                        if ip_port_increment_a != 0:
+                            ip_port_a = int(ip_port_a) + int(ip_port_increment_a)
+                    if ip_port_b != -1:
+                        if ip_port_increment_b != 0:
+                            ip_port_b = int(ip_port_b) + int(ip_port_increment_b)
+                    cx_name = None
+
+            elif type(side_b) == list and type(side_a) != list:
+                side_b_info = self.local_realm.name_to_eid(side_b[0])
+                side_b_shelf = side_b_info[0]
+                side_b_resource = side_b_info[1]
+                side_a_info = self.local_realm.name_to_eid(side_a, debug=debug_)
+                side_a_shelf = side_a_info[0]
+                side_a_resource = side_a_info[1]
+
+                endp_a_list, endp_b_list = [], []
+                end_point_list = side_b
+                # setting the end points for batch-create functionality if type of side_b list
+                if int(batch_quantity) > 1:
+                    # separating the endpoints prefix
+                    endp_a_prefix, endp_a_suffix = self.separate_endpoints_prefix(side_a)
+                    endp_b_prefix, endp_b_suffix = self.separate_endpoints_prefix(side_b[0])
+
+                    # separating the endpoints prefix if it's macvlan (eth1#0, eth1#1,..)
+                    if '#' in (side_a or side_b[0]):
+                        if '#' in side_a:
+                            prefix = side_a[::-1][side_a[::-1].index('#'):][::-1]
+                            suffix = side_a[::-1][0:side_a[::-1].index('#')][::-1]
+                            endp_a_prefix = prefix
+                            endp_a_suffix = suffix
+                        if '#' in side_b[0]:
+                            prefix = side_b[0][::-1][side_b[0][::-1].index('#'):][::-1]
+                            suffix = side_b[0][::-1][0:side_b[0][::-1].index('#')][::-1]
+                            endp_b_prefix = prefix
+                            endp_b_suffix = suffix
+                    if port_increment_a != '0' and port_increment_b != '0':
+                        for i in range(int(endp_a_suffix),
+                                       int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
+                                       int(port_increment_a)):
+                            endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
+                        for j in range(int(endp_b_suffix),
+                                       int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
+                                       int(port_increment_b)):
+                            endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
+                    elif port_increment_a == '0' and port_increment_b != '0':
+                        for i in range(int(batch_quantity)):
+                            endp_a_list.append(side_a)
+                        for j in range(int(endp_b_suffix),
+                                       int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
+                                       int(port_increment_b)):
+                            endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
+                    elif port_increment_a != '0' and port_increment_b == '0':
+                        for i in range(int(endp_a_suffix),
+                                       int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
+                                       int(port_increment_a)):
+                            endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
+                        for j in range(int(batch_quantity)):
+                            endp_b_list.append(side_b[0])
+                    elif port_increment_a == '0' and port_increment_b == '0':
+                        for i in range(int(batch_quantity)):
+                            endp_a_list.append(side_a)
+                        for j in range(int(batch_quantity)):
+                            endp_b_list.append(side_b[0])
+                    end_point_list = list(zip(endp_a_list, endp_b_list))
+                    # logger.info("Endpoint-A List:%s" % endp_a_list)
+                    # logger.info("Endpoint-B List:%s" % endp_b_list)
+                    # logger.info("End Points Combinations : %s" % end_point_list)
+
+                # iterating the end points list
+                for port_tuple in end_point_list:
+                    if int(batch_quantity) > 1:
+                        side_b_info = self.local_realm.name_to_eid(port_tuple[1])
+                        side_a_info = self.local_realm.name_to_eid(port_tuple[0])
+                    else:
+                        side_b_info = self.local_realm.name_to_eid(port_tuple, debug=debug_)
+                        side_b_shelf = side_b_info[0]
+                        side_b_resource = side_b_info[1]
+
+                    cx_name = "%s%s-%i" % (self.name_prefix, side_b_info[2], len(self.created_cx))
                     endp_a_name = cx_name + "-A"
                     endp_b_name = cx_name + "-B"
-                self.created_cx[cx_name] = [endp_a_name, endp_b_name]
-                self.created_endp[endp_a_name] = endp_a_name
-                self.created_endp[endp_b_name] = endp_b_name
-                these_cx.append(cx_name)
-                these_endp.append(endp_a_name)
-                these_endp.append(endp_b_name)
-                endp_side_a = {
-                    "alias": endp_a_name,
-                    "shelf": side_a_shelf,
-                    "resource": side_a_resource,
-                    "port": side_a_info[2],
-                    "type": endp_type,
-                    "min_rate": self.side_a_min_bps,
-                    "max_rate": self.side_a_max_bps,
-                    "min_pkt": self.side_a_min_pdu,
-                    "max_pkt": self.side_a_max_pdu,
-                    "ip_port": ip_port_a,
-                    "multi_conn": self.mconn_A,
-                }
-                endp_side_b = {
-                    "alias": endp_b_name,
-                    "shelf": side_b_shelf,
-                    "resource": side_b_resource,
-                    "port": side_b_info[2],
-                    "type": endp_type,
-                    "min_rate": self.side_b_min_bps,
-                    "max_rate": self.side_b_max_bps,
-                    "min_pkt": self.side_b_min_pdu,
-                    "max_pkt": self.side_b_max_pdu,
-                    "ip_port": ip_port_b,
-                    "multi_conn": self.mconn_B,
-                }
-
-                url = "/cli-json/add_endp"
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_a,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_b,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={"endp_name":endp_a_name, "milliseconds":250 },
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={ "endp_name":endp_b_name, "milliseconds":250, },
-                                           suppress_related_commands_=suppress_related_commands)
-                # time.sleep(sleep_time)
-
-                url = "cli-json/set_endp_flag"
-                data = {
-                    "name": endp_a_name,
-                    "flag": "AutoHelper",
-                    "val": 1
-                }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                data["name"] = endp_b_name
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                    self.created_cx[cx_name] = [endp_a_name, endp_b_name]
+                    self.created_endp[endp_a_name] = endp_a_name
+                    self.created_endp[endp_b_name] = endp_b_name
+                    these_cx.append(cx_name)
+                    batch.set_group(cx_name)
+                    these_endp.append(endp_a_name)
+                    these_endp.append(endp_b_name)
+                    endp_side_a = {
+                        "alias": endp_a_name,
+                        "shelf": side_a_shelf,
+                        "resource": side_a_resource,
+                        "port": side_a_info[2],
+                        "type": endp_type,
+                        "min_rate": self.side_a_min_bps,
+                        "max_rate": self.side_a_max_bps,
+                        "min_pkt": self.side_a_min_pdu,
+                        "max_pkt": self.side_a_max_pdu,
+                        "ip_port": ip_port_a,
+                        "multi_conn": self.mconn_A,
+                    }
+                    endp_side_b = {
+                        "alias": endp_b_name,
+                        "shelf": side_b_shelf,
+                        "resource": side_b_resource,
+                        "port": side_b_info[2],
+                        "type": endp_type,
+                        "min_rate": self.side_b_min_bps,
+                        "max_rate": self.side_b_max_bps,
+                        "min_pkt": self.side_b_min_pdu,
+                        "max_pkt": self.side_b_max_pdu,
+                        "ip_port": ip_port_b,
+                        "multi_conn": self.mconn_B,
+                    }
+
+                    url = "/cli-json/add_endp"
+                    self.local_realm.json_post(url, endp_side_a, debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
+                    self.local_realm.json_post(url, endp_side_b, debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
 
-                if (endp_type == "lf_udp") or (endp_type == "udp") or (endp_type == "lf_udp6") or (endp_type == "udp6"):
-                    data["name"] = endp_a_name
-                    data["flag"] = "UseAutoNAT"
+                    url = "cli-json/set_endp_flag"
+                    data = {
+                        "name": endp_a_name,
+                        "flag": "autohelper",
+                        "val": 1
+                    }
                     self.local_realm.json_post(url, data, debug_=debug_,
                                                suppress_related_commands_=suppress_related_commands)
-                    data["name"] = endp_b_name
+
+                    url = "cli-json/set_endp_flag"
+                    data = {
+                        "name": endp_b_name,
+                        "flag": "autohelper",
+                        "val": 1
+                    }
                     self.local_realm.json_post(url, data, debug_=debug_,
                                                suppress_related_commands_=suppress_related_commands)
 
-                if tos:
-                    self.local_realm.set_endp_tos(endp_a_name, tos)
-                    self.local_realm.set_endp_tos(endp_b_name, tos)
-
-                if pkts_to_send:
-                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
-                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
-
-                data = {
-                    "alias": cx_name,
-                    "test_mgr": "default_tm",
-                    "tx_endp": endp_a_name,
-                    "rx_endp": endp_b_name,
-                }
-                cx_post_data.append(data)
-                timer_post_data.append({
-                    "test_mgr": "default_tm",
-                    "cx_name": cx_name,
-                    "milliseconds": self.report_timer
-                })
-                if ip_port_a != -1:
-                    if ip_port_increment_a != 0:
-                        ip_port_a = int(ip_port_a) + int(ip_port_increment_a)
-                if ip_port_b != -1:
-                    if ip_port_increment_b != 0:
-                        ip_port_b = int(ip_port_b) + int(ip_port_increment_b)
-                cx_name = None
-
-        elif type(side_b) == list and type(side_a) != list:
-            side_b_info = self.local_realm.name_to_eid(side_b[0])
-            side_b_shelf = side_b_info[0]
-            side_b_resource = side_b_info[1]
-            side_a_info = self.local_realm.name_to_eid(side_a, debug=debug_)
-            side_a_shelf = side_a_info[0]
-            side_a_resource = side_a_info[1]
-
-            endp_a_list, endp_b_list = [], []
-            end_point_list = side_b
-            # setting the end points for batch-create functionality if type of side_b list
-            if int(batch_quantity) > 1:
-                # separating the endpoints prefix
-                endp_a_prefix, endp_a_suffix = self.separate_endpoints_prefix(side_a)
-                endp_b_prefix, endp_b_suffix = self.separate_endpoints_prefix(side_b[0])
-
-                # separating the endpoints prefix if it's macvlan (eth1#0, eth1#1,..)
-                if '#' in (side_a or side_b[0]):
-                    if '#' in side_a:
-                        prefix = side_a[::-1][side_a[::-1].index('#'):][::-1]
-                        suffix = side_a[::-1][0:side_a[::-1].index('#')][::-1]
-                        endp_a_prefix = prefix
-                        endp_a_suffix = suffix
-                    if '#' in side_b[0]:
-                        prefix = side_b[0][::-1][side_b[0][::-1].index('#'):][::-1]
-                        suffix = side_b[0][::-1][0:side_b[0][::-1].index('#')][::-1]
-                        endp_b_prefix = prefix
-                        endp_b_suffix = suffix
-                if port_increment_a != '0' and port_increment_b != '0':
-                    for i in range(int(endp_a_suffix),
-                                   int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
-                                   int(port_increment_a)):
-                        endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
-                    for j in range(int(endp_b_suffix),
-                                   int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
-                                   int(port_increment_b)):
-                        endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
-                elif port_increment_a == '0' and port_increment_b != '0':
-                    for i in range(int(batch_quantity)):
-                        endp_a_list.append(side_a)
-                    for j in range(int(endp_b_suffix),
-                                   int(int(batch_quantity) * int(port_increment_b) + int(endp_b_suffix)),
-                                   int(port_increment_b)):
-                        endp_b_list.append(endp_b_prefix + str(j).zfill(len(endp_b_suffix)))
-                elif port_increment_a != '0' and port_increment_b == '0':
-                    for i in range(int(endp_a_suffix),
-                                   int(int(batch_quantity) * int(port_increment_a) + int(endp_a_suffix)),
-                                   int(port_increment_a)):
-                        endp_a_list.append(endp_a_prefix + str(i).zfill(len(endp_a_suffix)))
-                    for j in range(int(batch_quantity)):
-                        endp_b_list.append(side_b[0])
-                elif port_increment_a == '0' and port_increment_b == '0':
-                    for i in range(int(batch_quantity)):
-                        endp_a_list.append(side_a)
-                    for j in range(int(batch_quantity)):
-                        endp_b_list.append(side_b[0])
-                end_point_list = list(zip(endp_a_list, endp_b_list))
+                    if tos:
+                        self.local_realm.set_endp_tos(endp_a_name, tos)
+                        self.local_realm.set_endp_tos(endp_b_name, tos)
+
+                    if pkts_to_send:
+                        self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
+                        self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
+
+                    data = {
+                        "alias": cx_name,
+                        "test_mgr": "default_tm",
+                        "tx_endp": endp_a_name,
+                        "rx_endp": endp_b_name,
+                    }
+                    cx_post_data.append(data)
+                    timer_post_data.append({
+                        "test_mgr": "default_tm",
+                        "cx_name": cx_name,
+                        "milliseconds": self.report_timer
+                    })
+                    if ip_port_a != -1:
+                        if ip_port_increment_a != 0:
+                            ip_port_a = int(ip_port_a) + int(ip_port_increment_a)
+                    if ip_port_b != -1:
+                        if ip_port_increment_b != 0:
+                            ip_port_b = int(ip_port_b) + int(ip_port_increment_b)
+
+            elif (type(side_a) == list) and (type(side_b) == list):
+                side_a_info = self.local_realm.name_to_eid(side_a[0])
+                side_a_shelf = side_a_info[0]
+                side_a_resource = side_a_info[1]
+                side_b_info = self.local_realm.name_to_eid(side_b[0])
+                side_b_shelf = side_b_info[0]
+                side_b_resource = side_b_info[1]
+
+                endp_a_list, endp_b_list = [], []
+                endp_a_list.extend(side_a)
+                endp_b_list.extend(side_b)
+
+                end_point_list = zip(endp_a_list, endp_b_list)
                 # logger.info("Endpoint-A List:%s" % endp_a_list)
                 # logger.info("Endpoint-B List:%s" % endp_b_list)
-                # logger.info("End Points Combinations : %s" % end_point_list)
+                # logger.info("End Points Combinations : %s" % list(end_point_list))
 
-            # iterating the end points list
-            for port_tuple in end_point_list:
-                if int(batch_quantity) > 1:
-                    side_b_info = self.local_realm.name_to_eid(port_tuple[1])
+                # iterating the end points list
+                for port_tuple in list(end_point_list):
                     side_a_info = self.local_realm.name_to_eid(port_tuple[0])
-                else:
-                    side_b_info = self.local_realm.name_to_eid(port_tuple, debug=debug_)
-                    side_b_shelf = side_b_info[0]
-                    side_b_resource = side_b_info[1]
-
-                cx_name = "%s%s-%i" % (self.name_prefix, side_b_info[2], len(self.created_cx))
-                endp_a_name = cx_name + "-A"
-                endp_b_name = cx_name + "-B"
-                self.created_cx[cx_name] = [endp_a_name, endp_b_name]
-                self.created_endp[endp_a_name] = endp_a_name
-                self.created_endp[endp_b_name] = endp_b_name
-                these_cx.append(cx_name)
-                these_endp.append(endp_a_name)
-                these_endp.append(endp_b_name)
-                endp_side_a = {
-                    "alias": endp_a_name,
-                    "shelf": side_a_shelf,
-                    "resource": side_a_resource,
-                    "port": side_a_info[2],
-                    "type": endp_type,
-                    "min_rate": self.side_a_min_bps,
-                    "max_rate": self.side_a_max_bps,
-                    "min_pkt": self.side_a_min_pdu,
-                    "max_pkt": self.side_a_max_pdu,
-                    "ip_port": ip_port_a,
-                    "multi_conn": self.mconn_A,
-                }
-                endp_side_b = {
-                    "alias": endp_b_name,
-                    "shelf": side_b_shelf,
-                    "resource": side_b_resource,
-                    "port": side_b_info[2],
-                    "type": endp_type,
-                    "min_rate": self.side_b_min_bps,
-                    "max_rate": self.side_b_max_bps,
-                    "min_pkt": self.side_b_min_pdu,
-                    "max_pkt": self.side_b_max_pdu,
-                    "ip_port": ip_port_b,
-                    "multi_conn": self.mconn_B,
-                }
-
-                url = "/cli-json/add_endp"
-                self.local_realm.json_post(url, endp_side_a, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(url, endp_side_b, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                time.sleep(sleep_time)
-
-                url = "cli-json/set_endp_flag"
-                data = {
-                    "name": endp_a_name,
-                    "flag": "autohelper",
-                    "val": 1
-                }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-
-                url = "cli-json/set_endp_flag"
-                data = {
-                    "name": endp_b_name,
-                    "flag": "autohelper",
-                    "val": 1
-                }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-
-                if tos:
-                    self.local_realm.set_endp_tos(endp_a_name, tos)
-                    self.local_realm.set_endp_tos(endp_b_name, tos)
-
-                if pkts_to_send:
-                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
-                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
-
-                data = {
-                    "alias": cx_name,
-                    "test_mgr": "default_tm",
-                    "tx_endp": endp_a_name,
-                    "rx_endp": endp_b_name,
-                }
-                cx_post_data.append(data)
-                timer_post_data.append({
-                    "test_mgr": "default_tm",
-                    "cx_name": cx_name,
-                    "milliseconds": self.report_timer
-                })
-                if ip_port_a != -1:
-                    if ip_port_increment_a != 0:
-                        ip_port_a = int(ip_port_a) + int(ip_port_increment_a)
-                if ip_port_b != -1:
-                    if ip_port_increment_b != 0:
-                        ip_port_b = int(ip_port_b) + int(ip_port_increment_b)
+                    side_b_info = self.local_realm.name_to_eid(port_tuple[1])
+                    cx_name = None
+                    # pprint.pprint(["sideA", side_a_info, "sideB", side_b_info, "cxname", cx_name])
 
-        elif (type(side_a) == list) and (type(side_b) == list):
-            side_a_info = self.local_realm.name_to_eid(side_a[0])
-            side_a_shelf = side_a_info[0]
-            side_a_resource = side_a_info[1]
-            side_b_info = self.local_realm.name_to_eid(side_b[0])
-            side_b_shelf = side_b_info[0]
-            side_b_resource = side_b_info[1]
-
-            endp_a_list, endp_b_list = [], []
-            endp_a_list.extend(side_a)
-            endp_b_list.extend(side_b)
-
-            end_point_list = zip(endp_a_list, endp_b_list)
-            # logger.info("Endpoint-A List:%s" % endp_a_list)
-            # logger.info("Endpoint-B List:%s" % endp_b_list)
-            # logger.info("End Points Combinations : %s" % list(end_point_list))
-
-            # iterating the end points list
-            for port_tuple in list(end_point_list):
-                side_a_info = self.local_realm.name_to_eid(port_tuple[0])
-                side_b_info = self.local_realm.name_to_eid(port_tuple[1])
-                cx_name = None
-                # pprint.pprint(["sideA", side_a_info, "sideB", side_b_info, "cxname", cx_name])
-
-                safer_info_2 = re.sub("[^-_a-zA-Z0-9]", "_", side_a_info[2])
-                cx_name = "%s%s-%i" % (self.name_prefix, safer_info_2, len(self.created_cx))
-
-                match = re.search("[^-._a-zA-Z0-9]", str(cx_name))
-                if match:
-                    pprint.pprint(["name_prefix", self.name_prefix,
-                                   "side_a_info.2", side_a_info[2]])
-                    raise ValueError(f"Endp-A has invalid characters in name: [{cx_name}]")
-
-                if tos and add_tos_to_name:
-                    endp_a_name = cx_name + "-%s-A" % (tos)
-                    endp_b_name = cx_name + "-%s-B" % (tos)
-                else:
-                    endp_a_name = cx_name + "-A"
-                    endp_b_name = cx_name + "-B"
+                    safer_info_2 = re.sub("[^-_a-zA-Z0-9]", "_", side_a_info[2])
+                    cx_name = "%s%s-%i" % (self.name_prefix, safer_info_2, len(self.created_cx))
 
-                self.created_cx[cx_name] = [endp_a_name, endp_b_name]
-                self.created_endp[endp_a_name] = endp_a_name
-                self.created_endp[endp_b_name] = endp_b_name
-                these_cx.append(cx_name)
-                these_endp.append(endp_a_name)
-                these_endp.append(endp_b_name)
-                endp_side_a = {
-                    "alias": endp_a_name,
-                    "shelf": side_a_shelf,
-                    "resource": side_a_resource,
-                    "port": side_a_info[2],
-                    "type": endp_type,
-                    "min_rate": self.side_a_min_bps,
-                    "max_rate": self.side_a_max_bps,
-                    "min_pkt": self.side_a_min_pdu,
-                    "max_pkt": self.side_a_max_pdu,
-                    "ip_port": ip_port_a,
-                    "multi_conn": self.mconn_A,
-                }
-                endp_side_b = {
-                    "alias": endp_b_name,
-                    "shelf": side_b_shelf,
-                    "resource": side_b_resource,
-                    "port": side_b_info[2],
-                    "type": endp_type,
-                    "min_rate": self.side_b_min_bps,
-                    "max_rate": self.side_b_max_bps,
-                    "min_pkt": self.side_b_min_pdu,
-                    "max_pkt": self.side_b_max_pdu,
-                    "ip_port": ip_port_b,
-                    "multi_conn": self.mconn_B,
-                }
-
-                # pprint.pprint(["endp_side_a", endp_side_a, "endp_side_b", endp_side_b])
-                url = "/cli-json/add_endp"
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_a,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_b,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={"endp_name":endp_a_name, "milliseconds":250 },
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={ "endp_name":endp_b_name, "milliseconds":250, },
-                                           suppress_related_commands_=suppress_related_commands)
-                # time.sleep(sleep_time)
-
-                url = "cli-json/set_endp_flag"
-                data = {
-                    "name": endp_a_name,
-                    "flag": "AutoHelper",
-                    "val": 1
-                }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                data["name"] = endp_b_name
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                    match = re.search("[^-._a-zA-Z0-9]", str(cx_name))
+                    if match:
+                        pprint.pprint(["name_prefix", self.name_prefix,
+                                       "side_a_info.2", side_a_info[2]])
+                        raise ValueError(f"Endp-A has invalid characters in name: [{cx_name}]")
 
-                if (endp_type == "lf_udp") or (endp_type == "udp") or (endp_type == "lf_udp6") or (endp_type == "udp6"):
-                    data["name"] = endp_a_name
-                    data["flag"] = "UseAutoNAT"
+                    if tos and add_tos_to_name:
+                        endp_a_name = cx_name + "-%s-A" % (tos)
+                        endp_b_name = cx_name + "-%s-B" % (tos)
+                    else:
+                        endp_a_name = cx_name + "-A"
+                        endp_b_name = cx_name + "-B"
+
+                    self.created_cx[cx_name] = [endp_a_name, endp_b_name]
+                    self.created_endp[endp_a_name] = endp_a_name
+                    self.created_endp[endp_b_name] = endp_b_name
+                    these_cx.append(cx_name)
+                    batch.set_group(cx_name)
+                    these_endp.append(endp_a_name)
+                    these_endp.append(endp_b_name)
+                    endp_side_a = {
+                        "alias": endp_a_name,
+                        "shelf": side_a_shelf,
+                        "resource": side_a_resource,
+                        "port": side_a_info[2],
+                        "type": endp_type,
+                        "min_rate": self.side_a_min_bps,
+                        "max_rate": self.side_a_max_bps,
+                        "min_pkt": self.side_a_min_pdu,
+                        "max_pkt": self.side_a_max_pdu,
+                        "ip_port": ip_port_a,
+                        "multi_conn": self.mconn_A,
+                    }
+                    endp_side_b = {
+                        "alias": endp_b_name,
+                        "shelf": side_b_shelf,
+                        "resource": side_b_resource,
+                        "port": side_b_info[2],
+                        "type": endp_type,
+                        "min_rate": self.side_b_min_bps,
+                        "max_rate": self.side_b_max_bps,
+                        "min_pkt": self.side_b_min_pdu,
+                        "max_pkt": self.side_b_max_pdu,
+                        "ip_port": ip_port_b,
+                        "multi_conn": self.mconn_B,
+                    }
+
+                    # pprint.pprint(["endp_side_a", endp_side_a, "endp_side_b", endp_side_b])
+                    url = "/cli-json/add_endp"
+                    self.local_realm.json_post(_req_url=url,
+                                               _data=endp_side_a,
+                                               debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
+                    self.local_realm.json_post(_req_url=url,
+                                               _data=endp_side_b,
+                                               debug_=debug_,
+                                               suppress_related_commands_=suppress_related_commands)
+                    self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
+                                               _data={"endp_name":endp_a_name, "milliseconds":250 },
+                                               suppress_related_commands_=suppress_related_commands)
+                    self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
+                                               _data={ "endp_name":endp_b_name, "milliseconds":250, },
+                                               suppress_related_commands_=suppress_related_commands)
+                    # time.sleep(sleep_time)
+
+                    url = "cli-json/set_endp_flag"
+                    data = {
+                        "name": endp_a_name,
+                        "flag": "AutoHelper",
+                        "val": 1
+                    }
                     self.local_realm.json_post(url, data, debug_=debug_,
                                                suppress_related_commands_=suppress_related_commands)
                     data["name"] = endp_b_name
                     self.local_realm.json_post(url, data, debug_=debug_,
                                                suppress_related_commands_=suppress_related_commands)
 
-                if tos:
-                    self.local_realm.set_endp_tos(endp_a_name, tos)
-                    self.local_realm.set_endp_tos(endp_b_name, tos)
-
-                if pkts_to_send:
-                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
-                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
-
-                data = {
-                    "alias": cx_name,
-                    "test_mgr": "default_tm",
-                    "tx_endp": endp_a_name,
-                    "rx_endp": endp_b_name,
-                }
-                cx_post_data.append(data)
-                timer_post_data.append({
-                    "test_mgr": "default_tm",
-                    "cx_name": cx_name,
-                    "milliseconds": self.report_timer
-                })
-                if (int(ip_port_a) > 0) and (int(ip_port_increment_a) != 0):
-                    ip_port_a = int(ip_port_a) + int(ip_port_increment_a)
-                if (int(ip_port_b) > 0) and (int(ip_port_increment_b) != 0):
-                    ip_port_b = int(ip_port_b) + int(ip_port_increment_b)
+                    if (endp_type == "lf_udp") or (endp_type == "udp") or (endp_type == "lf_udp6") or (endp_type == "udp6"):
+                        data["name"] = endp_a_name
+                        data["flag"] = "UseAutoNAT"
+                        self.local_realm.json_post(url, data, debug_=debug_,
+                                                   suppress_related_commands_=suppress_related_commands)
+                        data["name"] = endp_b_name
+                        self.local_realm.json_post(url, data, debug_=debug_,
+                                                   suppress_related_commands_=suppress_related_commands)
+
+                    if tos:
+                        self.local_realm.set_endp_tos(endp_a_name, tos)
+                        self.local_realm.set_endp_tos(endp_b_name, tos)
+
+                    if pkts_to_send:
+                        self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
+                        self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
+
+                    data = {
+                        "alias": cx_name,
+                        "test_mgr": "default_tm",
+                        "tx_endp": endp_a_name,
+                        "rx_endp": endp_b_name,
+                    }
+                    cx_post_data.append(data)
+                    timer_post_data.append({
+                        "test_mgr": "default_tm",
+                        "cx_name": cx_name,
+                        "milliseconds": self.report_timer
+                    })
+                    if (int(ip_port_a) > 0) and (int(ip_port_increment_a) != 0):
+                        ip_port_a = int(ip_port_a) + int(ip_port_increment_a)
+                    if (int(ip_port_b) > 0) and (int(ip_port_increment_b) != 0):
+                        ip_port_b = int(ip_port_b) + int(ip_port_increment_b)
 
-        else:
-            logger.critical(
-                "side_a or side_b must be of type list but not both: side_a is type {side_a} side_b is type {side_b}".format(
-                    side_a=type(side_a), side_b=type(side_b)))
+            else:
+                logger.critical(
+                    "side_a or side_b must be of type list but not both: side_a is type {side_a} side_b is type {side_b}".format(
+                        side_a=type(side_a), side_b=type(side_b)))
 
-            raise ValueError(
-                "side_a or side_b must be of type list but not both: side_a is type %s side_b is type %s" % (
-                    type(side_a), type(side_b)))
+                raise ValueError(
+                    "side_a or side_b must be of type list but not both: side_a is type %s side_b is type %s" % (
+                        type(side_a), type(side_b)))
         if debug_:
             logger.debug("wait_until_endps_appear these_endp: {these_endp} debug_ {debug_}".format(
                 these_endp=these_endp, debug_=debug_))
@@ -991,17 +1039,18 @@ class L3CXProfile(LFCliBase):
             logger.error("L3CXProfile::create, Could not create/find endpoints")
             return False, False
 
-        for data in cx_post_data:
-            url = "/cli-json/add_cx"
-            self.local_realm.json_post(url,
-                                       data,
-                                       debug_=debug_,
-                                       suppress_related_commands_=suppress_related_commands)
-            self.local_realm.json_post("/cli-json/set_cx_report_timer",
-                                       {"test_mgr": "all", "cx_name": data["alias"], "milliseconds": 8000},
-                                       debug_=debug_,
-                                       suppress_related_commands_=suppress_related_commands)
-            time.sleep(0.01)
+        with self.local_realm.command_batch(debug_=debug_) as batch:
+            for data in cx_post_data:
+                batch.set_group(data["alias"])
+                url = "/cli-json/add_cx"
+                self.local_realm.json_post(url,
+                                           data,
+                                           debug_=debug_,
+                                           suppress_related_commands_=suppress_related_commands)
+                self.local_realm.json_post("/cli-json/set_cx_report_timer",
+                                           {"test_mgr": "all", "cx_name": data["alias"], "milliseconds": 8000},
+                                           debug_=debug_,
+                                           suppress_related_commands_=suppress_related_commands)
 
         rv = self.local_realm.wait_until_cxs_appear(these_cx, debug=debug_, timeout=timeout)
         if not rv:
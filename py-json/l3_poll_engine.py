@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# flake8: noqa
+"""
+L3PollEngine collects everything a layer-3 monitor loop needs for one polling interval
+in a single fetch: the endpoint table, the cross-connect states and the monitored
+ports, each projected to the columns the caller consumes. The requests of a fetch
+are issued concurrently, ports with one request per resource, so the cost of an
+interval is that of the slowest request instead of the sum of one request per port.
+
+Counter columns (rx bytes, rx pkts ll, ...) are remembered between fetches and turned
+into per-interval deltas and rates locally. Every fetch records its wall-clock cost so
+callers can tell how short a polling interval the system can sustain.
+
+    engine = L3PollEngine(lfcli=realm, port_list=["1.1.eth1", "1.1.sta0000"])
+    sample = engine.poll()
+    sample.port("1.1.sta0000")["bps rx"], sample.rate("VT-sta0000-A", "rx bytes")
+    engine.cost_summary()
+"""
+import sys
+import os
+import importlib
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+
+LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
+
+logger = logging.getLogger(__name__)
+
+
+def field_list(fields):
+    return ",".join(field.replace(' ', '+').replace('%', '%25') for field in fields)
+
+
+def counter_value(value):
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str) and value.isnumeric():
+        return int(value)
+    return None
+
+
+class PollSample:
+    """
+    Everything fetched for one polling interval.
+      endp_list:  /endp response as returned by the GUI, None if the request failed
+      cx_list:    /cx response, None if cross-connects were not requested or the request failed
+      ports:      'shelf.resource.name' -> port record, None for ports not found
+      port_json:  raw /port/all response when the engine polls all ports
+      deltas:     endpoint name -> {counter field: change since the previous sample}
+      elapsed_sec: seconds since the previous sample, None for the first one
+      collect_sec: wall-clock cost of the fetch
+    """
+    __slots__ = ("epoch", "endp_list", "cx_list", "ports", "port_json", "deltas",
+                 "elapsed_sec", "collect_sec", "requests", "failed")
+
+    def __init__(self):
+        self.epoch = time.time()
+        self.endp_list = None
+        self.cx_list = None
+        self.ports = {}
+        self.port_json = None
+        self.deltas = {}
+        self.elapsed_sec = None
+        self.collect_sec = 0.0
+        self.requests = 0
+        self.failed = 0
+
+    def endpoints(self):
+        """
+        :return: list of {endpoint name: record}, as the 'endpoint' element of /endp
+        """
+        if not self.endp_list:
+            return []
+        endpoint = self.endp_list.get("endpoint", [])
+        if isinstance(endpoint, dict):
+            return [{endpoint["name"]: endpoint}]
+        return endpoint
+
+    def port(self, port_eid=None):
+        """
+        :param port_eid: port EID like 1.1.sta0000
+        :return: port record, or None if the port was not found
+        """
+        eid = LFUtils.name_to_eid(port_eid)
+        return self.ports.get("%s.%s.%s" % (eid[0], eid[1], eid[2]))
+
+    def delta(self, endp_name=None, field=None):
+        return self.deltas.get(endp_name, {}).get(field)
+
+    def rate(self, endp_name=None, field="rx bytes"):
+        """
+        :return: change of a counter per second over the last interval, None before the second sample
+        """
+        delta = self.delta(endp_name, field)
+        if delta is None or not self.elapsed_sec:
+            return None
+        return delta / self.elapsed_sec
+
+    def total_rate(self, field="rx bytes"):
+        """
+        :return: sum of a counter's per-second change over all endpoints, None before the second sample
+        """
+        if not self.elapsed_sec:
+            return None
+        return sum(deltas.get(field, 0) for deltas in self.deltas.values()) / self.elapsed_sec
+
+
+class L3PollEngine:
+    Default_Endp_Fields = ("name", "eid", "delay", "jitter", "rx rate", "rx rate ll", "rx bytes",
+                           "rx drop %", "rx pkts ll", "run")
+    Default_Port_Fields = ("alias", "port", "bps rx", "bps tx", "rx-rate", "tx-rate", "signal",
+                           "ap", "mode", "mac", "channel")
+    Default_Cx_Fields = ("name", "state")
+    Default_Counter_Fields = ("rx bytes", "rx pkts ll")
+    Default_Max_Workers = 8
+    Default_History = 1024
+
+    def __init__(self,
+                 lfcli=None,
+                 port_list=(),
+                 all_ports=False,
+                 endp_fields=Default_Endp_Fields,
+                 optional_endp_fields=(),
+                 port_fields=Default_Port_Fields,
+                 cx_fields=Default_Cx_Fields,
+                 counter_fields=Default_Counter_Fields,
+                 fetch_cx=True,
+                 max_workers=Default_Max_Workers,
+                 history=Default_History,
+                 debug_=False):
+        """
+        :param lfcli: LFCliBase (or Realm) whose json_get() issues the requests
+        :param port_list: port EIDs to monitor, like 1.1.sta0000
+        :param all_ports: query /port/all once instead of the listed ports per resource
+        :param endp_fields: endpoint columns to request
+        :param optional_endp_fields: extra endpoint columns; dropped for good if the GUI rejects them
+        :param port_fields: port columns to request; alias is always added
+        :param cx_fields: cross-connect columns to request
+        :param counter_fields: endpoint columns turned into per-interval deltas
+        :param fetch_cx: also fetch cross-connect states
+        :param max_workers: concurrent requests per fetch
+        :param history: number of fetch costs kept for cost_summary()
+        :param debug_: passed to json_get
+        """
+        if lfcli is None:
+            raise ValueError("L3PollEngine needs lfcli")
+        self.lfcli = lfcli
+        self.all_ports = all_ports
+        self.endp_fields = list(endp_fields)
+        self.optional_endp_fields = [field for field in optional_endp_fields if field not in self.endp_fields]
+        self.cx_fields = list(cx_fields)
+        self.counter_fields = list(counter_fields)
+        self.fetch_cx = fetch_cx
+        self.max_workers = max(1, max_workers)
+        self.debug = debug_
+        self.port_list = list(port_list)
+        self.port_waiter = LFUtils.PortWaiter(base_url=lfcli.lfclient_url,
+                                              port_list=port_list,
+                                              fields=port_fields,
+                                              debug_=debug_)
+        self.counters = {}
+        self.last_poll = None
+        self.costs = deque(maxlen=history)
+        self.executor = None
+
+    def endp_uri(self):
+        return "/endp/all?fields=%s" % field_list(self.endp_fields + self.optional_endp_fields)
+
+    def cx_uri(self):
+        return "/cx/all?fields=%s" % field_list(self.cx_fields)
+
+    def queries(self):
+        """
+        :return: dict of query key -> uri for one fetch
+        """
+        queries = {"endp": self.endp_uri()}
+        if self.fetch_cx:
+            queries["cx"] = self.cx_uri()
+        if self.all_ports:
+            queries["port_all"] = "/port/all?fields=%s" % self.port_waiter.fields
+        else:
+            for (shelf, resource), uri in self.port_waiter.port_queries():
+                queries[("port", shelf, resource)] = uri
+        return queries
+
+    def _get(self, uri):
+        return self.lfcli.json_get(uri, debug_=self.debug)
+
+    def fetch(self, queries=None):
+        """
+        Issue the queries concurrently.
+        :return: dict of query key -> decoded response or None
+        """
+        if len(queries) == 1 or self.max_workers == 1:
+            return {key: self._get(uri) for key, uri in queries.items()}
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix="l3_poll")
+        futures = {key: self.executor.submit(self._get, uri) for key, uri in queries.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+    def poll(self):
+        """
+        Fetch one interval's endpoint, cross-connect and port data.
+        :return: PollSample
+        """
+        sample = PollSample()
+        started = time.monotonic()
+        queries = self.queries()
+        responses = self.fetch(queries)
+        sample.requests = len(queries)
+
+        if responses["endp"] is None and self.optional_endp_fields:
+            logger.info("L3PollEngine: GUI rejected endpoint fields %s, requesting without them"
+                        % ", ".join(self.optional_endp_fields))
+            self.optional_endp_fields = []
+            responses["endp"] = self._get(self.endp_uri())
+            sample.requests += 1
+        sample.endp_list = responses["endp"]
+        sample.cx_list = responses.get("cx")
+
+        index = dict.fromkeys(self.port_waiter.eids.keys())
+        if self.all_ports:
+            sample.port_json = responses["port_all"]
+            if sample.port_json is not None:
+                for eid, record in LFUtils.list_to_alias_map(sample.port_json, from_element="interfaces").items():
+                    index[eid] = record
+        else:
+            for key, json_response in responses.items():
+                if isinstance(key, tuple) and key[0] == "port":
+                    self.port_waiter.update_index(index, key[1], key[2], json_response, queries[key])
+        sample.ports = index
+        sample.failed = sum(1 for response in responses.values() if response is None)
+
+        self._update_counters(sample)
+        sample.collect_sec = time.monotonic() - started
+        self.costs.append(sample.collect_sec)
+        if self.last_poll is not None:
+            sample.elapsed_sec = started - self.last_poll
+        self.last_poll = started
+        if self.debug:
+            logger.debug("L3PollEngine: %d requests, %d failed, %.3fs"
+                         % (sample.requests, sample.failed, sample.collect_sec))
+        return sample
+
+    def _update_counters(self, sample):
+        for endpoint in sample.endpoints():
+            for name, record in endpoint.items():
+                deltas = {}
+                for field in self.counter_fields:
+                    value = counter_value(record.get(field))
+                    if value is None:
+                        continue
+                    previous = self.counters.get((name, field))
+                    self.counters[(name, field)] = value
+                    if previous is None:
+                        continue
+                    # counters go back to zero when an endpoint is cleared or restarted
+                    deltas[field] = value - previous if value >= previous else value
+                if deltas:
+                    sample.deltas[name] = deltas
+
+    def cost_summary(self):
+        """
+        :return: dict with the count, last, mean and max wall-clock seconds of recent fetches
+        """
+        if not self.costs:
+            return {"count": 0, "last": 0.0, "mean": 0.0, "max": 0.0}
+        return {"count": len(self.costs),
+                "last": self.costs[-1],
+                "mean": sum(self.costs) / len(self.costs),
+                "max": max(self.costs)}
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+# ~L3PollEngine
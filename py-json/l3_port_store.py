@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# flake8: noqa
+"""
+L3PortStore keeps the per-port rows a layer-3 monitor writes every interval in one
+append-only columnar file, with the port EID as a column, instead of one open csv
+file per port. Rows that share a 'Time epoch' form a row group; each group is
+encoded by a writer thread (one numpy array per column) and appended to the file,
+so the monitor loop only pays for appending to a list.
+
+Views are built when asked for: frame() reads the groups written since the last
+call and returns all ports, ordered like the legacy concatenation of the per-port
+files; port_frame() returns one port; export_port_csv() writes the legacy
+<prefix>-<eid>.csv files for tools that still want them.
+
+Text columns are parsed back the way pd.read_csv() parses a csv file: a column
+whose values all look like numbers becomes numeric, read_csv's default NA strings
+('', 'NA', 'N/A', 'nan', ...) become NaN. Parsed columns are kept, so frame() only
+parses the row groups written since its last call.
+
+    store = L3PortStore(path="test_l3-dl-ports.colstore", columns=headers)
+    store.add_port("1.1.sta0000")
+    store.append(row)                 # row[0] is the 'Time epoch'
+    df = store.frame()
+    store.export_port_csv(prefix="test_l3-dl-")
+
+File layout: an 8 byte magic, a 4 byte length and a json header with the column
+names, then for each row group an 8 byte length and an .npz payload with arrays
+c0..cN.
+"""
+import sys
+import atexit
+import io
+import json
+import logging
+import queue
+import struct
+import threading
+
+import numpy as np
+import pandas as pd
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LFCOLS1\n"
+
+# pd.read_csv() default na_values
+NA_VALUES = frozenset(["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+                       "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+                       "nan", "null"])
+
+
+def encode_column(values):
+    """
+    :return: int64 or float64 array when every value is a number, otherwise a str array; None becomes '' or NaN
+    """
+    numeric = True
+    integral = True
+    for value in values:
+        if value is None:
+            integral = False
+        elif isinstance(value, bool) or not isinstance(value, (int, float, np.integer, np.floating)):
+            numeric = False
+            break
+        elif not isinstance(value, (int, np.integer)):
+            integral = False
+    if numeric and integral:
+        return np.array(values, dtype=np.int64)
+    if numeric:
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return np.array(["" if value is None else str(value) for value in values], dtype=str)
+
+
+def parse_column(array, numeric=True):
+    """
+    :param numeric: False keeps the values as text, for a column already holding text
+    :return: Series typed like pd.read_csv() would type the same column of a csv file
+    """
+    if array.dtype.kind in "iuf":
+        return pd.Series(array)
+    series = pd.Series(array, dtype=object)
+    series = series.where(~series.isin(NA_VALUES), np.nan)
+    if numeric:
+        try:
+            return pd.to_numeric(series)
+        except (ValueError, TypeError):
+            pass
+    return series.infer_objects()
+
+
+def extend_column(parsed=None, arrays=(), start=0):
+    """
+    Parse the arrays from start on and append them to parsed, the column parsed from arrays[:start].
+    One text value makes the whole column text, as it would in a csv file.
+    :return: Series of the whole column
+    """
+    def as_text(group_arrays):
+        return np.concatenate([array.astype(str) for array in group_arrays])
+
+    new_arrays = arrays[start:]
+    if all(array.dtype.kind in "iuf" for array in new_arrays):
+        new = parse_column(np.concatenate(new_arrays))
+    else:
+        new = parse_column(as_text(new_arrays))
+    if parsed is None:
+        return new
+    parsed_numeric = pd.api.types.is_numeric_dtype(parsed)
+    new_numeric = pd.api.types.is_numeric_dtype(new)
+    if parsed_numeric and not new_numeric:
+        return parse_column(as_text(arrays))
+    if new_numeric and not parsed_numeric:
+        new = parse_column(as_text(new_arrays), numeric=False)
+    return pd.concat([parsed, new], ignore_index=True)
+
+
+class L3PortStore:
+    Default_Queue_Size = 64
+
+    def __init__(self,
+                 path=None,
+                 columns=None,
+                 port_column="Name",
+                 time_column="Time epoch",
+                 compress=False,
+                 debug_=False):
+        """
+        :param path: file to create, an existing file is replaced
+        :param columns: column names, rows are padded or cut to this length
+        :param port_column: column holding the port EID
+        :param time_column: column holding the interval's epoch; a new value starts a new row group
+        :param compress: zlib compress the row groups
+        :param debug_: log every row group written
+        """
+        if not path or not columns:
+            raise ValueError("L3PortStore needs path and columns")
+        self.path = path
+        self.columns = list(columns)
+        self.port_column = port_column
+        self.port_index = self.columns.index(port_column)
+        self.time_index = self.columns.index(time_column)
+        self.compress = compress
+        self.debug = debug_
+        self.ports = []
+        self.pending = []
+        self.pending_time = None
+        self.groups_written = 0
+        self.rows_written = 0
+        self.short_rows = 0
+        self.lock = threading.Lock()
+        self.error = None
+
+        header = json.dumps({"columns": self.columns}).encode("utf-8")
+        with open(self.path, "wb") as store_file:
+            store_file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self.read_offset = len(MAGIC) + 4 + len(header)
+        self.read_groups = 0
+        self.read_arrays = [[] for _ in self.columns]
+        self.parsed_columns = [None for _ in self.columns]
+        self.parsed_groups = 0
+        self.cached_frame = None
+
+        self.queue = queue.Queue(maxsize=self.Default_Queue_Size)
+        self.writer = threading.Thread(target=self._write_loop, name="l3_port_store", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def add_port(self, port_eid=None):
+        """
+        Remember a port, views list ports in the order they were added.
+        """
+        if port_eid not in self.ports:
+            self.ports.append(port_eid)
+
+    def append(self, row=None):
+        """
+        Add one port's row for an interval. Rows of a new 'Time epoch' close the previous row group.
+        """
+        if len(row) != len(self.columns):
+            if self.short_rows == 0:
+                logger.warning("L3PortStore: {path}: row of {count} values for {columns} columns".format(
+                    path=self.path, count=len(row), columns=len(self.columns)))
+            self.short_rows += 1
+            row = (list(row) + [None] * len(self.columns))[:len(self.columns)]
+        with self.lock:
+            if self.pending and row[self.time_index] != self.pending_time:
+                self._submit()
+            self.pending_time = row[self.time_index]
+            self.pending.append(row)
+
+    def _submit(self):
+        """ hand the pending rows to the writer thread; call with self.lock held """
+        if self.pending:
+            self.queue.put(self.pending)
+            self.pending = []
+            self.pending_time = None
+
+    def _write_loop(self):
+        while True:
+            rows = self.queue.get()
+            try:
+                if rows is None:
+                    return
+                arrays = {"c%d" % index: encode_column([row[index] for row in rows])
+                          for index in range(len(self.columns))}
+                payload = io.BytesIO()
+                if self.compress:
+                    np.savez_compressed(payload, **arrays)
+                else:
+                    np.savez(payload, **arrays)
+                data = payload.getvalue()
+                with open(self.path, "ab") as store_file:
+                    store_file.write(struct.pack("<Q", len(data)) + data)
+                self.groups_written += 1
+                self.rows_written += len(rows)
+                if self.debug:
+                    logger.debug("L3PortStore: {path}: group of {rows} rows, {size} bytes".format(
+                        path=self.path, rows=len(rows), size=len(data)))
+            except Exception as e:
+                self.error = e
+                logger.error("L3PortStore: {path}: {error}".format(path=self.path, error=e))
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """
+        Write the pending rows and wait until the writer thread has written everything.
+        """
+        with self.lock:
+            self._submit()
+        self.queue.join()
+
+    def close(self):
+        if self.writer.is_alive():
+            self.flush()
+            self.queue.put(None)
+            self.writer.join()
+
+    def _read_new_groups(self):
+        with open(self.path, "rb") as store_file:
+            store_file.seek(self.read_offset)
+            while True:
+                size_bytes = store_file.read(8)
+                if len(size_bytes) < 8:
+                    break
+                size = struct.unpack("<Q", size_bytes)[0]
+                data = store_file.read(size)
+                if len(data) < size:
+                    break
+                with np.load(io.BytesIO(data), allow_pickle=False) as group:
+                    for index in range(len(self.columns)):
+                        self.read_arrays[index].append(group["c%d" % index])
+                self.read_offset += 8 + size
+                self.read_groups += 1
+
+    def frame(self, ports=None):
+        """
+        All rows written so far, ordered by port then time like the legacy per-port files
+        concatenated one after the other; the index counts each port's rows from 0.
+        :param ports: port EIDs to include and their order, default every port added
+        :return: pandas DataFrame
+        """
+        self.flush()
+        if self.error is not None:
+            raise self.error
+        if self.cached_frame is None or self.read_groups != self.groups_written:
+            self._read_new_groups()
+            if self.parsed_groups != self.read_groups:
+                for index, arrays in enumerate(self.read_arrays):
+                    self.parsed_columns[index] = extend_column(self.parsed_columns[index], arrays, self.parsed_groups)
+                self.parsed_groups = self.read_groups
+            columns = {}
+            for name, parsed in zip(self.columns, self.parsed_columns):
+                columns[name] = pd.Series([], dtype=object) if parsed is None else parsed
+            self.cached_frame = pd.DataFrame(columns)
+        df = self.cached_frame
+        order = list(self.ports if ports is None else ports)
+        names = df[self.port_column].astype(str)
+        rank = {port: position for position, port in enumerate(order)}
+        keys = names.map(rank)
+        df = df[keys.notna()]
+        df = df.iloc[np.argsort(keys[keys.notna()].to_numpy(), kind="stable")]
+        df.index = df.groupby(self.port_column, sort=False).cumcount().to_numpy()
+        return df
+
+    def port_frame(self, port_eid=None):
+        """
+        :return: the rows of one port, like reading its legacy csv file
+        """
+        return self.frame(ports=[port_eid]).reset_index(drop=True)
+
+    def export_port_csv(self, prefix=None):
+        """
+        Write the legacy per-port files, <prefix><port eid>.csv.
+        :return: list of files written
+        """
+        df = self.frame()
+        files = []
+        for port_eid, port_df in df.groupby(self.port_column, sort=False):
+            file_name = "{prefix}{port}.csv".format(prefix=prefix, port=port_eid)
+            port_df.to_csv(file_name, index=False)
+            files.append(file_name)
+        return files
+# ~L3PortStore
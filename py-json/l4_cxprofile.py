@@ -182,45 +182,47 @@ class L4CXProfile(LFCliBase):
         if ports is None:
             ports = []
         cx_post_data = []
-        for port_name in ports:
-            logger.info("port_name: {} len: {} self.local_realm.name_to_eid(port_name): {}".format(port_name,
-                                                                                             len(self.local_realm.name_to_eid(
-                                                                                                 port_name)),
-                                                                                             self.local_realm.name_to_eid(
-                                                                                                 port_name)))
-            shelf = self.local_realm.name_to_eid(port_name)[0]
-            resource = self.local_realm.name_to_eid(port_name)[1]
-            name = self.local_realm.name_to_eid(port_name)[2]
-            endp_data = {
-                "alias": name + "_l4",
-                "shelf": shelf,
-                "resource": resource,
-                "port": name,
-                "type": "l4_generic",
-                "timeout": 10,
-                "url_rate": self.requests_per_ten,
-                "url": self.url,
-                "proxy_auth_type": 0x200
-            }
-            url = "cli-json/add_l4_endp"
-            self.local_realm.json_post(url, endp_data, debug_=debug_,
-                                       suppress_related_commands_=suppress_related_commands_)
-            time.sleep(sleep_time)
-
-            endp_data = {
-                "alias": "CX_" + name + "_l4",
-                "test_mgr": "default_tm",
-                "tx_endp": name + "_l4",
-                "rx_endp": "NA"
-            }
-            cx_post_data.append(endp_data)
-            self.created_cx[name + "_l4"] = "CX_" + name + "_l4"
-
-        for cx_data in cx_post_data:
-            url = "/cli-json/add_cx"
-            self.local_realm.json_post(url, cx_data, debug_=debug_,
-                                       suppress_related_commands_=suppress_related_commands_)
-            time.sleep(sleep_time)
+        with self.local_realm.command_batch(debug_=debug_):
+            for port_name in ports:
+                logger.info("port_name: {} len: {} self.local_realm.name_to_eid(port_name): {}".format(port_name,
+                                                                                                 len(self.local_realm.name_to_eid(
+                                                                                                     port_name)),
+                                                                                                 self.local_realm.name_to_eid(
+                                                                                                     port_name)))
+                shelf = self.local_realm.name_to_eid(port_name)[0]
+                resource = self.local_realm.name_to_eid(port_name)[1]
+                name = self.local_realm.name_to_eid(port_name)[2]
+                endp_data = {
+                    "alias": name + "_l4",
+                    "shelf": shelf,
+                    "resource": resource,
+                    "port": name,
+                    "type": "l4_generic",
+                    "timeout": 10,
+                    "url_rate": self.requests_per_ten,
+                    "url": self.url,
+                    "proxy_auth_type": 0x200
+                }
+                url = "cli-json/add_l4_endp"
+                self.local_realm.json_post(url, endp_data, debug_=debug_,
+                                           suppress_related_commands_=suppress_related_commands_)
+
+                endp_data = {
+                    "alias": "CX_" + name + "_l4",
+                    "test_mgr": "default_tm",
+                    "tx_endp": name + "_l4",
+                    "rx_endp": "NA"
+                }
+                cx_post_data.append(endp_data)
+                self.created_cx[name + "_l4"] = "CX_" + name + "_l4"
+        # give the GUI a moment to register the endpoints before the connections reference them
+        time.sleep(sleep_time)
+
+        with self.local_realm.command_batch(debug_=debug_):
+            for cx_data in cx_post_data:
+                url = "/cli-json/add_cx"
+                self.local_realm.json_post(url, cx_data, debug_=debug_,
+                                           suppress_related_commands_=suppress_related_commands_)
 
         # TODO:  Verify they were created here, or at least add a method to verify they were
         # created and add that to create_l4.py
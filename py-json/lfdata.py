@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 # flake8: noqa
+import csv
 import datetime
 import logging
 
@@ -95,3 +96,79 @@ class LFDataCollection:
             for name in header_row_[3:-3]:
                 temp_list.append(merge[name])
             return temp_list
+
+
+class MonitorSampler:
+    """
+    Accumulates monitor samples column by column and appends every tick to a CSV file
+    as it is taken, so neither memory churn nor file writing grows with the number of
+    ticks already collected. Column storage is preallocated and doubled when full.
+
+        sampler = MonitorSampler(csv_file="/tmp/l3.csv")
+        sampler.set_columns(["Timestamp", "l3-name", "l3-rx bytes"])
+        sampler.append_rows([["10/01/2022 01:02:03", "cx0-A", 1200]])
+        df = sampler.to_dataframe()
+    """
+    Default_Capacity = 1024
+
+    def __init__(self, csv_file=None, capacity=Default_Capacity):
+        self.csv_file = csv_file
+        self.capacity = max(1, capacity)
+        self.columns = None
+        self.column_data = None
+        self.row_count = 0
+        self.file_handle = None
+        self.writer = None
+
+    def set_columns(self, columns=None):
+        """
+        Fix the column order and write the CSV header. Can only be called once.
+        """
+        if self.columns is not None:
+            raise ValueError("MonitorSampler columns already set")
+        self.columns = list(columns)
+        self.column_data = [[None] * self.capacity for _ in self.columns]
+        if self.csv_file:
+            self.file_handle = open(self.csv_file, 'w', newline='')
+            self.writer = csv.writer(self.file_handle)
+            self.writer.writerow(self.columns)
+            self.file_handle.flush()
+
+    def _grow(self, needed_rows):
+        while self.capacity < needed_rows:
+            for column in self.column_data:
+                column.extend([None] * self.capacity)
+            self.capacity *= 2
+
+    def append_rows(self, rows=()):
+        """
+        :param rows: list of rows, each a list of values in column order
+        """
+        if self.columns is None:
+            raise ValueError("MonitorSampler.set_columns must be called before append_rows")
+        if not rows:
+            return
+        self._grow(self.row_count + len(rows))
+        for row in rows:
+            for column, value in zip(self.column_data, row):
+                column[self.row_count] = value
+            self.row_count += 1
+        if self.writer is not None:
+            self.writer.writerows(rows)
+            self.file_handle.flush()
+
+    def column(self, name=None):
+        return self.column_data[self.columns.index(name)][:self.row_count]
+
+    def to_dataframe(self):
+        import pandas as pd
+        if self.columns is None:
+            return pd.DataFrame()
+        return pd.DataFrame({name: data[:self.row_count] for name, data in zip(self.columns, self.column_data)},
+                            columns=self.columns)
+
+    def close(self):
+        if self.file_handle is not None:
+            self.file_handle.close()
+            self.file_handle = None
+            self.writer = None
@@ -8,6 +8,10 @@ import importlib
 from time import sleep
 import sys
 import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pprint import pformat
 import logging
 import traceback
@@ -717,3 +721,278 @@ class ProbePort(LFCliBase):
         else:
             self.rx_mbit_calc = self.rx_data_rate_gi_long_Mbps
             self.rx_gi = T_gi_long
+
+
+# ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+# ProbeManager: many probes at once, parsed once, shared by everyone in the same tick
+# ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+
+PROBE_CRE = {
+    "signal": re.compile(r'^[ \t]*([^:\n]*signal[^:\n]*):[ \t]*(.*?)[ \t]*(?:dBm)?[ \t]*$', re.M),
+    "bitrate": re.compile(r'^[ \t]*(tx|rx) bitrate:[ \t]*(.*?)[ \t]*$', re.M),
+    "mbit": re.compile(r'^([\d.]+)'),
+    "mhz": re.compile(r'(\d+)\s*MHz'),
+    "mcs": re.compile(r'MCS[ \t]+(\d+)'),
+    "nss": re.compile(r'NSS[ \t]+(\d+)'),
+}
+
+# MCS index -> (coding rate R, coded bits per subcarrier N_bpscs); HT repeats the
+# first eight entries for every spatial stream.  10 and 11 are HE 1024-QAM.
+MCS_CODING = {
+    0: (1 / 2, 1),
+    1: (1 / 2, 2),
+    2: (3 / 4, 2),
+    3: (1 / 2, 4),
+    4: (3 / 4, 4),
+    5: (2 / 3, 6),
+    6: (3 / 4, 6),
+    7: (5 / 6, 6),
+    8: (3 / 4, 8),
+    9: (5 / 6, 8),
+    10: (3 / 4, 10),
+    11: (5 / 6, 10),
+}
+# channel width in MHz -> number of data subcarriers N_sd
+DATA_SUBCARRIERS = {20: 52, 40: 108, 80: 234, 160: 468}
+T_DFT = 3.2 * 10 ** -6
+T_GI_SHORT = .4 * 10 ** -6
+T_GI_LONG = .8 * 10 ** -6
+
+
+def calculated_data_rate(mode="HT", mhz=20, mcs=0, nss=1, mbit=0.0):
+    """
+    Same calculation as ProbePort.calculated_data_rate_{tx,rx}_{HT,VHT,HE}.
+    :return: (mhz, short GI Mbps, long GI Mbps, Mbps closest to the reported rate, GI of that rate)
+    """
+    mhz = int(mhz)
+    if mhz not in DATA_SUBCARRIERS:
+        logger.info("For HT if cannot be read bw is assumed to be 20")
+        mhz = 20
+    n_sd = DATA_SUBCARRIERS[mhz]
+    if mode == "HT":
+        mcs = mcs % 8
+    r, n_bpscs = MCS_CODING.get(mcs, (0, 0))
+    gi_short_mbps = ((n_sd * n_bpscs * r * float(nss)) / (T_DFT + T_GI_SHORT)) / 1000000
+    gi_long_mbps = ((n_sd * n_bpscs * r * float(nss)) / (T_DFT + T_GI_LONG)) / 1000000
+    if abs(mbit - gi_short_mbps) <= abs(mbit - gi_long_mbps):
+        return mhz, gi_short_mbps, gi_long_mbps, gi_short_mbps, T_GI_SHORT
+    return mhz, gi_short_mbps, gi_long_mbps, gi_long_mbps, T_GI_LONG
+
+
+class ProbeResult:
+    """
+    Parsed probe of one port. Attribute and getter names match ProbePort so a result
+    can be used wherever a refreshed ProbePort was.
+    """
+    __slots__ = ("eid_str", "timestamp", "signals",
+                 "tx_bitrate", "tx_mcs", "tx_nss", "tx_mbit", "tx_mhz", "tx_gi", "tx_mbit_calc",
+                 "tx_data_rate_gi_short_Mbps", "tx_data_rate_gi_long_Mbps",
+                 "rx_bitrate", "rx_mcs", "rx_nss", "rx_mbit", "rx_mhz", "rx_gi", "rx_mbit_calc",
+                 "rx_data_rate_gi_short_Mbps", "rx_data_rate_gi_long_Mbps")
+
+    def __init__(self, eid_str=None, timestamp=None):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.eid_str = eid_str
+        self.timestamp = timestamp
+        self.signals = {}
+
+    @classmethod
+    def parse(cls, eid_str=None, text="", timestamp=None):
+        result = cls(eid_str=eid_str, timestamp=timestamp)
+        for match in PROBE_CRE["signal"].finditer(text):
+            result.signals[match.group(1).strip()] = match.group(2).replace('\t', '').strip()
+        for match in PROBE_CRE["bitrate"].finditer(text):
+            result._parse_bitrate(match.group(1), match.group(2))
+        return result
+
+    def _parse_bitrate(self, direction="tx", bitrate=""):
+        setattr(self, direction + "_bitrate", bitrate)
+        match = PROBE_CRE["mhz"].search(bitrate)
+        mhz = int(match.group(1)) if match else 20
+        setattr(self, direction + "_mhz", mhz)
+        match = PROBE_CRE["mcs"].search(bitrate)
+        if match is None:
+            # legacy rate such as 6.0 MBit/s
+            return
+        mcs = int(match.group(1))
+        match = PROBE_CRE["nss"].search(bitrate)
+        if match is not None:
+            nss = int(match.group(1))
+        else:
+            # nss is not present need to derive from MCS for HT
+            nss = (mcs // 8) + 1
+        match = PROBE_CRE["mbit"].search(bitrate)
+        mbit = float(match.group(1)) if match else 0.0
+        if 'HE' in bitrate:
+            mode = "HE"
+        elif 'VHT' in bitrate:
+            mode = "VHT"
+        else:
+            mode = "HT"
+        mhz, gi_short, gi_long, mbit_calc, gi = calculated_data_rate(mode=mode, mhz=mhz, mcs=mcs, nss=nss, mbit=mbit)
+        setattr(self, direction + "_mcs", mcs)
+        setattr(self, direction + "_nss", nss)
+        setattr(self, direction + "_mbit", mbit)
+        setattr(self, direction + "_mhz", mhz)
+        setattr(self, direction + "_data_rate_gi_short_Mbps", gi_short)
+        setattr(self, direction + "_data_rate_gi_long_Mbps", gi_long)
+        setattr(self, direction + "_mbit_calc", mbit_calc)
+        setattr(self, direction + "_gi", gi)
+
+    def getSignalAvgCombined(self):
+        return self.signals['signal avg'].split(' ')[0]
+
+    def getSignalAvgPerChain(self):
+        return ' '.join(self.signals['signal avg'].split(' ')[1:])
+
+    def getSignalCombined(self):
+        return self.signals['signal'].split(' ')[0]
+
+    def getSignalPerChain(self):
+        return ' '.join(self.signals['signal'].split(' ')[1:])
+
+    def getBeaconSignalAvg(self):
+        return ' '.join(self.signals['beacon signal avg']).replace(' ', '')
+
+    def __repr__(self):
+        return "ProbeResult(%s tx=%s rx=%s)" % (self.eid_str, self.tx_bitrate, self.rx_bitrate)
+
+
+class ProbeManager(LFCliBase):
+    """
+    Probes many ports concurrently. Each probe is POSTed and then its results are
+    polled every poll_interval_sec until they arrive, instead of sleeping a fixed
+    time. The GUI keeps answering with the previous probe's results until the new
+    ones are in, so results only count once they differ from the text read before
+    the POST, or once min_wait_sec, the old fixed sleep, has passed. Parsed results
+    are cached for ttl_sec, and requests for a port that is already being probed
+    wait for that probe, so every consumer in one monitor tick shares a single
+    probe per port.
+
+        manager = ProbeManager.get_shared(lfhost="localhost", lfport=8080)
+        results = manager.probe_many(["1.1.sta0000", "1.1.sta0001"])
+    """
+    Default_Max_Workers = 16
+    Default_TTL_Sec = 1.0
+    Default_Poll_Interval_Sec = 0.05
+    Default_Min_Wait_Sec = 0.2
+    Default_Probe_Timeout_Sec = 3.0
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self,
+                 lfhost=None,
+                 lfport='8080',
+                 max_workers=Default_Max_Workers,
+                 ttl_sec=Default_TTL_Sec,
+                 poll_interval_sec=Default_Poll_Interval_Sec,
+                 min_wait_sec=Default_Min_Wait_Sec,
+                 probe_timeout_sec=Default_Probe_Timeout_Sec,
+                 debug=False):
+        super().__init__(_lfjson_host=lfhost,
+                         _lfjson_port=lfport,
+                         _debug=debug)
+        self.max_workers = max(1, max_workers)
+        self.ttl_sec = ttl_sec
+        self.poll_interval_sec = poll_interval_sec
+        self.min_wait_sec = min_wait_sec
+        self.probe_timeout_sec = probe_timeout_sec
+        self.lock = threading.Lock()
+        self.cache = {}         # eid -> ProbeResult
+        self.in_flight = {}     # eid -> Future
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="probe")
+
+    @classmethod
+    def get_shared(cls, lfhost=None, lfport='8080', debug=False):
+        """
+        :return: the process-wide ProbeManager for this GUI
+        """
+        key = (lfhost, str(lfport))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(lfhost=lfhost, lfport=lfport, debug=debug)
+            return cls._shared[key]
+
+    @staticmethod
+    def probe_path(eid_str=None):
+        hunks = eid_str.split(".")
+        return "/probe/1/%s/%s" % (hunks[-2], hunks[-1])
+
+    @staticmethod
+    def probe_text(response=None, eid_str=None):
+        """
+        :return: the 'probe results' text of a probe response, or None
+        """
+        try:
+            return response['probe-results'][0][eid_str]['probe results']
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def _fetch(self, eid_str=None):
+        probepath = self.probe_path(eid_str)
+        previous_text = self.probe_text(self.json_get(probepath), eid_str)
+        self.json_post(probepath, {})
+        started = time.monotonic()
+        deadline = started + self.probe_timeout_sec
+        while True:
+            sleep(self.poll_interval_sec)
+            response = self.json_get(probepath)
+            if self.debug:
+                logger.debug("probepath (eid): {probepath}".format(probepath=probepath))
+                logger.debug(pformat("Probe response: {response}".format(response=response)))
+            text = self.probe_text(response, eid_str)
+            fresh = (text != previous_text) or (time.monotonic() - started >= self.min_wait_sec)
+            if text and ('bitrate' in text) and fresh:
+                return ProbeResult.parse(eid_str=eid_str, text=text, timestamp=time.monotonic())
+            if time.monotonic() >= deadline:
+                logger.warning("Probe of %s did not complete within %s seconds" % (eid_str, self.probe_timeout_sec))
+                return None
+
+    def _probe(self, eid_str=None):
+        try:
+            result = self._fetch(eid_str)
+        except Exception as x:
+            logger.warning("Probe of %s failed" % eid_str)
+            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+            result = None
+        with self.lock:
+            if result is not None:
+                self.cache[eid_str] = result
+            self.in_flight.pop(eid_str, None)
+        return result
+
+    def probe_async(self, eid_str=None):
+        """
+        :return: Future resolving to a ProbeResult, or to None if the probe failed
+        """
+        with self.lock:
+            cached = self.cache.get(eid_str)
+            if (cached is not None) and (time.monotonic() - cached.timestamp) < self.ttl_sec:
+                future = Future()
+                future.set_result(cached)
+                return future
+            future = self.in_flight.get(eid_str)
+            if future is None:
+                future = self.executor.submit(self._probe, eid_str)
+                self.in_flight[eid_str] = future
+            return future
+
+    def probe(self, eid_str=None):
+        return self.probe_async(eid_str).result()
+
+    def probe_many(self, eid_list=()):
+        """
+        :return: dict of eid -> ProbeResult, or None for ports that could not be probed
+        """
+        futures = [(eid_str, self.probe_async(eid_str)) for eid_str in eid_list]
+        return {eid_str: future.result() for eid_str, future in futures}
+
+    def clear_cache(self):
+        with self.lock:
+            self.cache.clear()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+# ~ProbeManager
@@ -65,6 +65,8 @@ lfdata = importlib.import_module("py-json.lfdata")
 LFDataCollection = lfdata.LFDataCollection
 vr_profile2 = importlib.import_module("py-json.vr_profile2")
 VRProfile = vr_profile2.VRProfile
+ws_event_bus = importlib.import_module("py-json.ws_event_bus")
+LFEventBus = ws_event_bus.LFEventBus
 
 
 def wpa_ent_list():
@@ -117,6 +119,8 @@ class Realm(LFCliBase):
         #     logger.debug("Realm _proxy_str: %s" % _proxy_str)
         #     logger.debug(pformat(_proxy_str))
         self.check_connect()
+        # see start_event_bus()
+        self.event_bus = None
         self.chan_to_freq = {}
         self.freq_to_chan = {}
         chan = 1
@@ -339,14 +343,71 @@ class Realm(LFCliBase):
         self.freq_to_chan[7095] = 419
         self.freq_to_chan[7115] = 423
 
+    def start_event_bus(self, ws_port=LFEventBus.Default_WS_Port, record_file=None):
+        """
+        Listen to the GUI websocket so wait_until_ports_appear, wait_for_ip and
+        wait_until_cxs_appear wake on events instead of polling. They fall back to
+        bulk HTTP polling whenever the websocket is not connected.
+        :param ws_port: GUI websocket port
+        :param record_file: optional file to record websocket messages into
+        :return: the LFEventBus
+        """
+        if self.event_bus is None:
+            self.event_bus = LFEventBus(lfclient_host=self.lfclient_host,
+                                        ws_port=ws_port,
+                                        record_file=record_file,
+                                        debug_=self.debug)
+        return self.event_bus.start()
+
+    def stop_event_bus(self):
+        if self.event_bus is not None:
+            self.event_bus.stop()
+            self.event_bus = None
+
+    def wait_for_ports(self, waiter=None, predicate=None, timeout_sec=360, on_pending=None):
+        """
+        Wait on an LFUtils.PortWaiter, through the event bus if one is running.
+        :return: (True if predicate held for every port, list of pending port EIDs, dict of port records)
+        """
+        if self.event_bus is None:
+            success = waiter.wait_for(predicate, timeout_sec=timeout_sec, on_pending=on_pending)
+            return success, waiter.pending, waiter.index
+
+        def refresh():
+            self.event_bus.update_ports(waiter.poll())
+
+        def pending_ports(pending, elapsed):
+            waiter.pending = pending
+            on_pending(waiter, pending, elapsed)
+
+        success = self.event_bus.wait_for(kind="port",
+                                          keys=list(waiter.eids.keys()),
+                                          predicate=predicate,
+                                          refresh=refresh,
+                                          timeout_sec=timeout_sec,
+                                          on_pending=pending_ports if on_pending is not None else None)
+        index = self.event_bus.get_items("port", waiter.eids.keys())
+        pending = [key for key, record in index.items() if not predicate(record)]
+        return success, pending, index
+
     def wait_until_ports_appear(self, sta_list=None, debug_=False, timeout=360):
         if (sta_list is None) or (len(sta_list) < 1):
             logger.info("realm.wait_until_ports_appear: no stations provided")
             return
-        LFUtils.wait_until_ports_appear(base_url=self.lfclient_url,
-                                        port_list=sta_list,
-                                        debug=debug_,
-                                        timeout=timeout)
+        if self.event_bus is None:
+            return LFUtils.wait_until_ports_appear(base_url=self.lfclient_url,
+                                                   port_list=sta_list,
+                                                   debug=debug_,
+                                                   timeout=timeout)
+        waiter = LFUtils.PortWaiter(base_url=self.lfclient_url,
+                                    port_list=sta_list,
+                                    fields=("alias", "phantom"),
+                                    proxies_=self.proxy,
+                                    debug_=debug_)
+        success, pending, index = self.wait_for_ports(waiter, LFUtils.port_is_present, timeout_sec=timeout)
+        if not success:
+            logger.info("realm.wait_until_ports_appear: these ports did not appear: %s" % ", ".join(pending))
+        return success
 
     def wait_until_ports_disappear(self, sta_list=None, debug_=False):
         if (sta_list is None) or (len(sta_list) < 1):
@@ -623,6 +684,8 @@ class Realm(LFCliBase):
         return self.wait_until_cxs_appear(these_cx, debug=debug, timeout=timeout)
 
     def wait_until_cxs_appear(self, these_cx, debug=False, timeout=100):
+        if self.event_bus is not None:
+            return self.wait_until_cxs_appear_events(these_cx, debug=debug, timeout=timeout)
         wait_more = True
         count = 0
         while wait_more:
@@ -651,6 +714,25 @@ class Realm(LFCliBase):
 
         return True
 
+    def wait_until_cxs_appear_events(self, these_cx, debug=False, timeout=100):
+        not_cx = ['warnings', 'errors', 'handler', 'uri', 'items']
+
+        def refresh():
+            cx_list = self.cx_list()
+            found_cxs = {}
+            if cx_list:
+                found_cxs = {cx_name: cx_list[cx_name] for cx_name in cx_list if cx_name not in not_cx}
+            self.event_bus.update_items("cx", {cx_name: found_cxs.get(cx_name) for cx_name in these_cx})
+
+        success = self.event_bus.wait_for(kind="cx",
+                                          keys=these_cx,
+                                          predicate=ws_event_bus.item_exists,
+                                          refresh=refresh,
+                                          timeout_sec=timeout)
+        if not success and debug:
+            logger.error("ERROR:  Failed to find all cxs: %s" % these_cx)
+        return success
+
     # def wait_until_database_loaded(self):
 
     # Returns map of all stations with port+type == WIFI-STATION
@@ -842,66 +924,40 @@ class Realm(LFCliBase):
             if debug:
                 logger.debug("Auto-Timeout requested, using: %s" % timeout_sec)
 
-        stas_without_ip4s = {}
-        stas_without_ip6s = {}
-
-        sec_elapsed = 0
-        start_time = int(time.time())
-        # logger.info(station_list)
-        waiting_states = ["0.0.0.0", "NA", "", 'DELETED', 'AUTO']
         if (station_list is None) or (len(station_list) < 1):
             logger.critical("wait_for_ip: expects non-empty list of ports")
             raise ValueError("wait_for_ip: expects non-empty list of ports")
 
-        wait_more = True
-        while wait_more:
-            wait_more = False
-            stas_without_ip4s = {}
-            stas_without_ip6s = {}
+        def has_ips(record):
+            if ipv4 and not LFUtils.port_has_ipv4(record):
+                return False
+            if ipv6 and not LFUtils.port_has_ipv6(record):
+                return False
+            return True
 
-            for sta_eid in station_list:
-                eid = self.name_to_eid(sta_eid)
+        def log_waiting(waiter, pending, elapsed):
+            if debug:
+                logger.debug("Waiting for ports %s to get IP addresses try %i / %s" % (pending, elapsed, timeout_sec))
 
-                response = super().json_get("/port/%s/%s/%s?fields=alias,ip,port+type,ipv6+address" %
-                                            (eid[0], eid[1], eid[2]))
-                # logger.info(pformat(response))
+        # one port query per resource per poll instead of one per station
+        waiter = LFUtils.PortWaiter(base_url=self.lfclient_url,
+                                    port_list=[LFUtils.eid_to_str(self.name_to_eid(sta_eid)[0:3], shrink_zeros=False)
+                                               for sta_eid in station_list],
+                                    fields=("alias", "ip", "port type", "ipv6 address"),
+                                    proxies_=self.proxy,
+                                    debug_=debug)
+        success, pending, index = self.wait_for_ports(waiter, has_ips, timeout_sec=timeout_sec, on_pending=log_waiting)
 
-                if (response is None) or ("interface" not in response):
-                    logger.info("station_list: incomplete response for eid: %s:  wait longer" % sta_eid)
-                    logger.info(pformat(response))
-                    wait_more = True
-                    break
-
-                if ipv4:
-                    v = response['interface']
-                    if v['ip'] in waiting_states:
-                        wait_more = True
-                        stas_without_ip4s[sta_eid] = True
-                        if debug:
-                            logger.debug("Waiting for port %s to get IPv4 Address try %s / %s" % (sta_eid, sec_elapsed, timeout_sec))
-                    else:
-                        if debug:
-                            logger.debug("Found IP: %s on port: %s" % (v['ip'], sta_eid))
-
-                if ipv6:
-                    v = response['interface']
-                    # logger.info(v)
-                    ip6a = v['ipv6_address']
-                    if ip6a != 'DELETED' and not ip6a.startswith('fe80') and ip6a != 'AUTO':
-                        if debug:
-                            logger.debug("Found IPv6: %s on port: %s" % (ip6a, sta_eid))
-                    else:
-                        stas_without_ip6s[sta_eid] = True
-                        wait_more = True
-                        if debug:
-                            logger.debug("Waiting for port %s to get IPv6 Address try %s / %s, reported: %s." % (sta_eid, sec_elapsed, timeout_sec, ip6a))
-
-            # Check if we need to wait more but timed out. Otherwise, continue polling
-            cur_time = int(time.time())
-            if wait_more and (cur_time - start_time) > timeout_sec:
-                break  # Timed out. Exit while loop
-            else:
-                sec_elapsed += 1
+        stas_without_ip4s = {}
+        stas_without_ip6s = {}
+        for sta_eid in pending:
+            record = index.get(sta_eid)
+            if record is None:
+                logger.info("station_list: incomplete response for eid: %s" % sta_eid)
+            if ipv4 and not LFUtils.port_has_ipv4(record):
+                stas_without_ip4s[sta_eid] = True
+            if ipv6 and not LFUtils.port_has_ipv6(record):
+                stas_without_ip6s[sta_eid] = True
 
         # If not all ports got IP addresses before timeout, and debugging is enabled, then
         # add logging.
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# flake8: noqa
+"""
+SSHSessionPool keeps one authenticated paramiko transport per (host, port, user) and
+runs every command on its own channel of that transport, so a script that asks a
+LANforge system a dozen questions pays for one SSH handshake instead of a dozen.
+Channels are multiplexed, several threads may run commands on the same host at once.
+A transport that has dropped is reconnected and the command retried once.
+
+Command output can be cached: lf_check asks for the kernel, server and GUI versions
+of the same system at every suite iteration, and those do not change while a suite
+runs. Only commands that exit with status 0 and print something are cached.
+
+    pool = SSHSessionPool.get_shared()
+    lines = pool.exec_command(hostname="192.168.100.116", command="uname -n", use_cache=True)
+    pool.scp_get(hostname="192.168.100.116", remote_path="/home/lanforge/html-reports/", local_path="reports/")
+"""
+import sys
+import atexit
+import logging
+import socket
+import threading
+
+import paramiko
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+logger = logging.getLogger(__name__)
+
+
+class SSHSessionPool:
+    Default_Banner_Timeout = 600
+    Default_Keepalive_Sec = 30
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def get_shared(cls):
+        """
+        :return: the process-wide pool, closed at exit
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                atexit.register(cls._shared.close)
+            return cls._shared
+
+    def __init__(self,
+                 banner_timeout=Default_Banner_Timeout,
+                 keepalive_sec=Default_Keepalive_Sec,
+                 debug_=False):
+        """
+        :param banner_timeout: seconds to wait for the SSH banner, LANforge systems under load can be slow
+        :param keepalive_sec: transport keepalive interval, 0 to disable
+        :param debug_: log every command
+        """
+        self.banner_timeout = banner_timeout
+        self.keepalive_sec = keepalive_sec
+        self.debug = debug_
+        self.lock = threading.Lock()
+        self.clients = {}           # (hostname, port, username) -> paramiko.SSHClient
+        self.host_locks = {}        # (hostname, port, username) -> Lock held while connecting
+        self.cache = {}             # (hostname, port, username, command) -> list of lines
+        self.connects = 0
+
+    def _host_lock(self, key):
+        with self.lock:
+            if key not in self.host_locks:
+                self.host_locks[key] = threading.Lock()
+            return self.host_locks[key]
+
+    def get_client(self,
+                   hostname="localhost",
+                   port=22,
+                   username="lanforge",
+                   password="lanforge",
+                   system_host_keys=False,
+                   reconnect=False):
+        """
+        Return the connected client for a host, connecting if there is none or its transport died.
+        :param system_host_keys: check the host key against ~/.ssh/known_hosts when connecting
+        :param reconnect: drop the current connection and open a new one
+        """
+        key = (hostname, int(port), username)
+        with self._host_lock(key):
+            client = self.clients.get(key)
+            if client is not None and not reconnect:
+                transport = client.get_transport()
+                if transport is not None and transport.is_active():
+                    return client
+            if client is not None:
+                client.close()
+                self.clients.pop(key, None)
+            client = paramiko.SSHClient()
+            if system_host_keys:
+                client.load_system_host_keys()
+            # automatically adds the missing host key
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(hostname=hostname, port=int(port), username=username, password=password,
+                           allow_agent=False, look_for_keys=False, banner_timeout=self.banner_timeout)
+            if self.keepalive_sec:
+                client.get_transport().set_keepalive(self.keepalive_sec)
+            self.connects += 1
+            if self.debug:
+                logger.debug("SSHSessionPool: connected to {user}@{host}:{port}".format(
+                    user=username, host=hostname, port=port))
+            self.clients[key] = client
+            return client
+
+    def exec_command(self,
+                     hostname="localhost",
+                     port=22,
+                     username="lanforge",
+                     password="lanforge",
+                     command=None,
+                     timeout=None,
+                     use_cache=False):
+        """
+        Run a command on its own channel of the host's shared transport.
+        :param timeout: seconds to wait for output, None waits forever
+        :param use_cache: return the saved output of an earlier successful run of the same command
+        :return: stdout as a list of lines without line endings
+        """
+        if not command:
+            raise ValueError("SSHSessionPool.exec_command needs command")
+        cache_key = (hostname, int(port), username, command)
+        if use_cache:
+            with self.lock:
+                if cache_key in self.cache:
+                    return list(self.cache[cache_key])
+
+        for attempt in (1, 2):
+            client = self.get_client(hostname=hostname, port=port, username=username, password=password,
+                                     reconnect=(attempt > 1))
+            try:
+                stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
+                lines = [line.replace('\n', '') for line in stdout.readlines()]
+                exit_status = stdout.channel.recv_exit_status()
+                break
+            except (paramiko.SSHException, EOFError, socket.error) as e:
+                if attempt > 1:
+                    raise
+                logger.info("SSHSessionPool: {host}: {error}, reconnecting".format(host=hostname, error=e))
+
+        if self.debug:
+            logger.debug("SSHSessionPool: {host}: {command} exit {status}".format(
+                host=hostname, command=command, status=exit_status))
+        if use_cache and exit_status == 0 and lines:
+            with self.lock:
+                self.cache[cache_key] = list(lines)
+        return lines
+
+    def scp_get(self,
+                hostname="localhost",
+                port=22,
+                username="lanforge",
+                password="lanforge",
+                remote_path=None,
+                local_path=None,
+                recursive=True,
+                system_host_keys=True):
+        """
+        Copy files from the host over the shared transport. Needs the scp module.
+        """
+        from scp import SCPClient
+
+        client = self.get_client(hostname=hostname, port=port, username=username, password=password,
+                                 system_host_keys=system_host_keys)
+        with SCPClient(client.get_transport()) as scp:
+            scp.get(remote_path=remote_path, local_path=local_path, recursive=recursive)
+
+    def clear_cache(self, hostname=None):
+        """
+        Forget cached command output, for one host or all of them, e.g. after a LANforge upgrade.
+        """
+        with self.lock:
+            if hostname is None:
+                self.cache.clear()
+            else:
+                for key in [key for key in self.cache if key[0] == hostname]:
+                    del self.cache[key]
+
+    def close(self):
+        with self.lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug("SSHSessionPool: close: {error}".format(error=e))
+# ~SSHSessionPool
@@ -566,13 +566,6 @@ class StationProfile:
         self.reset_port_extra_data["resource"] = radio_resource
         self.reset_port_extra_data["shelf"] = radio_shelf
 
-        # these are unactivated LFRequest objects that we can modify and
-        # re-use inside a loop, reducing the number of object creations
-        add_sta_r = LFRequest.LFRequest(self.lfclient_url + "/cli-json/add_sta", debug_=debug)
-        set_port_r = LFRequest.LFRequest(self.lfclient_url + "/cli-json/set_port", debug_=debug)
-        wifi_extra_r = LFRequest.LFRequest(self.lfclient_url + "/cli-json/set_wifi_extra", debug_=debug)
-        wifi_extra2_r = LFRequest.LFRequest(self.lfclient_url + "/cli-json/set_wifi_extra2", debug_=debug)
-        wifi_txo_r = LFRequest.LFRequest(self.lfclient_url + "/cli-json/set_wifi_txo", debug_=debug)
         # add radio here
         if num_stations and not sta_names_:
             if debug:
@@ -607,77 +600,70 @@ class StationProfile:
         # track the names of stations in case we have stations added multiple times
         finished_sta = []
 
-        for eidn in my_sta_eids:
-            if eidn in self.station_names:
-                logger.info("Station {eidn} already created, skipping.".format(eidn=eidn))
-                continue
-            if self.debug:
-                logger.debug(" EIDN " + eidn)
-            if eidn in finished_sta:
+        # add_sta, set_port and the wifi extras for one station are sent in order as one group;
+        # groups for different stations are pipelined over keep-alive connections when the
+        # batch exits, so sleep_time is no longer needed between stations
+        with self.local_realm.command_batch(debug_=debug) as batch:
+            for eidn in my_sta_eids:
+                if eidn in self.station_names:
+                    logger.info("Station {eidn} already created, skipping.".format(eidn=eidn))
+                    continue
                 if self.debug:
-                    logger.debug("Station {eidn} already created".format(eidn=eidn))
-                continue
+                    logger.debug(" EIDN " + eidn)
+                if eidn in finished_sta:
+                    if self.debug:
+                        logger.debug("Station {eidn} already created".format(eidn=eidn))
+                    continue
+
+                eid = self.local_realm.name_to_eid(eidn)
+                name = eid[2]
+                num += 1
+                self.add_sta_data["shelf"] = radio_shelf
+                self.add_sta_data["resource"] = radio_resource
+                self.add_sta_data["radio"] = radio_port
+                self.add_sta_data["sta_name"] = name  # for create station calls
+                self.set_port_data["port"] = name  # for set_port calls.
+                self.set_port_data["shelf"] = radio_shelf
+                self.set_port_data["resource"] = radio_resource
 
-            eid = self.local_realm.name_to_eid(eidn)
-            name = eid[2]
-            num += 1
-            self.add_sta_data["shelf"] = radio_shelf
-            self.add_sta_data["resource"] = radio_resource
-            self.add_sta_data["radio"] = radio_port
-            self.add_sta_data["sta_name"] = name  # for create station calls
-            self.set_port_data["port"] = name  # for set_port calls.
-            self.set_port_data["shelf"] = radio_shelf
-            self.set_port_data["resource"] = radio_resource
-
-            add_sta_r.addPostData(self.add_sta_data)
-            if debug:
-                logger.debug("{date} - 3254 - {eidn}- - - - - - - - - - - - - - - - - - ".format(
-                    date=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], eidn=eidn))
-
-                logger.debug(pformat(add_sta_r.requested_url))
-                logger.debug(pformat(add_sta_r.proxies))
-                logger.debug(pformat(self.add_sta_data))
-                logger.debug(self.set_port_data)
-                logger.debug("- ~3254 - - - - - - - - - - - - - - - - - - - ")
-            if dry_run:
                 if debug:
-                    logger.debug("dry run: not creating {eidn} ".format(eidn=eidn))
-                continue
-            if debug:
-                logger.debug('Timestamp: {time_}'.format(time_=(time.time() * 1000)))
-                logger.debug("- 3264 - ## {eidn} ##  add_sta_r.jsonPost - - - - - - - - - - - - - - - - - - ".format(eidn=eidn))
-            add_sta_r.jsonPost(debug=self.debug)
-            finished_sta.append(eidn)
-            if debug:
-                logger.debug("- ~3264 - {eidn} - add_sta_r.jsonPost - - - - - - - - - - - - - - - - - - ".format(eidn=eidn))
-            time.sleep(0.01)
-            set_port_r.addPostData(self.set_port_data)
+                    logger.debug("{date} - 3254 - {eidn}- - - - - - - - - - - - - - - - - - ".format(
+                        date=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], eidn=eidn))
+                    logger.debug(pformat(self.add_sta_data))
+                    logger.debug(self.set_port_data)
+                    logger.debug("- ~3254 - - - - - - - - - - - - - - - - - - - ")
+                if dry_run:
+                    if debug:
+                        logger.debug("dry run: not creating {eidn} ".format(eidn=eidn))
+                    continue
+
+                batch.set_group(eidn)
+                batch.add("/cli-json/add_sta", self.add_sta_data)
+                finished_sta.append(eidn)
+                batch.add("/cli-json/set_port", self.set_port_data)
+
+                self.wifi_extra_data["resource"] = radio_resource
+                self.wifi_extra_data["port"] = name
+                self.wifi_extra2_data["resource"] = radio_resource
+                self.wifi_extra2_data["port"] = name
+                self.wifi_txo_data["resource"] = radio_resource
+                self.wifi_txo_data["port"] = name
+                if self.wifi_extra_data_modified:
+                    batch.add("/cli-json/set_wifi_extra", self.wifi_extra_data)
+                if self.wifi_extra2_data_modified:
+                    batch.add("/cli-json/set_wifi_extra2", self.wifi_extra2_data)
+                if self.wifi_txo_data_modified:
+                    batch.add("/cli-json/set_wifi_txo", self.wifi_txo_data)
+
+                # append created stations to self.station_names
+                self.station_names.append("%s.%s.%s" % (radio_shelf, radio_resource, name))
             if debug:
-                logger.debug("- 3270 -- {eidn} --  set_port_r.jsonPost - - - - - - - - - - - - - - - - - - ".format(eidn=eidn))
-            set_port_r.jsonPost(debug=debug)
-            if debug:
-                logger.debug("- ~3270 - {eidn} - set_port_r.jsonPost - - - - - - - - - - - - - - - - - - ".format(eidn=eidn))
-            time.sleep(0.01)
-
-            self.wifi_extra_data["resource"] = radio_resource
-            self.wifi_extra_data["port"] = name
-            self.wifi_extra2_data["resource"] = radio_resource
-            self.wifi_extra2_data["port"] = name
-            self.wifi_txo_data["resource"] = radio_resource
-            self.wifi_txo_data["port"] = name
-            if self.wifi_extra_data_modified:
-                wifi_extra_r.addPostData(self.wifi_extra_data)
-                wifi_extra_r.jsonPost(debug)
-            if self.wifi_extra2_data_modified:
-                wifi_extra2_r.addPostData(self.wifi_extra2_data)
-                wifi_extra2_r.jsonPost(debug)
-            if self.wifi_txo_data_modified:
-                wifi_txo_r.addPostData(self.wifi_txo_data)
-                wifi_txo_r.jsonPost(debug)
-
-            # append created stations to self.station_names
-            self.station_names.append("%s.%s.%s" % (radio_shelf, radio_resource, name))
-            time.sleep(sleep_time)
+                logger.debug("- 3264 - flushing {num} commands - - - - - - - - - - - - - - - - - - ".format(
+                    num=len(batch)))
+        if debug:
+            failed = [result for result in batch.results if not result.ok()]
+            logger.debug("- ~3264 - {failed} of {num} commands failed - - - - - - - - - - - - - - - - ".format(
+                failed=len(failed), num=len(batch.results)))
 
         logger.debug('StationProfile.create debug: {port}'.format(port=pformat(self.local_realm.json_get('/port/'))))
         logger.debug("- ~3287 - waitUntilPortsAppear - - - - - - - - - - - - - - - - - - ")
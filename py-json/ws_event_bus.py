@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# flake8: noqa
+"""
+LFEventBus listens to the LANforge GUI websocket (port 8081) in a background thread
+and keeps a live cache of port, endpoint and cross-connect state so that wait helpers
+can block until a condition holds instead of polling the JSON API every second.
+
+The websocket carries events ("Port sta0000 IP change from 0.0.0.0 to 10.0.0.5",
+link up/down, create/delete, ...), not full port records. The cache is therefore
+seeded and verified by a refresh callable supplied by the waiter, normally one bulk
+LFUtils.PortWaiter.poll(). An event that names a watched entity wakes its waiters
+right away so they refresh immediately; an IP change event updates the cached
+record directly and may complete a wait without any HTTP request at all.
+
+If the websocket is not connected -- websocket-client is not installed, the GUI
+does not listen on 8081, or the socket dropped -- waiters refresh every
+poll_interval_sec, which is plain bulk HTTP polling. The listener reconnects on
+its own.
+
+    bus = LFEventBus(lfclient_host="localhost").start()
+    waiter = LFUtils.PortWaiter(base_url="http://localhost:8080", port_list=sta_list)
+    bus.wait_for(kind="port",
+                 keys=waiter.eids.keys(),
+                 predicate=LFUtils.port_is_present,
+                 refresh=lambda: bus.update_ports(waiter.poll()),
+                 timeout_sec=120)
+
+Messages can be recorded with record_file= and fed back through replay(), or served
+to the bus by py-scripts/sandbox/ws_replay_server.py.
+
+You will need websocket-client:
+pip install websocket_client
+"""
+import sys
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+logger = logging.getLogger(__name__)
+
+cre = {
+    "port": re.compile(r'Port (\S+)', re.I),
+    "ip_change": re.compile(r'IP change from (\S+) to (\S+)', re.I),
+}
+
+
+def item_exists(record):
+    return record is not None
+
+
+def split_port_key(key=None):
+    """
+    :return: [shelf, resource, name] of a 'shelf.resource.name' key; names like eth1.100 keep their dot
+    """
+    return key.split('.', 2)
+
+
+class _Watcher:
+    """
+    One outstanding wait. future completes with True once predicate holds for every key.
+    """
+
+    def __init__(self, kind=None, keys=(), predicate=None):
+        self.kind = kind
+        self.keys = list(keys)
+        self.predicate = predicate
+        self.future = Future()
+        self.wake = threading.Event()
+        # events carry short names, ports are cached under shelf.resource.name
+        self.names = set(split_port_key(key)[-1] if kind == "port" else key for key in self.keys)
+
+    def check(self, cache):
+        if self.future.done():
+            return True
+        for key in self.keys:
+            if not self.predicate(cache.get(key)):
+                return False
+        self.future.set_result(True)
+        self.wake.set()
+        return True
+
+    def pending(self, cache):
+        return [key for key in self.keys if not self.predicate(cache.get(key))]
+
+
+class LFEventBus:
+    Default_WS_Port = 8081
+    Default_Reconnect_Sec = 2.0
+    Default_Refresh_Sec = 5.0
+    Default_Poll_Interval_Sec = 2.0
+    KINDS = ("port", "endp", "cx")
+
+    def __init__(self,
+                 lfclient_host="localhost",
+                 ws_port=Default_WS_Port,
+                 ws_url=None,
+                 reconnect_sec=Default_Reconnect_Sec,
+                 refresh_sec=Default_Refresh_Sec,
+                 record_file=None,
+                 debug_=False):
+        """
+        :param lfclient_host: GUI host
+        :param ws_port: GUI websocket port
+        :param ws_url: full websocket url, overrides lfclient_host and ws_port
+        :param reconnect_sec: pause before reconnecting a dropped websocket
+        :param refresh_sec: how often waiters verify the cache over HTTP while the websocket is up
+        :param record_file: append every received message to this file, one per line
+        :param debug_: log every message
+        """
+        if ws_url is None:
+            ws_url = "ws://%s:%s" % (lfclient_host, ws_port)
+        self.ws_url = ws_url
+        self.reconnect_sec = reconnect_sec
+        self.refresh_sec = refresh_sec
+        self.record_file = record_file
+        self.debug = debug_
+        self.lock = threading.RLock()
+        self.cache = {kind: {} for kind in self.KINDS}
+        self.watchers = []
+        self.listeners = []
+        self.connected = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.ws = None
+        self.message_count = 0
+
+    # ----- ----- websocket thread ----- -----
+
+    def start(self):
+        if (self.thread is not None) and self.thread.is_alive():
+            return self
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="lf_event_bus", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception as e:
+                logger.debug("LFEventBus: close: %s" % e)
+        if self.thread is not None:
+            self.thread.join(timeout=self.reconnect_sec + 1)
+        self.connected.clear()
+        self.wake_all()
+
+    def is_connected(self):
+        return self.connected.is_set()
+
+    def _run(self):
+        try:
+            import websocket
+        except ImportError:
+            logger.warning("LFEventBus: websocket-client is not installed, waiting by HTTP polling only")
+            return
+        while not self.stop_event.is_set():
+            self.ws = websocket.WebSocketApp(self.ws_url,
+                                             on_open=self._on_open,
+                                             on_message=self._on_message,
+                                             on_error=self._on_error,
+                                             on_close=self._on_close)
+            try:
+                self.ws.run_forever()
+            except Exception as e:
+                logger.warning("LFEventBus: %s: %s" % (self.ws_url, e))
+            if self.connected.is_set():
+                logger.info("LFEventBus: lost %s, polling until it reconnects" % self.ws_url)
+            self.connected.clear()
+            # waiters were sleeping on events, have them poll now
+            self.wake_all()
+            self.stop_event.wait(self.reconnect_sec)
+
+    def _on_open(self, ws):
+        logger.info("LFEventBus: connected to %s" % self.ws_url)
+        self.connected.set()
+
+    def _on_message(self, ws, message):
+        self.handle_message(message)
+
+    def _on_error(self, ws, error):
+        if self.debug:
+            logger.debug("LFEventBus: %s error: %s" % (self.ws_url, error))
+
+    def _on_close(self, ws, *args):
+        self.connected.clear()
+
+    # ----- ----- messages ----- -----
+
+    def add_listener(self, callback):
+        """
+        :param callback: called with each decoded message dict on the websocket thread
+        """
+        with self.lock:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def replay(self, messages=()):
+        """
+        Feed recorded messages through the bus, e.g. the lines of a record_file.
+        """
+        for message in messages:
+            if isinstance(message, str) and not message.strip():
+                continue
+            self.handle_message(message)
+
+    def handle_message(self, text):
+        """
+        Apply one websocket message to the cache and wake the waiters it concerns.
+        """
+        self.message_count += 1
+        if self.record_file and isinstance(text, str):
+            with open(self.record_file, 'a') as record:
+                record.write(text.rstrip('\n') + '\n')
+        try:
+            message = json.loads(text) if isinstance(text, (str, bytes)) else text
+        except json.JSONDecodeError as e:
+            if self.debug:
+                logger.debug("LFEventBus: undecodable message %s: %s" % (text, e))
+            return
+        if not isinstance(message, dict):
+            return
+        if self.debug:
+            logger.debug("LFEventBus: %s" % message)
+
+        with self.lock:
+            listeners = list(self.listeners)
+        for callback in listeners:
+            try:
+                callback(message)
+            except Exception as e:
+                logger.warning("LFEventBus: listener %s failed: %s" % (callback, e))
+
+        details = message.get("details")
+        if not isinstance(details, str):
+            details = message.get("wifi-event") if isinstance(message.get("wifi-event"), str) else ""
+        name = message.get("name")
+        match_result = cre["port"].search(details)
+        if match_result is not None:
+            name = match_result.group(1)
+        if not name:
+            return
+        resource = message.get("resource")
+        shelf = message.get("shelf")
+
+        with self.lock:
+            match_result = cre["ip_change"].search(details)
+            if match_result is not None:
+                self._apply_ip_change(name, resource, match_result.group(2), shelf=shelf)
+            for watcher in self.watchers:
+                if name in watcher.names:
+                    watcher.wake.set()
+
+    def _apply_ip_change(self, name=None, resource=None, ip=None, shelf=None):
+        """ call with self.lock held; a message without shelf or resource matches any """
+        ports = self.cache["port"]
+        keys = []
+        for key in ports.keys():
+            key_shelf, key_resource, key_name = split_port_key(key)
+            if key_name != name:
+                continue
+            if (resource is not None) and (key_resource != str(resource)):
+                continue
+            if (shelf is not None) and (key_shelf != str(shelf)):
+                continue
+            keys.append(key)
+        for key in keys:
+            record = ports.get(key)
+            if record is None:
+                continue
+            record = dict(record)
+            record["ip"] = ip
+            ports[key] = record
+        self._check_watchers("port")
+
+    # ----- ----- cache ----- -----
+
+    def _check_watchers(self, kind=None):
+        """ call with self.lock held """
+        cache = self.cache[kind]
+        for watcher in self.watchers:
+            if watcher.kind == kind:
+                watcher.check(cache)
+
+    def update_items(self, kind=None, records=None):
+        """
+        Store fresh records, e.g. from an HTTP query. A value of None means the item does not exist.
+        :param kind: port, endp or cx
+        :param records: dict of key -> record or None
+        """
+        if kind not in self.cache:
+            raise ValueError("LFEventBus: unknown kind [%s]" % kind)
+        with self.lock:
+            cache = self.cache[kind]
+            for key, record in records.items():
+                if record is None:
+                    cache.pop(key, None)
+                else:
+                    cache[key] = record
+            self._check_watchers(kind)
+
+    def update_ports(self, index=None):
+        """
+        :param index: dict of 'shelf.resource.name' -> port record, as returned by LFUtils.PortWaiter.poll()
+        """
+        self.update_items("port", index)
+
+    def get_items(self, kind=None, keys=()):
+        with self.lock:
+            cache = self.cache[kind]
+            return {key: cache.get(key) for key in keys}
+
+    def get_port(self, eid=None):
+        with self.lock:
+            return self.cache["port"].get(eid)
+
+    def wake_all(self):
+        with self.lock:
+            for watcher in self.watchers:
+                watcher.wake.set()
+
+    # ----- ----- waiting ----- -----
+
+    def watch(self, kind=None, keys=(), predicate=None):
+        """
+        Register a wait; the returned watcher's future completes when predicate holds for all keys
+        after the next update of the cache. Records already cached are not checked, they may be
+        left from an earlier test. Call unwatch() when done with it.
+        """
+        if kind not in self.cache:
+            raise ValueError("LFEventBus: unknown kind [%s]" % kind)
+        watcher = _Watcher(kind=kind, keys=keys, predicate=predicate)
+        with self.lock:
+            self.watchers.append(watcher)
+        return watcher
+
+    def forget(self, kind=None, keys=()):
+        """
+        Drop cached records, so that only a fresh query or event can satisfy a wait on them.
+        """
+        with self.lock:
+            cache = self.cache[kind]
+            for key in keys:
+                cache.pop(key, None)
+
+    def unwatch(self, watcher=None):
+        with self.lock:
+            if watcher in self.watchers:
+                self.watchers.remove(watcher)
+
+    def wait_for(self,
+                 kind=None,
+                 keys=(),
+                 predicate=None,
+                 refresh=None,
+                 timeout_sec=300,
+                 poll_interval_sec=Default_Poll_Interval_Sec,
+                 on_pending=None):
+        """
+        Block until predicate(record) holds for every key, or timeout_sec passes.
+        Cached records of the keys are dropped first, the wait only trusts fresh state.
+        :param kind: port, endp or cx
+        :param keys: cache keys to wait on; ports are 'shelf.resource.name'
+        :param predicate: called with the cached record, or None if the item is not known
+        :param refresh: callable that queries the GUI and calls update_items(); run once up
+            front, whenever a relevant event arrives, every refresh_sec while the websocket is
+            up and every poll_interval_sec while it is not
+        :param timeout_sec: seconds to wait
+        :param poll_interval_sec: refresh interval while the websocket is down
+        :param on_pending: optional callback(pending_keys, elapsed_sec) run after each refresh
+            that leaves keys pending
+        :return: True if the condition was met
+        """
+        keys = list(keys)
+        self.forget(kind=kind, keys=keys)
+        watcher = self.watch(kind=kind, keys=keys, predicate=predicate)
+        started = time.monotonic()
+        deadline = started + timeout_sec
+        try:
+            while True:
+                if refresh is not None:
+                    refresh()
+                    with self.lock:
+                        pending = [] if watcher.check(self.cache[kind]) else watcher.pending(self.cache[kind])
+                    if pending and (on_pending is not None):
+                        on_pending(pending, time.monotonic() - started)
+                if watcher.future.done():
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                interval = self.refresh_sec if self.is_connected() else poll_interval_sec
+                watcher.wake.wait(min(interval, remaining))
+                watcher.wake.clear()
+                if watcher.future.done():
+                    break
+        finally:
+            self.unwatch(watcher)
+        if not watcher.future.done():
+            with self.lock:
+                pending = watcher.pending(self.cache[kind])
+            logger.info("LFEventBus: %d of %d %s items not ready after %s seconds"
+                        % (len(pending), len(watcher.keys), kind, timeout_sec))
+            return False
+        return True
+# ~LFEventBus
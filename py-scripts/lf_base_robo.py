@@ -4,8 +4,11 @@ import os
 import json
 import math
 import logging
+import importlib
 from datetime import datetime
 
+lf_webgui_control = importlib.import_module("py-scripts.lf_webgui_control")
+
 
 class RobotClass:
     """
@@ -73,27 +76,25 @@ class RobotClass:
     def check_test_status(self):
         """
         Check whether the running test has been stopped by the user from webui.
+        The Running_instances file is watched by lf_webgui_control, this only reads the cached status.
 
         Returns:
             bool: True if test is stopped, False otherwise.
         """
-
-        file_path = os.path.join(
-            self.runtime_dir,
-            "../../Running_instances/{}_{}_running.json".format(self.ip, self.testname))
-
-        if not os.path.exists(file_path):
-            return False
-
-        with open(file_path, 'r') as f:
-            run_status = json.load(f)
-
-            if 'status' in run_status.keys() and run_status["status"] != "Running":
-                logging.info("Test is stopped by the user")
-                return True
+        watcher = lf_webgui_control.RunningInstanceWatcher.for_test(result_dir=self.runtime_dir, host=self.ip, test_name=self.testname)
+        if watcher.stopped_by_user():
+            logging.info("Test is stopped by the user")
+            return True
 
         return False
 
+    def release_test_status(self):
+        """
+        Stop watching the Running_instances file check_test_status() reads, when the test finishes.
+        """
+        if self.runtime_dir is not None:
+            lf_webgui_control.RunningInstanceWatcher.release_test(result_dir=self.runtime_dir, host=self.ip, test_name=self.testname)
+
     def wait_for_battery(self, stop=None, monitor_function=None):
         """Monitor robot battery status and pause execution if battery is low.
 
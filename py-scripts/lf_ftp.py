@@ -165,6 +165,8 @@ DeviceConfig = importlib.import_module("py-scripts.DeviceConfig")
 lf_report = importlib.import_module("py-scripts.lf_report")
 lf_graph = importlib.import_module("py-scripts.lf_graph")
 lf_kpi_csv = importlib.import_module("py-scripts.lf_kpi_csv")
+lf_live_feed = importlib.import_module("py-scripts.lf_live_feed")
+lf_webgui_control = importlib.import_module("py-scripts.lf_webgui_control")
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 
@@ -534,7 +536,7 @@ class FtpTest(LFCliBase):
                     'status': 'Stopped'
                 }
                 )
-                df1.to_csv('{}/ftp_datavalues.csv'.format(self.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/ftp_datavalues.csv'.format(self.result_dir), df1)
                 raise ValueError("No Device is available to run the test hence aborting the test")
             logging.info("device got from webui are: %s", devices_list)
         else:
@@ -867,6 +869,8 @@ class FtpTest(LFCliBase):
     def stop(self):
         self.cx_profile.stop_cx()
         self.station_profile.admin_down()
+        if self.dowebgui == "True":
+            lf_webgui_control.RunningInstanceWatcher.release_test(result_dir=self.result_dir, host=self.host, test_name=self.test_name)
         # To update status of devices and remaining_time in ftp_datavalues.csv file to stopped and 0 respectively.
         if self.clients_type == 'Real':
             if not self.robot_test:
@@ -905,7 +909,7 @@ class FtpTest(LFCliBase):
                         "uc_max": self.uc_max
                     }
                 if self.dowebgui:
-                    df1.to_csv(f"{self.result_dir}/{self.current_coordinate}_ftp_datavalues.csv", index=False)
+                    lf_live_feed.write_snapshot(f"{self.result_dir}/{self.current_coordinate}_ftp_datavalues.csv", df1)
                 else:
                     df1.to_csv(f"{self.current_coordinate}_ftp_datavalues.csv", index=False)
 
@@ -915,7 +919,7 @@ class FtpTest(LFCliBase):
         df1 = pd.DataFrame(self.data)
         df1.to_csv("ftp_datavalues.csv", index=False)
         if self.dowebgui:
-            df1.to_csv(f"{self.result_dir}/{self.current_coordinate}_ftp_datavalues.csv", index=False)
+            lf_live_feed.write_snapshot(f"{self.result_dir}/{self.current_coordinate}_ftp_datavalues.csv", df1)
         else:
             df1.to_csv(f"{self.current_coordinate}_ftp_datavalues.csv", index=False)
 
@@ -1143,13 +1147,9 @@ class FtpTest(LFCliBase):
         wait_start = datetime.now()
         while (datetime.now() - wait_start).total_seconds() < timeout:
             time.sleep(poll_interval)
-            if self.dowebgui == "True":
-                with open(self.result_dir + "/../../Running_instances/{}_{}_running.json".format(
-                        self.host, self.test_name), 'r') as file:
-                    data = json.load(file)
-                    if data["status"] != "Running":
-                        logger.info("Test is stopped by the user during the device-recovery wait.")
-                        return 'stopped'
+            if self.dowebgui == "True" and self.webgui_watcher().stopped_by_user():
+                logger.info("Test is stopped by the user during the device-recovery wait.")
+                return 'stopped'
             self.get_device_details()
             elapsed = (datetime.now() - wait_start).total_seconds()
             if len(self.missing_cx_logged) < len(self.cx_list):
@@ -1359,10 +1359,11 @@ class FtpTest(LFCliBase):
                 logger.error("An exception occurred:\n%s", tb_str)
                 exit(1)
             if self.dowebgui:
-                df1.to_csv('{}/ftp_datavalues.csv'.format(self.result_dir), index=False)
+                # replaced atomically, the WebGUI reads this file while the test runs
+                lf_live_feed.write_snapshot('{}/ftp_datavalues.csv'.format(self.result_dir), df1)
                 if not self.do_bandsteering and self.robot_test:
                     # Save FTP data values for the current coordinate when in robot test
-                    df1.to_csv(f"{self.result_dir}/{self.current_coordinate}_ftp_datavalues.csv", index=False)
+                    lf_live_feed.write_snapshot(f"{self.result_dir}/{self.current_coordinate}_ftp_datavalues.csv", df1)
             if self.clients_type == 'Real':
                 df1.to_csv("ftp_datavalues.csv", index=False)
                 if not self.do_bandsteering and self.robot_test:
@@ -1370,18 +1371,17 @@ class FtpTest(LFCliBase):
             # No sleep is added here for band steering, as we need to capture data every second.
             # The per-second sleep interval is already handled in lf_base_robo.
             if not self.do_bandsteering:
-                time.sleep(5)
-            if self.dowebgui == "True":
-                with open(self.result_dir + "/../../Running_instances/{}_{}_running.json".format(self.host,
-                                                                                                 self.test_name),
-                          'r') as file:
-                    data = json.load(file)
-                    if data["status"] != "Running":
-                        # User has requested to stop the test
-                        test_stopped_by_user = True
-                        logging.info('Test is stopped by the user')
-                        self.data["end_time"] = [datetime.now().strftime("%d/%m %I:%M:%S %p")] * len(self.cx_list)
-                        break
+                if self.dowebgui == "True":
+                    # returns early when the user stops the test
+                    self.webgui_watcher().stop_event.wait(5)
+                else:
+                    time.sleep(5)
+            if self.dowebgui == "True" and self.webgui_watcher().stopped_by_user():
+                # User has requested to stop the test
+                test_stopped_by_user = True
+                logging.info('Test is stopped by the user')
+                self.data["end_time"] = [datetime.now().strftime("%d/%m %I:%M:%S %p")] * len(self.cx_list)
+                break
             # Reusing monitor logic for band steering, but only need one record per call,
             # so break after first iteration instead of running for full duration.
             if self.do_bandsteering:
@@ -1556,6 +1556,12 @@ class FtpTest(LFCliBase):
                 self.ssid_list.append('-')
                 self.bssid_list.append('-')
 
+    def webgui_watcher(self):
+        """
+        :return: watcher of this test's Running_instances file, see lf_webgui_control
+        """
+        return lf_webgui_control.RunningInstanceWatcher.for_test(result_dir=self.result_dir, host=self.host, test_name=self.test_name)
+
     # Updates the status in the running.json file while running a test from the Web UI
     def updating_webui_runningjson(self, obj):
         data = {}
@@ -1670,7 +1676,7 @@ class FtpTest(LFCliBase):
                 if len(self.data["url_data"]) == 0:
                     self.data["url_data"] = [0] * len(self.cx_list)
                 df1 = pd.DataFrame(self.data)
-                df1.to_csv('{}/ftp_datavalues.csv'.format(self.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/ftp_datavalues.csv'.format(self.result_dir), df1)
             logger.info("No layer 4-7 endpoints")
             exit()
 
@@ -4137,7 +4143,7 @@ some amount of file data from the FTP server while measuring the time taken by c
         obj.data_for_webui["status"] = ["STOPPED"] * len(obj.url_data)
 
         df1 = pd.DataFrame(obj.data_for_webui)
-        df1.to_csv('{}/ftp_datavalues.csv'.format(obj.result_dir), index=False)
+        lf_live_feed.write_snapshot('{}/ftp_datavalues.csv'.format(obj.result_dir), df1)
     iot_summary = None
     if args.iot_test and args.iot_testname:
         base = os.path.join("results", args.iot_testname)
@@ -20,10 +20,12 @@ INCLUDE_IN_README
 import sys
 import os
 import importlib
-import matplotlib.pyplot as plt
 import numpy as np
 import pdfkit
 from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from concurrent.futures import ProcessPoolExecutor, Future
 # import matplotlib.ticker as mticker
 import argparse
 import traceback
@@ -47,6 +49,38 @@ lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 lf_csv = importlib.import_module("py-scripts.lf_csv")
 lf_csv = lf_csv.lf_csv
 
+
+# Graphs are drawn on Agg figures that pyplot does not know about, so there is no global
+# figure state: graphs can be built from several threads or in the worker processes of
+# lf_graph_render_queue.
+def new_figure(figsize=None, gridspec_kw=None):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots(gridspec_kw=gridspec_kw)
+    return fig, ax
+
+
+# same as pyplot.xticks() on ax
+def set_xticks(ax, ticks, labels=None, **kwargs):
+    ax.set_xticks(ticks)
+    if labels is None:
+        tick_labels = ax.get_xticklabels()
+        for tick_label in tick_labels:
+            tick_label.update(kwargs)
+        return tick_labels
+    return ax.set_xticklabels(labels, **kwargs)
+
+
+# same as pyplot.yticks() on ax
+def set_yticks(ax, ticks, labels=None, **kwargs):
+    ax.set_yticks(ticks)
+    if labels is None:
+        tick_labels = ax.get_yticklabels()
+        for tick_label in tick_labels:
+            tick_label.update(kwargs)
+        return tick_labels
+    return ax.set_yticklabels(labels, **kwargs)
+
 # internal candela references included during intial phases, to be deleted
 # at future date
 
@@ -139,7 +173,7 @@ class lf_bar_graph:
                 self.color.append(self.color_name[i])
                 i = i + 1
 
-        fig_size, ax = plt.subplots(figsize=self.figsize, gridspec_kw=self.alignment)
+        fig, ax = new_figure(figsize=self.figsize, gridspec_kw=self.alignment)
         i = 0
         # to remove the borders
         if self.remove_border is not None:
@@ -154,47 +188,45 @@ class lf_bar_graph:
         def show_value(rectangles):
             for rect in rectangles:
                 h = rect.get_height()
-                plt.text(rect.get_x() + rect.get_width() / 2., h, h,
-                         ha='center', va='bottom', rotation=self.text_rotation, fontsize=self.text_font)
+                ax.text(rect.get_x() + rect.get_width() / 2., h, h,
+                        ha='center', va='bottom', rotation=self.text_rotation, fontsize=self.text_font)
         br1 = None
         for _ in self.data_set:
             if i > 0:
                 br = br1
                 br2 = [x + self.bar_width for x in br]
-                rects = plt.bar(br2, self.data_set[i], color=self.color[i], width=self.bar_width,
-                                edgecolor=self.color_edge, label=self.label[i])
+                rects = ax.bar(br2, self.data_set[i], color=self.color[i], width=self.bar_width,
+                               edgecolor=self.color_edge, label=self.label[i])
                 if self.show_bar_value:
                     show_value(rects)
                 br1 = br2
                 i = i + 1
             else:
                 br1 = np.arange(len(self.data_set[i]))
-                rects = plt.bar(br1, self.data_set[i], color=self.color[i], width=self.bar_width,
-                                edgecolor=self.color_edge, label=self.label[i])
+                rects = ax.bar(br1, self.data_set[i], color=self.color[i], width=self.bar_width,
+                               edgecolor=self.color_edge, label=self.label[i])
                 if self.show_bar_value:
                     show_value(rects)
                 i = i + 1
-        plt.xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
-        plt.ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
+        ax.set_xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
+        ax.set_ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
         if self.xaxis_categories[0] == 0:
-            plt.xticks(np.arange(0,
-                                 len(self.xaxis_categories),
-                                 step=self.xaxis_step),
+            set_xticks(ax, np.arange(0,
+                                     len(self.xaxis_categories),
+                                     step=self.xaxis_step),
                        fontsize=self.xticks_font, rotation=self.xticks_rotation)
         else:
-            plt.xticks([i + self._xaxis_value_location for i in np.arange(0, len(self.data_set[0]), step=self.xaxis_step)],
+            set_xticks(ax, [i + self._xaxis_value_location for i in np.arange(0, len(self.data_set[0]), step=self.xaxis_step)],
                        self.xaxis_categories, fontsize=self.xticks_font, rotation=self.xticks_rotation)
-        plt.legend(
+        ax.legend(
             handles=self.legend_handles,
             loc=self.legend_loc,
             bbox_to_anchor=self.legend_box,
             ncol=self.legend_ncol,
             fontsize=self.legend_fontsize)
-        plt.suptitle(self.title, fontsize=self.title_size)
-        plt.title(self.grp_title)
-        plt.gcf()
-        plt.savefig("%s.png" % self.graph_image_name, dpi=96)
-        plt.close()
+        fig.suptitle(self.title, fontsize=self.title_size)
+        ax.set_title(self.grp_title)
+        fig.savefig("%s.png" % self.graph_image_name, dpi=96)
         logger.debug("{}.png".format(self.graph_image_name))
         if self.enable_csv:
             if self.data_set is not None and self.xaxis_categories is not None:
@@ -302,7 +334,7 @@ class lf_bar_graph_horizontal:
                 self.color.append(self.color_name[i])
                 i = i + 1
 
-        fig_size, ax = plt.subplots(figsize=self.figsize, gridspec_kw=self.alignment)
+        fig, ax = new_figure(figsize=self.figsize, gridspec_kw=self.alignment)
         i = 0
         # to remove the borders
         if self.remove_border is not None:
@@ -321,47 +353,45 @@ class lf_bar_graph_horizontal:
                 # h = rect.get_height()
                 # x = rect.get_x()
                 # adding 1 may not always work based on the x axis scale may need to be configurable
-                plt.text(w + 1, rect.get_y() + rect.get_height() / 4., w,
-                         ha='center', va='bottom', rotation=self.text_rotation, fontsize=self.text_font)
+                ax.text(w + 1, rect.get_y() + rect.get_height() / 4., w,
+                        ha='center', va='bottom', rotation=self.text_rotation, fontsize=self.text_font)
         br1 = None
         for _ in self.data_set:
             if i > 0:
                 br = br1
                 br2 = [y + self.bar_height for y in br]
-                rects = plt.barh(br2, self.data_set[i], color=self.color[i], height=self.bar_height,
-                                 edgecolor=self.color_edge, label=self.label[i])
+                rects = ax.barh(br2, self.data_set[i], color=self.color[i], height=self.bar_height,
+                                edgecolor=self.color_edge, label=self.label[i])
                 if self.show_bar_value:
                     show_value(rects)
                 br1 = br2
                 i = i + 1
             else:
                 br1 = np.arange(len(self.data_set[i]))
-                rects = plt.barh(br1, self.data_set[i], color=self.color[i], height=self.bar_height,
-                                 edgecolor=self.color_edge, label=self.label[i])
+                rects = ax.barh(br1, self.data_set[i], color=self.color[i], height=self.bar_height,
+                                edgecolor=self.color_edge, label=self.label[i])
                 if self.show_bar_value:
                     show_value(rects)
                 i = i + 1
-        plt.xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
-        plt.ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
+        ax.set_xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
+        ax.set_ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
         if self.yaxis_categories[0] == 0:
-            plt.yticks(np.arange(0,
-                                 len(self.yaxis_categories),
-                                 step=self.yaxis_step),
+            set_yticks(ax, np.arange(0,
+                                     len(self.yaxis_categories),
+                                     step=self.yaxis_step),
                        fontsize=self.yticks_font, rotation=self.yticks_rotation)
         else:
-            plt.yticks([i + self._yaxis_value_location for i in np.arange(0, len(self.data_set[0]), step=self.yaxis_step)],
+            set_yticks(ax, [i + self._yaxis_value_location for i in np.arange(0, len(self.data_set[0]), step=self.yaxis_step)],
                        self.yaxis_categories, fontsize=self.yticks_font, rotation=self.yticks_rotation)
-        plt.legend(
+        ax.legend(
             handles=self.legend_handles,
             loc=self.legend_loc,
             bbox_to_anchor=self.legend_box,
             ncol=self.legend_ncol,
             fontsize=self.legend_fontsize)
-        plt.suptitle(self.title, fontsize=self.title_size)
-        plt.title(self.grp_title)
-        plt.gcf()
-        plt.savefig("%s.png" % self.graph_image_name, dpi=96)
-        plt.close()
+        fig.suptitle(self.title, fontsize=self.title_size)
+        ax.set_title(self.grp_title)
+        fig.savefig("%s.png" % self.graph_image_name, dpi=96)
         logger.debug("{}.png".format(self.graph_image_name))
         if self.enable_csv:
             if self.data_set is not None and self.yaxis_categories is not None:
@@ -422,37 +452,36 @@ class lf_scatter_graph:
                 "royalblue",
                 "darkgray",
                 "maroon"]
-        plt.subplots(figsize=self.figsize)
+        fig, ax = new_figure(figsize=self.figsize)
         if self.values is None:
-            plt.scatter(
+            ax.scatter(
                 self.x_data_set,
                 self.y_data_set[0],
                 color=self.color[0],
                 label=self.label[0])
             if len(self.y_data_set) > 1:
                 for i in range(1, len(self.y_data_set)):
-                    plt.scatter(
+                    ax.scatter(
                         self.x_data_set,
                         self.y_data_set[i],
                         color=self.color[i],
                         label=self.label[i])
-            plt.xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
-            plt.ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
-            plt.gcf().autofmt_xdate()
-            plt.legend()
+            ax.set_xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
+            ax.set_ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
+            fig.autofmt_xdate()
+            ax.legend()
         else:
             colours = ListedColormap(self.color)
-            scatter = plt.scatter(
+            scatter = ax.scatter(
                 self.x_data_set,
                 self.y_data_set,
                 c=self.values,
                 cmap=colours)
-            plt.xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
-            plt.ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
-            plt.gcf().autofmt_xdate()
-            plt.legend(handles=scatter.legend_elements()[0], labels=self.label)
-        plt.savefig("%s.png" % self.graph_image_name, dpi=96)
-        plt.close()
+            ax.set_xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
+            ax.set_ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
+            fig.autofmt_xdate()
+            ax.legend(handles=scatter.legend_elements()[0], labels=self.label)
+        fig.savefig("%s.png" % self.graph_image_name, dpi=96)
         logger.debug("{}.png".format(self.graph_image_name))
         if self.enable_csv:
             self.lf_csv.columns = self.label
@@ -581,7 +610,7 @@ class lf_bar_line_graph:
                 self.color1.append(self.color_name[i])
                 i = i + 1
 
-        fig, ax1 = plt.subplots(figsize=self.figsize)
+        fig, ax1 = new_figure(figsize=self.figsize)
 
         ax2 = ax1.twinx()
 
@@ -614,12 +643,12 @@ class lf_bar_line_graph:
         ax1.set_xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
         ax1.set_ylabel(self.y1axis_name, fontweight='bold', fontsize=15)
         if self.xaxis_categories[0] == 0:
-            xsteps = plt.xticks(np.arange(0,
-                                          len(self.xaxis_categories),
-                                          step=self.xaxis_step),
+            xsteps = set_xticks(ax2, np.arange(0,
+                                               len(self.xaxis_categories),
+                                               step=self.xaxis_step),
                                 fontsize=self.xticks_font)
         else:
-            xsteps = plt.xticks([i + self._xaxis_value_location for i in np.arange(0, len(self.data_set1[0]), step=self.xaxis_step)],  # noqa: F841
+            xsteps = set_xticks(ax2, [i + self._xaxis_value_location for i in np.arange(0, len(self.data_set1[0]), step=self.xaxis_step)],  # noqa: F841
                                 self.xaxis_categories, fontsize=self.xticks_font)
         ax1.legend(
             handles=self.legend_handles,
@@ -678,11 +707,9 @@ class lf_bar_line_graph:
             bbox_to_anchor=self.legend_box2,
             ncol=self.legend_ncol,
             fontsize=self.legend_fontsize)
-        plt.suptitle(self.title, fontsize=self.title_size)
-        plt.title(self.grp_title)
-        plt.gcf()
-        plt.savefig("%s.png" % self.graph_image_name, dpi=96)
-        plt.close()
+        fig.suptitle(self.title, fontsize=self.title_size)
+        ax2.set_title(self.grp_title)
+        fig.savefig("%s.png" % self.graph_image_name, dpi=96)
         logger.debug("{}.png".format(self.graph_image_name))
         # TODO work though this for two axis
         if self.enable_csv:
@@ -770,7 +797,7 @@ class lf_stacked_graph:
         self.x_ticklabels_rotation = _x_ticklabels_rotation
 
     def build_stacked_graph(self):
-        fig, axes_subplot = plt.subplots(figsize=self.figsize)
+        fig, axes_subplot = new_figure(figsize=self.figsize)
         if self.color is None:
             self.color = [
                 "darkred",
@@ -780,17 +807,17 @@ class lf_stacked_graph:
                 "indigo",
                 "plum"]
         if type(self.data_set) is list:
-            plt.bar(self.data_set[0], self.data_set[1], color=self.color[0])
-            plt.bar(
+            axes_subplot.bar(self.data_set[0], self.data_set[1], color=self.color[0])
+            axes_subplot.bar(
                 self.data_set[0],
                 self.data_set[2],
                 bottom=self.data_set[1],
                 color=self.color[1])
             if len(self.data_set) > 3:
                 for i in range(3, len(self.data_set)):
-                    plt.bar(self.data_set[0], self.data_set[i],
-                            bottom=np.array(self.data_set[i - 2]) + np.array(self.data_set[i - 1]), color=self.color[i - 1])
-            plt.legend(self.label)
+                    axes_subplot.bar(self.data_set[0], self.data_set[i],
+                                     bottom=np.array(self.data_set[i - 2]) + np.array(self.data_set[i - 1]), color=self.color[i - 1])
+            axes_subplot.legend(self.label)
         elif type(self.data_set) is dict:
             lable_values = []
             pass_values = []
@@ -802,11 +829,11 @@ class lf_stacked_graph:
                 fail_values.append(round(float(100.0 - self.data_set[j]), 1))
 
             width = self.width
-            figure_size, axes_subplot = plt.subplots(figsize=self.figsize)
+            fig, axes_subplot = new_figure(figsize=self.figsize)
 
             # building vertical bar plot
-            bar_1 = plt.bar(lable_values, pass_values, width, color='green')
-            bar_2 = plt.bar(lable_values, fail_values, width, bottom=pass_values, color='red')
+            bar_1 = axes_subplot.bar(lable_values, pass_values, width, color='green')
+            bar_2 = axes_subplot.bar(lable_values, fail_values, width, bottom=pass_values, color='red')
 
             # inserting bar text
             if len(list(self.data_set.keys())) > 10:
@@ -814,16 +841,16 @@ class lf_stacked_graph:
                 self.x_ticklabels_rotation = 90
             for i, v in enumerate(pass_values):
                 if v != 0:
-                    plt.text(i + .005, v * 0.45, "%s%s" % (v, "%"), color=self.bar_text_color,
-                             fontweight=self.bar_font_weight,
-                             fontsize=self.bar_font_size, ha="center", va="center", rotation=self.bar_text_rotation)
+                    axes_subplot.text(i + .005, v * 0.45, "%s%s" % (v, "%"), color=self.bar_text_color,
+                                      fontweight=self.bar_font_weight,
+                                      fontsize=self.bar_font_size, ha="center", va="center", rotation=self.bar_text_rotation)
             for i, v in enumerate(fail_values):
                 if v != 0:
-                    plt.text(i + .005, v * 0.45 + pass_values[i], "%s%s" % (v, "%"), color=self.bar_text_color,
-                             fontweight=self.bar_font_weight, fontsize=self.bar_font_size, ha="center", va="center",
-                             rotation=self.bar_text_rotation)
-            plt.legend([bar_1, bar_2], self.label, title=self.legend_title, bbox_to_anchor=self.legend_bbox,
-                       loc=self.legend_loc)
+                    axes_subplot.text(i + .005, v * 0.45 + pass_values[i], "%s%s" % (v, "%"), color=self.bar_text_color,
+                                      fontweight=self.bar_font_weight, fontsize=self.bar_font_size, ha="center", va="center",
+                                      rotation=self.bar_text_rotation)
+            axes_subplot.legend([bar_1, bar_2], self.label, title=self.legend_title, bbox_to_anchor=self.legend_bbox,
+                                loc=self.legend_loc)
             axes_subplot.set_xticks(list(self.data_set.keys()))
             axes_subplot.set_xticklabels(list(self.data_set.keys()), rotation=self.x_ticklabels_rotation)
 
@@ -833,10 +860,9 @@ class lf_stacked_graph:
                 axes_subplot.spines[border].set_visible(False)
                 axes_subplot.yaxis.set_visible(False)
 
-        plt.xlabel(self.xaxis_name)
-        plt.ylabel(self.yaxis_name)
-        plt.savefig("%s.png" % self.graph_image_name, bbox_inches="tight", dpi=96)
-        plt.close()
+        axes_subplot.set_xlabel(self.xaxis_name)
+        axes_subplot.set_ylabel(self.yaxis_name)
+        fig.savefig("%s.png" % self.graph_image_name, bbox_inches="tight", dpi=96)
         logger.debug("{}.png".format(self.graph_image_name))
         if self.enable_csv:
             self.lf_csv.columns = self.label
@@ -886,7 +912,7 @@ class lf_horizontal_stacked_graph:
         def sumzip(items):
             return [sum(values) for values in zip(items)]
 
-        fig, ax = plt.subplots(figsize=self.figsize)
+        fig, ax = new_figure(figsize=self.figsize)
 
         n = self.seg
         values1 = self.xaxis_set1
@@ -895,13 +921,13 @@ class lf_horizontal_stacked_graph:
         ind = np.arange(n) + .15
         width = 0.3
 
-        plt.barh(
+        ax.barh(
             ind,
             values1,
             width,
             color=self.color[0],
             label=self.label[0])
-        plt.barh(
+        ax.barh(
             ind,
             values2,
             width,
@@ -916,27 +942,26 @@ class lf_horizontal_stacked_graph:
 
         for i, v in enumerate(values1):
             if v != 0:
-                plt.text(v * 0.45, i + .145, "%s%s" % (v, self.unit), color='white', fontweight='bold', fontsize=10,
-                         ha='center', va='center')
+                ax.text(v * 0.45, i + .145, "%s%s" % (v, self.unit), color='white', fontweight='bold', fontsize=10,
+                        ha='center', va='center')
 
         for i, v in enumerate(values2):
             if v != 0:
-                plt.text(v * 0.45 + values1[i], i + .145, "%s%s" % (v, self.unit), color='white', fontweight='bold',
-                         fontsize=10,
-                         ha='center', va='center')
+                ax.text(v * 0.45 + values1[i], i + .145, "%s%s" % (v, self.unit), color='white', fontweight='bold',
+                        fontsize=10,
+                        ha='center', va='center')
 
         ax.spines['right'].set_visible(False)
         ax.spines['top'].set_visible(False)
         ax.legend(loc='upper right')
         if self.disable_xaxis:
-            plt.tick_params(
+            ax.tick_params(
                 axis='x',
                 which='both',
                 bottom=False,
                 top=False,
                 labelbottom=False)  # disable x-axis
-        plt.savefig("%s.png" % self.graph_image_name, dpi=96)
-        plt.close()
+        fig.savefig("%s.png" % self.graph_image_name, dpi=96)
         logger.debug("{}.png".format(self.graph_image_name))
         if self.enable_csv:
             self.lf_csv.columns = self.label
@@ -1013,10 +1038,10 @@ class lf_line_graph:
         self.reverse_y = _reverse_y
 
     def build_line_graph(self):
-        plt.subplots(figsize=self.figsize)
+        fig, ax = new_figure(figsize=self.figsize)
         i = 0
         for data in self.data_set:
-            plt.plot(
+            ax.plot(
                 self.xaxis_categories,
                 data,
                 color=self.color[i],
@@ -1024,24 +1049,22 @@ class lf_line_graph:
                 marker=self.marker[i])
             i += 1
 
-        plt.xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
-        plt.ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
+        ax.set_xlabel(self.xaxis_name, fontweight='bold', fontsize=15)
+        ax.set_ylabel(self.yaxis_name, fontweight='bold', fontsize=15)
         if self.grid:
-            plt.grid(True, linestyle=':')  # available line styles = ':', '-', '--', '-.'
-        plt.legend(
+            ax.grid(True, linestyle=':')  # available line styles = ':', '-', '--', '-.'
+        ax.legend(
             handles=self.legend_handles,
             loc=self.legend_loc,
             bbox_to_anchor=self.legend_box,
             ncol=self.legend_ncol,
             fontsize=self.legend_fontsize)
-        plt.suptitle(self.grp_title, fontsize=self.title_size)
+        fig.suptitle(self.grp_title, fontsize=self.title_size)
         if self.reverse_y:
-            plt.gca().invert_yaxis()
+            ax.invert_yaxis()
         if self.reverse_x:
-            plt.gca().invert_xaxis()
-        plt.gcf()
-        plt.savefig("%s.png" % self.graph_image_name, dpi=96)
-        plt.close()
+            ax.invert_xaxis()
+        fig.savefig("%s.png" % self.graph_image_name, dpi=96)
         logger.debug("{}.png".format(self.graph_image_name))
         if self.enable_csv:
             if self.data_set is not None:
@@ -1055,6 +1078,109 @@ class lf_line_graph:
         return "%s.png" % self.graph_image_name
 
 
+# build method of each graph class
+graph_build_methods = {
+    'lf_bar_graph': 'build_bar_graph',
+    'lf_bar_graph_horizontal': 'build_bar_graph_horizontal',
+    'lf_scatter_graph': 'build_scatter_graph',
+    'lf_bar_line_graph': 'build_bar_line_graph',
+    'lf_stacked_graph': 'build_stacked_graph',
+    'lf_horizontal_stacked_graph': 'build_horizontal_stacked_graph',
+    'lf_line_graph': 'build_line_graph',
+}
+
+
+def graph_spec(graph):
+    """
+    Plain data description of a graph object, what a worker process needs to build it.
+    :param graph: lf_bar_graph, lf_line_graph, ... as configured for its build method
+    :return: {'graph': class name, 'params': the graph's attributes}
+    """
+    graph_class = type(graph).__name__
+    if graph_class not in graph_build_methods:
+        raise ValueError("graph_spec: unknown graph class {graph_class}".format(graph_class=graph_class))
+    params = {key: value for key, value in vars(graph).items() if key != 'lf_csv'}
+    return {'graph': graph_class, 'params': params}
+
+
+def render_graph_spec(spec):
+    """
+    Build the graph a spec describes, the png (and csv if enabled) is written relative to the current directory.
+    :return: png file name, as returned by the graph's build method
+    """
+    graph_class = globals()[spec['graph']]
+    graph = graph_class.__new__(graph_class)
+    graph.__dict__.update(spec['params'])
+    graph.lf_csv = lf_csv()
+    return getattr(graph, graph_build_methods[spec['graph']])()
+
+
+class lf_graph_render_queue:
+    """
+    Render graphs in a pool of worker processes.
+
+    usage:
+        render_queue = lf_graph_render_queue()
+        future = render_queue.submit(lf_bar_graph(_data_set=..., _graph_image_name="throughput"))
+        ...
+        render_queue.wait()     # or future.result(), the png file name
+        render_queue.shutdown()
+
+    lf_report.submit_graph() uses a render queue and waits for it before writing the report.
+    """
+
+    def __init__(self,
+                 _max_workers=None,
+                 _serial=False):
+        """
+        :param _max_workers: worker processes, default the number of cpus
+        :param _serial: build graphs in this process as they are submitted, for comparison and debugging
+        """
+        self.max_workers = _max_workers
+        self.serial = _serial
+        self.executor = None
+        self.futures = []
+
+    def submit(self, graph):
+        """
+        :param graph: graph object or graph_spec() dict
+        :return: Future of the png file name
+        """
+        spec = graph if isinstance(graph, dict) else graph_spec(graph)
+        if self.serial:
+            future = Future()
+            try:
+                future.set_result(render_graph_spec(spec))
+            except Exception as x:
+                future.set_exception(x)
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self.executor.submit(render_graph_spec, spec)
+        self.futures.append(future)
+        return future
+
+    def wait(self, timeout=None):
+        """
+        Wait for every submitted graph, raises the exception of a graph that failed to build.
+        :return: png file names in the order the graphs were submitted
+        """
+        futures = self.futures
+        self.futures = []
+        return [future.result(timeout=timeout) for future in futures]
+
+    def shutdown(self, wait=True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.shutdown()
+
+
 def main():
     help_summary = '''\
      This script facilitates the generation of comprehensive graphical reports. It offers a variety of graph types,
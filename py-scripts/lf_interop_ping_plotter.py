@@ -110,6 +110,8 @@ import argparse
 import time
 import sys
 import os
+import re
+import numpy as np
 import pandas as pd
 import importlib
 import logging
@@ -140,6 +142,7 @@ from LANforge import LFUtils  # noqa: E402
 
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+lf_webgui_control = importlib.import_module("py-scripts.lf_webgui_control")
 
 if sys.version_info[0] != 3:
     print("This script requires Python 3")
@@ -148,6 +151,128 @@ if sys.version_info[0] != 3:
 realm = importlib.import_module("py-json.realm")
 Realm = realm.Realm
 
+# sample result - 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms *** drop: 0 (0, 0.000)  rx: 28  fail: 0  bytes: 1792 min/avg/max: 2.160/3.422/5.190
+ping_result_regex = re.compile(r"icmp_seq=(\d+)\b.*?time=([0-9.]+).*?\*\*\*\s*drop:\s*(\d+)")
+
+
+def last_result_line(last_results):
+    """
+    :return: the line before the last newline of a 'last results' text, as last_results.split('\\n')[-2],
+             without splitting the whole text
+    """
+    if not last_results:
+        return ""
+    end = last_results.rfind('\n')
+    if end == -1:
+        return last_results
+    return last_results[last_results.rfind('\n', 0, end) + 1:end]
+
+
+class PingResultParser:
+    """
+    Incremental parser of one ping generic endpoint's 'last results' text.
+
+    Every poll returns the whole text again. feed() walks it backwards from the end and stops at
+    the newest line it has already consumed, so each poll only parses the new lines. RTTs are kept
+    in a numpy array indexed by icmp_seq that doubles when it is full, and as the {seq: rtt} dict
+    the report uses. Sequences without a reply are filled in when a later reply arrives: 0 if the
+    endpoint's drop counter says the packet was dropped, Missing_Rtt otherwise.
+    """
+    Missing_Rtt = 0.11
+    Dropped_Rtt = 0
+
+    def __init__(self, capacity=1024):
+        self.values = np.full(capacity, np.nan)
+        self.rtts = {}              # icmp_seq -> rtt, result_json[station]['rtts']
+        self.last_seq = 0           # sequence of the newest line consumed
+        self.max_seq = 0
+        self.drop_count = 0         # endpoint drop counter at last_seq
+        self.dropped = 0
+        self.received = 0           # sequences with a reply
+        self.replies = 0            # replies parsed, a restarted endpoint repeats sequences
+        self.rtt_sum = 0.0
+        self.rtt_min = None
+        self.rtt_max = None
+        self.restarts = 0
+
+    def new_results(self, last_results):
+        """
+        :return: list of (seq, rtt, drop counter) of the lines after the last consumed one, oldest first
+        """
+        new_results = []
+        end = len(last_results)
+        newer_seq = None
+        while end > 0:
+            start = last_results.rfind('\n', 0, end) + 1
+            match = ping_result_regex.search(last_results, start, end)
+            end = start - 1
+            if match is None:
+                continue
+            seq = int(match.group(1))
+            if newer_seq is None and seq < self.last_seq:
+                # the endpoint was restarted, ping counts from 1 again
+                self.last_seq = 0
+                self.drop_count = 0
+                self.restarts += 1
+            if seq <= self.last_seq or (newer_seq is not None and seq >= newer_seq):
+                break
+            new_results.append((seq, float(match.group(2)), int(match.group(3))))
+            newer_seq = seq
+        new_results.reverse()
+        return new_results
+
+    def feed(self, last_results):
+        """
+        Consume the new lines of the endpoint's 'last results' text.
+        :return: number of new replies
+        """
+        if not last_results:
+            return 0
+        new_results = self.new_results(last_results)
+        for seq, rtt, drop_count in new_results:
+            self.add(seq, rtt, drop_count)
+        return len(new_results)
+
+    def add(self, seq, rtt, drop_count):
+        if seq >= len(self.values):
+            values = np.full(max(seq + 1, 2 * len(self.values)), np.nan)
+            values[:len(self.values)] = self.values
+            self.values = values
+        new_drops = max(0, drop_count - self.drop_count)
+        self.drop_count = drop_count
+        self.dropped += new_drops
+        if seq > self.max_seq + 1:
+            # sequences without a reply, the last new_drops of them were dropped
+            first_dropped = max(self.max_seq + 1, seq - new_drops)
+            self.values[self.max_seq + 1:first_dropped] = self.Missing_Rtt
+            self.values[first_dropped:seq] = self.Dropped_Rtt
+            for missing_seq in range(self.max_seq + 1, seq):
+                self.rtts[missing_seq] = self.Missing_Rtt if missing_seq < first_dropped else self.Dropped_Rtt
+        if seq > self.max_seq:
+            self.max_seq = seq
+            self.received += 1
+        self.values[seq] = rtt
+        self.rtts[seq] = rtt
+        self.last_seq = seq
+        self.replies += 1
+        self.rtt_sum += rtt
+        self.rtt_min = rtt if self.rtt_min is None else min(self.rtt_min, rtt)
+        self.rtt_max = rtt if self.rtt_max is None else max(self.rtt_max, rtt)
+
+    def rtt_stats(self):
+        """
+        :return: min, avg and max rtt of the replies as strings, '0', '0.0', '0' before the first reply
+        """
+        if self.rtt_min is None:
+            return '0', '0.0', '0'
+        return str(self.rtt_min), str(self.rtt_sum / self.replies), str(self.rtt_max)
+
+    def rtt_array(self):
+        """
+        :return: rtts of icmp_seq 1 .. max_seq, copied from the array
+        """
+        return self.values[1:self.max_seq + 1].copy()
+
 
 class Ping(Realm):
     def __init__(self,
@@ -463,6 +588,9 @@ class Ping(Realm):
     def stop_generic(self):
         self.generic_endps_profile.stop_cx()
         self.stop_time = datetime.now()
+        if self.ui_report_dir:
+            lf_webgui_control.RunningInstanceWatcher.release_test(result_dir=self.ui_report_dir, host=self.host,
+                                                                  test_name=self.ui_report_dir.split("/")[-1])
 
     def log_endpoint_status_change(self, endpoint_name, endpoint_data):
         status = endpoint_data.get('status')
@@ -605,6 +733,19 @@ class Ping(Realm):
         logger.error(f"GET /adb/ still returned no response after waiting {timeout}s.")
         return None
 
+    def update_ping_rtts(self, station_ping_data, last_results, rtt_parser):
+        """
+        Parse the new lines of a ping endpoint's last results into station_ping_data: the rtts by
+        sequence, min/avg/max rtt and, for Android devices, the sent/received/dropped counts.
+        """
+        rtt_parser.feed(last_results)
+        station_ping_data['min_rtt'], station_ping_data['avg_rtt'], station_ping_data['max_rtt'] = rtt_parser.rtt_stats()
+        if station_ping_data['os'] == 'Android':
+            station_ping_data['sent'] = str(rtt_parser.max_seq)
+            station_ping_data['recv'] = str(rtt_parser.received)
+            station_ping_data['dropped'] = str(rtt_parser.max_seq - rtt_parser.received)
+        station_ping_data['rtts'] = rtt_parser.rtts
+
     def generate_remarks(self, station_ping_data):
         remarks = []
 
@@ -885,7 +1026,8 @@ class Ping(Realm):
 
         This function looks for a JSON file that tracks the running status of a test.
         The file is expected to be located in the `Running_instances` directory and
-        named using the pattern: <host>_<test_name>_running.json.
+        named using the pattern: <host>_<test_name>_running.json. It is watched by
+        lf_webgui_control, this only reads the cached status.
 
         Returns:
             bool:
@@ -893,20 +1035,10 @@ class Ping(Realm):
                 False -> If the file does not exist or the status is still "Running".
         """
         test_name = self.ui_report_dir.split("/")[-1]
-
-        file_path = os.path.join(
-            self.ui_report_dir,
-            "../../Running_instances/{}_{}_running.json".format(self.host, test_name))
-
-        if not os.path.exists(file_path):
-            return False
-
-        with open(file_path, 'r') as f:
-            run_status = json.load(f)
-            # Check if 'status' key exists and if the test is no longer running
-            if 'status' in run_status.keys() and run_status["status"] != "Running":
-                logging.info("Test is stopped by the user")
-                return True
+        watcher = lf_webgui_control.RunningInstanceWatcher.for_test(result_dir=self.ui_report_dir, host=self.host, test_name=test_name)
+        if watcher.stopped_by_user():
+            logging.info("Test is stopped by the user")
+            return True
 
         return False
 
@@ -942,12 +1074,8 @@ class Ping(Realm):
             with open(filepath, 'w') as f:
                 json.dump(data, f, indent=4)
 
-        test_name = self.ui_report_dir.split("/")[-1]
-        with open(self.ui_report_dir + '/../../Running_instances/{}_{}_running.json'.format(self.host, test_name), 'r') as f:
-            run_status = json.load(f)
-            if run_status["status"] != "Running":
-                logging.info('Test is stopped by the user')
-                return False
+        if self.check_stop_status():
+            return False
         return True
 
     def set_webUI_stop(self):
@@ -1704,10 +1832,9 @@ class Ping(Realm):
             Devices (RealDevice, optional): Device manager instance for fetching live
                 device metadata (MAC, IP, BSSID, etc.). Defaults to a new RealDevice
                 instance scoped to self.host if not provided.
-            rtts (dict, optional): Pre-initialized dict mapping station -> {seq: rtt}.
-                Overwritten internally at the start of each monitor call.
-            rtts_list (list, optional): Flat list of all RTT values seen so far.
-                Overwritten internally at the start of each monitor call.
+            rtts (dict, optional): Unused, each monitor call starts a PingResultParser
+                per station that keeps the RTTs by sequence.
+            rtts_list (list, optional): Unused, the parsers keep the RTT statistics.
             ping_stats (dict, optional): Dict mapping station -> {sent, received, dropped}
                 lists. Overwritten internally at the start of each monitor call.
             duration (float, optional): Test duration in seconds. Defaults to
@@ -1733,11 +1860,10 @@ class Ping(Realm):
             duration = self.pingduration * 60
         loop_timer = 0
         # logging.info(self.result_json)
-        rtts = {}
-        rtts_list = []
+        # one incremental parser per station, parsing only the new lines of each poll
+        rtt_parsers = {}
         ping_stats = {}
         for station in self.sta_list:
-            rtts[station] = {}
             ping_stats[station] = {
                 'sent': [],
                 'received': [],
@@ -1790,14 +1916,7 @@ class Ping(Realm):
                         # logging.info(current_device_data)
                         if station in result_data['name']:
                             # logging.info(result_data['last results'].split('\n'))
-                            if len(result_data['last results']) != 0:
-                                result = result_data['last results'].split('\n')
-                                if len(result) > 1:
-                                    last_result = result[-2]
-                                else:
-                                    last_result = result[-1]
-                            else:
-                                last_result = ""
+                            last_result = last_result_line(result_data['last results'])
 
                             hw_version = current_device_data['hw version']
                             if "Win" in hw_version:
@@ -1829,69 +1948,8 @@ class Ping(Realm):
                             ping_stats[station]['received'].append(result_data['rx pkts'])
                             ping_stats[station]['dropped'].append(result_data['dropped'])
                             self.result_json[station]['ping_stats'] = ping_stats[station]
-                            if len(result_data['last results']) != 0:
-                                temp_last_results = result_data['last results'].split('\n')[0: len(result_data['last results']) - 1]
-                                drop_count = 0  # let dropped = 0 initially
-                                dropped_packets = []
-                                # sample result - 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms *** drop: 0 (0, 0.000)  rx: 28  fail: 0  bytes: 1792 min/avg/max: 2.160/3.422/5.190
-                                for result in temp_last_results:
-                                    try:
-                                        # fetching the first part of the last result e.g., 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms into t_result and the remaining part into t_fail
-                                        t_result, t_fail = result.split('***')
-                                    except Exception:
-                                        continue
-                                    t_result = t_result.split()
-                                    seq_number = None
-                                    rtt = None
-                                    if 'icmp_seq=' not in result or 'time=' not in result:
-                                        continue
-                                    for t_data in t_result:
-                                        if 'icmp_seq=' in t_data:
-                                            seq_number = int(t_data.strip('icmp_seq='))
-                                        if 'time=' in t_data:
-                                            rtt = float(t_data.strip('time='))
-                                    if seq_number is None or rtt is None:
-                                        logger.error(f"missing  keys | t_result: {t_result} | full result: {result}")
-                                        continue
-                                    rtts[station][seq_number] = rtt
-                                    rtts_list.append(rtt)
-
-                                    # finding dropped packets
-                                    t_fail = t_fail.split()  # [' drop:', '0', '(0, 0.000)', 'rx:', '28', 'fail:', '0', 'bytes:', '1792', 'min/avg/max:', '2.160/3.422/5.190']
-                                    t_drop_val = t_fail[1]  # t_drop_val = '0'
-                                    t_drop_val = int(t_drop_val)  # type cast string to int
-                                    if t_drop_val != drop_count:
-                                        current_drop_packets = t_drop_val - drop_count
-                                        drop_count = t_drop_val
-                                        for drop_packet in range(1, current_drop_packets + 1):
-                                            dropped_packets.append(seq_number - drop_packet)
-
-                            if rtts_list == []:
-                                rtts_list = [0]
-                            min_rtt = str(min(rtts_list))
-                            avg_rtt = str(sum(rtts_list) / len(rtts_list))
-                            max_rtt = str(max(rtts_list))
-                            self.result_json[station]['min_rtt'] = min_rtt
-                            self.result_json[station]['avg_rtt'] = avg_rtt
-                            self.result_json[station]['max_rtt'] = max_rtt
-                            if self.result_json[station]['os'] == 'Android' and isinstance(rtts, dict) and rtts != {}:
-                                if list(rtts[station].keys()) == []:
-                                    self.result_json[station]['sent'] = str(0)
-                                    self.result_json[station]['recv'] = str(0)
-                                    self.result_json[station]['dropped'] = str(0)
-                                else:
-                                    self.result_json[station]['sent'] = str(max(list(rtts[station].keys())))
-                                    self.result_json[station]['recv'] = str(len(rtts[station].keys()))
-                                    self.result_json[station]['dropped'] = str(int(self.result_json[station]['sent']) - int(self.result_json[station]['recv']))
-                            if len(rtts[station].keys()) != 0:
-                                required_sequence_numbers = list(range(1, max(rtts[station].keys())))
-                                for seq in required_sequence_numbers:
-                                    if seq not in rtts[station].keys():
-                                        if seq in dropped_packets:
-                                            rtts[station][seq] = 0
-                                        else:
-                                            rtts[station][seq] = 0.11
-                            self.result_json[station]['rtts'] = rtts[station]
+                            self.update_ping_rtts(self.result_json[station], result_data['last results'],
+                                                  rtt_parsers.setdefault(station, PingResultParser()))
                             self.result_json[station]['remarks'] = self.generate_remarks(self.result_json[station])
 
                 else:
@@ -1914,14 +1972,7 @@ class Ping(Realm):
                                 logger.info("Excluding {} from report as there is no valid generic endpoint creation during the test(UNKNOWN CX)".format(device_id))
                                 continue
                             if station in ping_endp:
-                                if len(ping_data['last results']) != 0:
-                                    result = ping_data['last results'].split('\n')
-                                    if len(result) > 1:
-                                        last_result = result[-2]
-                                    else:
-                                        last_result = result[-1]
-                                else:
-                                    last_result = ""
+                                last_result = last_result_line(ping_data['last results'])
 
                                 hw_version = current_device_data['hw version']
                                 if "Win" in hw_version:
@@ -1953,71 +2004,8 @@ class Ping(Realm):
                                 ping_stats[station]['received'].append(ping_data['rx pkts'])
                                 ping_stats[station]['dropped'].append(ping_data['dropped'])
                                 self.result_json[station]['ping_stats'] = ping_stats[station]
-                                if len(ping_data['last results']) != 0:
-                                    temp_last_results = ping_data['last results'].split('\n')[0: len(ping_data['last results']) - 1]
-                                    drop_count = 0  # let dropped = 0 initially
-                                    dropped_packets = []
-                                    for result in temp_last_results:
-                                        # sample result - 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms *** drop: 0 (0, 0.000)  rx: 28  fail: 0  bytes: 1792 min/avg/max: 2.160/3.422/5.190
-                                        if 'time=' in result:
-                                            try:
-                                                # fetching the first part of the last result e.g., 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms into t_result and the remaining part into t_fail
-                                                t_result, t_fail = result.split('***')
-                                            except Exception:
-                                                continue
-                                            t_result = t_result.split()
-                                            seq_number = None
-                                            rtt = None
-                                            if 'icmp_seq=' not in result and 'time=' not in result:
-                                                continue
-                                            for t_data in t_result:
-                                                if 'icmp_seq=' in t_data:
-                                                    seq_number = int(t_data.strip('icmp_seq='))
-                                                if 'time=' in t_data:
-                                                    rtt = float(t_data.strip('time='))
-                                            if seq_number is None or rtt is None:
-                                                logger.error(f"missing variables | t_result: {t_result} | full result: {result}")
-                                                continue
-                                            rtts[station][seq_number] = rtt
-                                            rtts_list.append(rtt)
-
-                                            # finding dropped packets
-                                            t_fail = t_fail.split()  # [' drop:', '0', '(0, 0.000)', 'rx:', '28', 'fail:', '0', 'bytes:', '1792', 'min/avg/max:', '2.160/3.422/5.190']
-                                            t_drop_val = t_fail[1]  # t_drop_val = '0'
-                                            t_drop_val = int(t_drop_val)  # type cast string to int
-                                            if t_drop_val != drop_count:
-                                                current_drop_packets = t_drop_val - drop_count
-                                                drop_count = t_drop_val
-                                                for drop_packet in range(1, current_drop_packets + 1):
-                                                    dropped_packets.append(seq_number - drop_packet)
-
-                                if rtts_list == []:
-                                    rtts_list = [0]
-                                min_rtt = str(min(rtts_list))
-                                avg_rtt = str(sum(rtts_list) / len(rtts_list))
-                                max_rtt = str(max(rtts_list))
-                                self.result_json[station]['min_rtt'] = min_rtt
-                                self.result_json[station]['avg_rtt'] = avg_rtt
-                                self.result_json[station]['max_rtt'] = max_rtt
-                                if self.result_json[station]['os'] == 'Android' and isinstance(rtts, dict) and rtts != {}:
-                                    if list(rtts[station].keys()) == []:
-                                        self.result_json[station]['sent'] = str(0)
-                                        self.result_json[station]['recv'] = str(0)
-                                        self.result_json[station]['dropped'] = str(0)
-                                    else:
-                                        self.result_json[station]['sent'] = str(max(list(rtts[station].keys())))
-                                        self.result_json[station]['recv'] = str(len(rtts[station].keys()))
-                                        self.result_json[station]['dropped'] = str(int(self.result_json[station]['sent']) - int(self.result_json[station]['recv']))
-                                if len(rtts[station].keys()) != 0:
-                                    required_sequence_numbers = list(range(1, max(rtts[station].keys())))
-                                    for seq in required_sequence_numbers:
-                                        if seq not in rtts[station].keys():
-                                            if seq in dropped_packets:
-                                                rtts[station][seq] = 0
-                                            else:
-                                                rtts[station][seq] = 0.11
-                                        # print(station, rtts[station])
-                                self.result_json[station]['rtts'] = rtts[station]
+                                self.update_ping_rtts(self.result_json[station], ping_data['last results'],
+                                                      rtt_parsers.setdefault(station, PingResultParser()))
                                 self.result_json[station]['remarks'] = self.generate_remarks(self.result_json[station])
                                 # self.result_json[station]['dropped_packets'] = dropped_packets
 
@@ -3399,11 +3387,10 @@ connectivity problems.
 
     loop_timer = 0
     logging.info(ping.result_json)
-    rtts = {}
-    rtts_list = []
+    # one incremental parser per station, parsing only the new lines of each poll
+    rtt_parsers = {}
     ping_stats = {}
     for station in ping.sta_list:
-        rtts[station] = {}
         ping_stats[station] = {
             'sent': [],
             'received': [],
@@ -3458,63 +3445,14 @@ connectivity problems.
                                 'name': station,
                                 'os': 'Virtual',
                                 'remarks': [],
-                                'last_result': [result_data['last results'].split('\n')[-2] if len(result_data['last results']) != 0 else ""][0]
+                                'last_result': last_result_line(result_data['last results'])
                             }
                             ping_stats[station]['sent'].append(result_data['tx pkts'])
                             ping_stats[station]['received'].append(result_data['rx pkts'])
                             ping_stats[station]['dropped'].append(result_data['dropped'])
                             ping.result_json[station]['ping_stats'] = ping_stats[station]
-                            if len(result_data['last results']) != 0 and 'min/avg/max' in result_data['last results']:
-                                temp_last_results = result_data['last results'].split('\n')[0: len(result_data['last results']) - 1]
-                                drop_count = 0  # let dropped = 0 initially
-                                dropped_packets = []
-                                # sample result - 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms *** drop: 0 (0, 0.000)  rx: 28  fail: 0  bytes: 1792 min/avg/max: 2.160/3.422/5.190
-                                for result in temp_last_results:
-                                    try:
-                                        # fetching the first part of the last result e.g., 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms into t_result and the remaining part into t_fail
-                                        t_result, t_fail = result.split('***')
-                                    except Exception:
-                                        continue
-                                    t_result = t_result.split()
-                                    if 'icmp_seq=' not in result and 'time=' not in result:
-                                        continue
-                                    for t_data in t_result:
-                                        if 'icmp_seq=' in t_data:
-                                            seq_number = int(t_data.strip('icmp_seq='))
-                                        if 'time=' in t_data:
-                                            rtt = float(t_data.strip('time='))
-                                    rtts[station][seq_number] = rtt
-                                    rtts_list.append(rtt)
-
-                                    # finding dropped packets
-                                    t_fail = t_fail.split()  # [' drop:', '0', '(0, 0.000)', 'rx:', '28', 'fail:', '0', 'bytes:', '1792', 'min/avg/max:', '2.160/3.422/5.190']
-                                    t_drop_val = t_fail[1]  # t_drop_val = '0'
-                                    t_drop_val = int(t_drop_val)  # type cast string to int
-                                    if t_drop_val != drop_count:
-                                        current_drop_packets = t_drop_val - drop_count
-                                        drop_count = t_drop_val
-                                        for drop_packet in range(1, current_drop_packets + 1):
-                                            dropped_packets.append(seq_number - drop_packet)
-
-                            if rtts_list == []:
-                                rtts_list = [0]
-                            min_rtt = str(min(rtts_list))
-                            avg_rtt = str(sum(rtts_list) / len(rtts_list))
-                            max_rtt = str(max(rtts_list))
-                            ping.result_json[station]['min_rtt'] = min_rtt
-                            ping.result_json[station]['avg_rtt'] = avg_rtt
-                            ping.result_json[station]['max_rtt'] = max_rtt
-                            if list(rtts[station].keys()) != []:
-                                required_sequence_numbers = list(range(1, max(rtts[station].keys())))
-                                for seq in required_sequence_numbers:
-                                    if seq not in rtts[station].keys():
-                                        if seq in dropped_packets:
-                                            rtts[station][seq] = 0
-                                        else:
-                                            rtts[station][seq] = 0.11
-                            else:
-                                ping.result_json[station]['rtts'] = {}
-                            ping.result_json[station]['rtts'] = rtts[station]
+                            ping.update_ping_rtts(ping.result_json[station], result_data['last results'],
+                                                  rtt_parsers.setdefault(station, PingResultParser()))
                             ping.result_json[station]['remarks'] = ping.generate_remarks(ping.result_json[station])
                             # ping.result_json[station]['dropped_packets'] = dropped_packets
 
@@ -3540,63 +3478,14 @@ connectivity problems.
                                     'name': station,
                                     'os': 'Virtual',
                                     'remarks': [],
-                                    'last_result': [ping_data['last results'].split('\n')[-2] if len(ping_data['last results']) != 0 else ""][0]
+                                    'last_result': last_result_line(ping_data['last results'])
                                 }
                                 ping_stats[station]['sent'].append(ping_data['tx pkts'])
                                 ping_stats[station]['received'].append(ping_data['rx pkts'])
                                 ping_stats[station]['dropped'].append(ping_data['dropped'])
                                 ping.result_json[station]['ping_stats'] = ping_stats[station]
-                                if len(ping_data['last results']) != 0 and 'min/avg/max' in ping_data['last results']:
-                                    temp_last_results = ping_data['last results'].split('\n')[0: len(ping_data['last results']) - 1]
-                                    drop_count = 0  # let dropped = 0 initially
-                                    dropped_packets = []
-                                    # sample result - 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms *** drop: 0 (0, 0.000)  rx: 28  fail: 0  bytes: 1792 min/avg/max: 2.160/3.422/5.190
-                                    for result in temp_last_results:
-                                        try:
-                                            # fetching the first part of the last result e.g., 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms into t_result and the remaining part into t_fail
-                                            t_result, t_fail = result.split('***')
-                                        except Exception:
-                                            continue  # first line of ping result
-                                        t_result = t_result.split()
-                                        if 'icmp_seq=' not in result and 'time=' not in result:
-                                            continue
-                                        for t_data in t_result:
-                                            if 'icmp_seq=' in t_data:
-                                                seq_number = int(t_data.strip('icmp_seq='))
-                                            if 'time=' in t_data:
-                                                rtt = float(t_data.strip('time='))
-                                        rtts[station][seq_number] = rtt
-                                        rtts_list.append(rtt)
-
-                                        # finding dropped packets
-                                        t_fail = t_fail.split()  # [' drop:', '0', '(0, 0.000)', 'rx:', '28', 'fail:', '0', 'bytes:', '1792', 'min/avg/max:', '2.160/3.422/5.190']
-                                        t_drop_val = t_fail[1]  # t_drop_val = '0'
-                                        t_drop_val = int(t_drop_val)  # type cast string to int
-                                        if t_drop_val != drop_count:
-                                            current_drop_packets = t_drop_val - drop_count
-                                            drop_count = t_drop_val
-                                            for drop_packet in range(1, current_drop_packets + 1):
-                                                dropped_packets.append(seq_number - drop_packet)
-
-                                if rtts_list == []:
-                                    rtts_list = [0]
-                                min_rtt = str(min(rtts_list))
-                                avg_rtt = str(sum(rtts_list) / len(rtts_list))
-                                max_rtt = str(max(rtts_list))
-                                ping.result_json[station]['min_rtt'] = min_rtt
-                                ping.result_json[station]['avg_rtt'] = avg_rtt
-                                ping.result_json[station]['max_rtt'] = max_rtt
-                                if list(rtts[station].keys()) != []:
-                                    required_sequence_numbers = list(range(1, max(rtts[station].keys())))
-                                    for seq in required_sequence_numbers:
-                                        if seq not in rtts[station].keys():
-                                            if seq in dropped_packets:
-                                                rtts[station][seq] = 0
-                                            else:
-                                                rtts[station][seq] = 0.11
-                                else:
-                                    ping.result_json[station]['rtts'] = {}
-                                ping.result_json[station]['rtts'] = rtts[station]
+                                ping.update_ping_rtts(ping.result_json[station], ping_data['last results'],
+                                                      rtt_parsers.setdefault(station, PingResultParser()))
                                 ping.result_json[station]['remarks'] = ping.generate_remarks(ping.result_json[station])
                                 # ping.result_json[station]['dropped_packets'] = dropped_packets
 
@@ -3607,14 +3496,7 @@ connectivity problems.
                     # logging.info(current_device_data)
                     if station in result_data['name']:
                         # logging.info(result_data['last results'].split('\n'))
-                        if len(result_data['last results']) != 0:
-                            result = result_data['last results'].split('\n')
-                            if len(result) > 1:
-                                last_result = result[-2]
-                            else:
-                                last_result = result[-1]
-                        else:
-                            last_result = ""
+                        last_result = last_result_line(result_data['last results'])
 
                         hw_version = current_device_data['hw version']
                         if "Win" in hw_version:
@@ -3646,64 +3528,8 @@ connectivity problems.
                         ping_stats[station]['received'].append(result_data['rx pkts'])
                         ping_stats[station]['dropped'].append(result_data['dropped'])
                         ping.result_json[station]['ping_stats'] = ping_stats[station]
-                        if len(result_data['last results']) != 0:
-                            temp_last_results = result_data['last results'].split('\n')[0: len(result_data['last results']) - 1]
-                            drop_count = 0  # let dropped = 0 initially
-                            dropped_packets = []
-                            # sample result - 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms *** drop: 0 (0, 0.000)  rx: 28  fail: 0  bytes: 1792 min/avg/max: 2.160/3.422/5.190
-                            for result in temp_last_results:
-                                try:
-                                    # fetching the first part of the last result e.g., 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms into t_result and the remaining part into t_fail
-                                    t_result, t_fail = result.split('***')
-                                except Exception:
-                                    continue
-                                t_result = t_result.split()
-                                if 'icmp_seq=' not in result and 'time=' not in result:
-                                    continue
-                                for t_data in t_result:
-                                    if 'icmp_seq=' in t_data:
-                                        seq_number = int(t_data.strip('icmp_seq='))
-                                    if 'time=' in t_data:
-                                        rtt = float(t_data.strip('time='))
-                                rtts[station][seq_number] = rtt
-                                rtts_list.append(rtt)
-
-                                # finding dropped packets
-                                t_fail = t_fail.split()  # [' drop:', '0', '(0, 0.000)', 'rx:', '28', 'fail:', '0', 'bytes:', '1792', 'min/avg/max:', '2.160/3.422/5.190']
-                                t_drop_val = t_fail[1]  # t_drop_val = '0'
-                                t_drop_val = int(t_drop_val)  # type cast string to int
-                                if t_drop_val != drop_count:
-                                    current_drop_packets = t_drop_val - drop_count
-                                    drop_count = t_drop_val
-                                    for drop_packet in range(1, current_drop_packets + 1):
-                                        dropped_packets.append(seq_number - drop_packet)
-
-                        if rtts_list == []:
-                            rtts_list = [0]
-                        min_rtt = str(min(rtts_list))
-                        avg_rtt = str(sum(rtts_list) / len(rtts_list))
-                        max_rtt = str(max(rtts_list))
-                        ping.result_json[station]['min_rtt'] = min_rtt
-                        ping.result_json[station]['avg_rtt'] = avg_rtt
-                        ping.result_json[station]['max_rtt'] = max_rtt
-                        if ping.result_json[station]['os'] == 'Android' and isinstance(rtts, dict) and rtts != {}:
-                            if list(rtts[station].keys()) == []:
-                                ping.result_json[station]['sent'] = str(0)
-                                ping.result_json[station]['recv'] = str(0)
-                                ping.result_json[station]['dropped'] = str(0)
-                            else:
-                                ping.result_json[station]['sent'] = str(max(list(rtts[station].keys())))
-                                ping.result_json[station]['recv'] = str(len(rtts[station].keys()))
-                                ping.result_json[station]['dropped'] = str(int(ping.result_json[station]['sent']) - int(ping.result_json[station]['recv']))
-                        if len(rtts[station].keys()) != 0:
-                            required_sequence_numbers = list(range(1, max(rtts[station].keys())))
-                            for seq in required_sequence_numbers:
-                                if seq not in rtts[station].keys():
-                                    if seq in dropped_packets:
-                                        rtts[station][seq] = 0
-                                    else:
-                                        rtts[station][seq] = 0.11
-                        ping.result_json[station]['rtts'] = rtts[station]
+                        ping.update_ping_rtts(ping.result_json[station], result_data['last results'],
+                                              rtt_parsers.setdefault(station, PingResultParser()))
                         ping.result_json[station]['remarks'] = ping.generate_remarks(ping.result_json[station])
 
             else:
@@ -3725,14 +3551,7 @@ connectivity problems.
                             logger.info("Excluding {} from report as there is no valid generic endpoint creation during the test(UNKNOWN CX)".format(device_id))
                             continue
                         if station in ping_endp:
-                            if len(ping_data['last results']) != 0:
-                                result = ping_data['last results'].split('\n')
-                                if len(result) > 1:
-                                    last_result = result[-2]
-                                else:
-                                    last_result = result[-1]
-                            else:
-                                last_result = ""
+                            last_result = last_result_line(ping_data['last results'])
 
                             hw_version = current_device_data['hw version']
                             if "Win" in hw_version:
@@ -3764,66 +3583,8 @@ connectivity problems.
                             ping_stats[station]['received'].append(ping_data['rx pkts'])
                             ping_stats[station]['dropped'].append(ping_data['dropped'])
                             ping.result_json[station]['ping_stats'] = ping_stats[station]
-                            if len(ping_data['last results']) != 0:
-                                temp_last_results = ping_data['last results'].split('\n')[0: len(ping_data['last results']) - 1]
-                                drop_count = 0  # let dropped = 0 initially
-                                dropped_packets = []
-                                for result in temp_last_results:
-                                    # sample result - 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms *** drop: 0 (0, 0.000)  rx: 28  fail: 0  bytes: 1792 min/avg/max: 2.160/3.422/5.190
-                                    if 'time=' in result:
-                                        try:
-                                            # fetching the first part of the last result e.g., 64 bytes from 192.168.1.61: icmp_seq=28 time=3.66 ms into t_result and the remaining part into t_fail
-                                            t_result, t_fail = result.split('***')
-                                        except Exception:
-                                            continue
-                                        t_result = t_result.split()
-                                        if 'icmp_seq=' not in result and 'time=' not in result:
-                                            continue
-                                        for t_data in t_result:
-                                            if 'icmp_seq=' in t_data:
-                                                seq_number = int(t_data.strip('icmp_seq='))
-                                            if 'time=' in t_data:
-                                                rtt = float(t_data.strip('time='))
-                                        rtts[station][seq_number] = rtt
-                                        rtts_list.append(rtt)
-
-                                        # finding dropped packets
-                                        t_fail = t_fail.split()  # [' drop:', '0', '(0, 0.000)', 'rx:', '28', 'fail:', '0', 'bytes:', '1792', 'min/avg/max:', '2.160/3.422/5.190']
-                                        t_drop_val = t_fail[1]  # t_drop_val = '0'
-                                        t_drop_val = int(t_drop_val)  # type cast string to int
-                                        if t_drop_val != drop_count:
-                                            current_drop_packets = t_drop_val - drop_count
-                                            drop_count = t_drop_val
-                                            for drop_packet in range(1, current_drop_packets + 1):
-                                                dropped_packets.append(seq_number - drop_packet)
-
-                            if rtts_list == []:
-                                rtts_list = [0]
-                            min_rtt = str(min(rtts_list))
-                            avg_rtt = str(sum(rtts_list) / len(rtts_list))
-                            max_rtt = str(max(rtts_list))
-                            ping.result_json[station]['min_rtt'] = min_rtt
-                            ping.result_json[station]['avg_rtt'] = avg_rtt
-                            ping.result_json[station]['max_rtt'] = max_rtt
-                            if ping.result_json[station]['os'] == 'Android' and isinstance(rtts, dict) and rtts != {}:
-                                if list(rtts[station].keys()) == []:
-                                    ping.result_json[station]['sent'] = str(0)
-                                    ping.result_json[station]['recv'] = str(0)
-                                    ping.result_json[station]['dropped'] = str(0)
-                                else:
-                                    ping.result_json[station]['sent'] = str(max(list(rtts[station].keys())))
-                                    ping.result_json[station]['recv'] = str(len(rtts[station].keys()))
-                                    ping.result_json[station]['dropped'] = str(int(ping.result_json[station]['sent']) - int(ping.result_json[station]['recv']))
-                            if len(rtts[station].keys()) != 0:
-                                required_sequence_numbers = list(range(1, max(rtts[station].keys())))
-                                for seq in required_sequence_numbers:
-                                    if seq not in rtts[station].keys():
-                                        if seq in dropped_packets:
-                                            rtts[station][seq] = 0
-                                        else:
-                                            rtts[station][seq] = 0.11
-                                    # print(station, rtts[station])
-                            ping.result_json[station]['rtts'] = rtts[station]
+                            ping.update_ping_rtts(ping.result_json[station], ping_data['last results'],
+                                                  rtt_parsers.setdefault(station, PingResultParser()))
                             ping.result_json[station]['remarks'] = ping.generate_remarks(ping.result_json[station])
                             # ping.result_json[station]['dropped_packets'] = dropped_packets
 
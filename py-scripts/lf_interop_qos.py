@@ -141,6 +141,7 @@ logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 # Importing DeviceConfig to apply device configurations for ADB devices and laptops
 DeviceConfig = importlib.import_module("py-scripts.DeviceConfig")
+lf_live_feed = importlib.import_module("py-scripts.lf_live_feed")
 
 iot_scripts_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../local/interop-webGUI/IoT/scripts/"))
 if os.path.exists(iot_scripts_path):
@@ -319,6 +320,8 @@ class ThroughputQOS(Realm):
         self.qos_data = {}
         self.throughput_data = []
         self.band_steering_df = []
+        # WebGUI runtime csv files by path, rows are appended as the run collects them
+        self.webui_feeds = {}
         self.missing_cx_logged = set()
         self.missing_signal_logged = set()
         self.cx_endpoint_lookup_failed_logged = set()
@@ -613,6 +616,8 @@ class ThroughputQOS(Realm):
     def stop(self):
         self.cx_profile.stop_cx()
         self.station_profile.admin_down()
+        if getattr(self, "robot", None) is not None:
+            self.robot.release_test_status()
 
     def pre_cleanup(self):
         # self.cx_profile.cleanup_prefix()
@@ -683,6 +688,14 @@ class ThroughputQOS(Realm):
                 count += 1
             logger.info("cross connections with TOS type created.")
 
+    def webui_feed(self, path):
+        """
+        :return: LiveFeedWriter of a WebGUI runtime csv file, created on first use
+        """
+        if path not in self.webui_feeds:
+            self.webui_feeds[path] = lf_live_feed.LiveFeedWriter(path=path)
+        return self.webui_feeds[path]
+
     def monitor_cx(self):
         """
         This function waits for up to 20 iterations to allow all CXs (connections) to be created.
@@ -864,11 +877,8 @@ class ThroughputQOS(Realm):
         time_break = 0
         # Added background_run to allow the test to continue running, bypassing the duration limit for nile requirement.
         rates_data = defaultdict(list)
-        individual_device_data = {}
+        individual_device_feeds = {}
         cx_list = list(self.cx_profile.created_cx.keys())
-        for cx in cx_list:
-            columns = ['bps rx a', 'bps rx b']
-            individual_device_data[cx] = pd.DataFrame(columns=columns)
         while datetime.now() < end_time or getattr(self, "background_run", None):
             if self.all_devices_stopped:
                 # already gave up on recovery earlier; don't re-run the 40s wait on every
@@ -1170,20 +1180,20 @@ class ThroughputQOS(Realm):
                 self.band_steering_df.append(self.overall[-1])
             if self.dowebgui == "True":
                 if not self.do_bandsteering:
+                    if not individual_device_feeds:
+                        for cx in cx_list:
+                            individual_device_feeds[cx] = lf_live_feed.LiveFeedWriter(path=f"{runtime_dir}/{cx}.csv",
+                                                                                      columns=['bps rx a', 'bps rx b'])
                     for key, value in t_response.items():
-                        row_data = [value[0], value[1]]
-                        individual_device_data[key].loc[len(individual_device_data[key])] = row_data
-                    for port, df in individual_device_data.items():
-                        df.to_csv(f"{runtime_dir}/{port}.csv", index=False)
-                    df1 = pd.DataFrame(self.df_for_webui)
+                        individual_device_feeds[key].append([value[0], value[1]])
+                # only the rows added since the last interval are written
                 if not self.robot_test:
-                    df1.to_csv('{}/overall_throughput.csv'.format(runtime_dir), index=False)
+                    self.webui_feed('{}/overall_throughput.csv'.format(runtime_dir)).sync(self.df_for_webui)
                 else:
                     if self.do_bandsteering:
-                        df1 = pd.DataFrame(self.band_steering_df)
-                        df1.to_csv('{}/overall_throughput.csv'.format(runtime_dir), index=False)
+                        self.webui_feed('{}/overall_throughput.csv'.format(runtime_dir)).sync(self.band_steering_df)
                     else:
-                        df1.to_csv('{}/overall_throughput_{}.csv'.format(runtime_dir, curr_coordinate), index=False)
+                        self.webui_feed('{}/overall_throughput_{}.csv'.format(runtime_dir, curr_coordinate)).sync(self.df_for_webui)
                 with open(runtime_dir + "/../../Running_instances/{}_{}_running.json".format(self.ip, self.test_name), 'r') as file:
                     data = json.load(file)
                     if data["status"] != "Running":
@@ -1258,7 +1268,7 @@ class ThroughputQOS(Realm):
             last_entry["end_time"] = last_entry["timestamp"]
             self.df_for_webui.append(last_entry)
             df1 = pd.DataFrame(self.df_for_webui)
-            df1.to_csv('{}/overall_throughput_{}.csv'.format(runtime_dir, curr_coordinate), index=False)
+            lf_live_feed.write_snapshot('{}/overall_throughput_{}.csv'.format(runtime_dir, curr_coordinate), df1)
 
         # # rx_rate list is calculated
         for index, _key in enumerate(throughput):
@@ -3948,7 +3958,7 @@ LICENSE:    Free to distribute and modify. LANforge systems must be licensed.
             last_entry
         )
         df1 = pd.DataFrame(throughput_qos.df_for_webui)
-        df1.to_csv('{}/overall_throughput.csv'.format(args.result_dir, ), index=False)
+        lf_live_feed.write_snapshot('{}/overall_throughput.csv'.format(args.result_dir, ), df1)
     if args.group_name:
         throughput_qos.generate_report(
             data=data,
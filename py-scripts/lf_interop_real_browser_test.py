@@ -103,6 +103,7 @@ lf_graph = importlib.import_module("py-scripts.lf_graph")
 # Set up logging configuration for the script
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+lf_live_feed = importlib.import_module("py-scripts.lf_live_feed")
 
 
 class RealBrowserTest(Realm):
@@ -811,7 +812,7 @@ class RealBrowserTest(Realm):
 
             # Save data to CSV file based on dowebgui condition
             if self.dowebgui:
-                df1.to_csv('{}/rb_datavalues.csv'.format(self.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/rb_datavalues.csv'.format(self.result_dir), df1)
             else:
                 df1.to_csv(file_path, mode='w', index=False)
 
@@ -996,7 +997,7 @@ class RealBrowserTest(Realm):
         df = pd.DataFrame(self.data)
         # Store final data in CSV file based on dowebgui condition
         if self.dowebgui:
-            df.to_csv('{}/rb_datavalues.csv'.format(self.result_dir), index=False)
+            lf_live_feed.write_snapshot('{}/rb_datavalues.csv'.format(self.result_dir), df)
         else:
             df.to_csv(file_path, mode='w', index=False)
 
@@ -1330,7 +1331,7 @@ class RealBrowserTest(Realm):
                     self.data["status"][i] = "Completed"
             df = pd.DataFrame(self.data)
             if self.dowebgui:
-                df.to_csv('{}/rb_datavalues.csv'.format(self.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/rb_datavalues.csv'.format(self.result_dir), df)
 
 
 def main():
@@ -1842,7 +1843,7 @@ def main():
     # Generate CSV for webGUI results if dowebgui is True
     if args.dowebgui:
         df = pd.DataFrame(obj.data)
-        df.to_csv('{}/rb_datavalues.csv'.format(obj.result_dir), index=False)
+        lf_live_feed.write_snapshot('{}/rb_datavalues.csv'.format(obj.result_dir), df)
 
     # Additional setup for generating reports and post-cleanup
     if obj.resource_ids:
@@ -1929,7 +1930,7 @@ def main():
 
             df1 = pd.DataFrame(obj.data)
             if args.dowebgui:
-                df1.to_csv('{}/rb_datavalues.csv'.format(obj.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/rb_datavalues.csv'.format(obj.result_dir), df1)
                 df1.to_csv(file_path, mode='w', index=False)
             else:
                 df1.to_csv(file_path, mode='w', index=False)
@@ -1954,7 +1955,7 @@ def main():
         obj.data_for_webui["end_time_webGUI"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         obj.data_for_webui["remaining_time_webGUI"] = "0"
         df1 = pd.DataFrame(obj.data_for_webui)
-        df1.to_csv('{}/rb_datavalues.csv'.format(obj.result_dir), index=False)
+        lf_live_feed.write_snapshot('{}/rb_datavalues.csv'.format(obj.result_dir), df1)
 
 
 if __name__ == '__main__':
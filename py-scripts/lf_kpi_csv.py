@@ -7,6 +7,12 @@ PURPOSE:
 Common Library for generating kpi csv for LANforge output
 KPI - Key Performance Indicators
 
+Rows are buffered and written every _kpi_flush_rows rows or _kpi_flush_sec seconds, at exit
+and on SIGTERM / SIGHUP. Long running tests can rotate kpi.csv by size (_kpi_max_bytes) and
+write a numpy .npz sidecar per file (_kpi_sidecar) that read_kpi_csv() loads without parsing
+the csv, lf_qa.py reads kpi.csv that way. A file that grows past _kpi_sidecar_max_rows rows
+gets no sidecar and is read by parsing the csv.
+
 SETUP:
 None
 
@@ -21,11 +27,21 @@ INCLUDE_IN_README
 """
 # may need pandas if a data frame is passed in
 # import pandas as pd
+import os
+import sys
 import csv
 import time
+import array
+import atexit
+import signal
+import weakref
 import argparse
+import importlib
+import threading
 import traceback
 
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+
 '''
 Note teh delimiter for the kpi.csv is a tab
 
@@ -51,6 +67,199 @@ A blank entry is a valid entry in some cases.
 '''
 
 
+# Writers that are still open, flushed on SIGTERM / SIGHUP and closed at exit.
+open_kpi_writers = weakref.WeakSet()
+signal_handlers_installed = False
+previous_signal_handlers = {}
+
+
+def flush_open_kpi_writers():
+    for kpi_writer in list(open_kpi_writers):
+        try:
+            kpi_writer.kpi_csv_flush()
+        except Exception as x:
+            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+
+
+def close_open_kpi_writers():
+    for kpi_writer in list(open_kpi_writers):
+        try:
+            kpi_writer.kpi_csv_close()
+        except Exception as x:
+            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+
+
+def kpi_signal_handler(signum, frame):
+    # only flush, the process may go on after the previous handler and keep writing rows
+    flush_open_kpi_writers()
+    previous = previous_signal_handlers.get(signum)
+    if callable(previous):
+        previous(signum, frame)
+    else:
+        # default action, terminate with the signal
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+
+def install_kpi_signal_handlers():
+    global signal_handlers_installed
+    if signal_handlers_installed:
+        return
+    signal_handlers_installed = True
+    atexit.register(close_open_kpi_writers)
+    # signal handlers can only be set from the main thread
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)
+        if signum is None:
+            continue
+        try:
+            previous = signal.getsignal(signum)
+            # an ignored signal (nohup) stays ignored
+            if previous == signal.SIG_IGN:
+                continue
+            previous_signal_handlers[signum] = previous
+            signal.signal(signum, kpi_signal_handler)
+        except (ValueError, OSError):
+            pass
+
+
+def kpi_na_values():
+    """
+    :return: the strings pd.read_csv() reads as missing values, shared with l3_port_store
+    """
+    return importlib.import_module("py-json.l3_port_store").NA_VALUES
+
+
+def read_kpi_sidecar(kpi_file):
+    """
+    Read the .npz sidecar of a kpi.csv file.
+    :return: DataFrame, or None if there is no sidecar or it does not match the csv file
+    """
+    import numpy as np
+    import pandas as pd
+    sidecar = str(kpi_file) + ".npz"
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        with np.load(sidecar) as npz:
+            if int(npz["__csv_size__"]) != os.path.getsize(kpi_file):
+                return None
+            columns = [str(column) for column in npz["__columns__"]]
+            data = {}
+            for index, column in enumerate(columns):
+                values = npz["c%d" % index]
+                if "u%d" % index in npz.files:
+                    # text column: codes into the distinct values. Let pandas pick the text
+                    # dtype, as read_csv does; blanks and NA strings are missing values
+                    distinct = pd.Series(npz["u%d" % index].tolist())
+                    distinct = distinct.where(~distinct.isin(kpi_na_values()), np.nan)
+                    values = distinct.take(values).reset_index(drop=True)
+                data[column] = values
+    except Exception as x:
+        print("lf_kpi_csv.py: WARNING unable to read {sidecar}: {error}".format(sidecar=sidecar, error=x))
+        return None
+    return pd.DataFrame(data, columns=columns)
+
+
+def read_kpi_csv(kpi_file):
+    """
+    Read a kpi.csv and the segments rotated out of it (kpi.csv.000001, ...) oldest first,
+    from the .npz sidecars where they are current, otherwise by parsing the csv.
+    :return: DataFrame
+    """
+    import glob
+    import pandas as pd
+    kpi_file = str(kpi_file)
+    segments = sorted(segment for segment in glob.glob(glob.escape(kpi_file) + ".*")
+                      if segment[len(kpi_file) + 1:].isdigit())
+    frames = []
+    for segment in segments + [kpi_file]:
+        df = read_kpi_sidecar(segment)
+        if df is None:
+            df = pd.read_csv(segment, sep='\t')
+        frames.append(df)
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+class kpi_byte_counter:
+    """
+    File-like object in front of kpi.csv that counts the bytes written, for rotation by size
+    without kpi_file.tell(), which flushes the buffer.
+    """
+
+    def __init__(self, kpi_file):
+        self.kpi_file = kpi_file
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode('utf-8'))
+        return self.kpi_file.write(text)
+
+
+class kpi_column_store:
+    """
+    Columns of the rows of one kpi.csv segment for the .npz sidecar. Every value is kept as a
+    code into the column's distinct values, the column type (int, float or text) is decided
+    when the sidecar is written.
+    """
+
+    def __init__(self, headers):
+        self.headers = list(headers)
+        self.values = [dict() for _ in self.headers]     # value -> code
+        self.codes = [array.array('i') for _ in self.headers]
+
+    def __len__(self):
+        return len(self.codes[0]) if self.codes else 0
+
+    def append(self, row):
+        for index, header in enumerate(self.headers):
+            value = row.get(header, '')
+            value = '' if value is None else str(value)
+            codes = self.values[index]
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(codes)
+            self.codes[index].append(code)
+
+    @staticmethod
+    def column_arrays(values, codes):
+        """
+        :return: (values, None) for an int or float column, (codes, distinct values) for a text column;
+        blanks and the other strings read_csv reads as missing ('NA', 'nan', ...) are NaN
+        """
+        import numpy as np
+        na_values = kpi_na_values()
+        distinct = list(values)
+        codes = np.frombuffer(codes, dtype=np.int32) if len(codes) else np.zeros(0, dtype=np.int32)
+        try:
+            if all(value not in na_values for value in distinct):
+                return np.array([int(value) for value in distinct], dtype=np.int64)[codes], None
+        except ValueError:
+            pass
+        try:
+            return np.array([float(value) if value not in na_values else np.nan for value in distinct], dtype=np.float64)[codes], None
+        except ValueError:
+            return codes, np.array(distinct, dtype=str)
+
+    def write(self, sidecar, csv_size):
+        import numpy as np
+        arrays = {}
+        for index in range(len(self.headers)):
+            values, distinct = self.column_arrays(self.values[index], self.codes[index])
+            arrays["c%d" % index] = values
+            if distinct is not None:
+                arrays["u%d" % index] = distinct
+        arrays["__columns__"] = np.array(self.headers, dtype=str)
+        arrays["__csv_size__"] = np.array(csv_size, dtype=np.int64)
+        tmp_sidecar = sidecar + ".tmp.npz"
+        np.savez(tmp_sidecar, **arrays)
+        os.replace(tmp_sidecar, sidecar)
+
+
 # NOTE, Passing in _kpi_headers only used for testing.
 # Do Not pass in headers , Please use the defaults
 class lf_kpi_csv:
@@ -66,7 +275,17 @@ class lf_kpi_csv:
                  _kpi_dut_sw_version="SW_VERSION",
                  _kpi_dut_model_num="MODEL_NUM",
                  _kpi_dut_serial_num="SERIAL_NUM",
-                 _kpi_test_id="TEST_ID"
+                 _kpi_test_id="TEST_ID",
+                 # rows are written to disk every _kpi_flush_rows rows or _kpi_flush_sec seconds,
+                 # at exit and on SIGTERM / SIGHUP; 1 flushes every row
+                 _kpi_flush_rows=100,
+                 _kpi_flush_sec=5.0,
+                 # rotate kpi.csv to kpi.csv.000001, ... when it grows past this size, 0 never rotates
+                 _kpi_max_bytes=0,
+                 # also write kpi.csv.npz, the rows as numpy columns, read with read_kpi_csv()
+                 _kpi_sidecar=False,
+                 # rows kept in memory for the sidecar, a larger file is written without one
+                 _kpi_sidecar_max_rows=100000
                  ):
         if _kpi_headers is None:
             _kpi_headers = ['Date', 'test-rig', 'test-tag', 'dut-hw-version', 'dut-sw-version', 'dut-model-num',
@@ -86,6 +305,18 @@ class lf_kpi_csv:
         self.kpi_dut_serial_num = _kpi_dut_serial_num
         self.kpi_test_id = _kpi_test_id
         self.kpi_rows = ""
+        self.kpi_flush_rows = max(1, int(_kpi_flush_rows))
+        self.kpi_flush_sec = _kpi_flush_sec
+        self.kpi_max_bytes = _kpi_max_bytes
+        self.kpi_sidecar = _kpi_sidecar
+        self.kpi_sidecar_max_rows = _kpi_sidecar_max_rows
+        self.kpi_bytes = None
+        self.kpi_unflushed_rows = 0
+        self.kpi_last_flush = time.monotonic()
+        self.kpi_segment = 0
+        self.kpi_columns = None
+        # reentrant: the SIGTERM handler may close the file while the main thread is writing a row
+        self.kpi_lock = threading.RLock()
         try:
             print("self.kpi_path {kpi_path}".format(kpi_path=self.kpi_path))
             print("self.kpi_filename {kpi_filename}".format(kpi_filename=self.kpi_filename))
@@ -94,9 +325,10 @@ class lf_kpi_csv:
             else:
                 kpifile = self.kpi_path + '/' + self.kpi_filename
             print("kpifile {kpifile}".format(kpifile=kpifile))
-            self.kpi_file = open(kpifile, 'w')
-            self.kpi_writer = csv.DictWriter(self.kpi_file, delimiter="\t", fieldnames=self.kpi_headers)
-            self.kpi_writer.writeheader()
+            self.kpi_full_path = kpifile
+            self.kpi_csv_open()
+            install_kpi_signal_handlers()
+            open_kpi_writers.add(self)
         except Exception as x:
             print("lf_kpi_csv.py: {} WARNING unable to open".format(self.kpi_file))
             traceback.print_exception(Exception, x, x.__traceback__, chain=True)
@@ -124,9 +356,101 @@ class lf_kpi_csv:
         self.kpi_dict['Date'] = '{date}'.format(date=round(time.time() * 1000))
         return self.kpi_dict
 
+    def kpi_csv_open(self):
+        self.kpi_file = open(self.kpi_full_path, 'w', buffering=1024 * 1024)
+        self.kpi_bytes = kpi_byte_counter(self.kpi_file)
+        self.kpi_writer = csv.DictWriter(self.kpi_bytes, delimiter="\t", fieldnames=self.kpi_headers)
+        self.kpi_writer.writeheader()
+        if self.kpi_sidecar:
+            self.kpi_columns = kpi_column_store(self.kpi_headers)
+
     def kpi_csv_write_dict(self, kpi_dict):
-        self.kpi_writer.writerow(kpi_dict)
+        with self.kpi_lock:
+            self.kpi_writer.writerow(kpi_dict)
+            if self.kpi_columns is not None:
+                if len(self.kpi_columns) >= self.kpi_sidecar_max_rows:
+                    print("lf_kpi_csv.py: {kpi_file} has more than {rows} rows, writing it without a sidecar".format(
+                        kpi_file=self.kpi_full_path, rows=self.kpi_sidecar_max_rows))
+                    self.kpi_columns = None
+                else:
+                    self.kpi_columns.append(kpi_dict)
+            self.kpi_unflushed_rows += 1
+            if (self.kpi_unflushed_rows >= self.kpi_flush_rows
+                    or time.monotonic() - self.kpi_last_flush >= self.kpi_flush_sec):
+                self._kpi_flush()
+            if self.kpi_max_bytes and self.kpi_bytes.bytes >= self.kpi_max_bytes:
+                self._kpi_rotate()
+
+    def kpi_csv_flush(self):
+        with self.kpi_lock:
+            if self.kpi_file and not self.kpi_file.closed:
+                self._kpi_flush()
+
+    def _kpi_flush(self):
         self.kpi_file.flush()
+        self.kpi_unflushed_rows = 0
+        self.kpi_last_flush = time.monotonic()
+
+    def _kpi_write_sidecar(self):
+        if self.kpi_columns is None:
+            return
+        try:
+            self.kpi_columns.write(self.kpi_full_path + ".npz", os.path.getsize(self.kpi_full_path))
+        except Exception as x:
+            print("lf_kpi_csv.py: WARNING unable to write {kpi_file}.npz".format(kpi_file=self.kpi_full_path))
+            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+
+    def _kpi_rotate(self):
+        self.kpi_file.close()
+        self._kpi_write_sidecar()
+        self.kpi_segment += 1
+        segment = "{kpi_file}.{segment:06d}".format(kpi_file=self.kpi_full_path, segment=self.kpi_segment)
+        os.replace(self.kpi_full_path, segment)
+        if os.path.exists(self.kpi_full_path + ".npz"):
+            os.replace(self.kpi_full_path + ".npz", segment + ".npz")
+        self.kpi_csv_open()
+        self.kpi_unflushed_rows = 0
+
+    def kpi_csv_close(self):
+        """
+        Write the buffered rows and the sidecar and close kpi.csv, called at exit if not called before.
+        """
+        with self.kpi_lock:
+            if not self.kpi_file or self.kpi_file.closed:
+                return
+            self.kpi_file.close()
+            self._kpi_write_sidecar()
+            open_kpi_writers.discard(self)
+
+
+def check_kpi_sidecar(kpi_path=""):
+    """
+    Unit test: write rows with blank and NA values with a sidecar, and compare what the
+    sidecar reads back with pd.read_csv() of the same file.
+    :return: True when the frames are equal
+    """
+    import tempfile
+    import pandas as pd
+    kpi_dir = kpi_path or tempfile.mkdtemp(prefix="lf_kpi_csv_")
+    kpi_csv = lf_kpi_csv(_kpi_path=kpi_dir, _kpi_filename='kpi_sidecar_check.csv', _kpi_sidecar=True)
+    for score, units, subtest in [('1.5', 'NA', '1'), ('NA', 'Mbps', '2'), ('3', 'N/A', ''),
+                                  ('nan', '', '#N/A'), ('', 'null', '5')]:
+        results_dict = kpi_csv.kpi_csv_get_dict_update_time()
+        results_dict['numeric-score'] = score
+        results_dict['Units'] = units
+        results_dict['Subtest-Pass'] = subtest
+        results_dict['Subtest-Fail'] = 'NA'
+        kpi_csv.kpi_csv_write_dict(results_dict)
+    kpi_csv.kpi_csv_close()
+    from_sidecar = read_kpi_sidecar(kpi_csv.kpi_full_path)
+    from_csv = pd.read_csv(kpi_csv.kpi_full_path, sep='\t')
+    try:
+        pd.testing.assert_frame_equal(from_sidecar, from_csv)
+    except AssertionError as x:
+        print("lf_kpi_csv.py: sidecar of {kpi_file} differs from read_csv: {error}".format(kpi_file=kpi_csv.kpi_full_path, error=x))
+        return False
+    print("lf_kpi_csv.py: sidecar of {kpi_file} matches read_csv".format(kpi_file=kpi_csv.kpi_full_path))
+    return True
 
 
 def main():
@@ -196,6 +520,8 @@ Example :
     Units : units used for the numeric-scort
     Graph-Group - For the lf_qa.py dashboard
     '''
+    parser.add_argument('--check_sidecar', default=None, action="store_true",
+                        help='also check that the .npz sidecar reads back like pd.read_csv(), needs numpy and pandas')
     parser.add_argument('--help_summary', default=None, action="store_true", help='Show summary of what this script does')
 
     help_summary = '''\
@@ -253,6 +579,9 @@ The Unit test is used for helping to become familiar with the library
     print("date 2 {date}".format(date=results_dict_2['Date']))
     kpi_csv.kpi_csv_write_dict(results_dict_2)
 
+    if args.check_sidecar and not check_kpi_sidecar(args.local_lf_report_dir):
+        exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+"""
+NAME: lf_live_feed.py
+
+PURPOSE:
+Common Library for the runtime files scripts write for the LANforge WebGUI (--dowebgui).
+
+Scripts used to build a DataFrame of the whole run on every tick and rewrite the csv
+with df.to_csv(), so the cost of a tick grew with the length of the run. LiveFeedWriter
+appends only the new rows, as csv or as NDJSON (one json object per line, for .ndjson
+and .jsonl files), and can keep a small "latest" snapshot file with the last row.
+write_snapshot() replaces a file atomically (temporary file + os.replace), so a reader
+never sees a half written file. LiveFeedTail reads only the rows added since its last
+read, keeping a byte offset.
+
+A csv feed takes its columns from the first row. A later row with new columns rewrites
+the file once with the wider header; LiveFeedTail notices the new header and starts
+over.
+
+SETUP:
+None
+
+EXAMPLE:
+    feed = lf_live_feed.LiveFeedWriter(path="overall_throughput.csv",
+                                       snapshot_path="overall_throughput_latest.json")
+    feed.append({"timestamp": "...", "BE_dl": 1000, "status": "Running"})
+    feed.sync(self.overall)     # or append what a growing list gained since the last call
+
+    tail = lf_live_feed.LiveFeedTail(path="overall_throughput.csv")
+    rows = tail.read()          # rows added since the previous read, as dicts
+
+    lf_live_feed.write_snapshot("ftp_datavalues.csv", df)
+
+COPYRIGHT:
+    Copyright (C) 2020-2026 Candela Technologies Inc
+    License: Free to distribute and modify. LANforge systems must be licensed.
+
+INCLUDE_IN_README
+"""
+import os
+import io
+import csv
+import json
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def feed_format(path):
+    """
+    :return: 'ndjson' for .ndjson and .jsonl files, otherwise 'csv'
+    """
+    return "ndjson" if os.path.splitext(path)[1].lower() in (".ndjson", ".jsonl") else "csv"
+
+
+def write_snapshot(path, data, index=False):
+    """
+    Replace path atomically. A DataFrame is written as csv, anything else as json
+    when path ends in .json, otherwise as csv from a dict or list of dicts.
+    :param path: file to replace
+    :param data: pandas DataFrame, dict or list of dicts
+    :param index: write the DataFrame index
+    """
+    if hasattr(data, "to_csv"):
+        text = data.to_csv(index=index)
+    elif path.endswith(".json"):
+        text = json.dumps(data, default=str)
+    else:
+        rows = [data] if isinstance(data, dict) else list(data)
+        columns = []
+        for row in rows:
+            columns += [key for key in row if key not in columns]
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+        text = buffer.getvalue()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", newline="") as tmp_file:
+            tmp_file.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class LiveFeedWriter:
+    def __init__(self,
+                 path=None,
+                 snapshot_path=None,
+                 columns=None):
+        """
+        :param path: feed file, replaced when the writer is created; .ndjson/.jsonl for NDJSON, otherwise csv
+        :param snapshot_path: optional file rewritten atomically with the last row, json when it ends in .json
+        :param columns: csv columns, default the keys of the first row
+        """
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.format = feed_format(path)
+        self.initial_columns = list(columns) if columns else None
+        self.lock = threading.Lock()
+        self.restart()
+
+    def restart(self):
+        """
+        Empty the feed file, consumers start over at the new header.
+        """
+        self.columns = self.initial_columns
+        self.rows = 0
+        self.synced = None
+        open(self.path, "w").close()
+        if self.columns and self.format == "csv":
+            self._write_header()
+
+    def _write_header(self):
+        with open(self.path, "w", newline="") as feed_file:
+            csv.writer(feed_file).writerow(self.columns)
+
+    def _widen(self, row):
+        """ rewrite the csv file with the new columns of row added to the header """
+        new_columns = self.columns + [key for key in row if key not in self.columns]
+        with open(self.path, newline="") as feed_file:
+            old_rows = list(csv.DictReader(feed_file))
+        self.columns = new_columns
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.columns)
+        writer.writeheader()
+        writer.writerows(old_rows)
+        with open(self.path, "w", newline="") as feed_file:
+            feed_file.write(buffer.getvalue())
+        logger.debug("live feed {path}: columns are now {columns}".format(path=self.path, columns=self.columns))
+
+    def append(self, row=None):
+        """
+        Append one row.
+        :param row: dict of column to value, or a list in column order for csv feeds created with columns
+        """
+        self.append_rows([row])
+
+    def append_rows(self, rows=None):
+        """
+        Append rows with one write and update the snapshot with the last of them.
+        """
+        rows = list(rows or [])
+        if not rows:
+            return
+        with self.lock:
+            buffer = io.StringIO()
+            if self.format == "ndjson":
+                for row in rows:
+                    buffer.write(json.dumps(row, default=str))
+                    buffer.write("\n")
+            else:
+                if self.columns is None:
+                    self.columns = list(rows[0])
+                    self._write_header()
+                for row in rows:
+                    if isinstance(row, dict) and any(key not in self.columns for key in row):
+                        self._widen(row)
+                writer = csv.writer(buffer)
+                for row in rows:
+                    if isinstance(row, dict):
+                        writer.writerow([row.get(column, "") for column in self.columns])
+                    else:
+                        writer.writerow(row)
+            with open(self.path, "a", newline="") as feed_file:
+                feed_file.write(buffer.getvalue())
+            self.rows += len(rows)
+            if self.snapshot_path:
+                last = rows[-1]
+                if not isinstance(last, dict):
+                    last = dict(zip(self.columns, last))
+                write_snapshot(self.snapshot_path, last)
+
+    def sync(self, rows=None):
+        """
+        Append the rows of a list that grows through the run and are not in the file yet,
+        like the per-interval dicts a script keeps for its report. Passing a different list
+        than last time, e.g. after the script started a new one, restarts the file with it.
+        """
+        with self.lock:
+            if rows is not self.synced:
+                if self.synced is not None:
+                    self.restart()
+                self.synced = rows
+            new_rows = rows[self.rows:]
+        self.append_rows(new_rows)
+
+    def size(self):
+        """
+        :return: bytes in the feed file, the offset a LiveFeedTail reaches after reading everything
+        """
+        return os.path.getsize(self.path)
+# ~LiveFeedWriter
+
+
+class LiveFeedTail:
+    def __init__(self, path=None, offset=0):
+        """
+        :param path: feed file written by a LiveFeedWriter
+        :param offset: byte offset to start reading at, 0 for the first row
+        """
+        self.path = path
+        self.format = feed_format(path)
+        self.offset = offset
+        self.header = None
+
+    def read(self):
+        """
+        :return: list of dicts, the complete rows added since the previous read
+        """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as feed_file:
+            if self.format == "csv":
+                header_line = feed_file.readline()
+                if not header_line.endswith(b"\n"):
+                    return []
+                if header_line != self.header or os.path.getsize(self.path) < self.offset:
+                    # new file or new columns, read it from the start
+                    self.header = header_line
+                    self.offset = len(header_line)
+            elif os.path.getsize(self.path) < self.offset:
+                self.offset = 0
+            feed_file.seek(self.offset)
+            data = feed_file.read()
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return []
+        self.offset += end
+        text = data[:end].decode("utf-8")
+        if self.format == "ndjson":
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        columns = next(csv.reader([self.header.decode("utf-8")]))
+        return [dict(zip(columns, values)) for values in csv.reader(io.StringIO(text, newline=""))]
+# ~LiveFeedTail
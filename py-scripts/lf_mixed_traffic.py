@@ -142,6 +142,7 @@ lf_report_pdf = importlib.import_module("py-scripts.lf_report")
 lf_cleanup = importlib.import_module("py-scripts.lf_cleanup")
 LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+lf_live_feed = importlib.import_module("py-scripts.lf_live_feed")
 lf_base_interop_profile = importlib.import_module("py-scripts.lf_base_interop_profile")
 
 # importing scripts
@@ -796,7 +797,7 @@ class Mixed_Traffic(Realm):
                                         "remaining_time": ""
                                     })
                     df1 = pd.DataFrame(temp_json)
-                    df1.to_csv('{}/ping_datavalues.csv'.format(self.result_dir), index=False)
+                    lf_live_feed.write_snapshot('{}/ping_datavalues.csv'.format(self.result_dir), df1)
                     try:
                         with open(self.result_dir + "/../../Running_instances/{}_{}_running.json".format(self.host, self.test_name), 'r') as file:
                             data = json.load(file)
@@ -923,7 +924,7 @@ class Mixed_Traffic(Realm):
                                       'end_time': end_time.strftime("%d/%m %I:%M:%S %p"),
                                       "remaining_time": ""})
                 df1 = pd.DataFrame(temp_json)
-                df1.to_csv('{}/ping_datavalues.csv'.format(self.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/ping_datavalues.csv'.format(self.result_dir), df1)
             else:
                 logger.info("Final Result Json For Ping Test: {}".format(result_json))
             if all_bands:
@@ -3026,7 +3027,7 @@ INCLUDE_IN_README: False
                           "mc": "notstarted", "time": datetime.datetime.now().strftime("%Y %d %H:%M:%S"), "status": "running"}
         overall_csv.append(overall_status.copy())
         df1 = pd.DataFrame(overall_csv)
-        df1.to_csv('{}/overall_status.csv'.format(args.result_dir), index=False)
+        lf_live_feed.write_snapshot('{}/overall_status.csv'.format(args.result_dir), df1)
     else:
         overall_path = os.path.join(parent_dir, directory)
     os.mkdir(overall_path)
@@ -3525,7 +3526,7 @@ INCLUDE_IN_README: False
                                     overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                     overall_csv.append(overall_status.copy())
                                     df1 = pd.DataFrame(overall_csv)
-                                    df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                    lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                                     mixed_obj.ping_execution = True
                                     mixed_obj.ping_test(ssid=ssid, password=password, security=security, target=args.target,
                                                         interval=args.ping_interval, all_bands=True)
@@ -3536,7 +3537,7 @@ INCLUDE_IN_README: False
                                 overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                 overall_csv.append(overall_status.copy())
                                 df1 = pd.DataFrame(overall_csv)
-                                df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                             except Exception as e:
                                 logger.info(e)
                         else:
@@ -3555,7 +3556,7 @@ INCLUDE_IN_README: False
                                     overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                     overall_csv.append(overall_status.copy())
                                     df1 = pd.DataFrame(overall_csv)
-                                    df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                    lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                                     mixed_obj.qos_execution = True
                                     mixed_obj.qos_test(ssid=ssid, password=password, security=security, ap_name=args.dut_model,
                                                        upstream=args.upstream_port, tos=args.tos, traffic_type=args.traffic_type,
@@ -3568,7 +3569,7 @@ INCLUDE_IN_README: False
                                 overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                 overall_csv.append(overall_status.copy())
                                 df1 = pd.DataFrame(overall_csv)
-                                df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                             except Exception as e:
                                 logger.info(e)
                         else:
@@ -3589,7 +3590,7 @@ INCLUDE_IN_README: False
                                     overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                     overall_csv.append(overall_status.copy())
                                     df1 = pd.DataFrame(overall_csv)
-                                    df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                    lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                                     mixed_obj.ftp_execution = True
                                     mixed_obj.ftp_test(ssid=ssid, password=password, security=security, bands=Bands,
                                                        directions=args.direction, file_sizes=args.ftp_file_sizes, all_bands=True)
@@ -3600,7 +3601,7 @@ INCLUDE_IN_README: False
                                 overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                 overall_csv.append(overall_status.copy())
                                 df1 = pd.DataFrame(overall_csv)
-                                df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                             except Exception as e:
                                 logger.info(e)
                         else:
@@ -3619,7 +3620,7 @@ INCLUDE_IN_README: False
                                     overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                     overall_csv.append(overall_status.copy())
                                     df1 = pd.DataFrame(overall_csv)
-                                    df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                    lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                                     mixed_obj.http_execution = True
                                     mixed_obj.http_test(ssid=ssid, password=password, security=security,
                                                         http_file_size=args.http_file_size, target_per_ten=args.target_per_ten,
@@ -3631,7 +3632,7 @@ INCLUDE_IN_README: False
                                 overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                 overall_csv.append(overall_status.copy())
                                 df1 = pd.DataFrame(overall_csv)
-                                df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                             except Exception as e:
                                 logger.info(e)
                         else:
@@ -3651,7 +3652,7 @@ INCLUDE_IN_README: False
                                     overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                     overall_csv.append(overall_status.copy())
                                     df1 = pd.DataFrame(overall_csv)
-                                    df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                    lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                                     mixed_obj.mc_execution = True
                                     mixed_obj.multicast_test(endp_types=args.mc_traffic_type, mc_tos=args.mc_tos,
                                                              side_a_min=args.side_a_min_bps, side_b_min=args.side_b_min_bps,
@@ -3664,7 +3665,7 @@ INCLUDE_IN_README: False
                                 overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                                 overall_csv.append(overall_status)
                                 df1 = pd.DataFrame(overall_csv)
-                                df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                                lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                             except Exception as e:
                                 logger.info(e)
                         else:
@@ -3686,7 +3687,7 @@ INCLUDE_IN_README: False
                         overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                         overall_csv.append(overall_status.copy())
                         df1 = pd.DataFrame(overall_csv)
-                        df1.to_csv('{}/overall_status.csv'.format(mixed_obj.result_dir), index=False)
+                        lf_live_feed.write_snapshot('{}/overall_status.csv'.format(mixed_obj.result_dir), df1)
                     except Exception as e:
                         logging.info("Error while wrinting status file for webui", e)
 
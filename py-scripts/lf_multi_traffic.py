@@ -467,6 +467,7 @@ from test_l3 import (                  # noqa: E402
 
 lf_kpi_csv = importlib.import_module("py-scripts.lf_kpi_csv")
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+lf_live_feed = importlib.import_module("py-scripts.lf_live_feed")
 lf_report = importlib.import_module("py-scripts.lf_report")
 lf_report_pdf = importlib.import_module("py-scripts.lf_report")
 
@@ -488,6 +489,7 @@ teams_test = importlib.import_module(
 
 DeviceConfig = importlib.import_module("py-scripts.DeviceConfig")
 realm = importlib.import_module("py-json.realm")
+json_get_cache = importlib.import_module("py-json.LANforge.json_get_cache")
 
 Realm = realm.Realm
 RealBrowserTest = web_browser_test.RealBrowserTest
@@ -648,6 +650,32 @@ class MultiTraffic(Realm):
         self.duration_dict = duration_dict.copy()
         self.start_tests(self.test_map, tests_to_run_series, tests_to_run_parallel, self.duration_dict, self.args, self.args_dict)
 
+    def set_gui_cache(self, args, enabled=True):
+        """
+        Enable or disable the process-wide JsonGetCache for the parallel tests.
+
+        While enabled, the Realm of every test thread shares GUI responses: the same
+        GET within --gui_cache_sec seconds is answered once, and identical requests
+        in flight at the same time are sent once. Tests run as separate processes
+        (rb_test, yt_test, zoom_test, teams_test) each use their own copy of the cache.
+
+        Args:
+            args (argparse.Namespace):
+                Parsed command-line arguments, gui_cache_sec of 0 disables the cache.
+
+            enabled (bool):
+                True before the parallel tests start, False once they have finished.
+
+        Returns:
+            None
+        """
+        cache = json_get_cache.JsonGetCache.get_shared()
+        gui_cache_sec = getattr(args, 'gui_cache_sec', json_get_cache.JsonGetCache.Default_Freshness_Sec)
+        if enabled and gui_cache_sec and gui_cache_sec > 0:
+            cache.enable(freshness_sec=gui_cache_sec)
+        else:
+            cache.disable()
+
     def start_tests(self, test_map, tests_to_run_series, tests_to_run_parallel, duration_dict, args, args_dict):
         """
         Start and manage execution of configured traffic test suites.
@@ -788,7 +816,7 @@ class MultiTraffic(Realm):
                 }
                 self.overall_csv.append(self.overall_status.copy())
                 df1 = pd.DataFrame(self.overall_csv)
-                df1.to_csv(f'{args.result_dir}/overall_status.csv', index=False)
+                lf_live_feed.write_snapshot(f'{args.result_dir}/overall_status.csv', df1)
 
             """
             Execute scheduled test scenarios sequentially and/or in parallel according to priority.
@@ -807,6 +835,7 @@ class MultiTraffic(Realm):
                     time.sleep(10)
 
                 self.current_exec = "parallel"
+                self.set_gui_cache(args, enabled=bool(parallel_threads))
                 for t in parallel_threads:
                     t.start()
 
@@ -814,14 +843,17 @@ class MultiTraffic(Realm):
                 for t in parallel_threads:
                     t.join()
                     self.parallel_index += 1
+                self.set_gui_cache(args, enabled=False)
 
             else:
                 self.current_exec = "parallel"
+                self.set_gui_cache(args, enabled=bool(parallel_threads))
                 for t in parallel_threads:
                     t.start()
 
                 for t in parallel_threads:
                     t.join()
+                self.set_gui_cache(args, enabled=False)
 
                 if series_threads:
                     self.misc_clean_up(layer3=True, layer4=True, generic=True, port_5000=iszoom, port_5002=isyt, port_5003=isrb)
@@ -853,7 +885,7 @@ class MultiTraffic(Realm):
                 self.overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
                 self.overall_csv.append(self.overall_status.copy())
                 df1 = pd.DataFrame(self.overall_csv)
-                df1.to_csv(f'{self.result_dir}/overall_status.csv', index=False)
+                lf_live_feed.write_snapshot(f'{self.result_dir}/overall_status.csv', df1)
             except Exception as e:
                 logging.error(f"Error while writing status file for webui: {e}")
 
@@ -884,7 +916,7 @@ class MultiTraffic(Realm):
                 self.overall_status["current_test_name"] = test_name
                 self.overall_csv.append(self.overall_status.copy())
                 df1 = pd.DataFrame(self.overall_csv)
-                df1.to_csv('{}/overall_status.csv'.format(self.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/overall_status.csv'.format(self.result_dir), df1)
         except Exception:
             logger.info(f"Error while running for webui during {test_name} execution")
         if self.test_stopped:
@@ -905,7 +937,7 @@ class MultiTraffic(Realm):
             self.overall_status["time"] = datetime.datetime.now().strftime("%Y %d %H:%M:%S")
             self.overall_csv.append(self.overall_status.copy())
             df1 = pd.DataFrame(self.overall_csv)
-            df1.to_csv('{}/overall_status.csv'.format(self.result_dir), index=False)
+            lf_live_feed.write_snapshot('{}/overall_status.csv'.format(self.result_dir), df1)
         except Exception as e:
             logger.info(e)
 
@@ -1506,7 +1538,7 @@ class MultiTraffic(Realm):
                             self.overall_status["current_test_name"] = "ping"
                             self.overall_csv.append(self.overall_status.copy())
                             df1 = pd.DataFrame(self.overall_csv)
-                            df1.to_csv('{}/overall_status.csv'.format(self.result_dir), index=False)
+                            lf_live_feed.write_snapshot('{}/overall_status.csv'.format(self.result_dir), df1)
                     except Exception:
                         logger.info("Error while running for webui during ping execution")
                     if self.test_stopped:
@@ -1702,7 +1734,7 @@ class MultiTraffic(Realm):
                         self.overall_status["current_test_name"] = "ping"
                         self.overall_csv.append(self.overall_status.copy())
                         df1 = pd.DataFrame(self.overall_csv)
-                        df1.to_csv('{}/overall_status.csv'.format(self.result_dir), index=False)
+                        lf_live_feed.write_snapshot('{}/overall_status.csv'.format(self.result_dir), df1)
                 except Exception:
                     logger.info("Error while running for webui during ping execution")
                 if self.test_stopped:
@@ -1747,7 +1779,7 @@ class MultiTraffic(Realm):
                                         "remaining_time": ""
                                     })
                     df1 = pd.DataFrame(temp_json)
-                    df1.to_csv('{}/ping_datavalues.csv'.format(self.result_dir), index=False)
+                    lf_live_feed.write_snapshot('{}/ping_datavalues.csv'.format(self.result_dir), df1)
                     time.sleep(3)
             else:
                 time.sleep(ping_duration * 60)
@@ -1899,7 +1931,7 @@ class MultiTraffic(Realm):
                                   'end_time': end_time.strftime("%d/%m %I:%M:%S %p"),
                                   "remaining_time": ""})
             df1 = pd.DataFrame(temp_json)
-            df1.to_csv('{}/ping_datavalues.csv'.format(self.result_dir), index=False)
+            lf_live_feed.write_snapshot('{}/ping_datavalues.csv'.format(self.result_dir), df1)
         if local_lf_report_dir == "":
             # Report generation when groups are specified but no custom report path is provided
             if group_name:
@@ -2516,7 +2548,7 @@ class MultiTraffic(Realm):
             self.http_obj_dict[ce][obj_name]["obj"].data_for_webui["end_time"] = self.http_obj_dict[ce][obj_name]["obj"].data["end_time"]
             self.http_obj_dict[ce][obj_name]["obj"].data_for_webui["remaining_time"] = self.http_obj_dict[ce][obj_name]["obj"].data["remaining_time"]
             df1 = pd.DataFrame(self.http_obj_dict[ce][obj_name]["obj"].data_for_webui)
-            df1.to_csv('{}/http_datavalues.csv'.format(self.http_obj_dict[ce][obj_name]["obj"].result_dir), index=False)
+            lf_live_feed.write_snapshot('{}/http_datavalues.csv'.format(self.http_obj_dict[ce][obj_name]["obj"].result_dir), df1)
 
         self.http_obj_dict[ce][obj_name]["obj"].generate_report(date, num_stations=num_stations,
                                                                 duration=duration, test_setup_info=test_setup_info, dataset=dataset, lis=self.lis,
@@ -2886,7 +2918,7 @@ class MultiTraffic(Realm):
             self.ftp_obj_dict[ce][obj_name]["obj"].data_for_webui["status"] = ["STOPPED"] * len(self.ftp_obj_dict[ce][obj_name]["obj"].url_data)
 
             df1 = pd.DataFrame(self.ftp_obj_dict[ce][obj_name]["obj"].data_for_webui)
-            df1.to_csv('{}/ftp_datavalues.csv'.format(self.ftp_obj_dict[ce][obj_name]["obj"].result_dir), index=False)
+            lf_live_feed.write_snapshot('{}/ftp_datavalues.csv'.format(self.ftp_obj_dict[ce][obj_name]["obj"].result_dir), df1)
             # copying to home directory i.e home/user_name
             # self.ftp_obj_dict[ce][obj_name]["obj"].copy_reports_to_home_dir()
         # Report generation when groups are specified
@@ -3122,7 +3154,7 @@ class MultiTraffic(Realm):
                         'status': 'Stopped'
                     }]
                     )
-                    df1.to_csv('{}/overall_throughput.csv'.format(self.qos_obj_dict[ce][obj_name]["obj"].result_dir), index=False)
+                    lf_live_feed.write_snapshot('{}/overall_throughput.csv'.format(self.qos_obj_dict[ce][obj_name]["obj"].result_dir), df1)
                     raise ValueError("Aborting the test....")
             self.qos_obj_dict[ce][obj_name]["obj"].build()
             self.qos_obj_dict[ce][obj_name]["obj"].monitor_cx()
@@ -3318,7 +3350,7 @@ class MultiTraffic(Realm):
                 last_entry
             )
             df1 = pd.DataFrame(self.qos_obj_dict[ce][obj_name]["obj"].df_for_webui)
-            df1.to_csv('{}/overall_throughput.csv'.format(result_dir, ), index=False)
+            lf_live_feed.write_snapshot('{}/overall_throughput.csv'.format(result_dir, ), df1)
 
             # copying to home directory i.e home/user_name
             self.qos_obj_dict[ce][obj_name]["obj"].copy_reports_to_home_dir()
@@ -9739,17 +9771,16 @@ class MultiTraffic(Realm):
                                 curr_mcast_obj.report = self.overall_report
                                 curr_mcast_obj.get_bandsteering_stats()
                             # empty dictionarys evaluate to false , placing tables in output
-                            if bool(curr_mcast_obj.dl_port_csv_files):
-                                for key, value in curr_mcast_obj.dl_port_csv_files.items():
+                            if curr_mcast_obj.dl_port_store is not None:
+                                for key in curr_mcast_obj.dl_port_store.ports:
+                                    df = curr_mcast_obj.dl_port_store.port_frame(key)
                                     if curr_mcast_obj.csv_data_to_report:
-                                        # read the csv file
                                         self.overall_report.set_table_title("Layer 3 Cx Traffic  {key}".format(key=key))
                                         self.overall_report.build_table_title()
-                                        self.overall_report.set_table_dataframe_from_csv(value.name)
+                                        self.overall_report.set_table_dataframe(df)
                                         self.overall_report.build_table()
 
-                                    # read in column heading and last line
-                                    df = pd.read_csv(value.name)
+                                    # column heading and last line
                                     last_row = df.tail(1)
                                     self.overall_report.set_table_title(
                                         "Layer 3 Cx Traffic Last Reporting Interval {key}".format(key=key))
@@ -12475,6 +12506,12 @@ class MultiTraffic(Realm):
                 self.overall_report.set_custom_html(series_df.to_html(index=False, justify='center'))
                 self.overall_report.build_custom()
                 self.render_each_test(ce="series")
+        gui_cache = json_get_cache.JsonGetCache.get_shared()
+        if gui_cache.metrics()["requests"]:
+            self.overall_report.set_table_title("GUI Query Cache (parallel tests)")
+            self.overall_report.build_table_title()
+            self.overall_report.set_table_dataframe(pd.DataFrame(gui_cache.metrics_table()))
+            self.overall_report.build_table()
         self.overall_report.build_footer()
         html_file = self.overall_report.write_html()
         logging.info(f"Generated HTML report file: {html_file}")
@@ -13340,6 +13377,9 @@ def parse_args(return_parser=False):
                         'Example (real-app only): --parallel_tests zoom_test,rb_test,yt_test,teams_test')
     parser.add_argument('--order_priority', choices=['series', 'parallel'], default='series',
                         help='Which tests to run first: series or parallel')
+    parser.add_argument('--gui_cache_sec', type=float, default=1.0,
+                        help='While parallel tests run, reuse a GUI query response for this many seconds and '
+                        'share identical in-flight queries between tests. 0 disables the cache.')
     parser.add_argument('--test_name', help='Name of the Test')
     parser.add_argument('--dowebgui', help="If true will execute script for webgui", default=False, type=bool)
     parser.add_argument('--result_dir', help="Specify the result dir to store the runtime logs <Do not use in CLI, --used by webui>", default='')
@@ -44,6 +44,7 @@ sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+request_metrics = importlib.import_module("lanforge_client.request_metrics")
 os_name = platform.system()
 # Replace 'path_to_wkhtmltopdf' with the actual path to the wkhtmltopdf executable on your system
 
@@ -70,7 +71,8 @@ class lf_report:
                  _dataframe="",
                  _path_date_time="",
                  _custom_css='custom-example.css',
-                 _allure_report_dir_name="allure-report"):  # this is where the final report is placed.
+                 _allure_report_dir_name="allure-report",  # this is where the final report is placed.
+                 _pdf_renderer=None):
         # other report paths,
 
         # _path is where the directory with the data time will be created
@@ -117,6 +119,14 @@ class lf_report:
         self.footer_html = ""
         self.graph_titles = ""
         self.graph_image = ""
+        # graphs rendered in worker processes, see submit_graph()
+        self.graph_render_queue = None
+        self.pending_graphs = []
+        # pdf_renderer 'wkhtmltopdf' converts the written html with pdfkit, 'native' lays out
+        # pdf_sections in process with lf_report_pdf.py. LF_REPORT_PDF_RENDERER sets the default.
+        self.pdf_renderer = _pdf_renderer if _pdf_renderer else os.environ.get("LF_REPORT_PDF_RENDERER", "wkhtmltopdf")
+        self.pdf_sections = []
+        self.last_pdf_render = None     # (key, pdf file) of the last pdf rendered, see render_pdf()
         self.csv_file_name = ""
         self.html = ""
         self.allure_executor = ""
@@ -213,6 +223,48 @@ class lf_report:
         logger.info("graph_dst_file: {}".format(graph_dst_file))
         shutil.move(graph_src_file, graph_dst_file)
 
+    def submit_graph(self, graph, move_graph_image=True):
+        """
+        Render a graph in a worker process instead of calling its build method, the report
+        writers wait for it. The png name is known right away so the report can refer to it.
+        :param graph: lf_graph graph object, e.g. lf_bar_graph
+        :param move_graph_image: move the png, and the csv if the graph writes one, to the report directory once rendered
+        :return: png file name, as the graph's build method returns it
+        """
+        if self.graph_render_queue is None:
+            lf_graph = importlib.import_module("py-scripts.lf_graph")
+            self.graph_render_queue = lf_graph.lf_graph_render_queue()
+        future = self.graph_render_queue.submit(graph)
+        self.pending_graphs.append((future, move_graph_image, getattr(graph, 'enable_csv', False)))
+        return "%s.png" % graph.graph_image_name
+
+    def wait_for_graphs(self):
+        """
+        Wait for the graphs from submit_graph() and move them into the report directory.
+        """
+        pending_graphs = self.pending_graphs
+        self.pending_graphs = []
+        for future, move_graph_image, enable_csv in pending_graphs:
+            try:
+                graph_image = future.result()
+            except Exception as x:
+                traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+                logger.warning("graph failed to render")
+                continue
+            if not move_graph_image:
+                continue
+            graph_files = [graph_image]
+            if enable_csv:
+                graph_files.append(graph_image[:-len(".png")] + ".csv")
+            for graph_file in graph_files:
+                if os.path.exists(graph_file):
+                    graph_dst_file = str(self.path_date_time) + '/' + str(graph_file)
+                    logger.info("graph_dst_file: {}".format(graph_dst_file))
+                    shutil.move(graph_file, graph_dst_file)
+        if self.graph_render_queue is not None:
+            self.graph_render_queue.shutdown()
+            self.graph_render_queue = None
+
     def move_csv_file(self):
         csv_src_file = str(self.csv_file_name)
         csv_dst_file = str(self.path_date_time) + '/' + str(self.csv_file_name)
@@ -319,6 +371,11 @@ class lf_report:
         self.description = _desc
         self.desc_title = _desc_title
 
+    def set_pdf_renderer(self, _pdf_renderer):
+        if _pdf_renderer not in ("wkhtmltopdf", "native"):
+            raise ValueError("pdf renderer must be 'wkhtmltopdf' or 'native', not [%s]" % _pdf_renderer)
+        self.pdf_renderer = _pdf_renderer
+
     def set_graph_image(self, _graph_image):
         self.graph_image = _graph_image
 
@@ -357,6 +414,7 @@ class lf_report:
         logger.info("Report Location:::{report_location}".format(report_location=self.report_location))
 
     def write_html(self):
+        self.wait_for_graphs()
         if not self.output_html:
             logger.info("no html file name, skipping report generation")
             return
@@ -376,6 +434,7 @@ class lf_report:
         return self.write_output_html
 
     def write_index_html(self):
+        self.wait_for_graphs()
         # LAN-1535 scripting: test_l3.py output masks other output when browsing.
         # consider renaming index.html to readme.html
         # self.write_output_index_html = str(self.path_date_time) + '/' + str("index.html")
@@ -394,6 +453,7 @@ class lf_report:
         return self.write_output_index_html
 
     def write_html_with_timestamp(self):
+        self.wait_for_graphs()
         if not self.output_html:
             logger.info("no html file name, skipping report generation")
             return
@@ -566,38 +626,65 @@ class lf_report:
     # page_size A4, A3, Letter, Legal
     # orientation Portrait , Landscape
     def write_pdf(self, _page_size='A4', _orientation='Portrait'):
+        self.wait_for_graphs()
         # write logic to generate pdf here
         # wget https://github.com/wkhtmltopdf/packaging/releases/download/0.12.6-1/wkhtmltox_0.12.6-1.focal_amd64.deb
         # sudo apt install ./wkhtmltox_0.12.6-1.focal_amd64.deb
         if not self.output_pdf:
             logger.info("write_pdf: no pdf file name, skipping pdf output")
             return
-        options = {"enable-local-file-access": None,
-                   'orientation': _orientation,
-                   'page-size': _page_size}  # prevent error Blocked access to file
         self.write_output_pdf = str(self.path_date_time) + '/' + str(self.output_pdf)
-        if (os_name == "Windows"):
-            path_to_wkhtmltopdf = r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe'
-            config = pdfkit.configuration(wkhtmltopdf=path_to_wkhtmltopdf)
-            pdfkit.from_file(self.write_output_html, self.write_output_pdf, options=options, configuration=config)
-        else:
-            pdfkit.from_file(self.write_output_html, self.write_output_pdf, options=options)
+        self.render_pdf(self.write_output_pdf, _page_size, _orientation)
 
     # https://wkhtmltopdf.org/usage/wkhtmltopdf.txt
     # page_size A4, A3, Letter, Legal
     # orientation Portrait , Landscape
     def write_pdf_with_timestamp(self, _page_size='A4', _orientation='Portrait'):
+        self.wait_for_graphs()
         # write logic to generate pdf here
         # wget https://github.com/wkhtmltopdf/packaging/releases/download/0.12.6-1/wkhtmltox_0.12.6-1.focal_amd64.deb
         # sudo apt install ./wkhtmltox_0.12.6-1.focal_amd64.deb
         if not self.output_pdf:
             logger.info("write_pdf_with_timestamp: no pdf file name, skipping pdf output")
             return
-        options = {"enable-local-file-access": None,
-                   'orientation': _orientation,
-                   'page-size': _page_size}  # prevent error Blocked access to file
         self.write_output_pdf = "{}/{}-{}".format(self.path_date_time, self.date, self.output_pdf)
-        pdfkit.from_file(self.write_output_html, self.write_output_pdf, options=options)
+        self.render_pdf(self.write_output_pdf, _page_size, _orientation)
+
+    def render_pdf(self, output_pdf, _page_size='A4', _orientation='Portrait'):
+        # write_pdf() and write_pdf_with_timestamp() are usually called back to back for the same
+        # report, the second call copies the pdf of the first instead of rendering it again.
+        if self.pdf_renderer == "native":
+            key = ("native", _page_size, _orientation, len(self.pdf_sections), hash(self.html))
+        else:
+            key = ("wkhtmltopdf", _page_size, _orientation, self.write_output_html, hash(self.html))
+        if self.last_pdf_render is not None and self.last_pdf_render[0] == key:
+            rendered_pdf = self.last_pdf_render[1]
+            if os.path.exists(rendered_pdf):
+                if os.path.abspath(rendered_pdf) != os.path.abspath(output_pdf):
+                    shutil.copyfile(rendered_pdf, output_pdf)
+                    logger.info("copied {rendered} to {pdf}".format(rendered=rendered_pdf, pdf=output_pdf))
+                return output_pdf
+
+        if self.pdf_renderer == "native":
+            lf_report_pdf = importlib.import_module("py-scripts.lf_report_pdf")
+            renderer = lf_report_pdf.lf_report_pdf(_sections=self.pdf_sections,
+                                                   _report_dir=self.path_date_time,
+                                                   _page_size=_page_size,
+                                                   _orientation=_orientation,
+                                                   _logo=os.path.join(self.path_date_time, self.logo_file_name))
+            renderer.write(output_pdf)
+        else:
+            options = {"enable-local-file-access": None,
+                       'orientation': _orientation,
+                       'page-size': _page_size}  # prevent error Blocked access to file
+            if (os_name == "Windows"):
+                path_to_wkhtmltopdf = r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe'
+                config = pdfkit.configuration(wkhtmltopdf=path_to_wkhtmltopdf)
+                pdfkit.from_file(self.write_output_html, output_pdf, options=options, configuration=config)
+            else:
+                pdfkit.from_file(self.write_output_html, output_pdf, options=options)
+        self.last_pdf_render = (key, output_pdf)
+        return output_pdf
 
     def get_pdf_path(self):
         pdf_link_path = "{}/{}-{}".format(self.path_date_time, self.date, self.output_pdf)
@@ -674,6 +761,7 @@ class lf_report:
             date=self.date,
         )
         self.html += self.banner_html
+        self.pdf_sections.append(("banner", self.title, self.date))
 
     def build_banner_left(self):
         # NOTE: {{ }} are the ESCAPED curly braces
@@ -699,6 +787,7 @@ class lf_report:
             date=self.date,
         )
         self.html += self.banner_html
+        self.pdf_sections.append(("banner", self.title, self.date))
 
     def build_banner_left_h2_font(self):
         # NOTE: {{ }} are the ESCAPED curly braces
@@ -724,6 +813,7 @@ class lf_report:
             date=self.date,
         )
         self.html += self.banner_html
+        self.pdf_sections.append(("banner", self.title, self.date))
 
     def build_table_title(self):
         self.table_title_html = """
@@ -731,6 +821,7 @@ class lf_report:
                     <h3 align='left'>{title}</h3>
                     """.format(title=self.table_title)
         self.html += self.table_title_html
+        self.pdf_sections.append(("heading", self.table_title, 3))
 
     def start_content_div2(self):
         self.html += "\n<div class='contentDiv2'>\n"
@@ -745,6 +836,7 @@ class lf_report:
             <h3 class='TitleFontPrint'>{text}</h3>\n
         </div>""".format(text=self.text)
         self.html += self.text_html
+        self.pdf_sections.append(("heading", self.text, 3))
 
     def build_text_simple(self):
         # please do not use 'style=' tags unless you cannot override a class
@@ -752,6 +844,7 @@ class lf_report:
             <p align='left' width='900'>{text}</p>
         """.format(text=self.text)
         self.html += self.text_html
+        self.pdf_sections.append(("text", self.text))
 
     def build_date_time(self):
         self.date_time = str(datetime.datetime.now().strftime("%Y-%m-%d-%H-h-%m-m-%S-s")).replace(':', '-')
@@ -782,12 +875,14 @@ class lf_report:
         self.dataframe_html = self.dataframe.to_html(index=False,
                                                      justify='center')  # have the index be able to be passed in.
         self.html += self.dataframe_html
+        self.pdf_sections.append(("table", self.dataframe.copy()))
 
     def pass_failed_build_table(self):
         self.dataframe_html = self.dataframe.style.hide_index(subset=None, level=None, names=False).applymap(
                               self.pass_fail_background).to_html(index=False,
                                                                  justify='center')  # have the index be able to be passed in.
         self.html += self.dataframe_html
+        self.pdf_sections.append(("table", self.dataframe.copy(), True))
 
     def save_csv(self, file_name, save_to_csv_data):
         save_to_csv_data.to_csv(str(self.path_date_time) + "/" + file_name)
@@ -849,8 +944,51 @@ class lf_report:
                             <br>
                             """
         self.html += setup_information
+        self.pdf_sections.append(("table", pd.DataFrame({str(value): list(test_setup_data.keys()),
+                                                         "": [str(test_setup_data[key]) for key in test_setup_data]})))
+
+    def build_request_metrics(self):
+        """
+        When LANforge request instrumentation is on (LF_REQUEST_METRICS), add a table of
+        request latency by url template and write the full metrics with histograms to
+        request_metrics.json and request_metrics.csv in the report directory.
+        build_footer() calls this, it does nothing when instrumentation is off.
+        """
+        metrics = request_metrics.active()
+        if metrics is None:
+            return
+        rows = metrics.summary()
+        if not rows:
+            return
+        dataframe = pd.DataFrame({
+            "Method": [row["method"] for row in rows],
+            "URL": [row["url"] for row in rows],
+            "Requests": [row["requests"] for row in rows],
+            "Errors": [row["errors"] for row in rows],
+            "Retries": [row["retries"] for row in rows],
+            "KB In": [round(row["bytes_in"] / 1024, 1) for row in rows],
+            "KB Out": [round(row["bytes_out"] / 1024, 1) for row in rows],
+            "Mean ms": [round(row["total_ms_mean"], 1) for row in rows],
+            "Max ms": [round(row["total_ms_max"], 1) for row in rows],
+            "Queue ms": [round(row["queue_ms_mean"], 1) for row in rows],
+            "Server ms": [round(row["server_ms_mean"], 1) for row in rows],
+            "Read ms": [round(row["read_ms_mean"], 1) for row in rows],
+            "Decode ms": [round(row["decode_ms_mean"], 1) for row in rows]})
+        title = "LANforge Request Latency"
+        self.html += """
+                    <!-- Table Title-->
+                    <h3 align='left'>{title}</h3>
+                    """.format(title=title)
+        self.html += dataframe.to_html(index=False, justify='center')
+        self.pdf_sections.append(("heading", title, 3))
+        self.pdf_sections.append(("table", dataframe))
+        try:
+            metrics.export(os.path.join(str(self.path_date_time), "request_metrics"))
+        except OSError as e:
+            logger.warning("unable to write request metrics: %s" % e)
 
     def build_footer(self):
+        self.build_request_metrics()
         self.footer_html = """
     <footer class='FooterStyle'>
         <a href="https://www.candelatech.com/"><img
@@ -862,6 +1000,7 @@ class lf_report:
         self.html += self.footer_html
 
     def build_footer_no_png(self):
+        self.build_request_metrics()
         self.footer_html = """
     <footer class='FooterStyle'>
         <p>Generate by Candela Technologies LANforge network testing tool</p>
@@ -911,6 +1050,7 @@ function copyTextToClipboard(ele) {
 
     def build_custom(self):
         self.html += self.custom_html
+        self.pdf_sections.append(("text", self.custom_html))
 
     def build_objective(self):
         self.obj_html = """
@@ -920,6 +1060,8 @@ function copyTextToClipboard(ele) {
             """.format(title=self.obj_title,
                        objective=self.objective)
         self.html += self.obj_html
+        self.pdf_sections.append(("heading", self.obj_title, 3))
+        self.pdf_sections.append(("text", self.objective))
 
     def build_description(self):
         self.obj_html = """
@@ -929,6 +1071,8 @@ function copyTextToClipboard(ele) {
             """.format(title=self.desc_title,
                        description=self.description)
         self.html += self.obj_html
+        self.pdf_sections.append(("heading", self.desc_title, 3))
+        self.pdf_sections.append(("text", self.description))
 
     def build_graph_title(self):
         self.table_graph_html = """
@@ -936,18 +1080,21 @@ function copyTextToClipboard(ele) {
                 <h2 class='TitleFontPrint' style='color:darkgreen;'>{title}</h2>
             """.format(title=self.graph_title)
         self.html += self.table_graph_html
+        self.pdf_sections.append(("heading", self.graph_title, 2, "darkgreen"))
 
     def build_graph(self):
         self.graph_html_obj = """
               <img align='center' style='padding:15px;margin:5px 5px 2em 5px;width:1000px;' src='{image}' border='1' />
             """.format(image=self.graph_image)
         self.html += self.graph_html_obj
+        self.pdf_sections.append(("image", self.graph_image))
 
     def build_graph_without_border(self):
         self.graph_html_obj = """
               <img align='left' style='padding:15px;margin:5px 5px 2em 5px;width:1000px;' src='{image}' border='0' />
             """.format(image=self.graph_image)
         self.html += self.graph_html_obj
+        self.pdf_sections.append(("image", self.graph_image))
 
     def end_content_div(self):
         self.html += "\n</div><!-- end contentDiv -->\n"
@@ -958,18 +1105,22 @@ function copyTextToClipboard(ele) {
                 <h3 class='TitleFontPrint' style='color:darkgreen;'>{title}</h3>
             """.format(title=chart_title)
         self.html += self.chart_title_html
+        self.pdf_sections.append(("heading", chart_title, 3, "darkgreen"))
 
     def build_chart(self, name):
         self.chart_html_obj = """
               <img align='center' style='padding:15px;margin:5px 5px 2em 5px;width:500px;' src='{image}'/>
             """.format(image=name)
         self.html += self.chart_html_obj
+        self.pdf_sections.append(("image", name, 500))
 
     def build_chart_custom(self, name, align='center', padding='15px', margin='5px 5px 2em 5px', width='500px', height='500px'):
         self.chart_html_obj = """
               <img align='{align}' style='padding:{padding};margin:{margin};width:{width};height:{height};'
               src='{image}'/> """.format(image=name, align=align, padding=padding, margin=margin, width=width, height=height)
         self.html += self.chart_html_obj
+        lf_report_pdf = importlib.import_module("py-scripts.lf_report_pdf")
+        self.pdf_sections.append(("image", name, lf_report_pdf.width_to_px(width)))
 
     def build_banner_cover(self):
         # NOTE: {{ }} are the ESCAPED curly braces
@@ -995,6 +1146,7 @@ function copyTextToClipboard(ele) {
             date=self.date,
         )
         self.html += self.banner_html
+        self.pdf_sections.append(("banner", self.title, self.date))
 
 
 # Unit Test
@@ -1013,6 +1165,8 @@ if __name__ == "__main__":
     # the imports with --help
     parser.add_argument('--help_summary', help='Show summary of what this script does', default=None,
                         action="store_true")
+    parser.add_argument('--pdf_renderer', help='wkhtmltopdf or native, default from LF_REPORT_PDF_RENDERER else wkhtmltopdf',
+                        default=None, choices=['wkhtmltopdf', 'native'])
     args = parser.parse_args()
 
     # help summary
@@ -1040,7 +1194,7 @@ if __name__ == "__main__":
         'time_seconds': [23, 78, 22, 19, 45, 22, 25]
     })
 
-    report = lf_report()
+    report = lf_report(_pdf_renderer=args.pdf_renderer)
     report.set_title("Banner Title One")
     report.build_banner()
 
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+NAME: lf_report_pdf.py
+
+PURPOSE:
+
+In-process PDF renderer for lf_report. lf_report records every section it adds to the html
+(banner, headings, text, tables, images) in lf_report.pdf_sections; this module lays those
+sections out on pages and writes them with matplotlib's pdf backend, so no html is parsed
+and wkhtmltopdf is not needed. Tables are drawn from the DataFrames themselves and split
+across pages with the header repeated; images are read from the report directory. Each page
+is written to the file as soon as it is full, memory use does not grow with the report.
+
+Custom html sections are rendered as plain text.
+
+EXAMPLE:
+
+    report.set_pdf_renderer("native")
+    report.write_pdf()
+
+    or for a whole lf_check suite:  export LF_REPORT_PDF_RENDERER=native
+
+LICENSE:
+    Free to distribute and modify. LANforge systems must be licensed.
+    Copyright (C) 2020-2026 Candela Technologies Inc
+"""
+import os
+import re
+import logging
+import textwrap
+from html.parser import HTMLParser
+
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib import image as mpimg
+
+logger = logging.getLogger(__name__)
+
+# page sizes in inches, portrait, as wkhtmltopdf names them
+page_sizes = {
+    "A3": (11.69, 16.54),
+    "A4": (8.27, 11.69),
+    "A5": (5.83, 8.27),
+    "Letter": (8.5, 11.0),
+    "Legal": (8.5, 14.0),
+}
+
+# the html report images are sized for a 1000px wide content area
+html_content_width_px = 1000.0
+
+cell_colors = {"Success": "#4af84a", "Failed": "#ff1300"}
+
+
+class html_text_parser(HTMLParser):
+    block_tags = ("br", "p", "div", "tr", "li", "h1", "h2", "h3", "h4", "h5", "table", "ul", "ol")
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "head"):
+            self.skip += 1
+        elif tag in self.block_tags:
+            self.parts.append("\n")
+        elif tag == "td":
+            self.parts.append("  ")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "head"):
+            self.skip = max(0, self.skip - 1)
+        elif tag in self.block_tags:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    """
+    :return: the text of an html fragment, block elements as line breaks
+    """
+    if html is None:
+        return ""
+    html = str(html)
+    if "<" not in html and "&" not in html:
+        return html.strip()
+    parser = html_text_parser()
+    parser.feed(html)
+    parser.close()
+    lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parser.parts).split("\n")]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def width_to_px(width):
+    """
+    :param width: html image width like 500px, 1000 or 50%
+    :return: width in px of the 1000px content area, None if it can not be parsed
+    """
+    match = re.match(r"\s*([0-9.]+)\s*(px|%)?\s*$", str(width))
+    if not match:
+        return None
+    value = float(match.group(1))
+    if match.group(2) == "%":
+        return value * html_content_width_px / 100.0
+    return value
+
+
+class lf_report_pdf:
+    def __init__(self,
+                 _sections=None,
+                 _report_dir=".",
+                 _page_size="A4",
+                 _orientation="Portrait",
+                 _margin=0.5,
+                 _font_size=9,
+                 _table_font_size=7,
+                 _logo=None,
+                 _footer="Generated by Candela Technologies LANforge network testing tool"):
+        """
+        :param _sections: lf_report.pdf_sections, list of (kind, ...) tuples
+        :param _report_dir: directory relative image paths are found in
+        :param _page_size: A3, A4, A5, Letter or Legal
+        :param _orientation: Portrait or Landscape
+        :param _margin: page margin in inches
+        :param _logo: image drawn on the right of banners, None for no logo
+        :param _footer: text at the bottom of every page
+        """
+        self.sections = _sections if _sections is not None else []
+        self.report_dir = _report_dir
+        if _page_size not in page_sizes:
+            logger.warning("lf_report_pdf: unknown page size {size}, using A4".format(size=_page_size))
+            _page_size = "A4"
+        width, height = page_sizes[_page_size]
+        if str(_orientation).lower() == "landscape":
+            width, height = height, width
+        self.page_width = width
+        self.page_height = height
+        self.margin = _margin
+        self.font_size = _font_size
+        self.table_font_size = _table_font_size
+        self.logo = _logo
+        self.footer = _footer
+        self.content_width = self.page_width - 2 * self.margin
+        self.content_bottom = self.page_height - self.margin - 0.3   # room for the footer
+        self.pdf = None
+        self.figure = None
+        self.cursor = 0.0   # inches from the top of the page
+        self.page_count = 0
+
+    # page handling
+
+    def new_page(self):
+        self.finish_page()
+        self.figure = Figure(figsize=(self.page_width, self.page_height))
+        self.cursor = self.margin
+        self.page_count += 1
+
+    def finish_page(self):
+        if self.figure is None:
+            return
+        if self.footer:
+            self.figure.text(self.margin / self.page_width, self.margin / 2 / self.page_height,
+                             self.footer, fontsize=7, color="gray", va="bottom")
+        self.figure.text(1 - self.margin / self.page_width, self.margin / 2 / self.page_height,
+                         str(self.page_count), fontsize=7, color="gray", ha="right", va="bottom")
+        self.pdf.savefig(self.figure)
+        self.figure = None
+
+    def space_left(self):
+        return self.content_bottom - self.cursor
+
+    def ensure_space(self, height):
+        """ start a new page unless height inches fit, a page that is still empty is kept """
+        if self.figure is None or (height > self.space_left() and self.cursor > self.margin):
+            self.new_page()
+
+    def fx(self, x):
+        return x / self.page_width
+
+    def fy(self, y):
+        return 1.0 - y / self.page_height
+
+    @staticmethod
+    def line_height(font_size):
+        return font_size * 1.35 / 72.0
+
+    def chars_per_line(self, font_size, width=None):
+        width = self.content_width if width is None else width
+        return max(8, int(width * 72.0 / (font_size * 0.55)))
+
+    # sections
+
+    def add_text(self, text, font_size=None, color="black", weight="normal", space_before=0.05, space_after=0.1):
+        font_size = self.font_size if font_size is None else font_size
+        text = html_to_text(text)
+        if not text:
+            return
+        lines = []
+        for paragraph in text.split("\n"):
+            lines.extend(textwrap.wrap(paragraph, self.chars_per_line(font_size)) or [""])
+        line_height = self.line_height(font_size)
+        self.cursor += space_before
+        # a heading is kept with at least one line of what follows it
+        first = line_height * (3 if weight == "bold" else 1)
+        self.ensure_space(first)
+        for line in lines:
+            self.ensure_space(line_height)
+            self.figure.text(self.fx(self.margin), self.fy(self.cursor), line,
+                             fontsize=font_size, color=color, weight=weight, va="top")
+            self.cursor += line_height
+        self.cursor += space_after
+
+    def add_banner(self, title, date):
+        self.ensure_space(1.0)
+        top = self.cursor
+        if self.logo and os.path.exists(self.logo):
+            try:
+                logo = mpimg.imread(self.logo)
+                logo_height = 0.45
+                logo_width = logo_height * logo.shape[1] / logo.shape[0]
+                ax = self.figure.add_axes([self.fx(self.page_width - self.margin - logo_width),
+                                           self.fy(top + logo_height),
+                                           logo_width / self.page_width,
+                                           logo_height / self.page_height])
+                ax.imshow(logo)
+                ax.axis("off")
+            except Exception as x:
+                logger.debug("lf_report_pdf: logo {logo}: {error}".format(logo=self.logo, error=x))
+        self.add_text(title, font_size=18, color="darkgreen", weight="bold", space_before=0, space_after=0.02)
+        self.add_text(date, font_size=9, color="darkgreen", space_before=0, space_after=0)
+        self.cursor = max(self.cursor, top + 0.5) + 0.1
+        self.figure.add_artist(self.rule(self.cursor - 0.05))
+
+    def rule(self, y):
+        return Line2D([self.fx(self.margin), self.fx(self.page_width - self.margin)], [self.fy(y), self.fy(y)],
+                      color="darkgreen", linewidth=0.8)
+
+    def add_image(self, path, width_px=html_content_width_px):
+        if not os.path.isabs(path):
+            path = os.path.join(self.report_dir, path)
+        if not os.path.exists(path):
+            logger.warning("lf_report_pdf: image {path} not found, skipped".format(path=path))
+            return
+        try:
+            data = mpimg.imread(path)
+        except Exception as x:
+            logger.warning("lf_report_pdf: image {path}: {error}, skipped".format(path=path, error=x))
+            return
+        width_px = html_content_width_px if not width_px else width_px
+        width = self.content_width * min(1.0, width_px / html_content_width_px)
+        height = width * data.shape[0] / data.shape[1]
+        max_height = self.content_bottom - self.margin
+        if height > max_height:
+            width = width * max_height / height
+            height = max_height
+        self.ensure_space(height + 0.1)
+        left = self.margin + (self.content_width - width) / 2
+        ax = self.figure.add_axes([self.fx(left), self.fy(self.cursor + height),
+                                   width / self.page_width, height / self.page_height])
+        ax.imshow(data, interpolation="antialiased")
+        ax.axis("off")
+        self.cursor += height + 0.15
+
+    def column_chars(self, header, rows, font_size):
+        """ characters per line of each column, shrunk to fit the page width """
+        widths = []
+        for col, name in enumerate(header):
+            longest = max([len(str(name))] + [len(row[col]) for row in rows]) if rows else len(str(name))
+            widths.append(max(3, min(longest, 40)))
+        available = self.chars_per_line(font_size) - 2 * len(widths)
+        if sum(widths) > available:
+            scale = available / float(sum(widths))
+            widths = [max(3, int(width * scale)) for width in widths]
+        return widths
+
+    def add_table(self, dataframe, color_cells=False):
+        if dataframe is None or not hasattr(dataframe, "columns"):
+            return
+        font_size = self.table_font_size
+        header = [str(col) for col in dataframe.columns]
+        rows = [["" if value is None else str(value) for value in row]
+                for row in dataframe.itertuples(index=False, name=None)]
+        widths = self.column_chars(header, rows, font_size)
+        total = float(sum(widths))
+        col_widths = [width / total for width in widths]
+        line_height = self.line_height(font_size) * 1.1
+        pad = 0.04
+
+        def wrap(row):
+            cells = [textwrap.wrap(cell, width) or [""] for cell, width in zip(row, widths)]
+            return ["\n".join(cell) for cell in cells], max(len(cell) for cell in cells) * line_height + pad
+
+        header_cells, header_height = wrap(header)
+        pending = [wrap(row) for row in rows]
+        while True:
+            self.ensure_space(header_height + (pending[0][1] if pending else 0) + 0.05)
+            page_rows = []
+            height = header_height
+            while pending:
+                if page_rows and height + pending[0][1] > self.space_left():
+                    break
+                row = pending.pop(0)
+                page_rows.append(row)
+                height += row[1]
+            self.draw_table(header_cells, header_height, page_rows, col_widths, height, font_size, color_cells)
+            self.cursor += height + 0.2
+            if not pending:
+                break
+            self.new_page()
+
+    def draw_table(self, header_cells, header_height, page_rows, col_widths, height, font_size, color_cells):
+        ax = self.figure.add_axes([self.fx(self.margin), self.fy(self.cursor + height),
+                                   self.content_width / self.page_width, height / self.page_height])
+        ax.axis("off")
+        table = ax.table(cellText=[cells for cells, _ in page_rows] or None,
+                         colLabels=header_cells,
+                         colWidths=col_widths,
+                         cellLoc="left",
+                         loc="upper left")
+        table.auto_set_font_size(False)
+        table.set_fontsize(font_size)
+        for (row, col), cell in table.get_celld().items():
+            row_height = header_height if row == 0 else page_rows[row - 1][1]
+            cell.set_height(row_height / height)
+            cell.set_linewidth(0.4)
+            cell.PAD = 0.02
+            if row == 0:
+                cell.set_facecolor("#e6e6e6")
+                cell.get_text().set_weight("bold")
+            elif color_cells and cell.get_text().get_text() in cell_colors:
+                cell.set_facecolor(cell_colors[cell.get_text().get_text()])
+
+    def add_section(self, section):
+        kind = section[0]
+        if kind == "banner":
+            self.add_banner(section[1], section[2])
+        elif kind == "heading":
+            sizes = {1: 18, 2: 14, 3: 11, 4: 10}
+            self.add_text(section[1], font_size=sizes.get(section[2], 11), color=section[3] if len(section) > 3 else "black",
+                          weight="bold", space_before=0.1)
+        elif kind == "text":
+            self.add_text(section[1])
+        elif kind == "table":
+            self.add_table(section[1], color_cells=section[2] if len(section) > 2 else False)
+        elif kind == "image":
+            self.add_image(section[1], section[2] if len(section) > 2 else html_content_width_px)
+        elif kind == "page_break":
+            self.new_page()
+        else:
+            logger.debug("lf_report_pdf: unknown section {kind}".format(kind=kind))
+
+    def write(self, output_pdf):
+        """
+        Lay out every section and write the pdf one page at a time.
+        :return: number of pages written
+        """
+        self.page_count = 0
+        self.figure = None
+        with PdfPages(output_pdf) as self.pdf:
+            for section in self.sections:
+                self.add_section(section)
+            if self.figure is None:
+                self.new_page()
+            self.finish_page()
+        self.pdf = None
+        logger.info("lf_report_pdf: wrote {pages} pages to {pdf}".format(pages=self.page_count, pdf=output_pdf))
+        return self.page_count
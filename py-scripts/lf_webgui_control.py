@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+"""
+NAME: lf_webgui_control.py
+
+PURPOSE:
+Common Library for the control file the LANforge WebGUI uses to stop a running test,
+Running_instances/<ip>_<test name>_running.json.
+
+Scripts used to open and json.load() that file on every loop iteration, and noticed a
+stop only when the loop came around to it. RunningInstanceWatcher watches the file from
+a thread, with inotify where the kernel has it and by checking os.stat() every poll_sec
+otherwise, re-reads it only when it changed and keeps the parsed status. Monitor loops
+check an in-memory flag, wait on the stop event instead of sleeping, or register a
+callback that is called on every status change.
+
+Watchers are shared, every caller asking for the same file gets the same watcher.
+Each keeps a thread and an inotify descriptor, so the test that owns the file releases
+its watcher when it finishes; a later lookup starts a new one.
+
+SETUP:
+None
+
+EXAMPLE:
+    watcher = lf_webgui_control.RunningInstanceWatcher.for_test(result_dir=self.result_dir,
+                                                                host=self.host,
+                                                                test_name=self.test_name)
+    while running:
+        ...
+        if watcher.stop_event.wait(timeout=5):      # instead of time.sleep(5)
+            break
+
+    watcher.add_callback(lambda watcher, status: logger.info(status))
+
+COPYRIGHT:
+    Copyright (C) 2020-2026 Candela Technologies Inc
+    License: Free to distribute and modify. LANforge systems must be licensed.
+
+INCLUDE_IN_README
+"""
+import os
+import sys
+import json
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event masks, IN_MODIFY and IN_CREATE are left out so a half written file is not read
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+# status values besides the 'status' field of the file
+MISSING = "missing"
+CORRUPT = "corrupt"
+
+
+def running_instance_path(result_dir=None, host=None, test_name=None):
+    """
+    :return: path of the control file of a test whose results go to result_dir
+    """
+    return os.path.join(result_dir, "../../Running_instances/{}_{}_running.json".format(host, test_name))
+
+
+def inotify_watch(directory):
+    """
+    :return: inotify file descriptor watching directory, or None when inotify is not available
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+class RunningInstanceWatcher:
+    Default_Poll_Sec = 0.5
+    _watchers = {}
+    _watchers_lock = threading.Lock()
+
+    @classmethod
+    def for_file(cls, path=None, poll_sec=Default_Poll_Sec):
+        """
+        :return: the started watcher of path, shared by every caller in the process
+        """
+        path = os.path.abspath(path)
+        with cls._watchers_lock:
+            watcher = cls._watchers.get(path)
+            if watcher is None:
+                watcher = cls._watchers[path] = cls(path=path, poll_sec=poll_sec)
+                watcher.start()
+            return watcher
+
+    @classmethod
+    def for_test(cls, result_dir=None, host=None, test_name=None):
+        """
+        :return: the started watcher of <result_dir>/../../Running_instances/<host>_<test_name>_running.json
+        """
+        return cls.for_file(running_instance_path(result_dir=result_dir, host=host, test_name=test_name))
+
+    @classmethod
+    def release(cls, path=None):
+        """
+        Close the shared watcher of path, if one is running.
+        """
+        path = os.path.abspath(path)
+        with cls._watchers_lock:
+            watcher = cls._watchers.pop(path, None)
+        if watcher is not None:
+            watcher.close()
+
+    @classmethod
+    def release_test(cls, result_dir=None, host=None, test_name=None):
+        """
+        Close the shared watcher for_test() returns for the same arguments, if one is running.
+        """
+        cls.release(running_instance_path(result_dir=result_dir, host=host, test_name=test_name))
+
+    def __init__(self, path=None, poll_sec=Default_Poll_Sec):
+        """
+        :param path: control file to watch
+        :param poll_sec: seconds between os.stat() checks when inotify is not available;
+        with inotify the file is also checked this often in case an event was missed
+        """
+        self.path = path
+        self.poll_sec = poll_sec
+        self.lock = threading.Lock()
+        self.data = None
+        self.status = None
+        self.signature = None
+        self.callbacks = []
+        self.stop_event = threading.Event()
+        self.closed = threading.Event()
+        self.thread = None
+        self.inotify_fd = None
+        self.refresh()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.inotify_fd = inotify_watch(os.path.dirname(self.path))
+        if self.inotify_fd is None:
+            logger.debug("watching {path} by polling every {sec}s".format(path=self.path, sec=self.poll_sec))
+        self.thread = threading.Thread(target=self._watch, name="running_instance_watcher", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.closed.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+        with self._watchers_lock:
+            if self._watchers.get(self.path) is self:
+                del self._watchers[self.path]
+
+    def _watch(self):
+        name = os.fsencode(os.path.basename(self.path))
+        while not self.closed.is_set():
+            if self.inotify_fd is None:
+                self.closed.wait(self.poll_sec)
+            else:
+                readable = select.select([self.inotify_fd], [], [], self.poll_sec)[0]
+                if readable:
+                    events = os.read(self.inotify_fd, 4096)
+                    offset = 0
+                    touched = False
+                    while offset < len(events):
+                        _wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(events, offset)
+                        offset += EVENT_HEADER.size
+                        if events[offset:offset + length].rstrip(b"\0") == name:
+                            touched = True
+                        offset += length
+                    if not touched:
+                        continue
+            self.refresh()
+
+    def refresh(self):
+        """
+        Re-read the file when it changed since the last read.
+        :return: the status
+        """
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        with self.lock:
+            if signature == self.signature and self.status is not None:
+                return self.status
+            self.signature = signature
+            data = None
+            if signature is None:
+                status = MISSING
+            else:
+                try:
+                    with open(self.path, "r") as file:
+                        data = json.load(file)
+                    status = data.get("status") if isinstance(data, dict) else None
+                except FileNotFoundError:
+                    status = MISSING
+                except (ValueError, OSError):
+                    # the GUI may be half way through writing it, the next change re-reads it
+                    status = CORRUPT
+            changed = status != self.status
+            self.data = data
+            self.status = status
+            if self.stopped_by_user():
+                self.stop_event.set()
+            else:
+                self.stop_event.clear()
+            callbacks = list(self.callbacks) if changed else []
+        for callback in callbacks:
+            try:
+                callback(self, status)
+            except Exception as e:
+                logger.error("running instance callback failed: {error}".format(error=e))
+        return status
+
+    def add_callback(self, callback=None):
+        """
+        :param callback: called as callback(watcher, status) from the watcher thread when the status changes
+        """
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def remove_callback(self, callback=None):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def stopped_by_user(self):
+        """
+        :return: True when the file has a status other than "Running"; a missing or unreadable
+        file, or one without a status, is not a stop
+        """
+        return self.status not in (None, MISSING, CORRUPT, "Running")
+
+    def unavailable(self):
+        """
+        :return: True when the file is missing or could not be parsed
+        """
+        return self.status in (MISSING, CORRUPT)
+# ~RunningInstanceWatcher
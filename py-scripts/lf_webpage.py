@@ -134,6 +134,7 @@ PortUtils = realm.PortUtils
 lf_report = importlib.import_module("py-scripts.lf_report")
 lf_graph = importlib.import_module("py-scripts.lf_graph")
 lf_kpi_csv = importlib.import_module("py-scripts.lf_kpi_csv")
+lf_live_feed = importlib.import_module("py-scripts.lf_live_feed")
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 DeviceConfig = importlib.import_module("py-scripts.DeviceConfig")
 
@@ -495,7 +496,7 @@ class HttpDownload(Realm):
                     "url_data": 0
                 }]
                 )
-                df1.to_csv('{}/http_datavalues.csv'.format(self.result_dir), index=False)
+                lf_live_feed.write_snapshot('{}/http_datavalues.csv'.format(self.result_dir), df1)
                 raise ValueError("Aborting the test....")
         return self.port_list, self.devices_list, self.macid_list, config_devices
 
@@ -717,7 +718,7 @@ class HttpDownload(Realm):
                 else:
                     self.robot_data[self.current_coordinate] = self.data
                 if self.dowebgui:
-                    df1.to_csv(f"{self.result_dir}/{self.current_coordinate}_http_datavalues.csv", index=False)
+                    lf_live_feed.write_snapshot(f"{self.result_dir}/{self.current_coordinate}_http_datavalues.csv", df1)
                 else:
                     df1.to_csv(f"{self.current_coordinate}_http_datavalues.csv", index=False)
 
@@ -727,7 +728,7 @@ class HttpDownload(Realm):
         df1 = pd.DataFrame(self.data)
         df1.to_csv("http_datavalues.csv", index=False)
         if self.dowebgui:
-            df1.to_csv(f"{self.result_dir}/{self.current_coordinate}_http_datavalues.csv", index=False)
+            lf_live_feed.write_snapshot(f"{self.result_dir}/{self.current_coordinate}_http_datavalues.csv", df1)
         else:
             df1.to_csv(f"{self.current_coordinate}_http_datavalues.csv", index=False)
 
@@ -1083,9 +1084,10 @@ class HttpDownload(Realm):
                 logger.error("An exception occurred:\n%s", tb_str)
                 exit(1)
             if self.dowebgui:
-                df1.to_csv('{}/http_datavalues.csv'.format(self.result_dir), index=False)
+                # replaced atomically, the WebGUI reads this file while the test runs
+                lf_live_feed.write_snapshot('{}/http_datavalues.csv'.format(self.result_dir), df1)
                 if not self.do_bandsteering and self.robot_test:
-                    df1.to_csv(f"{self.result_dir}/{self.current_coordinate}_http_datavalues.csv", index=False)
+                    lf_live_feed.write_snapshot(f"{self.result_dir}/{self.current_coordinate}_http_datavalues.csv", df1)
             elif self.client_type == 'Real':
                 df1.to_csv("http_datavalues.csv", index=False)
                 # IF ROBOT TEST PERFORMED
@@ -3451,7 +3453,7 @@ times the file is downloaded.
         http.data_for_webui["end_time"] = http.data["end_time"]
         http.data_for_webui["remaining_time"] = http.data["remaining_time"]
         df1 = pd.DataFrame(http.data_for_webui)
-        df1.to_csv('{}/http_datavalues.csv'.format(http.result_dir), index=False)
+        lf_live_feed.write_snapshot('{}/http_datavalues.csv'.format(http.result_dir), df1)
 
     http.generate_report(date, num_stations=args.num_stations,
                          duration=args.duration, test_setup_info=test_setup_info, dataset=dataset, lis=lis,
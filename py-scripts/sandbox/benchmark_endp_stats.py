@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+NAME:       benchmark_endp_stats.py
+
+PURPOSE:    Measure the per-interval cost of L3VariableTime.get_endp_stats_for_port()
+            in test_l3.py as the number of endpoints grows. No LANforge system is
+            needed: each run builds synthetic endpoint records for count/2 stations,
+            each with one connection whose -A endpoint runs on the station and whose
+            -B endpoint runs on the upstream port, then gathers the stats of every
+            station port the way the monitor loop does once per poll.
+              scan    - the previous implementation, kept here as the baseline: every
+                        port scans and pformat()s every endpoint, twice. It is O(ports x
+                        endps), so it is timed on --sample_ports ports and scaled up to
+                        all ports (marked est).
+              indexed - build_endp_port_index() once, then one lookup per port.
+            Both methods are checked to return the same stats for the sampled ports.
+
+EXAMPLE:    ./benchmark_endp_stats.py --counts 100,1000,5000
+
+            endpoints   ports     scan_sec   indexed_sec   speedup
+                  100      50         0.05        0.0004      125x
+                  ...
+"""
+import sys
+import os
+import importlib
+import argparse
+import logging
+import random
+import time
+from pprint import pformat
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit(1)
+
+# repo root for importlib, py-scripts for the plain imports test_l3 makes (lf_graph, lf_base_robo, ...)
+py_scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(py_scripts_dir))
+sys.path.append(py_scripts_dir)
+
+test_l3 = importlib.import_module("py-scripts.test_l3")
+L3VariableTime = test_l3.L3VariableTime
+
+logger = logging.getLogger(__name__)
+
+
+def make_endps(count, seed=1):
+    """ count endpoints for count/2 stations on resource 1, upstream is port 1.1.1 """
+    rand = random.Random(seed)
+    endps = []
+    port_eids = []
+    for sta in range(count // 2):
+        port_id = sta + 2
+        port_eids.append("1.1.%d" % port_id)
+        cx_name = "VT-sta%04d-BE" % sta
+        for side, port in (("-A", port_id), ("-B", 1)):
+            endps.append({
+                "name": cx_name + side,
+                "eid": "1.1.%d.%d" % (port, len(endps) + 1),
+                "delay": rand.randint(100, 5000),
+                "jitter": rand.randint(0, 500),
+                "rx rate": rand.randint(0, 10000000),
+                "rx rate ll": rand.randint(0, 10000000),
+                "rx pkts ll": rand.randint(0, 100000),
+                "rx drop %": rand.random() * 5,
+                "rx bytes": rand.randint(0, 1000000000),
+                "run": True,
+            })
+    return endps, port_eids
+
+
+def scan_endp_stats_for_port(port_eid, endps):
+    """ previous per-port scan of every endpoint, kept here as the baseline """
+    lat = jit = count = 0
+    dl = [0, 0, 0, 0]
+    ul = [0, 0, 0, 0]
+    sta_name = 'no_station'
+    eid = [str(part) for part in port_eid.split(".")]
+    for endp in endps:
+        logging.info(pformat(endp))
+        eid_endp = endp["eid"].split(".")
+        if eid[0] == eid_endp[0] and eid[1] == eid_endp[1] and eid[2] == eid_endp[2]:
+            lat += int(endp['delay'])
+            jit += int(endp['jitter'])
+            sta_name = endp["name"].replace('-A', '')
+            count += 1
+    if count > 1:
+        lat = int(lat / count)
+        jit = int(jit / count)
+    for endp in endps:
+        if sta_name in endp["name"]:
+            totals = dl if endp["name"].endswith("-A") else ul
+            totals[0] += int(endp["rx rate"])
+            totals[1] += int(endp["rx rate ll"])
+            totals[2] += int(endp["rx pkts ll"])
+            totals[3] = round(endp["rx drop %"], 2)
+    return (lat, jit, dl[0], dl[1], dl[2], dl[3], ul[0], ul[1], ul[2], ul[3])
+
+
+def stats_object():
+    """ an L3VariableTime with just enough state for get_endp_stats_for_port() """
+    l3 = L3VariableTime.__new__(L3VariableTime)
+    l3.dowebgui = True
+    l3.debug = False
+    return l3
+
+
+def run(counts, sample_ports):
+    l3 = stats_object()
+    rows = []
+    for count in counts:
+        endps, port_eids = make_endps(count)
+        sample = port_eids[:sample_ports]
+
+        started = time.perf_counter()
+        scan_stats = [scan_endp_stats_for_port(port_eid, endps) for port_eid in sample]
+        scan_sec = (time.perf_counter() - started) * len(port_eids) / max(1, len(sample))
+
+        started = time.perf_counter()
+        endp_index = l3.build_endp_port_index(endps)
+        indexed_stats = [l3.get_endp_stats_for_port(port_eid, endps, endp_index=endp_index)
+                         for port_eid in port_eids]
+        indexed_sec = time.perf_counter() - started
+
+        if scan_stats != indexed_stats[:len(sample)]:
+            logger.error("%d endpoints: scan and indexed stats differ" % count)
+            exit(1)
+        rows.append((count, len(port_eids), scan_sec, len(sample) < len(port_eids), indexed_sec))
+        logger.info("%d endpoints: scan %.4fs indexed %.4fs" % (count, scan_sec, indexed_sec))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="benchmark_endp_stats.py",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Compare per-port endpoint scans with the per-poll endpoint index in test_l3")
+    parser.add_argument("--counts", default="100,1000,5000", help="comma separated endpoint counts")
+    parser.add_argument("--sample_ports", type=int, default=100,
+                        help="ports timed with the scan method, the rest is extrapolated")
+    parser.add_argument("--log_level", default="warning", help="Set logging level: debug | info | warning | error")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING))
+    counts = [int(count) for count in args.counts.split(",") if count.strip()]
+    rows = run(counts, args.sample_ports)
+
+    print("%9s %7s %16s %12s %9s" % ("endpoints", "ports", "scan_sec", "indexed_sec", "speedup"))
+    for count, ports, scan_sec, estimated, indexed_sec in rows:
+        speedup = scan_sec / indexed_sec if indexed_sec > 0 else 0
+        print("%9d %7d %12.4f%s %12.4f %8.0fx" % (count, ports, scan_sec, " est" if estimated else "    ",
+                                                  indexed_sec, speedup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+NAME:       benchmark_graph_render.py
+
+PURPOSE:    Compare rendering the graphs of a report one after another, as the test
+            scripts do at report time, with rendering them in the worker processes of
+            lf_graph.lf_graph_render_queue. No LANforge system is needed: the report is
+            --graphs synthetic bar, horizontal bar, line and stacked graphs sized like
+            the per-station graphs of test_l3.py and lf_interop_throughput.py.
+              serial - each graph's build method, in this process
+              pooled - lf_graph_render_queue with --workers processes, then wait()
+            Both runs write the same png files, the pooled ones are checked to exist.
+            The pool only pays off with more than one cpu; on a single cpu the worker
+            start up makes it slower than serial.
+
+EXAMPLE:    ./benchmark_graph_render.py --graphs 50 --stations 40 --workers 8
+
+            graphs  workers  serial_sec  pooled_sec  speedup
+                50        8         ...         ...      ...
+"""
+import sys
+import os
+import importlib
+import argparse
+import logging
+import random
+import tempfile
+import time
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit(1)
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
+
+lf_graph = importlib.import_module("py-scripts.lf_graph")
+
+logger = logging.getLogger(__name__)
+
+
+def make_graphs(count, stations, prefix, seed=1):
+    """ count graphs cycling through the graph types the test scripts use most """
+    rand = random.Random(seed)
+    names = ["sta%04d" % sta for sta in range(stations)]
+    graphs = []
+    for index in range(count):
+        image_name = "%s_graph_%02d" % (prefix, index)
+        data_set = [[round(rand.uniform(0, 900), 1) for _ in names] for _ in range(2)]
+        kind = index % 4
+        if kind == 0:
+            graph = lf_graph.lf_bar_graph(_data_set=data_set,
+                                          _xaxis_name="Stations",
+                                          _yaxis_name="Throughput (Mbps)",
+                                          _xaxis_categories=names,
+                                          _graph_image_name=image_name,
+                                          _label=["Download", "Upload"],
+                                          _color=None,
+                                          _color_edge='black',
+                                          _figsize=(18, 6),
+                                          _show_bar_value=True,
+                                          _text_font=7,
+                                          _text_rotation=45,
+                                          _xticks_font=7,
+                                          _xticks_rotation=90)
+        elif kind == 1:
+            graph = lf_graph.lf_bar_graph_horizontal(_data_set=data_set,
+                                                     _xaxis_name="Throughput (Mbps)",
+                                                     _yaxis_name="Stations",
+                                                     _yaxis_categories=names,
+                                                     _graph_image_name=image_name,
+                                                     _label=["Download", "Upload"],
+                                                     _color_edge='black',
+                                                     _figsize=(18, len(names) * .35 + 2),
+                                                     _show_bar_value=True,
+                                                     _text_font=7)
+        elif kind == 2:
+            graph = lf_graph.lf_line_graph(_data_set=data_set,
+                                           _xaxis_name="Time (sec)",
+                                           _yaxis_name="Throughput (Mbps)",
+                                           _xaxis_categories=list(range(len(names))),
+                                           _graph_image_name=image_name,
+                                           _label=["Download", "Upload"],
+                                           _figsize=(18, 6))
+        else:
+            graph = lf_graph.lf_stacked_graph(_data_set={name: round(rand.uniform(0, 100), 1) for name in names},
+                                              _xaxis_name="Stations",
+                                              _yaxis_name="Pass %",
+                                              _graph_image_name=image_name,
+                                              _figsize=(18, 6),
+                                              _enable_csv=False,
+                                              _remove_border=True)
+        graphs.append(graph)
+    return graphs
+
+
+def build(graph):
+    return getattr(graph, lf_graph.graph_build_methods[type(graph).__name__])()
+
+
+def run(count, stations, workers):
+    started = time.perf_counter()
+    for graph in make_graphs(count, stations, "serial"):
+        build(graph)
+    serial_sec = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with lf_graph.lf_graph_render_queue(_max_workers=workers) as render_queue:
+        for graph in make_graphs(count, stations, "pooled"):
+            render_queue.submit(graph)
+        png_files = render_queue.wait()
+    pooled_sec = time.perf_counter() - started
+
+    missing = [png_file for png_file in png_files if not os.path.exists(png_file)]
+    if missing:
+        logger.error("pooled render did not write %s" % ", ".join(missing))
+        exit(1)
+    return serial_sec, pooled_sec
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="benchmark_graph_render.py",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Compare serial graph rendering with the lf_graph process pool render queue")
+    parser.add_argument("--graphs", type=int, default=50, help="graphs in the report")
+    parser.add_argument("--stations", type=int, default=40, help="stations, the bars or points per graph")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--dir", default=None, help="directory for the png files, default a temporary directory")
+    parser.add_argument("--log_level", default="warning", help="Set logging level: debug | info | warning | error")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING))
+    out_dir = args.dir if args.dir else tempfile.mkdtemp(prefix="graph_render_")
+    os.makedirs(out_dir, exist_ok=True)
+    os.chdir(out_dir)
+    serial_sec, pooled_sec = run(args.graphs, args.stations, args.workers)
+
+    print("png files in %s" % out_dir)
+    print("%6s %8s %11s %11s %8s" % ("graphs", "workers", "serial_sec", "pooled_sec", "speedup"))
+    speedup = serial_sec / pooled_sec if pooled_sec > 0 else 0
+    print("%6d %8d %11.2f %11.2f %7.1fx" % (args.graphs, args.workers, serial_sec, pooled_sec, speedup))
+
+
+if __name__ == "__main__":
+    main()
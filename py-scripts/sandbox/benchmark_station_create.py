@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+NAME:       benchmark_station_create.py
+
+PURPOSE:    Measure how long it takes to submit station creation commands as the
+            number of stations grows. Each count is run twice:
+              serial  - one add_sta and one set_port request per station with a
+                        10ms pause in between, as StationProfile.create() used to do
+              batched - StationProfile.create(), which queues the commands in a
+                        CommandBatch and pipelines them over keep-alive connections
+            Stations are created admin-down and removed after each run.
+
+EXAMPLE:    ./benchmark_station_create.py --mgr 192.168.100.20 --radio 1.1.wiphy0 \\
+                --ssid test --passwd NA --security open --counts 10,50,100,200
+
+            count   serial_sec   batched_sec   speedup
+               10         0.92          0.21      4.4x
+               ...
+"""
+import sys
+import os
+import importlib
+import argparse
+import logging
+import time
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit(1)
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
+
+lfcli_base = importlib.import_module("py-json.LANforge.lfcli_base")
+LFCliBase = lfcli_base.LFCliBase
+LFRequest = importlib.import_module("py-json.LANforge.LFRequest")
+LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
+realm = importlib.import_module("py-json.realm")
+Realm = realm.Realm
+lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+
+logger = logging.getLogger(__name__)
+
+
+class StationCreateBenchmark(Realm):
+    def __init__(self, host="localhost", port=8080, radio=None, ssid=None, passwd=None,
+                 security="open", prefix="bsta", debug=False):
+        super().__init__(lfclient_host=host, lfclient_port=port, debug_=debug)
+        self.radio = radio
+        self.prefix = prefix
+        self.station_profile = self.new_station_profile()
+        self.station_profile.ssid = ssid
+        self.station_profile.ssid_pass = passwd
+        self.station_profile.security = security
+        self.station_profile.use_security(security, ssid, passwd)
+        self.station_profile.set_command_flag("add_sta", "create_admin_down", 1)
+
+    def station_names(self, count):
+        return LFUtils.port_name_series(prefix=self.prefix,
+                                        start_id=0,
+                                        end_id=count - 1,
+                                        padding_number=10000,
+                                        radio=self.radio)
+
+    def cleanup(self, names):
+        self.station_profile.cleanup(names)
+        LFUtils.wait_until_ports_disappear(base_url=self.lfclient_url, port_list=names, debug=self.debug)
+
+    def create_serial(self, names):
+        """ previous request-per-command behavior, kept here as the baseline """
+        shelf, resource, radio_port, *nil = LFUtils.name_to_eid(self.radio)
+        add_sta_r = LFRequest.LFRequest(self.lfclient_url + "/cli-json/add_sta")
+        set_port_r = LFRequest.LFRequest(self.lfclient_url + "/cli-json/set_port")
+        for name in names:
+            sta = LFUtils.name_to_eid(name)[2]
+            add_sta_data = dict(self.station_profile.add_sta_data)
+            add_sta_data.update({"shelf": shelf, "resource": resource, "radio": radio_port, "sta_name": sta})
+            add_sta_r.addPostData(add_sta_data)
+            add_sta_r.jsonPost()
+            time.sleep(0.01)
+            set_port_data = dict(self.station_profile.set_port_data)
+            set_port_data.update({"shelf": shelf, "resource": resource, "port": sta})
+            set_port_r.addPostData(set_port_data)
+            set_port_r.jsonPost()
+            time.sleep(0.01)
+        return LFUtils.wait_until_ports_appear(self.lfclient_url, names)
+
+    def create_batched(self, names):
+        self.station_profile.station_names = []
+        return self.station_profile.create(radio=self.radio, sta_names_=names, up_=False)
+
+    def run(self, counts):
+        rows = []
+        for count in counts:
+            names = self.station_names(count)
+            self.cleanup(names)
+
+            started = time.monotonic()
+            self.create_serial(names)
+            serial_sec = time.monotonic() - started
+            self.cleanup(names)
+
+            started = time.monotonic()
+            self.create_batched(names)
+            batched_sec = time.monotonic() - started
+            self.cleanup(names)
+
+            rows.append((count, serial_sec, batched_sec))
+            logger.info("%d stations: serial %.2fs batched %.2fs" % (count, serial_sec, batched_sec))
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="benchmark_station_create.py",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Compare serial and batched station creation time vs. station count")
+    parser.add_argument("--mgr", "--lfmgr", default="localhost", help="LANforge manager IP address")
+    parser.add_argument("--mgr_port", "--port", default=8080, help="LANforge JSON API port")
+    parser.add_argument("--radio", required=True, help="parent radio EID, e.g. 1.1.wiphy0")
+    parser.add_argument("--ssid", default="NA")
+    parser.add_argument("--passwd", "--password", default="NA")
+    parser.add_argument("--security", default="open")
+    parser.add_argument("--prefix", default="bsta", help="station name prefix")
+    parser.add_argument("--counts", default="10,50,100", help="comma separated station counts")
+    parser.add_argument("--debug", action="store_true")
+    parser.add_argument("--log_level", default=None, help="Set logging level: debug | info | warning | error | critical")
+    args = parser.parse_args()
+
+    logger_config = lf_logger_config.lf_logger_config()
+    if args.log_level:
+        logger_config.set_level(level=args.log_level)
+
+    bench = StationCreateBenchmark(host=args.mgr,
+                                   port=args.mgr_port,
+                                   radio=args.radio,
+                                   ssid=args.ssid,
+                                   passwd=args.passwd,
+                                   security=args.security,
+                                   prefix=args.prefix,
+                                   debug=args.debug)
+    counts = [int(count) for count in args.counts.split(",") if count.strip()]
+    rows = bench.run(counts)
+
+    print("%7s %12s %13s %9s" % ("count", "serial_sec", "batched_sec", "speedup"))
+    for count, serial_sec, batched_sec in rows:
+        speedup = serial_sec / batched_sec if batched_sec > 0 else 0
+        print("%7d %12.2f %13.2f %8.1fx" % (count, serial_sec, batched_sec, speedup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+NAME:       ws_replay_server.py
+
+PURPOSE:    Stand-in for the LANforge GUI websocket on port 8081. Every client that
+            connects is sent the messages from a recording, one JSON message per line
+            as written by LFEventBus(record_file=...), and is then disconnected.
+            Use it to exercise py-json/ws_event_bus.py, including reconnects and the
+            fallback to HTTP polling, without a GUI.
+
+            Only what LFEventBus needs is implemented: the RFC 6455 handshake and
+            unmasked server text frames. Nothing sent by the client is read.
+
+EXAMPLE:    ./ws_replay_server.py --recording events.ndjson --port 8081 --interval 0.1
+"""
+import sys
+import os
+import argparse
+import base64
+import hashlib
+import logging
+import socketserver
+import struct
+import time
+
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit(1)
+
+logger = logging.getLogger(__name__)
+
+WS_MAGIC = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def text_frame(text):
+    payload = text.encode("utf-8")
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x81, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x81, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x81, 127, length)
+    return header + payload
+
+
+class ReplayHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        key = None
+        while True:
+            line = self.rfile.readline().decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+        if key is None:
+            logger.warning("%s: not a websocket request" % (self.client_address,))
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_MAGIC).encode("ascii")).digest()).decode("ascii")
+        self.wfile.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                          "Upgrade: websocket\r\n"
+                          "Connection: Upgrade\r\n"
+                          "Sec-WebSocket-Accept: %s\r\n\r\n" % accept).encode("ascii"))
+        logger.info("%s: replaying %d messages" % (self.client_address, len(self.server.messages)))
+        for message in self.server.messages:
+            self.wfile.write(text_frame(message))
+            self.wfile.flush()
+            if self.server.interval > 0:
+                time.sleep(self.server.interval)
+        # close frame
+        self.wfile.write(struct.pack("!BB", 0x88, 0))
+
+
+class ReplayServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 8081), messages=(), interval=0.0):
+        super().__init__(address, ReplayHandler)
+        self.messages = list(messages)
+        self.interval = interval
+
+
+def read_recording(filename):
+    with open(filename, 'r') as recording:
+        return [line.rstrip('\n') for line in recording if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="ws_replay_server.py",
+        formatter_class=argparse.RawTextHelpFormatter,
+        description="Replay recorded LANforge websocket messages to websocket clients")
+    parser.add_argument("--recording", required=True, help="file with one JSON message per line")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8081, help="port to listen on")
+    parser.add_argument("--interval", type=float, default=0.0, help="seconds between messages")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not os.path.exists(args.recording):
+        print("Recording %s not found" % args.recording)
+        exit(1)
+    server = ReplayServer(address=(args.host, args.port),
+                          messages=read_recording(args.recording),
+                          interval=args.interval)
+    logger.info("listening on ws://%s:%s" % (args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
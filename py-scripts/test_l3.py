@@ -741,10 +741,14 @@ sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 lf_report = importlib.import_module("py-scripts.lf_report")
 lf_graph = importlib.import_module("py-scripts.lf_graph")
 lf_kpi_csv = importlib.import_module("py-scripts.lf_kpi_csv")
+lf_live_feed = importlib.import_module("py-scripts.lf_live_feed")
+lf_webgui_control = importlib.import_module("py-scripts.lf_webgui_control")
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
 realm = importlib.import_module("py-json.realm")
 LFCliBase = realm.LFCliBase
+l3_poll_engine = importlib.import_module("py-json.l3_poll_engine")
+l3_port_store = importlib.import_module("py-json.l3_port_store")
 DeviceConfig = importlib.import_module("py-scripts.DeviceConfig")
 lf_attenuator = importlib.import_module("py-scripts.lf_atten_mod_test")
 lf_modify_radio = importlib.import_module("py-scripts.lf_modify_radio")
@@ -818,6 +822,7 @@ class L3VariableTime(Realm):
                  wait_for_ip_sec="120s",
                  exit_on_ip_acquired=False,
                  csv_data_to_report=False,
+                 per_port_csv=False,
 
                  # ap module
                  ap_read=False,
@@ -928,6 +933,7 @@ class L3VariableTime(Realm):
                          _capture_signal_list=_capture_signal_list)
         self.interopt_mode = interopt_mode
         self.csv_data_to_report = csv_data_to_report
+        self.per_port_csv = per_port_csv
         self.kpi_csv = kpi_csv
         self.tos = tos.split(",")
         self.endp_types = endp_types.split(",")
@@ -965,6 +971,9 @@ class L3VariableTime(Realm):
         self.polling_interval_seconds = self.duration_time_to_seconds(
             polling_interval)
         self.polling_interval = polling_interval
+        # built by get_poll_engine() once the ports are known
+        self.poll_engine = None
+        self.l3_resource_data = None
         self.cx_profile = self.new_l3_cx_profile()
         self.multicast_profile = self.new_multicast_profile()
         self.missing_endp_logged = set()
@@ -1028,15 +1037,13 @@ class L3VariableTime(Realm):
         self.cx_profile.side_b_min_bps = side_b_min_rate[0]
         self.cx_profile.side_b_max_bps = side_b_max_rate[0]
 
-        # Lookup key is port-eid name
-        self.dl_port_csv_files = {}
-        self.dl_port_csv_writers = {}
+        # Per-port interval rows, one columnar store per direction with the port-eid name as a column
+        self.dl_port_store = None
 
         self.dl_port_total_csv_files = {}
         self.dl_port_total_csv_writers = {}
 
-        self.ul_port_csv_files = {}
-        self.ul_port_csv_writers = {}
+        self.ul_port_store = None
 
         # Interopt graphs
         # Data used for graphing the TOS bar graphs
@@ -1407,7 +1414,9 @@ class L3VariableTime(Realm):
         self.total_ul_bps = None
         self.total_dl_ll_bps = None
         self.total_ul_ll_bps = None
-        self.individual_device_data = {}
+        # WebGUI runtime csv files, rows are appended as they are collected
+        self.individual_device_feeds = {}
+        self.overall_feeds = {}
 
         # AP information import the module
         if self.ap_read and self.ap_module is not None:
@@ -1710,8 +1719,52 @@ class L3VariableTime(Realm):
         # print("self.csv_results_file {}".format(self.csv_results_file.name))
         return self.csv_results_file.name
 
+    @staticmethod
+    def endp_stat_value(value):
+        # Endpoint counters read None or a non-numeric string such as 'NA' until traffic starts.
+        if value is None or (isinstance(value, str) and not value.isnumeric()):
+            return 0
+        return value
+
+    @staticmethod
+    def build_endp_port_index(endps):
+        """
+        Index the endpoints of one polling interval so that per-port stats are a dict lookup
+        instead of a scan of every endpoint for every port. Build it once per poll and pass it
+        to get_endp_stats_for_port().
+
+        :param endps: endpoint records as returned by __get_rx_values()
+        :return: dict with
+            'port': (shelf, resource, port) -> endpoints running on that port, in endps order
+            'cx':   connection name (endpoint name without -A/-B) -> its endpoints
+            'name': endpoint name -> endpoint
+        """
+        by_port = {}
+        by_cx = {}
+        by_name = {}
+        for endp in endps:
+            eid_endp = endp["eid"].split(".")
+            by_port.setdefault(tuple(eid_endp[0:3]), []).append(endp)
+            name = endp["name"]
+            by_name[name] = endp
+            if name.endswith("-A") or name.endswith("-B"):
+                by_cx.setdefault(name[:-2], []).append(endp)
+        return {"port": by_port, "cx": by_cx, "name": by_name}
+
     # Find avg latency, jitter for connections using specified port.
-    def get_endp_stats_for_port(self, port_eid, endps):
+    def get_endp_stats_for_port(self, port_eid, endps, endp_index=None):
+        """
+        Latency and jitter are averaged over the endpoints running on port_eid (the -A side of
+        a station's connections). Rates, low-level packet counts and drop % are summed over both
+        sides of the last connection found on the port: -A counts as download, -B as upload.
+
+        :param port_eid: port EID, e.g. 1.1.5
+        :param endps: endpoint records as returned by __get_rx_values()
+        :param endp_index: result of build_endp_port_index(endps); built here when not passed,
+            callers handling many ports should build it once per poll
+        :return: lat, jit, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_rx_drop_percent,
+            total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent
+        """
         lat = 0
         jit = 0
         total_dl_rate = 0
@@ -1722,152 +1775,56 @@ class L3VariableTime(Realm):
         total_ul_rate_ll = 0
         total_ul_pkts_ll = 0
         ul_rx_drop_percent = 0
-        count = 0
         sta_name = 'no_station'
 
-        eid = port_eid
+        if endp_index is None:
+            endp_index = self.build_endp_port_index(endps)
         eid = self.name_to_eid(port_eid)
+        port_key = (str(eid[0]), str(eid[1]), str(eid[2]))
         if not self.dowebgui:
             logger.info("endp-stats-for-port, port-eid: {}".format(port_eid))
-            logger.debug(
-                "eid: {eid}".format(eid=eid))
-
-        # Convert all eid elements to strings
-        eid[0] = str(eid[0])
-        eid[1] = str(eid[1])
-        eid[2] = str(eid[2])
-
-        for endp in endps:
-            # pprint(endp)
-            if not self.dowebgui:
-                logging.info(pformat(endp))
-            eid_endp = endp["eid"].split(".")
-            logger.debug(
-                "Comparing eid:{eid} to endp-id {eid_endp}".format(eid=eid, eid_endp=eid_endp))
-            # Look through all the endpoints (endps), to find the port the port_eid is using.
-            # The port_eid that has the same Shelf, Resource, and Port as the eid_endp (looking at all the endps)
-            # Then read the eid_endp to get the delay, jitter and rx rate
-            # Note: the endp eid is shelf.resource.port.endp-id, the eid can be treated somewhat as
-            # child class of port-eid , and look up the port the eid is using.
-            if eid[0] == eid_endp[0] and eid[1] == eid_endp[1] and eid[2] == eid_endp[2]:
-                if ((endp['delay'] is str and not endp['delay'].isnumeric()) or endp['delay'] is None):
-                    logging.debug(
-                        'Expected integer response for delay, received non-numeric string instead. Replacing with 0')
-                    lat += 0
-                else:
-                    lat += int(endp['delay'])
-
-                if ((endp['jitter'] is str and not endp['jitter'].isnumeric()) or endp['jitter'] is None):
-                    logging.debug(
-                        'Expected integer response for jitter, received non-numeric string instead. Replacing with 0')
-                    jit += 0
-                else:
-                    jit += int(endp["jitter"])
-                # lat += int(endp["delay"])
-                # jit += int(endp["jitter"])
-                name = endp["name"]
-                logger.debug("endp name {name}".format(name=name))
-                sta_name = name.replace('-A', '')
-                # only the -A endpoint will be found
-
-                count += 1
-                logger.debug(
-                    "Matched: name: {name} eid:{eid} to endp-id {eid_endp}".format(
-                        name=name, eid=eid, eid_endp=eid_endp))
-            else:
-                name = endp["name"]
-                logger.debug(
-                    "No Match: name: {name} eid:{eid} to endp-id {eid_endp}".format(
-                        name=name, eid=eid, eid_endp=eid_endp))
 
+        # Note: the endp eid is shelf.resource.port.endp-id, so the endpoints running on a port
+        # are the ones whose eid starts with the port's shelf.resource.port
+        port_endps = endp_index["port"].get(port_key, [])
+        for endp in port_endps:
+            lat += int(self.endp_stat_value(endp["delay"]))
+            jit += int(self.endp_stat_value(endp["jitter"]))
+            # only the -A endpoint will be found
+            sta_name = endp["name"].replace('-A', '')
+
+        count = len(port_endps)
+        logger.debug("eid: {eid} matched {count} endpoints".format(eid=port_key, count=count))
         if count > 1:
             lat = int(lat / count)
             jit = int(jit / count)
 
-        # need to loop though again to find the upload and download per station
-        # if the name matched
-        for endp in endps:
-            if sta_name in endp["name"]:
-                name = endp["name"]
-                if name.endswith("-A"):
-                    logger.info("name has -A")
-
-                    if (isinstance(endp['rx rate'], str)
-                            and not endp['rx rate'].isnumeric()) or endp['rx rate'] is None:
-                        logging.debug(
-                            'Expected integer response for rx rate, received non-numeric string instead. Replacing with 0')
-                        total_dl_rate += 0
-                    else:
-                        total_dl_rate += int(endp["rx rate"])
-
-                    if (isinstance(endp['rx rate ll'], str)
-                            and not endp['rx rate ll'].isnumeric()) or endp['rx rate ll'] is None:
-                        logging.debug(
-                            'Expected integer response for rx rate ll, received non-numeric string instead. Replacing with 0')
-                        total_dl_rate_ll += 0
-                    else:
-                        total_dl_rate_ll += int(endp["rx rate ll"])
-
-                    if (isinstance(endp['rx pkts ll'], str)
-                            and not endp['rx pkts ll'].isnumeric()) or endp['rx pkts ll'] is None:
-                        logging.debug(
-                            'Expected integer response for rx pkts ll, received non-numeric string instead. Replacing with 0')
-                        total_dl_pkts_ll += 0
-                    else:
-                        total_dl_pkts_ll += int(endp["rx pkts ll"])
-
-                    if (isinstance(endp['rx drop %'], str)
-                            and not endp['rx drop %'].isnumeric()) or endp['rx drop %'] is None:
-                        logging.debug(
-                            'Expected integer response for rx drop %, received non-numeric string instead. Replacing with 0')
-                        dl_rx_drop_percent = 0
-                    else:
-                        dl_rx_drop_percent = round(endp["rx drop %"], 2)
-
-                # -B upload side
-                else:
-                    if (isinstance(endp['rx rate'], str)
-                            and not endp['rx rate'].isnumeric()) or endp['rx rate'] is None:
-                        logging.debug(
-                            'Expected integer response for rx rate, received non-numeric string instead. Replacing with 0')
-                        total_ul_rate += 0
-                    else:
-                        total_ul_rate += int(endp["rx rate"])
-
-                    if (isinstance(endp['rx rate ll'], str)
-                            and not endp['rx rate ll'].isnumeric()) or endp['rx rate ll'] is None:
-                        logging.debug(
-                            'Expected integer response for rx rate ll, received non-numeric string instead. Replacing with 0')
-                        total_ul_rate_ll += 0
-                    else:
-                        total_ul_rate_ll += int(endp["rx rate ll"])
-
-                    if (isinstance(endp['rx pkts ll'], str)
-                            and not endp['rx pkts ll'].isnumeric()) or endp['rx pkts ll'] is None:
-                        logging.debug(
-                            'Expected integer response for rx pkts ll, received non-numeric string instead. Replacing with 0')
-                        total_ul_pkts_ll += 0
-                    else:
-                        total_ul_pkts_ll += int(endp["rx pkts ll"])
-
-                    if (isinstance(endp['rx drop %'], str)
-                            and not endp['rx drop %'].isnumeric()) or endp['rx drop %'] is None:
-                        logging.debug(
-                            'Expected integer response for rx drop %, received non-numeric string instead. Replacing with 0')
-                        ul_rx_drop_percent = 0
-                    else:
-                        ul_rx_drop_percent = round(endp["rx drop %"], 2)
-
-                    # total_ul_rate += int(endp["rx rate"])
-                    # total_ul_rate_ll += int(endp["rx rate ll"])
-                    # total_ul_pkts_ll += int(endp["rx pkts ll"])
-                    # ul_rx_drop_percent = round(endp["rx drop %"], 2)
+        # upload and download for the connection the station uses
+        if sta_name in endp_index["cx"]:
+            cx_endps = endp_index["cx"][sta_name]
+        elif sta_name in endp_index["name"]:
+            cx_endps = [endp_index["name"][sta_name]]
+        else:
+            cx_endps = []
+        for endp in cx_endps:
+            if endp["name"].endswith("-A"):
+                total_dl_rate += int(self.endp_stat_value(endp["rx rate"]))
+                total_dl_rate_ll += int(self.endp_stat_value(endp["rx rate ll"]))
+                total_dl_pkts_ll += int(self.endp_stat_value(endp["rx pkts ll"]))
+                dl_rx_drop_percent = round(self.endp_stat_value(endp["rx drop %"]), 2)
+            # -B upload side
+            else:
+                total_ul_rate += int(self.endp_stat_value(endp["rx rate"]))
+                total_ul_rate_ll += int(self.endp_stat_value(endp["rx rate ll"]))
+                total_ul_pkts_ll += int(self.endp_stat_value(endp["rx pkts ll"]))
+                ul_rx_drop_percent = round(self.endp_stat_value(endp["rx drop %"]), 2)
 
         return lat, jit, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_rx_drop_percent, total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent
 
     # Query all endpoints to generate rx and other stats, returned
-    # as an array of objects.
-    def __get_rx_values(self):
+    # as an array of objects. sample is an L3PollEngine.poll() result
+    # whose cross-connect and endpoint data is used instead of querying.
+    def __get_rx_values(self, sample=None):
 
         endp_rx_drop_map = {}
         endp_rx_map = {}
@@ -1888,11 +1845,16 @@ class L3VariableTime(Realm):
                 return False, endp_rx_map, endp_rx_drop_map, endps, total_dl, total_ul, total_dl_ll, total_ul_ll
         # Checking atleast one cx is there if not exiting
         else:
-            available = self.monitor_cx_availability(self.cx_profile.get_cx_names())
+            available = self.monitor_cx_availability(self.cx_profile.get_cx_names(),
+                                                     cx_list=sample.cx_list if sample is not None else None)
             if not available:
                 return False, endp_rx_map, endp_rx_drop_map, endps, total_dl, total_ul, total_dl_ll, total_ul_ll
-            endp_url = "endp?fields=name,eid,delay,jitter,rx+rate,rx+rate+ll,rx+bytes,rx+drop+%25,rx+pkts+ll,run"
-            endp_list = self.json_get(endp_url, debug_=True)
+            if sample is not None:
+                endp_url = self.poll_engine.endp_uri()
+                endp_list = sample.endp_list
+            else:
+                endp_url = "endp?fields=name,eid,delay,jitter,rx+rate,rx+rate+ll,rx+bytes,rx+drop+%25,rx+pkts+ll,run"
+                endp_list = self.json_get(endp_url, debug_=True)
             if not endp_list:
                 logger.error(
                     "Failed to fetch endpoints. Received empty response.\n"
@@ -2071,6 +2033,27 @@ class L3VariableTime(Realm):
 
         return rv
 
+    def get_poll_engine(self):
+        """Return the L3PollEngine that fetches each monitor interval's data.
+
+        It is rebuilt when the monitored ports change. In webgui mode it also fetches
+        the columns l3_endp_port_data() needs, so one fetch serves both.
+        """
+        port_eids = self.gather_port_eids()
+        if self.use_existing_station_lists:
+            port_eids.extend(self.existing_station_lists.copy())
+        if self.poll_engine is not None and self.poll_engine.port_list == port_eids:
+            return self.poll_engine
+        if self.poll_engine is not None:
+            self.poll_engine.close()
+        self.poll_engine = l3_poll_engine.L3PollEngine(
+            lfcli=self,
+            port_list=port_eids,
+            all_ports=self.dowebgui,
+            optional_endp_fields=("tx rate", "a/b", "tos", "type") if self.dowebgui else (),
+            fetch_cx=not self.mtx_endps)
+        return self.poll_engine
+
     # Create stations and connections/endpoints.  If rebuild is true, then
     # only update connections/endpoints.
     def build(self, rebuild=False):
@@ -2489,17 +2472,23 @@ class L3VariableTime(Realm):
         # total_dl_bps,total_ul_bps,total_dl_ll
         return 0
 
-    def l3_endp_port_data(self, tos):
+    def l3_endp_port_data(self, tos, sample=None):
         """
         Args:
             tos (str): Type of Service (TOS) value to filter endpoints.
+            sample (PollSample, optional): L3PollEngine.poll() result for this interval.
+                Its /port/all and endpoint data are used when they carry the needed
+                columns, and resource host names are only queried once per run.
 
         Returns:
             dict: Collected client data for the given TOS, including clients,
                 uplink/downlink rates, resource aliases, and port signals.
         """
         port_url = 'port/all?fields=signal,signal'
-        port_data = self.json_get(port_url, debug_=True)
+        if sample is not None and sample.port_json:
+            port_data = dict(sample.port_json)
+        else:
+            port_data = self.json_get(port_url, debug_=True)
         if not port_data:
             logger.error(
                 "Failed to fetch port data. Received empty response.\n"
@@ -2512,7 +2501,12 @@ class L3VariableTime(Realm):
 
         # Gather resource data (only need hostname for alias)
         resource_url = 'resource/all?fields=eid,hostname'
-        resource_data = self.json_get(resource_url, debug_=True)
+        if sample is not None and self.l3_resource_data:
+            resource_data = dict(self.l3_resource_data)
+        else:
+            resource_data = self.json_get(resource_url, debug_=True)
+            if resource_data and sample is not None:
+                self.l3_resource_data = dict(resource_data)
         if not resource_data:
             logger.error(
                 "Failed to fetch resource data. Received empty response.\n"
@@ -2532,7 +2526,11 @@ class L3VariableTime(Realm):
         # Gather endpoint data (name, tx/rx rate, a/b, tos, eid, type)
         endp_type_present = False
         endp_url = 'endp/all?fields=name,tx+rate,rx+rate,a/b,tos,eid,type'
-        endp_data = self.json_get(endp_url, debug_=True)
+        endp_data = None
+        if sample is not None and sample.endp_list and "type" in self.poll_engine.optional_endp_fields:
+            endp_data = dict(sample.endp_list)
+        if endp_data is None:
+            endp_data = self.json_get(endp_url, debug_=True)
         if endp_data is not None:
             endp_type_present = True
         else:
@@ -2679,30 +2677,17 @@ class L3VariableTime(Realm):
         # port_eids= self.gather_port_eids()
         # for port_eid in port_eids
         # Collecting Totals of all stations for all intervals for each collection period
-        # TODO make all port csv files into one concatinated csv files
-        # Create empty dataframe
-        all_dl_ports_df = pd.DataFrame()
+        # All ports of all intervals come from the dl port store, ordered port by port
         port_eids = self.gather_port_eids()
         warnings = 0
         # if self.use_existing_station_lists:
         #    port_eids.extend(self.existing_station_lists.copy())
-
-        for port_eid in port_eids:
-            logger.debug("port files: {port_file}".format(
-                port_file=self.dl_port_csv_files[port_eid]))
-            name = self.dl_port_csv_files[port_eid].name
-            logger.debug("name : {name}".format(name=name))
-            df_dl_tmp = pd.read_csv(name)
-            all_dl_ports_df = pd.concat(
-                [all_dl_ports_df, df_dl_tmp], axis=0)
+        all_dl_ports_df = self.dl_port_store.frame(ports=port_eids)
 
         all_dl_ports_file_name = self.outfile[:-4]
         all_dl_port_file_name = all_dl_ports_file_name + "-dl-all-eids.csv"
         all_dl_ports_df.to_csv(all_dl_port_file_name)
 
-        # process "-dl-all-eids.csv to have per iteration loops deltas"
-        all_dl_ports_df.to_csv(all_dl_port_file_name)
-
         # copy the above pandas dataframe (all_dl_ports_df)
         all_dl_ports_stations_df = all_dl_ports_df.copy(deep=True)
         # drop rows that have eth
@@ -2757,18 +2742,8 @@ class L3VariableTime(Realm):
 
         if self.ap_read:
             # Consolidate all the ul ports into one file
-            # Create empty dataframe
-            all_ul_ports_df = pd.DataFrame()
             port_eids = self.gather_port_eids()
-
-            for port_eid in port_eids:
-                logger.debug("ul port files: {port_file}".format(
-                    port_file=self.ul_port_csv_files[port_eid]))
-                name = self.ul_port_csv_files[port_eid].name
-                logger.debug("name : {name}".format(name=name))
-                df_ul_tmp = pd.read_csv(name)
-                all_ul_ports_df = pd.concat(
-                    [all_ul_ports_df, df_ul_tmp], axis=0)
+            all_ul_ports_df = self.ul_port_store.frame(ports=port_eids)
 
             all_ul_ports_file_name = self.outfile[:-4]
             all_ul_port_file_name = all_ul_ports_file_name + "-ul-all-eids.csv"
@@ -2833,6 +2808,12 @@ class L3VariableTime(Realm):
             # if there are multiple loops then delete the df
             del all_ul_ports_df
 
+        # optional legacy per-port csv files, written from the stores
+        if self.per_port_csv:
+            self.dl_port_store.export_port_csv(prefix=self.outfile[:-4] + "-dl-")
+            if self.ap_read:
+                self.ul_port_store.export_port_csv(prefix=self.outfile[:-4] + "-ul-")
+
         # At end of test step, record KPI into kpi.csv
         self.record_kpi_csv(
             len(self.station_names_list),
@@ -2994,6 +2975,7 @@ class L3VariableTime(Realm):
                     logger.info("Getting initial values.")
                     available = self.__get_rx_values()[0]
                     self.overall = []
+                    self.overall_feeds = {}
                     # monitor stats
                     if self.do_bandsteering:
                         return available, ul, dl, ul_pdu_str, dl_pdu_str, atten_val, ul_pdu, dl_pdu, passes, expected_passes, coordinate, rotation
@@ -3049,7 +3031,7 @@ class L3VariableTime(Realm):
         total_ul_bps = self.total_ul_bps if self.total_ul_bps is not None else 0
         total_dl_ll_bps = self.total_dl_ll_bps if self.total_dl_ll_bps is not None else 0
         total_ul_ll_bps = self.total_ul_ll_bps if self.total_ul_ll_bps is not None else 0
-        reset_timer = 0
+        poll_engine = self.get_poll_engine()
         # individual_device_data = {}
         # Monitor loop
         bandsteering_data = None
@@ -3062,25 +3044,28 @@ class L3VariableTime(Realm):
                 "total_ul_ll_bps": total_ul_ll_bps
             }
             return data
+        # intervals are scheduled from the start of the previous one, so collection time
+        # does not stretch the polling interval
+        interval_deadline = time.monotonic()
         while cur_time < end_time:
-            # interval_time = cur_time + datetime.timedelta(seconds=5)
-            interval_time = cur_time + \
-                datetime.timedelta(
-                    seconds=self.polling_interval_seconds)
-            # logger.info("polling_interval_seconds {}".format(self.polling_interval_seconds))
-
-            # Gather interop data
+            interval_deadline = max(interval_deadline + self.polling_interval_seconds, time.monotonic())
 
             # Holds off for the interval and allows for port reset
-            while cur_time < interval_time:
-                cur_time = datetime.datetime.now()
-                time.sleep(.2)
-                reset_timer += 1
-                if reset_timer % 5 == 0:
-                    self.reset_port_check()
+            while True:
+                remaining = interval_deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, 1.0))
+                self.reset_port_check()
+            cur_time = datetime.datetime.now()
 
             self.epoch_time = int(time.time())
-            available, endp_rx_map, endp_rx_drop_map, endps, total_dl_bps, total_ul_bps, total_dl_ll_bps, total_ul_ll_bps = self.__get_rx_values()
+            sample = poll_engine.poll()
+            available, endp_rx_map, endp_rx_drop_map, endps, total_dl_bps, total_ul_bps, total_dl_ll_bps, total_ul_ll_bps = self.__get_rx_values(sample=sample)
+            endp_index = self.build_endp_port_index(endps)
+            logger.debug("monitor: collected {requests} requests in {cost:.3f}s, endpoint rx from counters: {rx_bps} bps".format(
+                requests=sample.requests, cost=sample.collect_sec,
+                rx_bps=int(sample.total_rate("rx bytes") * 8) if sample.elapsed_sec else "NA"))
             if not available:
                 logger.warning("Endpoint data not available, exiting monitoring loop early.")
                 self.actual_test_duration_display = self.format_duration(cur_time - start_time)
@@ -3104,16 +3089,17 @@ class L3VariableTime(Realm):
             # Added logic creating a csv file for webGUI to get runtime data
             if self.dowebgui:
                 # Fetch L3 endpoint and port data for the given ToS
-                real_client_endpoint_data = self.l3_endp_port_data(self.tos[0])
+                real_client_endpoint_data = self.l3_endp_port_data(self.tos[0], sample=sample)
                 l3_port_data = real_client_endpoint_data[self.tos[0]]
-                # Initialize empty DataFrames for each device (based on resource alias)
+                # Create a runtime csv file for each device (based on resource alias)
                 for name in l3_port_data['resource_alias_A']:
                     # Extract device/resource ID from alias
                     r_id = name.split('_')[0]
-                    if r_id not in self.individual_device_data:
-                        # Create a DataFrame with columns for download rate, upload rate, and RSSI
-                        columns = ['download_rate_A', 'upload_rate_A', 'RSSI']
-                        self.individual_device_data[r_id] = pd.DataFrame(columns=columns)
+                    if r_id not in self.individual_device_feeds:
+                        # columns for download rate, upload rate, and RSSI
+                        self.individual_device_feeds[r_id] = lf_live_feed.LiveFeedWriter(
+                            path=f'{self.result_dir}/individual_device_data_{r_id}.csv',
+                            columns=['download_rate_A', 'upload_rate_A', 'RSSI'])
 
                 # Calculate average RSSI
                 rssi_values = []
@@ -3123,10 +3109,8 @@ class L3VariableTime(Realm):
 
                     row_data = [l3_port_data['dl_A'][i], l3_port_data['ul_A'][i], port_signal]
                     r_id = l3_port_data['resource_alias_A'][i].split('_')[0]
-                    # Append new row to the device-specific DataFrame
-                    self.individual_device_data[r_id].loc[len(self.individual_device_data[r_id])] = row_data
-                    # for each resource individual csv will be created here
-                    self.individual_device_data[r_id].to_csv(f'{self.result_dir}/individual_device_data_{r_id}.csv', index=False)
+                    # Append new row to the device-specific csv file
+                    self.individual_device_feeds[r_id].append(row_data)
                     # Collect RSSI for average calculation
                     try:
                         rssi_val = float(port_signal)
@@ -3161,40 +3145,24 @@ class L3VariableTime(Realm):
                         "RSSI": avg_rssi
                     })
 
-                df1 = pd.DataFrame(self.overall)
+                # append the new entry, a new file starts with the entries collected so far
+                labels = {}
                 if coordinate is not None and not self.do_bandsteering:
-                    df1['coordinate'] = coordinate
+                    labels['coordinate'] = coordinate
                     if rotation is not None:
-                        df1['rotation'] = rotation
+                        labels['rotation'] = rotation
                     else:
                         rotation = None
-                    df1.to_csv('{}/overall_multicast_throughput_coord_{}_rot_{}.csv'.format(
-                        self.result_dir, coordinate, rotation), index=False)
+                    overall_file = '{}/overall_multicast_throughput_coord_{}_rot_{}.csv'.format(
+                        self.result_dir, coordinate, rotation)
                 else:
-                    df1.to_csv('{}/overall_multicast_throughput.csv'.format(self.result_dir), index=False)
-                running_file = f"{self.result_dir}/../../Running_instances/{self.ip}_{self.test_name}_running.json"
-                try:
-                    with open(running_file, "r") as file:
-                        data = json.load(file)
-                        # If file exists but test is stopped
-                        if data.get("status") != "Running":
-                            logging.warning("Test is stopped by the user")
-                            self.test_stopped_user = True
-                            self.overall[-1]["end_time"] = self.get_time_stamp_local()
-                            break
-
-                except FileNotFoundError:
-                    logging.warning(f"Running instance file not found: {running_file}")
-                    self.overall[-1]["end_time"] = self.get_time_stamp_local()
-                    break
-
-                except json.JSONDecodeError:
-                    logging.warning(f"Running instance file corrupted or empty: {running_file}")
-                    self.overall[-1]["end_time"] = self.get_time_stamp_local()
-                    break
-
-                except Exception as e:
-                    logging.error(f"Unexpected error reading running.json: {e}")
+                    overall_file = '{}/overall_multicast_throughput.csv'.format(self.result_dir)
+                new_entries = self.overall[-1:]
+                if overall_file not in self.overall_feeds:
+                    self.overall_feeds[overall_file] = lf_live_feed.LiveFeedWriter(path=overall_file)
+                    new_entries = self.overall
+                self.overall_feeds[overall_file].append_rows([dict(entry, **labels) for entry in new_entries])
+                if self.is_test_stopped_by_webgui():
                     self.overall[-1]["end_time"] = self.get_time_stamp_local()
                     break
 
@@ -3218,26 +3186,12 @@ class L3VariableTime(Realm):
                 port_eids = self.gather_port_eids()
 
                 for port_eid in port_eids:
-                    eid = self.name_to_eid(port_eid)
-                    url = "/port/%s/%s/%s" % (eid[0],
-                                              eid[1], eid[2])
-
-                    # read LANforge to get the mac
-                    response = self.json_get(url, debug_=True)
-                    if response is None:
-                        logger.error(
-                            "Failed to fetch port data. Received empty response.\n"
-                            f"Requested URL: '{url}'\n"
-                            f"Response: {response}")
-                        continue
-                    elif "interface" not in response:
-                        logger.error(
-                            "'interface' key not found in response.\n"
-                            f"Requested URL: '{url}'\n"
-                            f"Response: {response}")
+                    # port data, including the mac, was fetched with the endpoints
+                    port_data = sample.port(port_eid)
+                    if port_data is None:
+                        logger.error("Port {port_eid} not found in this interval's port data".format(port_eid=port_eid))
                         continue
                     else:
-                        port_data = response['interface']
                         mac = port_data['mac']
                         logger.debug("mac : {mac}".format(mac=mac))
 
@@ -3249,9 +3203,6 @@ class L3VariableTime(Realm):
                         xtop_reported, ap_row_chanim = self.ap.chanim_stats(
                             mac)
 
-                        self.get_endp_stats_for_port(
-                            port_data["port"], endps)
-
                         if tx_dl_mac_found:
                             if not self.dowebgui:
                                 logger.info("mac {mac} ap_row_tx_dl {ap_row_tx_dl}".format(
@@ -3261,7 +3212,7 @@ class L3VariableTime(Realm):
                             (latency, jitter, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll,
                                 dl_rx_drop_percent, total_ul_rate, total_ul_rate_ll,
                                 total_ul_pkts_ll, ul_rx_drop_percent) = self.get_endp_stats_for_port(
-                                port_data["port"], endps)
+                                port_data["port"], endps, endp_index=endp_index)
 
                             ap_row_tx_dl.append(ap_row_chanim)
 
@@ -3333,26 +3284,14 @@ class L3VariableTime(Realm):
                     # for existing_station in self.existing_station_lists:
                     #    port_eids.append(self.existing_station)
                 for port_eid in port_eids:
-                    eid = self.name_to_eid(port_eid)
-                    url = "/port/%s/%s/%s" % (eid[0],
-                                              eid[1], eid[2])
-                    response = self.json_get(url, debug_=True)
-                    if response is None:
-                        logger.error(
-                            "Failed to fetch port information. Received empty response.\n"
-                            f"Requested URL: '{url}'\n"
-                            f"Response: {response}")
-                    elif "interface" not in response:
-                        logger.error(
-                            "'interface' key not found in response.\n"
-                            f"Requested URL: '{url}'\n"
-                            f"Response: {pformat(response)}")
+                    port_data = sample.port(port_eid)
+                    if port_data is None:
+                        logger.error("Port {port_eid} not found in this interval's port data".format(port_eid=port_eid))
                     else:
-                        port_data = response['interface']
                         (latency, jitter, total_dl_rate, total_dl_rate_ll,
                             total_dl_pkts_ll, dl_rx_drop_percent, total_ul_rate,
                             total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent) = self.get_endp_stats_for_port(
-                            port_data["port"], endps)
+                            port_data["port"], endps, endp_index=endp_index)
 
                         if self.do_bandsteering:
                             robot_x, robot_y, from_coordinate, to_coordinate = self.robot_obj.get_robot_pose()
@@ -3390,6 +3329,8 @@ class L3VariableTime(Realm):
                     "total_ul_ll_bps": total_ul_ll_bps
                 }
                 return data
+        cost = poll_engine.cost_summary()
+        logger.info("monitor: {count} intervals, collection took {mean:.3f}s on average, {max:.3f}s at most".format(**cost))
         return total_dl_bps, total_ul_bps, total_dl_ll_bps, total_ul_ll_bps
 
     def write_dl_port_csv(
@@ -3451,9 +3392,7 @@ class L3VariableTime(Realm):
                     # print("col {}".format(col))
                     row.append(col)
 
-        writer = self.dl_port_csv_writers[port_eid]
-        writer.writerow(row)
-        self.dl_port_csv_files[port_eid].flush()
+        self.dl_port_store.append(row)
 
     def write_ul_port_csv(
             self,
@@ -3513,9 +3452,7 @@ class L3VariableTime(Realm):
                     logger.debug("col {}".format(col))
                     row.append(col)
 
-        writer = self.ul_port_csv_writers[port_eid]
-        writer.writerow(row)
-        self.ul_port_csv_files[port_eid].flush()
+        self.ul_port_store.append(row)
 
     def record_kpi_csv(
             self,
@@ -6308,6 +6245,8 @@ class L3VariableTime(Realm):
         for station_list in self.station_lists:
             for station_name in station_list:
                 self.admin_down(station_name)
+        if self.dowebgui:
+            lf_webgui_control.RunningInstanceWatcher.release_test(result_dir=self.result_dir, host=self.ip, test_name=self.test_name)
 
     # clean up cx
     def cleanup_cx(self):
@@ -6480,30 +6419,18 @@ class L3VariableTime(Realm):
                 self.csv_generate_results_column_headers())
             self.csv_results_file.flush()
 
-    # Write initial headers to port csv file.
+    # Register a port with the dl port store, created with the headers on first use.
     def csv_add_port_column_headers(self, port_eid, headers):
-        # if self.csv_file is not None:
-        fname = self.outfile[:-4]  # Strip '.csv' from file name
-        fname = fname + "-dl-" + port_eid + ".csv"
-        pfile = open(fname, "w")
-        port_csv_writer = csv.writer(pfile, delimiter=",")
-        self.dl_port_csv_files[port_eid] = pfile
-        self.dl_port_csv_writers[port_eid] = port_csv_writer
-
-        port_csv_writer.writerow(headers)
-        pfile.flush()
+        if self.dl_port_store is None:
+            fname = self.outfile[:-4]  # Strip '.csv' from file name
+            self.dl_port_store = l3_port_store.L3PortStore(path=fname + "-dl-ports.colstore", columns=headers)
+        self.dl_port_store.add_port(port_eid)
 
     def csv_add_ul_port_column_headers(self, port_eid, headers):
-        # if self.csv_file is not None:
-        fname = self.outfile[:-4]  # Strip '.csv' from file name
-        fname = fname + "-ul-" + port_eid + ".csv"
-        pfile = open(fname, "w")
-        ul_port_csv_writer = csv.writer(pfile, delimiter=",")
-        self.ul_port_csv_files[port_eid] = pfile
-        self.ul_port_csv_writers[port_eid] = ul_port_csv_writer
-
-        ul_port_csv_writer.writerow(headers)
-        pfile.flush()
+        if self.ul_port_store is None:
+            fname = self.outfile[:-4]  # Strip '.csv' from file name
+            self.ul_port_store = l3_port_store.L3PortStore(path=fname + "-ul-ports.colstore", columns=headers)
+        self.ul_port_store.add_port(port_eid)
 
     @staticmethod
     def csv_validate_list(csv_list, length):
@@ -6705,11 +6632,11 @@ class L3VariableTime(Realm):
 
     def get_bandsteering_stats(self):
         """
-        Analyze band steering statistics from downloaded CSV files and generate reports.
+        Analyze band steering statistics from the per-port download rows and generate reports.
 
         Args:
             self:
-                dl_port_csv_files (dict): Dictionary mapping device names to CSV file objects.
+                dl_port_store (L3PortStore): Per-port download rows of every interval.
                 existing_station_lists (list): List of device names to include for processing.
                 bssids (list): Optional list of BSSIDs to filter results.
                 report (object): Report object used for generating graphs, tables, and HTML output.
@@ -6719,12 +6646,11 @@ class L3VariableTime(Realm):
         """
         merged_df = None
         df = None
-        if bool(self.dl_port_csv_files):
-            for key, value in self.dl_port_csv_files.items():
+        if self.dl_port_store is not None:
+            for key in self.dl_port_store.ports:
                 if key in self.existing_station_lists:
                     device_name = key
-                    file_path = value.name
-                    df = pd.read_csv(file_path)
+                    df = self.dl_port_store.port_frame(key)
                     df = df[['Time', 'AP', 'Channel', 'Robot X', 'Robot Y', 'From Coordinate', 'To Coordinate']]
                     df.rename(columns={
                         'Time': 'TIMESTAMP',
@@ -7436,17 +7362,16 @@ class L3VariableTime(Realm):
             if self.robo_test and self.do_bandsteering:
                 self.get_bandsteering_stats()
 
-            if bool(self.dl_port_csv_files):
-                for key, value in self.dl_port_csv_files.items():
+            if self.dl_port_store is not None:
+                for key in self.dl_port_store.ports:
+                    df = self.dl_port_store.port_frame(key)
                     if self.csv_data_to_report:
-                        # read the csv file
                         self.report.set_table_title("Layer 3 Cx Traffic  {key}".format(key=key))
                         self.report.build_table_title()
-                        self.report.set_table_dataframe_from_csv(value.name)
+                        self.report.set_table_dataframe(df)
                         self.report.build_table()
 
-                    # read in column heading and last line
-                    df = pd.read_csv(value.name)
+                    # column heading and last line
                     last_row = df.tail(1)
                     self.report.set_table_title(
                         "Layer 3 Cx Traffic Last Reporting Interval {key}".format(key=key))
@@ -7647,7 +7572,8 @@ class L3VariableTime(Realm):
         print(f"DEBUG: Saving to {filepath}")
 
         try:
-            df1.to_csv(filepath, index=False)
+            # replaced atomically, the WebGUI may be reading the runtime file
+            lf_live_feed.write_snapshot(filepath, df1)
             print(f"INFO: Successfully saved results to {filepath}")
         except PermissionError as e:
             # Try alternative location if permission denied
@@ -7897,25 +7823,22 @@ class L3VariableTime(Realm):
                 self.not_running_endp_logged.discard(endp_name)
 
     def is_test_stopped_by_webgui(self):
-        """Check the webgui running-instance file to see if the user stopped the test."""
+        """Check the webgui running-instance file to see if the user stopped the test.
+
+        The file is watched by lf_webgui_control, this only reads the cached status.
+        """
         if not self.dowebgui:
             return False
-        running_file = f"{self.result_dir}/../../Running_instances/{self.ip}_{self.test_name}_running.json"
-        try:
-            with open(running_file, "r") as file:
-                data = json.load(file)
-            if data.get("status") != "Running":
-                logging.warning("Test is stopped by the user")
-                self.test_stopped_user = True
-                return True
-        except FileNotFoundError:
-            logging.warning(f"Running instance file not found: {running_file}")
+        watcher = lf_webgui_control.RunningInstanceWatcher.for_test(result_dir=self.result_dir, host=self.ip, test_name=self.test_name)
+        if watcher.stopped_by_user():
+            logging.warning("Test is stopped by the user")
+            self.test_stopped_user = True
             return True
-        except json.JSONDecodeError:
-            logging.warning(f"Running instance file corrupted or empty: {running_file}")
+        if watcher.status == lf_webgui_control.MISSING:
+            logging.warning(f"Running instance file not found: {watcher.path}")
             return True
-        except Exception as e:
-            logging.error(f"Unexpected error reading running.json: {e}")
+        if watcher.status == lf_webgui_control.CORRUPT:
+            logging.warning(f"Running instance file corrupted or empty: {watcher.path}")
             return True
         return False
 
@@ -8012,8 +7935,10 @@ class L3VariableTime(Realm):
                 self.missing_cx_logged.discard(cx_name)
                 self.not_running_cx_logged.discard(cx_name)
 
-    def monitor_cx_availability(self, expected_cxs, duration=40, interval=5):
-        """Retry for up to duration seconds until at least one expected cross-connect is present and running."""
+    def monitor_cx_availability(self, expected_cxs, duration=40, interval=5, cx_list=None):
+        """Retry for up to duration seconds until at least one expected cross-connect is present and running.
+
+        cx_list is a /cx response already fetched this interval, used for the first attempt."""
         start_time = time.time()
         end_time = start_time + duration
         no_of_attempts = duration // interval
@@ -8025,7 +7950,8 @@ class L3VariableTime(Realm):
                 return False
             if count > 1:
                 logger.info("Attempt {} of {} to check cross-connect availability".format(count, no_of_attempts))
-            cx_list = self.json_get("cx/all", debug_=True)
+            if count > 1 or not cx_list:
+                cx_list = self.json_get("cx/all", debug_=True)
             if not cx_list:
                 logger.error(
                     "Failed to fetch cross-connects. Received empty response.\n"
@@ -9360,6 +9286,10 @@ INCLUDE_IN_README: False
     test_l3_parser.add_argument(
         '--csv_data_to_report', help='collected interval data in csv for each cx will be put in report', action='store_true')
 
+    test_l3_parser.add_argument(
+        '--per_port_csv', help='also write the legacy per-port <outfile>-dl-<eid>.csv and -ul-<eid>.csv files from the port stores',
+        action='store_true')
+
     test_l3_parser.add_argument('--no_stop_traffic', help='leave traffic running',
                                 action='store_true')
 
@@ -10240,6 +10170,7 @@ and generate a report.
         existing_station_lists=existing_station_lists,
         wait_for_ip_sec=args.wait_for_ip_sec,
         exit_on_ip_acquired=args.exit_on_ip_acquired,
+        per_port_csv=args.per_port_csv,
         ap_read=args.ap_read,
         ap_module=args.ap_module,
         ap_test_mode=args.ap_test_mode,
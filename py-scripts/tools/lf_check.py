@@ -113,7 +113,6 @@ Starting LANforge:
 from psutil import TimeoutExpired
 import requests
 import pandas as pd
-import paramiko
 import shlex
 import shutil
 import csv
@@ -131,6 +130,7 @@ import datetime
 import sys
 import traceback
 import copy
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 
 if sys.version_info[0] != 3:
@@ -139,7 +139,9 @@ if sys.version_info[0] != 3:
 
 
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
 lf_report = importlib.import_module("lf_report")
+ssh_session_pool = importlib.import_module("py-json.ssh_session_pool")
 lf_kpi_csv = importlib.import_module("lf_kpi_csv")
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("lf_logger_config")
@@ -155,6 +157,50 @@ sys.path.insert(0, parent_dir_path)
 FORMAT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
 
 
+# one run of a test script, lf_check prepares it, runs it and reports it
+class lf_check_job():
+    def __init__(self,
+                 test=None,
+                 iteration=1,
+                 command="",
+                 command_to_run=None,
+                 stdout_log_txt="",
+                 stderr_log_txt="",
+                 timeout=0,
+                 load_db=None):
+        # position in the suite, results are reported in this order
+        self.index = 0
+        self.test = test
+        self.iteration = iteration
+        self.command = command
+        self.command_to_run = command_to_run
+        self.stdout_log_txt = stdout_log_txt
+        self.stderr_log_txt = stderr_log_txt
+        self.timeout = timeout
+        self.load_db = load_db
+        self.user_prompt = None
+
+        # scheduling, see lf_check.get_test_resources()
+        self.resources = set()
+        self.exclusive = True
+        self.depends_on = []
+        self.deps = set()
+
+        # filled in by lf_check.execute_script()
+        self.return_code = None
+        self.timed_out = False
+        self.summary_output = ''
+        self.start_time = None
+        self.end_time = None
+        self.test_start_time = ""
+        self.test_end_time = ""
+
+    def duration_sec(self):
+        if self.start_time is None or self.end_time is None:
+            return 0.0
+        return (self.end_time - self.start_time).total_seconds()
+
+
 # lf_check class contains verificaiton configuration and ocastrates the
 # testing.
 class lf_check():
@@ -275,6 +321,8 @@ class lf_check():
         self.lf_mgr_port = "8080"
         # TODO allow for json configuration
         self.lf_mgr_ssh_port = "22"
+        # shared with cv_test_reports.lanforge_reports.pull_reports
+        self.ssh_pool = ssh_session_pool.SSHSessionPool.get_shared()
         self.lf_mgr_user = "lanforge"
         self.lf_mgr_pass = "lanforge"
         self.upstream_port = ""
@@ -289,6 +337,8 @@ class lf_check():
         self.suite_start_time = ""
         self.suite_end_time = ""
         self.suite_duration = ""
+        # sum of the test durations, what the suite takes when run one test at a time
+        self.suite_serial_duration = ""
         self.test_start_time = ""
         self.test_end_time = ""
         self.duration = ""
@@ -312,6 +362,11 @@ class lf_check():
         self.bandwidth = 'NA'
         self.tx_power_list = []
         self.tx_power = 'NA'
+        self.user_prompt = None
+
+        # --parallel, number of tests run at the same time, 1 runs them one after another
+        self.parallel_workers = 1
+        self.script_jobs = []
 
         # radio firmware list
         self.radio_firmware_list = ["NA"]
@@ -433,64 +488,28 @@ class lf_check():
     def get_lanforge_system_ip(self):
         return self.lf_mgr_ip
 
+    # System facts are read over one pooled SSH connection per LANforge and cached for the
+    # whole suite, so later iterations do not reconnect. A failed or empty command is not cached.
+    def ssh_exec(self, command, use_cache=True):
+        return self.ssh_pool.exec_command(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port,
+                                          username=self.lf_mgr_user, password=self.lf_mgr_pass,
+                                          command=command, use_cache=use_cache)
+
     def get_lanforge_system_node_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command('uname -n')
-        self.lanforge_system_node_version = stdout.readlines()
-        self.lanforge_system_node_version = [line.replace(
-            '\n', '') for line in self.lanforge_system_node_version]
-        ssh.close()
-        time.sleep(1)
+        self.lanforge_system_node_version = self.ssh_exec('uname -n')
         return self.lanforge_system_node_version
 
     def get_lanforge_fedora_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command('cat /etc/fedora-release')
-        self.lanforge_fedora_version = stdout.readlines()
-        self.lanforge_fedora_version = [line.replace(
-            '\n', '') for line in self.lanforge_fedora_version]
-        ssh.close()
-        time.sleep(1)
+        self.lanforge_fedora_version = self.ssh_exec('cat /etc/fedora-release')
         return self.lanforge_fedora_version
 
     def get_lanforge_kernel_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        # stdin, stdout, stderr = ssh.exec_command('uname -r')
-        stdin, stdout, stderr = ssh.exec_command('uname -a')
-        self.lanforge_kernel_version = stdout.readlines()
-        self.lanforge_kernel_version = [line.replace(
-            '\n', '') for line in self.lanforge_kernel_version]
-        ssh.close()
-        time.sleep(1)
+        # self.ssh_exec('uname -r')
+        self.lanforge_kernel_version = self.ssh_exec('uname -a')
         return self.lanforge_kernel_version
 
     def get_lanforge_server_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command(
-            './btserver --version | grep  Version')
-        self.lanforge_server_version_full = stdout.readlines()
-        self.lanforge_server_version_full = [line.replace(
-            '\n', '') for line in self.lanforge_server_version_full]
+        self.lanforge_server_version_full = self.ssh_exec('./btserver --version | grep  Version')
         self.logger.info("lanforge_server_version_full: {lanforge_server_version_full}".format(
             lanforge_server_version_full=self.lanforge_server_version_full))
         self.lanforge_server_version = self.lanforge_server_version_full[0].split(
@@ -498,22 +517,10 @@ class lf_check():
         self.lanforge_server_version = self.lanforge_server_version.strip()
         self.logger.info("lanforge_server_version: {lanforge_server_version}".format(
             lanforge_server_version=self.lanforge_server_version))
-        ssh.close()
-        time.sleep(1)
         return self.lanforge_server_version_full
 
     def get_lanforge_server_build_info(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command(
-            './btserver --version')
-        self.lanforge_server_build_info = stdout.readlines()
-        self.lanforge_server_build_info = [line.replace(
-            '\n', '') for line in self.lanforge_server_build_info]
+        self.lanforge_server_build_info = self.ssh_exec('./btserver --version')
 
         # self.lanforge_server_build_info = ''.join(self.lanforge_server_build_info)
         self.logger.info("lanforge_server_build_info: {lanforge_server_build_info}".format(
@@ -521,23 +528,11 @@ class lf_check():
         # self.lanforge_server_build_info = self.lanforge_server_build_info.strip()
         self.logger.info("lanforge_server_build_info: {lanforge_server_build_info}".format(
             lanforge_server_build_info=self.lanforge_server_build_info))
-        ssh.close()
-        time.sleep(1)
         return self.lanforge_server_build_info
 
     def get_lanforge_gui_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command(
+        self.lanforge_gui_version_full = self.ssh_exec(
             'curl -H "Accept: application/json" http://{lanforge_ip}:8080 | json_pp  | grep -A 7 "VersionInfo"'.format(lanforge_ip=self.lf_mgr_ip))
-        self.lanforge_gui_version_full = stdout.readlines()
-        # self.logger.info("lanforge_gui_version_full pre: {lanforge_gui_version_full}".format(lanforge_gui_version_full=self.lanforge_gui_version_full))
-        self.lanforge_gui_version_full = [line.replace(
-            '\n', '') for line in self.lanforge_gui_version_full]
         # self.logger.info("lanforge_gui_version_full: {lanforge_gui_version_full}".format(lanforge_gui_version_full=self.lanforge_gui_version_full))
         for element in self.lanforge_gui_version_full:
             if "BuildVersion" in element:
@@ -560,8 +555,6 @@ class lf_check():
                 self.logger.info("GitVersion {}".format(
                     self.lanforge_gui_git_sha))
 
-        ssh.close()
-        time.sleep(1)
         return self.lanforge_gui_version_full, self.lanforge_gui_version, self.lanforge_gui_build_date, self.lanforge_gui_git_sha
 
     def no_send_results_email(self, report_file=None):
@@ -1201,6 +1194,23 @@ junit.xml path: allure serve {junit_path}
         sleep(15)
 
     def run_script(self):
+        """
+        Run the current test iteration. With --parallel the prepared command is queued
+        for run_script_jobs() instead, results are then reported once it has run.
+        """
+        job = self.prepare_script()
+        if self.parallel_workers > 1:
+            job.index = len(self.script_jobs)
+            self.script_jobs.append(job)
+            return
+        self.execute_script(job)
+        self.report_script(job)
+
+    def prepare_script(self):
+        """
+        Substitute the rig, dut and batch values into the current test's arguments.
+        :return: lf_check_job with the command for the current test iteration
+        """
         # The network arguments need to be changed when in a list
         for index, args_list_element in enumerate(
                 self.test_dict[self.test]['args_list']):
@@ -1360,31 +1370,14 @@ junit.xml path: allure serve {junit_path}
                 self.test_dict[self.test]['timeout'])
         else:
             self.test_timeout = self.test_timeout_default
+        load_db = None
         if 'load_db' in self.test_dict[self.test]:
             self.logger.info(
                 "load_db : {}".format(
                     self.test_dict[self.test]['load_db']))
             if str(self.test_dict[self.test]['load_db']).lower() != "none" and str(
                     self.test_dict[self.test]['load_db']).lower() != "skip":
-                try:
-                    self.load_custom_database(
-                        self.test_dict[self.test]['load_db'])
-                except Exception as x:
-                    traceback.print_exception(
-                        Exception, x, x.__traceback__, chain=True)
-                    self.logger.info("custom database failed to load check existance and location: {}".format(
-                        self.test_dict[self.test]['load_db']))
-        try:
-            os.chdir(self.scripts_wd)
-            self.logger.info(
-                "Current Working Directory {}".format(os.getcwd()))
-
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            self.logger.info(
-                "failed to change to {}".format(
-                    self.scripts_wd))
+                load_db = self.test_dict[self.test]['load_db']
         cmd_args = "{}".format(self.test_dict[self.test]['args'])
 
         # check to see if the command is a python or perl scrip
@@ -1407,7 +1400,6 @@ junit.xml path: allure serve {junit_path}
                 self.log_path, "{}-{}-stdout.txt".format(self.outfile_name, self.test))
             self.logger.info(
                 "stdout_log_txt: {}".format(stdout_log_txt))
-            stdout_log = open(stdout_log_txt, 'a')
             stderr_log_txt = os.path.join(
                 self.log_path, "{}-{}-stderr.txt".format(self.outfile_name, self.test))
             self.logger.info(
@@ -1425,79 +1417,162 @@ junit.xml path: allure serve {junit_path}
         self.logger.info(
             "running {command_to_run}".format(
                 command_to_run=command_to_run))
-        self.test_start_time = str(datetime.datetime.now().strftime(
+        job = lf_check_job(test=self.test,
+                           iteration=self.iteration,
+                           command=command,
+                           command_to_run=command_to_run,
+                           stdout_log_txt=stdout_log_txt,
+                           stderr_log_txt=stderr_log_txt,
+                           timeout=self.test_timeout,
+                           load_db=load_db)
+        job.resources, job.exclusive, job.depends_on = self.get_test_resources()
+        job.user_prompt = self.user_prompt
+        self.user_prompt = None
+        return job
+
+    def get_test_resources(self):
+        """
+        What the current test declares it uses, for the parallel scheduler. Optional test json keys:
+            "resources":"1.1.wiphy0 1.1.wiphy1 UPSTREAM_PORT"  radios, ports or attenuators the test uses
+            "depends_on":"test_a test_b"                        tests that need to finish first
+            "exclusive":"TRUE"                                  run with no other test running
+        A test without resources may use anything and runs exclusively, so do tests that load a
+        database or ask for user intervention since they change or wait on the whole testbed.
+        :return: (set of resources, exclusive, list of test names depended on)
+        """
+        test_json = self.test_dict[self.test]
+        resources = str(test_json.get('resources', '')).replace(',', ' ')
+        for key, value in (('UPSTREAM_PORT', self.upstream_port),
+                           ('UPSTREAM_ALIAS', self.upstream_alias),
+                           ('ATTENUATOR_1', self.attenuator_1),
+                           ('ATTENUATOR_2', self.attenuator_2),
+                           ('ATTENUATOR_3', self.attenuator_3)):
+            resources = resources.replace(key, str(value))
+        resources = set(resources.split())
+        exclusive = (not resources
+                     or str(test_json.get('exclusive', 'FALSE')).upper() == 'TRUE'
+                     or str(test_json.get('load_db', 'none')).lower() not in ('none', 'skip')
+                     or str(test_json.get('user_intervention', 'FALSE')).upper() == 'TRUE')
+        depends_on = str(test_json.get('depends_on', '')).replace(',', ' ').split()
+        return resources, exclusive, depends_on
+
+    def execute_script(self, job, log_output=True):
+        """
+        Load the test's database if it has one, then run the command and wait for it.
+        :param job: lf_check_job from prepare_script()
+        :param log_output: log the output line by line while the script runs; otherwise the
+            script writes straight to its stdout log, which lets several scripts run at once
+        """
+        if job.user_prompt is not None:
+            user_input = input(job.user_prompt)
+            self.logger.info(
+                "user input received {input}".format(input=user_input))
+        if job.load_db is not None:
+            try:
+                self.load_custom_database(job.load_db)
+            except Exception as x:
+                traceback.print_exception(
+                    Exception, x, x.__traceback__, chain=True)
+                self.logger.info("custom database failed to load check existance and location: {}".format(
+                    job.load_db))
+
+        job.test_start_time = str(datetime.datetime.now().strftime(
             "%Y-%m-%d-%H-%M-%S")).replace(':', '-')
         self.logger.info(
-            "Test start: {time} Timeout: {timeout}".format(
-                time=self.test_start_time, timeout=self.test_timeout))
-        start_time = datetime.datetime.now()
-        summary_output = ''
+            "Test: {test} start: {time} Timeout: {timeout}".format(
+                test=job.test, time=job.test_start_time, timeout=job.timeout))
+        job.start_time = datetime.datetime.now()
+        stdout_log = open(job.stdout_log_txt, 'a')
+        log_offset = stdout_log.tell()
+        if log_output:
+            stdout = subprocess.PIPE
+        else:
+            stdout = stdout_log
+        summary = None
         # have stderr go to stdout
         try:
-            summary = subprocess.Popen(command_to_run, shell=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                       universal_newlines=True)
+            summary = subprocess.Popen(job.command_to_run, shell=False, cwd=self.scripts_wd, stdout=stdout,
+                                       stderr=subprocess.STDOUT, universal_newlines=True)
         # TODO the looks one directory higher,  there needs to be a way to execute from higher directory.
         except FileNotFoundError:
             # TODO tx_power is one directory up from py-scripts
             self.logger.info(
-                "FileNotFoundError will try to execute from lanforge Top directory")
-            os.chdir(self.lanforge_wd)
-            self.logger.info(
-                "Changed Current Working Directory to {}".format(os.getcwd()))
-            summary = subprocess.Popen(command_to_run, shell=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                       universal_newlines=True)
+                "FileNotFoundError will try to execute from lanforge Top directory {}".format(self.lanforge_wd))
+            summary = subprocess.Popen(job.command_to_run, shell=False, cwd=self.lanforge_wd, stdout=stdout,
+                                       stderr=subprocess.STDOUT, universal_newlines=True)
 
         except PermissionError:
             self.logger.info("PermissionError on execution of {command}".format(
-                command=command_to_run))
+                command=job.command_to_run))
 
         except IsADirectoryError:
             self.logger.info("IsADirectoryError on execution of {command}".format(
-                command=command_to_run))
-
-        # This code will read the output as the script is running and log
-        for line in iter(summary.stdout.readline, ''):
-            self.logger.info(line)
-            summary_output += line
-        try:
-            if int(self.test_timeout != 0):
-                summary.wait(timeout=int(self.test_timeout))
-            else:
-                summary.wait()
-        except TimeoutExpired:
-            summary.terminate
-            self.test_result = "TIMEOUT"
-        # TODO will change back to the scripts_wd since a script like tx_power.py will run in the parent directoy to
-        # py-scripts
-        os.chdir(self.scripts_wd)
-        self.logger.info("Current Working Directory {}".format(os.getcwd()))
-
-        # Since using "wait" above the return code will be set.
-        try:
-            return_code = summary.returncode
-            if return_code == 0:
+                command=job.command_to_run))
+
+        if summary is not None:
+            if log_output:
+                # This code will read the output as the script is running and log
+                for line in iter(summary.stdout.readline, ''):
+                    self.logger.info(line)
+                    job.summary_output += line
+            try:
+                if int(job.timeout) != 0:
+                    summary.wait(timeout=int(job.timeout))
+                else:
+                    summary.wait()
+            except (TimeoutExpired, subprocess.TimeoutExpired):
+                summary.terminate()
+                try:
+                    summary.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    summary.kill()
+                    summary.wait()
+                job.timed_out = True
+
+            # Since using "wait" above the return code will be set.
+            job.return_code = summary.returncode
+            if job.return_code == 0:
                 self.logger.info("Script returned pass return code: {return_code} for test: {command}".format(
-                    return_code=return_code, command=command_to_run))
+                    return_code=job.return_code, command=job.command_to_run))
             else:
                 self.logger.info("Script returned non-zero return code: {return_code} for test: {command}".format(
-                    return_code=return_code, command=command_to_run))
+                    return_code=job.return_code, command=job.command_to_run))
 
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            self.logger.info(
-                "issue reading return code, test runner will continue")
-
-        self.logger.info(summary_output)
-        stdout_log.write(summary_output)
-        stdout_log.close()
-        end_time = datetime.datetime.now()
-        self.test_end_time = str(datetime.datetime.now().strftime(
+        if log_output:
+            stdout_log.write(job.summary_output)
+            stdout_log.close()
+        else:
+            stdout_log.close()
+            with open(job.stdout_log_txt) as stdout_log_fd:
+                stdout_log_fd.seek(log_offset)
+                job.summary_output = stdout_log_fd.read()
+        job.end_time = datetime.datetime.now()
+        job.test_end_time = str(job.end_time.strftime(
             "%Y-%m-%d-%H-%M-%S")).replace(':', '-')
+
+    def report_script(self, job):
+        """
+        Write the meta data and the html, junit and csv results of a test that has run.
+        :param job: lf_check_job that execute_script() has run
+        """
+        self.test = job.test
+        self.iteration = job.iteration
+        self.test_timeout = job.timeout
+        self.test_start_time = job.test_start_time
+        self.test_end_time = job.test_end_time
+        if job.timed_out:
+            self.test_result = "TIMEOUT"
+        command = job.command
+        command_to_run = job.command_to_run
+        stdout_log_txt = job.stdout_log_txt
+        stderr_log_txt = job.stderr_log_txt
+        return_code = job.return_code
+
+        self.logger.info(job.summary_output)
         self.logger.info(
             "Test end time {time}".format(
                 time=self.test_end_time))
-        time_delta = end_time - start_time
+        time_delta = job.end_time - job.start_time
         self.duration_sec_us = "{seconds}.{micro_sec}".format(
             seconds=time_delta.seconds, micro_sec=time_delta.microseconds)
         minutes, seconds = divmod(time_delta.seconds, 60)
@@ -1874,6 +1949,112 @@ junit.xml path: allure serve {junit_path}
         # self.logger.info("row: {}".format(row))
         self.logger.info("test: {} executed".format(self.test))
 
+    def schedule_script_jobs(self, jobs):
+        """
+        Work out which earlier jobs each job has to wait for:
+        the previous iteration of the same test, since they share a log, the tests named
+        in depends_on, and exclusive jobs, which wait for everything before them and
+        hold back everything after them.
+        """
+        jobs_by_test = {}
+        for job in jobs:
+            jobs_by_test.setdefault(job.test, []).append(job.index)
+        last_exclusive = None
+        last_of_test = {}
+        for job in jobs:
+            deps = set()
+            if job.test in last_of_test:
+                deps.add(last_of_test[job.test])
+            for test in job.depends_on:
+                if test not in jobs_by_test:
+                    self.logger.warning("test: {test} depends_on {depends_on} which is not run in this suite".format(
+                        test=job.test, depends_on=test))
+                    continue
+                deps.update(index for index in jobs_by_test[test] if index != job.index)
+            if job.exclusive:
+                deps.update(range(job.index))
+                last_exclusive = job.index
+            elif last_exclusive is not None:
+                deps.add(last_exclusive)
+            job.deps = deps
+            last_of_test[job.test] = job.index
+
+    def run_script_jobs(self):
+        """
+        Run the queued jobs with up to parallel_workers at a time. A job starts once the jobs it
+        depends on are done and no running job holds one of its resources. Results are reported
+        in suite order as soon as all the jobs before them are done.
+        """
+        jobs = self.script_jobs
+        self.script_jobs = []
+        if not jobs:
+            return
+        self.schedule_script_jobs(jobs)
+
+        pending = list(jobs)
+        running = {}
+        held = set()
+        done = set()
+        next_report = 0
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.parallel_workers, thread_name_prefix="lf_check") as executor:
+            while pending or running:
+                exclusive_running = any(job.exclusive for job in running.values())
+                for job in list(pending):
+                    if len(running) >= self.parallel_workers or exclusive_running:
+                        break
+                    if not job.deps <= done or job.resources & held:
+                        continue
+                    if job.exclusive and running:
+                        continue
+                    pending.remove(job)
+                    held |= job.resources
+                    running[executor.submit(self.execute_script, job, False)] = job
+                    self.logger.info("started test: {test} iteration: {iteration} running: {running}".format(
+                        test=job.test, iteration=job.iteration, running=len(running)))
+                    exclusive_running = job.exclusive
+
+                if not running:
+                    # depends_on loop, nothing can start: run the next job in suite order
+                    job = pending.pop(0)
+                    self.logger.warning("test: {test} depends_on cannot be met, running it now".format(test=job.test))
+                    held |= job.resources
+                    running[executor.submit(self.execute_script, job, False)] = job
+
+                finished, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = running.pop(future)
+                    held -= job.resources
+                    done.add(job.index)
+                    try:
+                        future.result()
+                    except Exception as x:
+                        traceback.print_exception(
+                            Exception, x, x.__traceback__, chain=True)
+                        self.logger.error("test: {test} failed to run".format(test=job.test))
+                        if job.start_time is None:
+                            job.start_time = datetime.datetime.now()
+                        if job.end_time is None:
+                            job.end_time = datetime.datetime.now()
+                            job.test_end_time = str(job.end_time.strftime(
+                                "%Y-%m-%d-%H-%M-%S")).replace(':', '-')
+                    self.logger.info("finished test: {test} iteration: {iteration} return code: {return_code}".format(
+                        test=job.test, iteration=job.iteration, return_code=job.return_code))
+
+                while next_report < len(jobs) and jobs[next_report].index in done:
+                    self.report_script(jobs[next_report])
+                    next_report += 1
+
+        wall_sec = time.monotonic() - started
+        serial_sec = sum(job.duration_sec() for job in jobs)
+        minutes, seconds = divmod(int(serial_sec), 60)
+        hours, minutes = divmod(minutes, 60)
+        days, hours = divmod(hours, 24)
+        self.suite_serial_duration = "{day}d {hours}h {minutes}m {seconds}s".format(
+            day=days, hours=hours, minutes=minutes, seconds=seconds)
+        self.logger.info("{count} test runs with {workers} workers took {wall:.1f}s, run serially {serial:.1f}s".format(
+            count=len(jobs), workers=self.parallel_workers, wall=wall_sec, serial=serial_sec))
+
     # TODO the command needs to be updated for the batch iterations
     def run_script_test(self):
         self.start_html_results()
@@ -1910,9 +2091,13 @@ junit.xml path: allure serve {junit_path}
                             user_prompt = 'Default prompt User Intervention requested for test: {test}, hit enter to continue: '.format(
                                 test=self.test)
 
-                        user_input = input(user_prompt)
-                        logger.info(
-                            "user input received {input}".format(input=user_input))
+                        if self.parallel_workers > 1:
+                            # asked once the tests before this one have finished
+                            self.user_prompt = user_prompt
+                        else:
+                            user_input = input(user_prompt)
+                            logger.info(
+                                "user input received {input}".format(input=user_input))
 
                 # TODO Place test interations here
                 if 'iterations' in self.test_dict[self.test]:
@@ -2045,6 +2230,9 @@ junit.xml path: allure serve {junit_path}
                 self.logger.warning(
                     "enable value {} for test: {} ".format(self.test_dict[self.test]['enabled'], self.test))
 
+        if self.parallel_workers > 1:
+            self.run_script_jobs()
+
         # The test suite has run
         self.finish_junit_testsuite()
         self.finish_junit_testsuites()
@@ -2061,6 +2249,9 @@ junit.xml path: allure serve {junit_path}
             day=suite_time_delta.days, hours=hours, minutes=minutes, seconds=seconds, msec=suite_time_delta.microseconds)
         self.logger.info("Suite Duration:  {suite_duration}".format(
             suite_duration=self.suite_duration))
+        if self.suite_serial_duration:
+            self.logger.info("Suite Duration if run serially:  {serial_duration}".format(
+                serial_duration=self.suite_serial_duration))
         self.finish_html_results()
 
 
@@ -2175,6 +2366,12 @@ If parameter not set will read TEST_WINDOW_DAYS from rig.json""")
                         help="--no_exit_if_no_gui store true , if gui unavailable do not exit to allow gui restart",
                         action='store_true')
 
+    parser.add_argument('--parallel', type=int, default=1,
+                        help="""--parallel <number>  run up to this many tests at the same time, default 1 runs them in order.
+Tests run alongside each other only when the test json declares what they use:
+    "resources":"1.1.wiphy0 1.1.wiphy1 UPSTREAM_PORT", "depends_on":"<test> <test>", "exclusive":"TRUE"
+tests without resources run alone. Results are reported in suite order.""")
+
     args = parser.parse_args()
 
     # set up logger
@@ -2420,6 +2617,7 @@ If parameter not set will read TEST_WINDOW_DAYS from rig.json""")
                                  _report_path=report_path,
                                  _log_path=log_path,
                                  _json_test_name=json_test_name)
+                check.parallel_workers = max(1, args.parallel)
 
                 # set up logging
                 logfile = args.logfile[:-4]
@@ -2631,6 +2829,8 @@ If parameter not set will read TEST_WINDOW_DAYS from rig.json""")
                 lf_suite_time['Suite Start'] = [check.suite_start_time]
                 lf_suite_time['Suite End'] = [check.suite_end_time]
                 lf_suite_time['Suite Duration'] = [check.suite_duration]
+                if check.suite_serial_duration:
+                    lf_suite_time['Suite Duration If Run Serially'] = [check.suite_serial_duration]
 
                 lf_test_summary = pd.DataFrame()
                 lf_test_summary['Tests Run'] = [check.tests_run]
@@ -15,23 +15,116 @@ import plotly.express as px
 import pandas as pd
 import sqlite3
 import argparse
+import hashlib
 from pathlib import Path
 import time
 import logging
 import re
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
 
 lf_report = importlib.import_module("py-scripts.lf_report")
 lf_report = lf_report.lf_report
+lf_kpi_csv = importlib.import_module("py-scripts.lf_kpi_csv")
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 
 # Any style components can be used
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
+# hover data of the kpi graphs
+graph_hover_columns = [
+    'Date',
+    'test_dir',
+    'numeric-score',
+    'kernel',
+    'radio_fw',
+    'gui_ver',
+    'gui_build_date',
+    'server_ver',
+    'server_build_date',
+    'dut-hw-version',
+    'dut-sw-version',
+    'dut-model-num',
+    'dut-serial-num'
+]
+
+# columns read from the database to generate the kpi graphs
+graph_columns = graph_hover_columns + ['test-rig', 'test-tag', 'Graph-Group', 'test-id', 'kpi_path', 'Units',
+                                       'short-description']
+
+
+def kpi_figure(df_tmp, group, test_tag, test_rig):
+    # Note if graph group is score there is sub tests for pass and fail
+    # would like a percentage
+    test_id_list = list(df_tmp['test-id'])
+    units_list = list(df_tmp['Units'])
+    kpi_fig = (
+        px.scatter(
+            df_tmp,
+            x="Date",
+            y="numeric-score",
+            custom_data=graph_hover_columns,
+            color="short-description",
+            hover_name="short-description",
+            size_max=60)).update_traces(
+        mode='lines+markers')
+
+    kpi_fig.update_traces(
+        hovertemplate="<br>".join([
+            "Date: %{customdata[0]}",
+            "test_dir: %{customdata[1]}",
+            "numeric-score: %{customdata[2]}",
+            "kernel-version: %{customdata[3]}",
+            "radio-fw: %{customdata[4]}",
+            "gui-version: %{customdata[5]}",
+            "gui-build-date: %{customdata[6]}",
+            "server-version: %{customdata[7]}",
+            "server-build-date: %{customdata[8]}",
+            "dut-hw-version: %{customdata[9]}",
+            "dut-sw-version: %{customdata[10]}",
+            "dut-model-num: %{customdata[11]}",
+            "dut-serial-num: %{customdata[12]}",
+        ])
+    )
+
+    kpi_fig.update_layout(
+        title="{test_id} : {group} : {test_tag} : {test_rig}".format(
+            test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig),
+        xaxis_title="Time",
+        yaxis_title="{units}".format(units=units_list[-1]),
+        xaxis={'type': 'date'}
+    )
+    kpi_fig.update_layout(autotypenumbers='convert types')
+    return kpi_fig
+
+
+def write_kpi_graph(df_tmp, group, test_tag, test_rig, png_path, html_path):
+    """
+    Generate the png and the interactive html of one kpi graph, run in a worker process.
+    :return: True if the png was written
+    """
+    logger.info("generate png and kpi images from kpi kpi_path:{}".format(
+        df_tmp['kpi_path'].iloc[-1]))
+    kpi_fig = kpi_figure(df_tmp, group, test_tag, test_rig)
+    # generate png image
+    png_present = True
+    try:
+        kpi_fig.write_image(png_path, scale=1, width=1200, height=300)
+    except ValueError as err:
+        logger.info("ValueError kpi_fig.write_image {msg}".format(msg=err))
+        png_present = False
+    except Exception as x:
+        traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+        png_present = False
+    # generate html image (interactive)
+    if png_present:
+        kpi_fig.write_html(html_path)
+    return png_present
+
 
 class csv_sql:
     def __init__(self,
@@ -42,7 +135,10 @@ class csv_sql:
                  _database='qa_db',
                  _table='qa_table',
                  _png=False,
-                 _test_window_days='7'):
+                 _test_window_days='7',
+                 _incremental=False,
+                 _png_workers=None,
+                 _png_refresh=False):
         self.path = _path
         self.path_comp = _path_comp
         self.lf_qa_report_path = _lf_qa_report_path
@@ -54,6 +150,12 @@ class csv_sql:
         self.database = _database
         self.table = _table
         self.png = _png
+        self.incremental = _incremental
+        # kpi graphs are rendered in worker processes, unchanged graphs are not rendered again
+        self.png_workers = _png_workers if _png_workers else min(4, os.cpu_count() or 1)
+        self.png_refresh = _png_refresh
+        # columns the report queries filter on, indexed by store_incremental()
+        self.index_columns = ['test-rig', 'test-tag', 'Graph-Group', 'Date']
         self.kpi_list = []
         self.html_list = []
         self.conn = None
@@ -571,7 +673,35 @@ class csv_sql:
     # Ubuntu sudo apt-get install sqlite3
     #
 
+    def read_kpi(self, kpi):
+        # includes rotated kpi.csv segments, read from their .npz sidecars when present
+        df_kpi_tmp = lf_kpi_csv.read_kpi_csv(kpi)
+        # only store the path to the kpi.csv file
+        _kpi_path = str(kpi).replace('kpi.csv', '')
+        df_kpi_tmp['kpi_path'] = _kpi_path
+        test_run = self.get_test_run_from_meta(_kpi_path)
+        df_kpi_tmp['test_run'] = test_run
+
+        use_meta_test_tag, test_tag = self.get_test_tag_from_meta(_kpi_path)
+        if use_meta_test_tag:
+            df_kpi_tmp['test-tag'] = test_tag
+
+        test_dir = self.get_test_dir_info_from_meta(_kpi_path)
+        # test_dir = test_dir.replace('-',' ')
+        df_kpi_tmp['test_dir'] = test_dir
+
+        logger.info("test_dir: {test_dir}".format(test_dir=test_dir))
+
+        df_kpi_tmp['kernel'] = self.get_kernel_version_from_meta(_kpi_path)
+        df_kpi_tmp['radio_fw'] = self.get_radio_firmware_from_meta(_kpi_path)
+        df_kpi_tmp['gui_ver'], df_kpi_tmp['gui_build_date'] = self.get_gui_info_from_meta(_kpi_path)
+        df_kpi_tmp['server_ver'], df_kpi_tmp['server_build_date'] = self.get_server_info_from_meta(_kpi_path)
+        return df_kpi_tmp
+
     def store(self):
+        if self.incremental:
+            self.store_incremental()
+            return
         logger.info("reading kpi and storing in db {}".format(self.database))
         path = Path(self.path)
         logger.info("store path {path}".format(path=path))
@@ -581,31 +711,10 @@ class csv_sql:
         if not self.kpi_list:
             logger.info("WARNING: used --store , no new kpi.csv found, check input path or remove --store from command line")
 
-        for kpi in self.kpi_list:  # TODO note empty kpi.csv failed test
-            df_kpi_tmp = pd.read_csv(kpi, sep='\t')
-            # only store the path to the kpi.csv file
-            _kpi_path = str(kpi).replace('kpi.csv', '')
-            df_kpi_tmp['kpi_path'] = _kpi_path
-            test_run = self.get_test_run_from_meta(_kpi_path)
-            df_kpi_tmp['test_run'] = test_run
-
-            use_meta_test_tag, test_tag = self.get_test_tag_from_meta(_kpi_path)
-            if use_meta_test_tag:
-                df_kpi_tmp['test-tag'] = test_tag
-
-            test_dir = self.get_test_dir_info_from_meta(_kpi_path)
-            # test_dir = test_dir.replace('-',' ')
-            df_kpi_tmp['test_dir'] = test_dir
-
-            logger.info("test_dir: {test_dir}".format(test_dir=test_dir))
-
-            df_kpi_tmp['kernel'] = self.get_kernel_version_from_meta(_kpi_path)
-            df_kpi_tmp['radio_fw'] = self.get_radio_firmware_from_meta(_kpi_path)
-            df_kpi_tmp['gui_ver'], df_kpi_tmp['gui_build_date'] = self.get_gui_info_from_meta(_kpi_path)
-            df_kpi_tmp['server_ver'], df_kpi_tmp['server_build_date'] = self.get_server_info_from_meta(_kpi_path)
-
-            # this next line creats duplicate entries
-            self.df = pd.concat([self.df, df_kpi_tmp], ignore_index=True)
+        # TODO note empty kpi.csv failed test
+        df_kpi_list = [self.read_kpi(kpi) for kpi in self.kpi_list]
+        if df_kpi_list:
+            self.df = pd.concat([self.df] + df_kpi_list, ignore_index=True)
 
         self.conn = sqlite3.connect(self.database)
         try:
@@ -622,6 +731,136 @@ class csv_sql:
             exit(1)
         self.conn.close()
 
+    # The manifest table remembers every kpi.csv already stored: path, mtime, size and sha256.
+    # A file whose mtime and size are unchanged is skipped without being read, a file whose
+    # content hash is unchanged only has its manifest entry refreshed.
+    def get_manifest_table(self):
+        return "{table}_manifest".format(table=self.table)
+
+    def get_file_hash(self, kpi):
+        sha = hashlib.sha256()
+        with open(kpi, 'rb') as kpi_fd:
+            for chunk in iter(lambda: kpi_fd.read(1024 * 1024), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def get_table_columns(self, table):
+        cursor = self.conn.execute('PRAGMA table_info("{table}")'.format(table=table))
+        return [row[1] for row in cursor.fetchall()]
+
+    def create_report_indexes(self):
+        columns = self.get_table_columns(self.table)
+        for column in self.index_columns:
+            if column not in columns:
+                continue
+            index_name = "{table}_{column}_idx".format(table=self.table, column=re.sub(r'\W', '_', column))
+            self.conn.execute('CREATE INDEX IF NOT EXISTS "{index}" ON "{table}" ("{column}")'.format(
+                index=index_name, table=self.table, column=column))
+
+    def store_incremental(self):
+        logger.info("reading new or changed kpi and storing in db {}".format(self.database))
+        path = Path(self.path)
+        logger.info("store path {path}".format(path=path))
+        self.kpi_list = list(path.glob('**/kpi.csv'))  # Hard code for now
+
+        manifest_table = self.get_manifest_table()
+        self.conn = sqlite3.connect(self.database)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS "{manifest}" '
+                          '(kpi_file TEXT PRIMARY KEY, mtime REAL, size INTEGER, sha256 TEXT, rows INTEGER, stored REAL)'.format(
+                              manifest=manifest_table))
+        manifest = {}
+        for kpi_file, mtime, size, sha256 in self.conn.execute(
+                'SELECT kpi_file, mtime, size, sha256 FROM "{manifest}"'.format(manifest=manifest_table)):
+            manifest[kpi_file] = (mtime, size, sha256)
+
+        # rows stored by a plain --store have no manifest entry, replace them instead of duplicating
+        stored_kpi_paths = set()
+        if 'kpi_path' in self.get_table_columns(self.table):
+            stored_kpi_paths = set(row[0] for row in self.conn.execute(
+                'SELECT DISTINCT kpi_path FROM "{table}"'.format(table=self.table)))
+
+        df_kpi_list = []
+        manifest_updates = []
+        changed_files = []
+        skipped = 0
+        for kpi in self.kpi_list:
+            kpi_file = str(kpi)
+            stat = kpi.stat()
+            entry = manifest.get(kpi_file)
+            if entry is not None and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+                skipped += 1
+                continue
+            sha256 = self.get_file_hash(kpi)
+            if entry is not None and entry[2] == sha256:
+                # touched but not changed
+                manifest_updates.append((kpi_file, stat.st_mtime, stat.st_size, sha256, None))
+                skipped += 1
+                continue
+            try:
+                df_kpi_tmp = self.read_kpi(kpi)
+            except Exception as x:
+                # TODO note empty kpi.csv failed test
+                traceback.print_exception(
+                    Exception, x, x.__traceback__, chain=True)
+                logger.info("unable to read {kpi}, skipping".format(kpi=kpi_file))
+                continue
+            if entry is not None or kpi_file.replace('kpi.csv', '') in stored_kpi_paths:
+                changed_files.append(kpi_file)
+            df_kpi_list.append(df_kpi_tmp)
+            manifest_updates.append((kpi_file, stat.st_mtime, stat.st_size, sha256, len(df_kpi_tmp)))
+
+        logger.info("kpi.csv files: {total} found, {new} to store, {skipped} unchanged".format(
+            total=len(self.kpi_list), new=len(df_kpi_list), skipped=skipped))
+        if not df_kpi_list and not manifest_updates:
+            logger.info("WARNING: used --store , no new kpi.csv found, check input path or remove --store from command line")
+
+        self.df = pd.concat(df_kpi_list, ignore_index=True) if df_kpi_list else pd.DataFrame()
+        try:
+            # one transaction: rows and manifest are stored together or not at all
+            with self.conn:
+                table_columns = self.get_table_columns(self.table)
+                if not table_columns and not self.df.empty:
+                    self.df.head(0).to_sql(self.table, self.conn)
+                    table_columns = self.get_table_columns(self.table)
+                for column in self.df.columns:
+                    if column not in table_columns:
+                        logger.info("adding column {column} to {table}".format(column=column, table=self.table))
+                        self.conn.execute('ALTER TABLE "{table}" ADD COLUMN "{column}"'.format(
+                            table=self.table, column=column))
+                for kpi_file in changed_files:
+                    # rows were stored with the kpi.csv directory as kpi_path
+                    self.conn.execute('DELETE FROM "{table}" WHERE kpi_path = ?'.format(table=self.table),
+                                      (kpi_file.replace('kpi.csv', ''),))
+                if not self.df.empty:
+                    columns = list(self.df.columns)
+                    values = self.df.astype(object).where(pd.notnull(self.df), None)
+                    if 'index' in table_columns and 'index' not in columns:
+                        columns = ['index'] + columns
+                        rows = [(position,) + tuple(row) for position, row in enumerate(values.itertuples(index=False, name=None))]
+                    else:
+                        rows = list(values.itertuples(index=False, name=None))
+                    self.conn.executemany('INSERT INTO "{table}" ({columns}) VALUES ({marks})'.format(
+                        table=self.table,
+                        columns=",".join('"{}"'.format(column) for column in columns),
+                        marks=",".join("?" * len(columns))), rows)
+                stored = time.time()
+                for kpi_file, mtime, size, sha256, rows in manifest_updates:
+                    if rows is None:
+                        self.conn.execute('UPDATE "{manifest}" SET mtime = ?, size = ? WHERE kpi_file = ?'.format(
+                            manifest=manifest_table), (mtime, size, kpi_file))
+                    else:
+                        self.conn.execute('INSERT OR REPLACE INTO "{manifest}" VALUES (?, ?, ?, ?, ?, ?)'.format(
+                            manifest=manifest_table), (kpi_file, mtime, size, sha256, rows, stored))
+                self.create_report_indexes()
+        except Exception as x:
+            traceback.print_exception(
+                Exception, x, x.__traceback__, chain=True)
+            logger.info("incremental store into {database} failed, nothing was stored".format(database=self.database))
+            print("Error incremental store into {database} failed, nothing was stored".format(database=self.database),
+                  file=sys.stderr)
+            exit(1)
+        self.conn.close()
+
     # information on sqlite database
     # https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_sql.html
     # sqlite browser:
@@ -639,7 +878,7 @@ class csv_sql:
             logger.info("WARNING: used --store , no new kpi.csv found, check input path or remove --store from command line")
 
         for kpi in self.kpi_list:  # TODO note empty kpi.csv failed test
-            df_kpi_tmp = pd.read_csv(kpi, sep='\t')
+            df_kpi_tmp = lf_kpi_csv.read_kpi_csv(kpi)
             # only store the path to the kpi.csv file
             _kpi_path = str(kpi).replace('kpi.csv', '')
             df_kpi_tmp['kpi_path'] = _kpi_path
@@ -680,13 +919,8 @@ class csv_sql:
             exit(1)
         self.conn.close()
 
-    def generate_png(self, group, test_id_list, test_tag,
-                     test_rig, kpi_path_list, kpi_fig, df_tmp):
+    def get_kpi_graph_paths(self, group, test_tag, test_rig, kpi_path_list):
         # save the figure - figures will be over written png
-        # for testing
-        # generate the png files
-        logger.info("generate png and kpi images from kpi kpi_path:{}".format(
-            df_tmp['kpi_path']))
         # LAN-1535 scripting: test_l3.py output masks other output when browsing (index.html) create relative paths in reports
         # generate png img path
         png_path = os.path.join(
@@ -696,45 +930,63 @@ class csv_sql:
         html_path = os.path.join(
             kpi_path_list[-1], "{}_{}_{}_kpi.html".format(group, test_tag, test_rig))
         html_path = html_path.replace(' ', '')
-
-        # generate png image
-        png_present = True
-        try:
-            kpi_fig.write_image(png_path, scale=1, width=1200, height=300)
-        except ValueError as err:
-            logger.info("ValueError kpi_fig.write_image {msg}".format(msg=err))
-            png_present = False
-            # exit(1)
-        except Exception as x:
-            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
-            png_present = False
-            # exit(1)
-        # generate html image (interactive)
-        # TODO Do not crash if a PNG is not present
-        if png_present:
-            kpi_fig.write_html(html_path)
-            # Relative path
-            img_kpi_html_path_relative = os.path.relpath(html_path, self.lf_qa_report_path)
-            png_img_path_relative = os.path.relpath(png_path, self.lf_qa_report_path)
-
-            # link to interactive results
-            report_index_html_path = kpi_path_list[-1] + "readme.html"
-            relative_report_index_html = os.path.relpath(report_index_html_path, self.lf_qa_report_path)
-
-            self.html_results += """<a href={report_index_html_path} target="_blank">{test_id}_{group}_{test_tag}_{test_rig}_Report </a>
-            """.format(report_index_html_path=relative_report_index_html, test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig)
-
-            self.html_results += """
-            <a href={img_kpi_html_path} target="_blank">
-                <img src={png_server_img}>
-            </a>
-            """.format(img_kpi_html_path=img_kpi_html_path_relative, png_server_img=png_img_path_relative)
-
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
+        return png_path, html_path
+
+    def add_kpi_graph_html(self, group, test_id_list, test_tag,
+                           test_rig, kpi_path_list, png_path, html_path):
+        # Relative path
+        img_kpi_html_path_relative = os.path.relpath(html_path, self.lf_qa_report_path)
+        png_img_path_relative = os.path.relpath(png_path, self.lf_qa_report_path)
+
+        # link to interactive results
+        report_index_html_path = kpi_path_list[-1] + "readme.html"
+        relative_report_index_html = os.path.relpath(report_index_html_path, self.lf_qa_report_path)
+
+        self.html_results += """<a href={report_index_html_path} target="_blank">{test_id}_{group}_{test_tag}_{test_rig}_Report </a>
+        """.format(report_index_html_path=relative_report_index_html, test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig)
+
+        self.html_results += """
+        <a href={img_kpi_html_path} target="_blank">
+            <img src={png_server_img}>
+        </a>
+        """.format(img_kpi_html_path=img_kpi_html_path_relative, png_server_img=png_img_path_relative)
+
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
+
+    def get_graph_cache_table(self):
+        return "{table}_graph_cache".format(table=self.table)
+
+    def get_graph_cache(self):
+        self.conn.execute('CREATE TABLE IF NOT EXISTS "{cache}" '
+                          '(graph TEXT PRIMARY KEY, sha256 TEXT, png_path TEXT)'.format(
+                              cache=self.get_graph_cache_table()))
+        cursor = self.conn.execute('SELECT graph, sha256, png_path FROM "{cache}"'.format(
+            cache=self.get_graph_cache_table()))
+        return {graph: (sha256, png_path) for graph, sha256, png_path in cursor.fetchall()}
+
+    def get_graph_hash(self, df_tmp, png_path):
+        sha = hashlib.sha256(png_path.encode('utf-8'))
+        sha.update(df_tmp.to_csv(index=False).encode('utf-8'))
+        return sha.hexdigest()
+
+    def render_kpi_graphs(self, graphs):
+        """
+        Render graphs in worker processes, kaleido png export is the slow part of the report.
+        :param graphs: list of (df_tmp, group, test_tag, test_rig, png_path, html_path)
+        :return: list of png_present, in the order of graphs
+        """
+        if self.png_workers > 1 and len(graphs) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(self.png_workers, len(graphs))) as executor:
+                    return list(executor.map(write_kpi_graph, *zip(*graphs)))
+            except Exception as x:
+                traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+                logger.warning("png worker processes failed, generating png files one at a time")
+        return [write_kpi_graph(*graph) for graph in graphs]
 
     # TODO determin the subtest pass and fail graph
     # df is sorted by date oldest to newest
@@ -830,205 +1082,77 @@ class csv_sql:
             "generate png and html to display, generate time: {}".format(
                 time.time()))
 
+        # Time now generating the report
+        time_now = round(time.time() * 1000)
+        test_window_epoch = int(self.test_window_days) * 86400000
+
         # https://datacarpentry.org/python-ecology-lesson/09-working-with-sql/index.html-
         self.conn = sqlite3.connect(self.database)
-        # current connection is sqlite3 /TODO move to SQLAlchemy
-        df3 = pd.read_sql_query(
-            "SELECT * from {}".format(self.table), self.conn)
-        # sort by date from oldest to newest.
-        try:
-            df3 = df3.sort_values(by='Date')
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
+        table_columns = self.get_table_columns(self.table)
+        if 'Date' not in table_columns:
             logger.info("Database empty: KeyError(key) when sorting by Date, check Database name, path to kpi, typo in path, exiting")
             exit(1)
-        self.conn.close()
-
-        # graph group and test-tag are used for detemining the graphs, can use any columns
-        # the following list manipulation removes the duplicates
-        graph_group_list = list(df3['Graph-Group'])
-        graph_group_list = [x for x in graph_group_list if x is not None]
-        graph_group_list = list(set(graph_group_list))
-        logger.info("graph_group_list: {}".format(graph_group_list))
-
-        # prior to 5.4.3 there was not test-tag, the test tag is in the meta data
-        # logger.info("dataframe df3 {df3}".format(df3=df3))
-
-        test_tag_list = list(df3['test-tag'])
-        test_tag_list = [x for x in test_tag_list if x is not None]
-        test_tag_list = list(sorted(set(test_tag_list)))
-        # logger.info("test_tag_list: {}".format(test_tag_list) )
-
-        test_rig_list = list(df3['test-rig'])
-        test_rig_list = [x for x in test_rig_list if x is not None]
-        test_rig_list = list(sorted(set(test_rig_list)))
-        self.test_rig_list = test_rig_list
-        logger.info("test_rig_list: {}".format(test_rig_list))
 
-        # Time now generating the report
-        time_now = round(time.time() * 1000)
-        test_window_epoch = int(self.test_window_days) * 86400000
-
-        # create the rest of the graphs
-        for test_rig in test_rig_list:
-            for test_tag in test_tag_list:
-                for group in graph_group_list:
-                    df_tmp = df3.loc[(df3['test-rig'] == test_rig) & (
-                        df3['Graph-Group'] == str(group)) & (df3['test-tag'] == str(test_tag))]
-                    if not df_tmp.empty:
-                        # Note if graph group is score there is sub tests for pass and fail
-                        # would like a percentage
-
-                        df_tmp = df_tmp.sort_values(by='Date')
-                        test_id_list = list(df_tmp['test-id'])
-                        kpi_path_list = list(df_tmp['kpi_path'])
-
-                        # get Device Under Test Information ,
-                        # the set command uses a hash , sorted puts it back in order
-                        # the set reduces the redundency the filster removes None
-                        # list puts it back into a list
-                        # This code is since the dut is not passed in to lf_qa.py when
-                        # regernation of graphs from db
-
-                        # find the last Date in the dataframe see if it is a test no longer run
-                        recent_test_run = df_tmp["Date"].iloc[-1]
-                        oldest_test_run = df_tmp["Date"].iloc[0]
-                        # if the recent test is over a week old do not include in run
-                        # 1 day = 86400000 milli seconds
-                        # 1 week = 604800000 milli seconds
-                        time_difference = int(time_now) - int(recent_test_run)
-                        logger.info("time_now: {time_now} recent_test_run: {recent_test_run} difference: {time_difference} test_window_epoch: {test_window_epoch} oldest_test_run: {oldest_test_run}".format(  # noqa: E501
-                            time_now=time_now, recent_test_run=recent_test_run, test_window_epoch=test_window_epoch, time_difference=time_difference, oldest_test_run=oldest_test_run))
-                        # if (time_difference) < 604800000:  # TODO have window be configurable
-                        if (time_difference) < test_window_epoch:  # TODO have window be configurable
-                            units_list = list(df_tmp['Units'])
-                            logger.info(
-                                "GRAPHING::: test-rig {} test-tag {}  Graph-Group {}".format(test_rig, test_tag, group))
-                            # group of Score will have subtest
-                            if group == 'Score':
-                                # Print out the Standard Score report
-                                kpi_fig = (
-                                    px.scatter(
-                                        df_tmp,
-                                        x="Date",
-                                        y="numeric-score",
-                                        custom_data=[
-                                            'Date',
-                                            'test_dir',
-                                            'numeric-score',
-                                            'kernel',
-                                            'radio_fw',
-                                            'gui_ver',
-                                            'gui_build_date',
-                                            'server_ver',
-                                            'server_build_date',
-                                            'dut-hw-version',
-                                            'dut-sw-version',
-                                            'dut-model-num',
-                                            'dut-serial-num'
-                                        ],
-                                        color="short-description",
-                                        hover_name="short-description",
-                                        size_max=60)).update_traces(
-                                    mode='lines+markers')
-
-                                kpi_fig.update_traces(
-                                    hovertemplate="<br>".join([
-                                        "Date: %{customdata[0]}",
-                                        "test_dir: %{customdata[1]}",
-                                        "numeric-score: %{customdata[2]}",
-                                        "kernel-version: %{customdata[3]}",
-                                        "radio-fw: %{customdata[4]}",
-                                        "gui-version: %{customdata[5]}",
-                                        "gui-build-date: %{customdata[6]}",
-                                        "server-version: %{customdata[7]}",
-                                        "server-build-date: %{customdata[8]}",
-                                        "dut-hw-version: %{customdata[9]}",
-                                        "dut-sw-version: %{customdata[10]}",
-                                        "dut-model-num: %{customdata[11]}",
-                                        "dut-serial-num: %{customdata[12]}",
-                                    ])
-                                )
-
-                                kpi_fig.update_layout(
-                                    title="{test_id} : {group} : {test_tag} : {test_rig}".format(
-                                        test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig),
-                                    xaxis_title="Time",
-                                    yaxis_title="{}".format(units_list[-1]),
-                                    xaxis={'type': 'date'}
-                                )
-                                kpi_fig.update_layout(autotypenumbers='convert types')
-
-                                self.generate_png(df_tmp=df_tmp,
-                                                  group=group,
-                                                  test_id_list=test_id_list,
-                                                  test_tag=test_tag,
-                                                  test_rig=test_rig,
-                                                  kpi_path_list=kpi_path_list,
-                                                  kpi_fig=kpi_fig)
-
-                            else:
-                                kpi_fig = (
-                                    px.scatter(
-                                        df_tmp,
-                                        x="Date",
-                                        y="numeric-score",
-                                        custom_data=[
-                                            'Date',
-                                            'test_dir',
-                                            'numeric-score',
-                                            'kernel',
-                                            'radio_fw',
-                                            'gui_ver',
-                                            'gui_build_date',
-                                            'server_ver',
-                                            'server_build_date',
-                                            'dut-hw-version',
-                                            'dut-sw-version',
-                                            'dut-model-num',
-                                            'dut-serial-num'
-                                        ],
-                                        color="short-description",
-                                        hover_name="short-description",
-                                        size_max=60)).update_traces(
-                                    mode='lines+markers')
-
-                                kpi_fig.update_layout(
-                                    title="{test_id} : {group} : {test_tag} : {test_rig}".format(
-                                        test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig),
-                                    xaxis_title="Time",
-                                    yaxis_title="{units}".format(units=units_list[-1]),
-                                    xaxis={'type': 'date'}
-                                )
-
-                                kpi_fig.update_traces(
-                                    hovertemplate="<br>".join([
-                                        "Date: %{customdata[0]}",
-                                        "test_dir: %{customdata[1]}",
-                                        "numeric-score: %{customdata[2]}",
-                                        "kernel-version: %{customdata[3]}",
-                                        "radio-fw: %{customdata[4]}",
-                                        "gui-version: %{customdata[5]}",
-                                        "gui-build-date: %{customdata[6]}",
-                                        "server-version: %{customdata[7]}",
-                                        "server-build-date: %{customdata[8]}",
-                                        "dut-hw-version: %{customdata[9]}",
-                                        "dut-sw-version: %{customdata[10]}",
-                                        "dut-model-num: %{customdata[11]}",
-                                        "dut-serial-num: %{customdata[12]}",
-                                    ])
-                                )
-
-                                kpi_fig.update_layout(autotypenumbers='convert types')
-
-                                self.generate_png(df_tmp=df_tmp,
-                                                  group=group,
-                                                  test_id_list=test_id_list,
-                                                  test_tag=test_tag,
-                                                  test_rig=test_rig,
-                                                  kpi_path_list=kpi_path_list,
-                                                  kpi_fig=kpi_fig)
+        cursor = self.conn.execute('SELECT DISTINCT "test-rig" FROM "{table}" WHERE "test-rig" IS NOT NULL '
+                                   'ORDER BY "test-rig"'.format(table=self.table))
+        self.test_rig_list = [row[0] for row in cursor.fetchall()]
+        logger.info("test_rig_list: {}".format(self.test_rig_list))
+
+        # graph group, test-tag and test-rig are used for detemining the graphs.
+        # Only the graphs whose most recent test is inside the test window are read, with
+        # their whole history, and only the columns the graphs use.
+        # 1 day = 86400000 milli seconds
+        columns = [column for column in graph_columns if column in table_columns]
+        query = """SELECT {columns} FROM "{table}" t
+            JOIN (SELECT "test-rig", "test-tag", "Graph-Group" FROM "{table}"
+                  GROUP BY "test-rig", "test-tag", "Graph-Group"
+                  HAVING MAX(CAST("Date" AS INTEGER)) > ?) w
+            ON t."test-rig" = w."test-rig" AND t."test-tag" = w."test-tag" AND t."Graph-Group" = w."Graph-Group"
+            ORDER BY CAST(t."Date" AS INTEGER)""".format(
+            columns=", ".join('t."{column}"'.format(column=column) for column in columns), table=self.table)
+        df3 = pd.read_sql_query(query, self.conn, params=(time_now - test_window_epoch,))
+        graph_cache = self.get_graph_cache()
+        logger.info("graphs in test window of {days} days: {rows} rows".format(days=self.test_window_days, rows=len(df3)))
+
+        graphs = []
+        for (test_rig, test_tag, group), df_tmp in df3.groupby(['test-rig', 'test-tag', 'Graph-Group'], sort=True):
+            test_id_list = list(df_tmp['test-id'])
+            kpi_path_list = list(df_tmp['kpi_path'])
+            logger.info("time_now: {time_now} recent_test_run: {recent_test_run} test_window_epoch: {test_window_epoch} oldest_test_run: {oldest_test_run}".format(  # noqa: E501
+                time_now=time_now, recent_test_run=df_tmp["Date"].iloc[-1], test_window_epoch=test_window_epoch, oldest_test_run=df_tmp["Date"].iloc[0]))
+            png_path, html_path = self.get_kpi_graph_paths(group, test_tag, test_rig, kpi_path_list)
+            graph = "{}_{}_{}".format(group, test_tag, test_rig)
+            sha256 = self.get_graph_hash(df_tmp, png_path)
+            # the data of the graph has not changed since the png was generated
+            cached = (not self.png_refresh and graph_cache.get(graph) == (sha256, png_path)
+                      and os.path.exists(png_path) and os.path.exists(html_path))
+            graphs.append((df_tmp, group, test_tag, test_rig, test_id_list, kpi_path_list,
+                           png_path, html_path, graph, sha256, cached))
+
+        render = [(df_tmp, group, test_tag, test_rig, png_path, html_path)
+                  for df_tmp, group, test_tag, test_rig, _, _, png_path, html_path, _, _, cached in graphs
+                  if not cached]
+        logger.info("GRAPHING::: {render} of {total} graphs changed, png workers: {workers}".format(
+            render=len(render), total=len(graphs), workers=self.png_workers))
+        png_present_list = iter(self.render_kpi_graphs(render))
+
+        for df_tmp, group, test_tag, test_rig, test_id_list, kpi_path_list, png_path, html_path, graph, sha256, cached in graphs:
+            png_present = True if cached else next(png_present_list)
+            # TODO Do not crash if a PNG is not present
+            if not png_present:
+                continue
+            if not cached:
+                self.conn.execute('INSERT OR REPLACE INTO "{cache}" (graph, sha256, png_path) VALUES (?, ?, ?)'.format(
+                    cache=self.get_graph_cache_table()), (graph, sha256, png_path))
+            self.add_kpi_graph_html(group=group,
+                                    test_id_list=test_id_list,
+                                    test_tag=test_tag,
+                                    test_rig=test_rig,
+                                    kpi_path_list=kpi_path_list,
+                                    png_path=png_path,
+                                    html_path=html_path)
+        self.conn.commit()
+        self.conn.close()
 
 
 # Feature, Sum up the subtests passed/failed from the kpi files for each
@@ -1080,6 +1204,11 @@ Usage: lf_qa.py --store --png --path <path to directories to traverse> --databas
         '--store',
         help='--store , store kpi to db, action store_true',
         action='store_true')
+    parser.add_argument(
+        '--store_incremental',
+        help='''--store_incremental , store only new or changed kpi.csv files, action store_true
+            a manifest table <table>_manifest records the files already stored''',
+        action='store_true')
     parser.add_argument(
         '--store_comp',
         help='--store_comp , store compared data kpi to db, action store_true',
@@ -1088,6 +1217,16 @@ Usage: lf_qa.py --store --png --path <path to directories to traverse> --databas
         '--png',
         help='--png,  generate png for kpi in path, generate display, action store_true',
         action='store_true')
+    parser.add_argument(
+        '--png_workers',
+        help='--png_workers <number> , processes generating png files, default the number of cpus up to 4',
+        type=int,
+        default=None)
+    parser.add_argument(
+        '--png_refresh',
+        help='''--png_refresh , generate every png even if its data has not changed, action store_true
+            the data of each graph is hashed in table <table>_graph_cache''',
+        action='store_true')
     parser.add_argument(
         '--dir',
         help="--dir <results directory> default lf_qa",
@@ -1136,6 +1275,8 @@ Usage: lf_qa.py --store --png --path <path to directories to traverse> --databas
     __png = args.png
     __dir = args.dir
     __test_window_days = args.test_window_days
+    if args.store_incremental:
+        args.store = True
 
     logger.info("config:\
             path:{path} file:{file}\
@@ -1172,7 +1313,10 @@ Usage: lf_qa.py --store --png --path <path to directories to traverse> --databas
         _database=__database,
         _table=__table,
         _png=__png,
-        _test_window_days=__test_window_days)
+        _test_window_days=__test_window_days,
+        _incremental=args.store_incremental,
+        _png_workers=args.png_workers,
+        _png_refresh=args.png_refresh)
     # csv_dash.sub_test_information()
 
     if args.store: